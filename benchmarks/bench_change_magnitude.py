@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of outline change-magnitude scoring.
+
+For each outline (this repository's own .discuss outlines plus synthetic
+ones of increasing size), times fingerprinting the edited outline and
+scoring it against the stored fingerprint, which is what the Stop hook
+adds when an outline's content changed. Also reports the magnitude of a new
+bullet point and of a one-word typo fix, and the fingerprint size stored in
+the snapshot.
+
+Fails (exit code 1) if scoring an outline of up to --budget-words words
+takes longer than --budget-us microseconds (median).
+
+Usage:
+    python benchmarks/bench_change_magnitude.py [--repeat 200] [--budget-us 1000]
+                                                [--budget-words 1000]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+
+from common.change_magnitude import change_magnitude, fingerprint
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def synthetic_outline(words: int) -> str:
+    """Build an outline of roughly `words` words in bullet lines."""
+    lines = ["# Discussion: Synthetic", "", "## ⚪ Pending", ""]
+    for i in range(words // 12):
+        lines.append(f"- Question {i}: should component {i % 17} cache result {i} or recompute it")
+    return "\n".join(lines) + "\n"
+
+
+def median_us(func, repeat: int) -> float:
+    """Median wall time of func() in microseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark outline change-magnitude scoring")
+    parser.add_argument("--repeat", type=int, default=200, help="Runs per measurement")
+    parser.add_argument(
+        "--budget-us", type=float, default=1000.0, help="Scoring budget per outline (median)"
+    )
+    parser.add_argument(
+        "--budget-words", type=int, default=1000, help="Largest outline held to the budget"
+    )
+    args = parser.parse_args()
+
+    outlines = [
+        (path.parent.name[:32], path.read_text(encoding="utf-8"))
+        for path in sorted(REPO_ROOT.glob(".discuss/*/*/outline.md"))
+    ]
+    outlines += [(f"synthetic-{words}", synthetic_outline(words)) for words in (250, 1000, 5000)]
+
+    print(
+        f"{'outline':>32}  {'words':>6}  {'score us':>9}  {'bullet':>7}  {'typo':>7}  "
+        f"{'stored B':>8}"
+    )
+    over_budget = []
+    for name, text in outlines:
+        stored = fingerprint(text)
+        edited = text + "\n- New question raised in this round about retention\n"
+        words = text.split()
+        typo = text.replace(words[-1], words[-1][::-1] + "x", 1)
+
+        def score(stored=stored, edited=edited):
+            change_magnitude(stored, fingerprint(edited))
+
+        elapsed = median_us(score, args.repeat)
+        bullet = change_magnitude(stored, fingerprint(edited))
+        typo_magnitude = change_magnitude(stored, fingerprint(typo))
+        print(
+            f"{name:>32}  {len(words):>6}  {elapsed:>9.1f}  {bullet:>7.3f}  "
+            f"{typo_magnitude:>7.3f}  {len(stored):>8}"
+        )
+        if len(words) <= args.budget_words and elapsed > args.budget_us:
+            over_budget.append(name)
+
+    if over_budget:
+        print(
+            f"\nOver the {args.budget_us:.0f} us budget: {', '.join(over_budget)}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: content-hash overhead of change detection on large notes.
+
+Builds one discussion with an outline and a few multi-megabyte notes, then
+times, per check:
+- scan: the stat-only scan (scan_discussion)
+- hash all: scan plus hashing every file (first run, or every file touched)
+- hash changed: scan plus hash_changed_files after rewriting one note with
+  new content (only that note is hashed)
+- unchanged: scan plus hash_changed_files with nothing written (no hashing)
+and compares file_digest through mmap with a plain read() of the same files.
+
+Usage:
+    python benchmarks/bench_content_hash.py [--notes 4] [--note-mb 8] [--repeat 5]
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+
+import common.file_utils as file_utils
+from common.snapshot_manager import hash_changed_files, scan_discussion
+
+
+def build_topic(discuss_dir: Path, notes: int, note_mb: int) -> None:
+    """Write an outline and `notes` notes of `note_mb` MiB each."""
+    (discuss_dir / "notes").mkdir(parents=True)
+    (discuss_dir / "outline.md").write_text("# Outline\n" * 200)
+    chunk = b"lorem ipsum dolor sit amet\n" * 4096
+    for i in range(notes):
+        with open(discuss_dir / "notes" / f"note-{i}.md", "wb") as f:
+            for _ in range(note_mb * 1024 * 1024 // len(chunk) + 1):
+                f.write(chunk)
+
+
+def median_ms(func, repeat: int) -> float:
+    """Median wall time of func() in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark content hashing overhead")
+    parser.add_argument("--notes", type=int, default=4, help="Number of large notes")
+    parser.add_argument("--note-mb", type=int, default=8, help="Size of each note (MiB)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        discuss_dir = Path(tmp) / ".discuss" / "2026-01-30" / "topic"
+        build_topic(discuss_dir, args.notes, args.note_mb)
+        hashed_state = scan_discussion(discuss_dir)
+        hash_changed_files({}, hashed_state, discuss_dir)
+        note = discuss_dir / "notes" / "note-0.md"
+        edits = iter(range(10**6))
+
+        def hash_all():
+            hash_changed_files({}, scan_discussion(discuss_dir), discuss_dir)
+
+        def hash_changed():
+            edit = next(edits)
+            with open(note, "r+b") as f:
+                f.write(b"edit %d\n" % edit)
+            os.utime(note, (time.time() + edit + 1,) * 2)
+            hash_changed_files(hashed_state, scan_discussion(discuss_dir), discuss_dir)
+
+        def unchanged():
+            state = scan_discussion(discuss_dir)
+            hash_changed_files(hashed_state, state, discuss_dir)
+
+        total_mb = args.notes * args.note_mb
+        print(f"{args.notes} notes x {args.note_mb} MiB ({total_mb} MiB)")
+        print(f"{'check':>14}  {'ms':>8}")
+        print(f"{'scan':>14}  {median_ms(lambda: scan_discussion(discuss_dir), args.repeat):>8.2f}")
+        print(f"{'hash all':>14}  {median_ms(hash_all, args.repeat):>8.2f}")
+        print(f"{'hash changed':>14}  {median_ms(hash_changed, args.repeat):>8.2f}")
+        hashed_state = scan_discussion(discuss_dir)
+        hash_changed_files({}, hashed_state, discuss_dir)
+        print(f"{'unchanged':>14}  {median_ms(unchanged, args.repeat):>8.2f}")
+
+        paths = sorted((discuss_dir / "notes").iterdir())
+
+        def read_digests():
+            for path in paths:
+                hashlib.blake2b(path.read_bytes(), digest_size=file_utils.DIGEST_SIZE).hexdigest()
+
+        def mmap_digests():
+            for path in paths:
+                file_utils.file_digest(path)
+
+        print(f"{'read() notes':>14}  {median_ms(read_digests, args.repeat):>8.2f}")
+        print(f"{'mmap notes':>14}  {median_ms(mmap_digests, args.repeat):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
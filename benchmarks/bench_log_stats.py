@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: throughput of the hook log statistics scan.
+
+Writes synthetic hook logs of the given size (13 records per run, like a
+check_precipitation run at INFO) in the JSON-lines and text formats, plus
+a gzipped copy of the JSON-lines log, and times collect_stats over each.
+Reports MB/s of uncompressed log and the peak traced memory (measured in
+a separate pass).
+
+Usage:
+    python benchmarks/bench_log_stats.py [--mb 64]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+
+from common.log_stats import collect_stats
+
+PLATFORMS = ("claude_code", "cursor")
+VERDICTS = ("allow", "allow", "allow", "skip", "suggest", "block", "error")
+
+
+def json_run(rng: random.Random, day: str, exec_id: str) -> str:
+    """The JSON-lines records of one run."""
+    base = {
+        "ts": f"{day}T10:00:00.000",
+        "level": "INFO",
+        "hook": "check_precipitation",
+        "exec_id": exec_id,
+        "platform": rng.choice(PLATFORMS),
+        "session": f"s{rng.randrange(200)}",
+        "phase": "run",
+        "duration_ms": None,
+        "verdict": None,
+        "msg": "",
+    }
+    records = [dict(base, phase="start", msg="START cwd=/home/user/project")]
+    records += [dict(base, msg=f"> Checking discussion {i} of the workspace") for i in range(11)]
+    records.append(
+        dict(
+            base,
+            phase="end",
+            duration_ms=round(rng.lognormvariate(3, 0.6), 2),
+            verdict=rng.choice(VERDICTS),
+            msg="END [OK]",
+        )
+    )
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def text_run(rng: random.Random, day: str, exec_id: str) -> str:
+    """The text records of one run."""
+    prefix = f"{day} 10:00:00 | INFO     | [check_precipitation:{exec_id}] "
+    lines = [
+        "START cwd=/home/user/project",
+        f"platform={rng.choice(PLATFORMS)} session=s{rng.randrange(200)}",
+    ]
+    lines += [f"> Checking discussion {i} of the workspace" for i in range(10)]
+    lines.append(
+        f"END [OK] duration_ms={rng.lognormvariate(3, 0.6):.2f} verdict={rng.choice(VERDICTS)}"
+    )
+    return "".join(prefix + line + "\n" for line in lines)
+
+
+def write_log(path: Path, make_run, size: int) -> None:
+    """Write runs until the file reaches size bytes."""
+    rng = random.Random(1)
+    written = 0
+    with open(path, "w") as file:
+        while written < size:
+            day = f"2026-10-{rng.randrange(1, 29):02d}"
+            text = "".join(make_run(rng, day, f"{rng.randrange(65536):04x}") for _ in range(100))
+            file.write(text)
+            written += len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hook log statistics scan")
+    parser.add_argument("--mb", type=int, default=64, help="Size of each synthetic log (MB)")
+    args = parser.parse_args()
+    size = args.mb * 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+        json_log = log_dir / "discuss-hooks.jsonl"
+        text_log = log_dir / "discuss-hooks-2026-10-01.log"
+        write_log(json_log, json_run, size)
+        write_log(text_log, text_run, size)
+        gz_log = log_dir / "discuss-hooks.20261001T100000-1.jsonl.gz"
+        with open(json_log, "rb") as source, gzip.open(gz_log, "wb", compresslevel=6) as target:
+            shutil.copyfileobj(source, target)
+
+        print(f"{'log':>12}  {'MB':>6}  {'runs':>8}  {'seconds':>8}  {'MB/s':>7}  {'peak MB':>7}")
+        for name, path, uncompressed in (
+            ("jsonl", json_log, json_log.stat().st_size),
+            ("jsonl.gz", gz_log, json_log.stat().st_size),
+            ("text", text_log, text_log.stat().st_size),
+        ):
+            start = time.perf_counter()
+            groups = collect_stats([path], ["platform", "day"])
+            elapsed = time.perf_counter() - start
+            # Memory in a second pass: tracing slows the scan down
+            tracemalloc.start()
+            collect_stats([path], ["platform", "day"])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            runs = sum(group.runs for group in groups.values())
+            megabytes = uncompressed / 1024 / 1024
+            print(
+                f"{name:>12}  {megabytes:>6.0f}  {runs:>8}  {elapsed:>8.2f}  "
+                f"{megabytes / elapsed:>7.0f}  {peak / 1024 / 1024:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-run logging overhead of a Stop hook.
+
+Replays the records of a typical run (START with the stdin payload, a few
+INFO lines, DEBUG lines per discussion, metrics, END) through:
+
+- legacy: the previous pipeline (logging.FileHandler at DEBUG, messages
+  formatted eagerly, input/output payloads always serialized, one write
+  per record)
+- buffered at INFO (the default) and at DEBUG: common/logging_utils.py,
+  level-gated lazy records written once at log_hook_end
+- buffered JSON at INFO: the same with DISCUSS_HOOKS_LOG_FORMAT=json
+
+Logs go to a temporary home directory.
+
+Usage:
+    python benchmarks/bench_logging.py [--repeat 200] [--discussions 10]
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+
+import common.logging_utils as logging_utils
+
+PAYLOAD = {
+    "session_id": "0f3c2a9e-5d1b-4c7e-9a8f-2b6d4e1c3a5f",
+    "hook_event_name": "Stop",
+    "stop_hook_active": False,
+    "transcript_path": "/home/user/.claude/projects/demo/0f3c2a9e.jsonl",
+    "last_assistant_message": "Summary of the discussion round. " * 60,
+}
+
+
+def make_legacy_logger(log_file: Path) -> logging.Logger:
+    """The previous pipeline: one FileHandler write per record."""
+    logger = logging.getLogger("bench-legacy")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    handler = logging.FileHandler(log_file, encoding="utf-8")
+    handler.setFormatter(
+        logging.Formatter(
+            "%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+        )
+    )
+    logger.addHandler(handler)
+    return logger
+
+
+def legacy_run(logger: logging.Logger, discussions: int) -> None:
+    """Log one run the way the previous logging_utils did."""
+    prefix = "[check_precipitation:a3f2]"
+    logger.log(logging.INFO, f"{prefix} START cwd=/home/user/project")
+    logger.log(logging.INFO, f"{prefix} platform=claude_code session={PAYLOAD['session_id']}")
+    input_str = json.dumps(PAYLOAD, ensure_ascii=False)
+    if len(input_str) > 500:
+        input_str = input_str[:500] + "...(truncated)"
+    logger.log(logging.DEBUG, f"{prefix} input={input_str}")
+    logger.log(logging.INFO, f"{prefix} > Detected platform: claude_code")
+    logger.log(logging.DEBUG, f"{prefix} . Workspace root: /home/user/project")
+    logger.log(logging.DEBUG, f"{prefix} . Loaded json snapshot with {discussions} discussions")
+    for i in range(discussions):
+        logger.log(logging.DEBUG, f"{prefix} . Found active discussion: 2026-01-30/topic-{i}")
+    for i in range(discussions):
+        logger.log(
+            logging.DEBUG, f"{prefix} . Outline content unchanged, keeping change_count: {i}"
+        )
+    logger.log(logging.DEBUG, f"{prefix} . Snapshot unchanged, skipping write")
+    logger.log(logging.INFO, f"{prefix} > Stale reminders: 0")
+    logger.log(logging.INFO, f"{prefix} metrics: snapshot_writes=0 snapshot_writes_skipped=1")
+    logger.log(logging.INFO, f"{prefix} END [OK]")
+    logger.log(logging.DEBUG, f"{prefix} output={json.dumps({}, ensure_ascii=False)}")
+
+
+def buffered_run(discussions: int) -> None:
+    """Log the same run through the current logging_utils."""
+    logging_utils.log_hook_start("check_precipitation", PAYLOAD)
+    logging_utils.log_info("Detected platform: %s", "claude_code")
+    logging_utils.log_debug("Workspace root: %s", "/home/user/project")
+    logging_utils.log_debug("Loaded %s snapshot with %s discussions", "json", discussions)
+    for i in range(discussions):
+        logging_utils.log_debug("Found active discussion: %s", f"2026-01-30/topic-{i}")
+    for i in range(discussions):
+        logging_utils.log_debug("Outline content unchanged, keeping change_count: %s", i)
+    logging_utils.log_debug("Snapshot unchanged, skipping write")
+    logging_utils.log_info("Stale reminders: %s", 0)
+    logging_utils.log_hook_end("check_precipitation", {}, success=True)
+
+
+def median_us(func, repeat: int) -> float:
+    """Median wall time of func() in microseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-run logging overhead")
+    parser.add_argument("--repeat", type=int, default=200, help="Runs per measurement")
+    parser.add_argument("--discussions", type=int, default=10, help="Active discussions per run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        Path.home = lambda: home
+        logging_utils.ensure_directories()
+
+        logger = make_legacy_logger(home / "legacy.log")
+        results = [
+            (
+                "legacy (DEBUG, per record)",
+                median_us(lambda: legacy_run(logger, args.discussions), args.repeat),
+            )
+        ]
+        for name, level, log_format in (
+            ("buffered INFO", logging_utils.INFO, logging_utils.LOG_FORMAT_TEXT),
+            ("buffered DEBUG", logging_utils.DEBUG, logging_utils.LOG_FORMAT_TEXT),
+            ("buffered INFO json", logging_utils.INFO, logging_utils.LOG_FORMAT_JSON),
+        ):
+            logging_utils.set_log_level(level)
+            logging_utils.set_log_format(log_format)
+            results.append((name, median_us(lambda: buffered_run(args.discussions), args.repeat)))
+
+    print(f"{'pipeline':>28}  {'per run us':>10}")
+    for name, elapsed in results:
+        print(f"{name:>28}  {elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
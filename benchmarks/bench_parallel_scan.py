@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial vs thread-pool discussion scanning under stat latency.
+
+Builds a .discuss tree (each topic has an outline, 3 decisions and 2 notes;
+a few topics are recent), then times scan_active_discussions with a
+simulated per-call latency added to os.stat, os.scandir and DirEntry.stat,
+as on NFS or sshfs where every metadata call is a network round trip. The
+latency is a sleep, which releases the GIL like a real blocking syscall.
+
+Usage:
+    python benchmarks/bench_parallel_scan.py [--topics 200] [--latency-ms 1.0]
+                                             [--workers 1,4,8,16] [--repeat 3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+
+from common.snapshot_manager import scan_active_discussions
+
+
+def build_tree(discuss_root: Path, topics: int) -> None:
+    """Build a deterministic tree; every tenth topic is recent, the rest are old."""
+    old = time.time() - 30 * 24 * 3600
+    for i in range(topics):
+        topic = (
+            discuss_root / f"2025-{1 + i // 280 % 12:02d}-{1 + i // 10 % 28:02d}" / f"topic-{i:05d}"
+        )
+        files = [topic / "outline.md"]
+        files += [topic / "decisions" / f"D{d:02d}-decision.md" for d in range(3)]
+        files += [topic / "notes" / f"note-{n}.md" for n in range(2)]
+        for path in files:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(path.name)
+            if i % 10:
+                os.utime(path, (old, old))
+        if i % 10:
+            for directory in (topic / "decisions", topic / "notes", topic):
+                os.utime(directory, (old, old))
+
+
+class SlowEntry:
+    """DirEntry proxy adding latency to the first stat() call."""
+
+    def __init__(self, entry, delay: float):
+        self._entry = entry
+        self._delay = delay
+        self._stat = None
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def __fspath__(self):
+        return self._entry.path
+
+    def stat(self, *, follow_symlinks=True):
+        if self._stat is None:
+            time.sleep(self._delay)
+            self._stat = self._entry.stat(follow_symlinks=follow_symlinks)
+        return self._stat
+
+
+@contextmanager
+def simulated_latency(delay: float):
+    """Add delay seconds to every os.stat/os.scandir/DirEntry.stat call."""
+    real_stat, real_scandir = os.stat, os.scandir
+
+    def slow_stat(*args, **kwargs):
+        time.sleep(delay)
+        return real_stat(*args, **kwargs)
+
+    def slow_scandir(path="."):
+        time.sleep(delay)
+        with real_scandir(path) as it:
+            return iter([SlowEntry(entry, delay) for entry in it])
+
+    os.stat, os.scandir = slow_stat, slow_scandir
+    try:
+        yield
+    finally:
+        os.stat, os.scandir = real_stat, real_scandir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel discussion scanning")
+    parser.add_argument("--topics", type=int, default=200, help="Number of discussion topics")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Simulated latency per call")
+    parser.add_argument("--workers", default="1,4,8,16", help="Comma-separated worker counts")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per measurement (median reported)"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        discuss_root = Path(tmp) / ".discuss"
+        build_tree(discuss_root, args.topics)
+        expected = scan_active_discussions(discuss_root)
+
+        print(f"{'topics':>7}  {'latency ms':>10}  {'workers':>7}  {'scan ms':>10}  {'speedup':>8}")
+        serial_ms = None
+        for workers in [int(w) for w in args.workers.split(",")]:
+            times = []
+            with simulated_latency(args.latency_ms / 1000):
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    result = scan_active_discussions(discuss_root, workers=workers)
+                    times.append(time.perf_counter() - start)
+            assert result == expected, f"workers={workers} changed the scan result"
+
+            scan_ms = statistics.median(times) * 1000
+            serial_ms = serial_ms or scan_ms
+            print(
+                f"{args.topics:>7}  {args.latency_ms:>10.2f}  {workers:>7}  "
+                f"{scan_ms:>10.1f}  {serial_ms / scan_ms:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
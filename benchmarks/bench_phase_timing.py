@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: overhead of per-phase timing on an in-process Stop hook run.
+
+Builds a workspace with --discussions active discussions and times
+run_check (nothing changed since the previous run, the common case) with
+DISCUSS_HOOKS_TIMING off, "1" (phases line in the log) and "json" (also
+the hook-timings.jsonl sidecar), plus the cost of the disabled phase() and
+count() calls alone. Logs go to a temporary home directory.
+
+Usage:
+    python benchmarks/bench_phase_timing.py [--repeat 200] [--discussions 20]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+
+import common.logging_utils as logging_utils
+from common import metrics
+from common.precipitation import run_check
+
+
+def make_workspace(root: Path, discussions: int) -> Path:
+    """Create a workspace with active discussions."""
+    for i in range(discussions):
+        topic = root / ".discuss" / "2026-01-30" / f"topic-{i}"
+        (topic / "decisions").mkdir(parents=True)
+        (topic / "outline.md").write_text(f"# Topic {i}\n\n" + "- point\n" * 50)
+        (topic / "decisions" / "D01-choice.md").write_text("# Decision\n")
+    return root
+
+
+def median_us(func, repeat: int) -> float:
+    """Median wall time of func() in microseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(times)
+
+
+def disabled_calls() -> None:
+    """The phase()/count() calls of a run, with timing off."""
+    for name in (
+        "load_snapshot",
+        "find_active_discussions",
+        "scan_compare",
+        "cleanup",
+        "save_snapshot",
+    ):
+        with metrics.phase(name):
+            metrics.count("bytes_read", 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-phase timing overhead")
+    parser.add_argument("--repeat", type=int, default=200, help="Runs per measurement")
+    parser.add_argument(
+        "--discussions", type=int, default=20, help="Active discussions in the workspace"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        Path.home = lambda: home
+        workspace = make_workspace(home / "project", args.discussions)
+        logging_utils.set_log_level(logging_utils.INFO)
+        run_check({"status": "completed"}, workspace)  # First run writes the snapshot
+
+        results = []
+        for name, mode in (
+            ("off", metrics.TIMING_OFF),
+            ("log", metrics.TIMING_LOG),
+            ("json sidecar", metrics.TIMING_JSON),
+        ):
+            metrics.set_timing(mode)
+            results.append(
+                (
+                    f"run_check, timing {name}",
+                    median_us(
+                        lambda: run_check({"status": "completed"}, workspace, read_seconds=0.0),
+                        args.repeat,
+                    ),
+                )
+            )
+        metrics.set_timing(metrics.TIMING_OFF)
+        results.append(("phase/count calls, off", median_us(disabled_calls, args.repeat * 10)))
+
+    print(f"{'measurement':>30}  {'per run us':>10}")
+    for name, elapsed in results:
+        print(f"{name:>30}  {elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
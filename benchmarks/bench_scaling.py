@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: how the Stop hook and its steps scale with the .discuss tree.
+
+For each size, builds a deterministic tree (see discuss_tree.py), runs the
+hook once to write the snapshot and directory index, then measures:
+
+- stop_hook: hooks/stop/check_precipitation.py end to end, as a separate
+  process (nothing changed since the previous run, the common case)
+- stop_hook_edited: the same after appending a line to every recent outline
+  (a discussion round; the edit is not timed)
+- stop_hook_cached: stop_hook with the verdict cache on (a cache hit; the
+  other hook benchmarks run with DISCUSS_HOOKS_NO_CACHE=1)
+- find_active_cold / find_active_warm: scan_discussions_indexed without /
+  with the stored directory index
+- scan_discussion: scan_discussion of every active topic
+- compare_and_update: the per-discussion compare of the hook (hash changed
+  files, score the outline edit, compare_and_update) over active topics
+- load_snapshot / save_snapshot: snapshot I/O (save forced)
+
+Every measurement runs in a fresh process: wall time per repetition, peak
+RSS of the process, and filesystem calls (stat, scandir, open, rename,
+counted in one extra run through the os/io modules). stop_hook results also
+carry the median of each check_precipitation phase (DISCUSS_HOOKS_TIMING).
+
+Usage:
+    python benchmarks/bench_scaling.py [--sizes s,m,l] [--repeat 5]
+                                       [--benchmarks NAME,...] [--json PATH]
+                                       [--decisions 3] [--notes 2]
+                                       [--file-size 2048] [--recent 0.1]
+                                       [--seed 1]
+
+Sizes are preset names (s=10x5, m=40x10, l=100x20) or DATESxTOPICS.
+"""
+
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).parent
+HOOKS_DIR = BENCH_DIR.parent / "hooks"
+HOOK = HOOKS_DIR / "stop" / "check_precipitation.py"
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(HOOKS_DIR))
+
+from discuss_tree import (
+    TreeSpec,
+    build_tree,
+    count_fs_calls,
+    edit_recent_outlines,
+    parse_size,
+    size_label,
+)
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+HOOK_BENCHMARKS = ("stop_hook", "stop_hook_edited", "stop_hook_cached")
+FUNCTION_BENCHMARKS = (
+    "find_active_cold",
+    "find_active_warm",
+    "scan_discussion",
+    "compare_and_update",
+    "load_snapshot",
+    "save_snapshot",
+)
+BENCHMARKS = HOOK_BENCHMARKS + FUNCTION_BENCHMARKS
+
+HOOK_INPUT = '{"status": "completed"}'
+
+RESULTS_VERSION = 1
+
+
+def hook_env(workspace: Path, **extra: str) -> Dict[str, str]:
+    """Environment of a hook run: private home, no daemon or verdict cache, phase timings on."""
+    env = dict(
+        os.environ,
+        HOME=str(workspace / "home"),
+        PWD=str(workspace),
+        DISCUSS_HOOKS_NO_DAEMON="1",
+        DISCUSS_HOOKS_NO_CACHE="1",
+        DISCUSS_HOOKS_TIMING="json",
+    )
+    for name in ("WORKSPACE_ROOT", "PROJECT_ROOT", "DISCUSS_HOOKS_PROFILE"):
+        env.pop(name, None)
+    env.update(extra)
+    return env
+
+
+def rss_kib(usage) -> int:
+    """ru_maxrss in KiB (macOS reports bytes)."""
+    return usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+
+
+def run_hook(workspace: Path, env: Dict[str, str]) -> "tuple[float, Optional[int]]":
+    """
+    Run the hook once as a child process.
+
+    Returns:
+        (wall seconds, peak RSS in KiB or None)
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, str(HOOK)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=str(workspace),
+        env=env,
+    )
+    if hasattr(os, "wait4"):
+        # Reap the child ourselves to get its resource usage
+        proc.stdin.write(HOOK_INPUT.encode())
+        proc.stdin.close()
+        out = proc.stdout.read()
+        err = proc.stderr.read()
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        peak = rss_kib(usage)
+    else:
+        out, err = proc.communicate(HOOK_INPUT.encode())
+        peak = None
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"hook failed ({proc.returncode}): {err.decode(errors='replace')}")
+    json.loads(out)
+    return elapsed, peak
+
+
+def read_phases(workspace: Path) -> List[Dict[str, Any]]:
+    """Phase timings of the hook runs so far (hook-timings.jsonl), then clear them."""
+    path = workspace / "home" / ".discuss-for-specs" / "logs" / "hook-timings.jsonl"
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return []
+    path.unlink()
+    return [json.loads(line)["phases"] for line in lines if line.strip()]
+
+
+def measure_hook(name: str, workspace: Path, repeat: int) -> Dict[str, Any]:
+    """Measure a stop_hook benchmark."""
+    env = hook_env(workspace, **hook_extra_env(name))
+    if name == "stop_hook_cached":
+        run_hook(workspace, env)  # Writes the verdict cache
+    read_phases(workspace)
+    times, peaks = [], []
+    for i in range(repeat):
+        if name == "stop_hook_edited":
+            edit_recent_outlines(workspace / ".discuss", i)
+        elapsed, peak = run_hook(workspace, env)
+        times.append(elapsed)
+        peaks.append(peak)
+    phases = read_phases(workspace)
+
+    if name == "stop_hook_edited":
+        edit_recent_outlines(workspace / ".discuss", repeat)
+    counts = run_worker(name, workspace, 0, count=True)["fs_calls"]
+    # Cache hits write no phase timings
+    phase_stats = {
+        phase: summarize([run.get(phase, {}).get("ms", 0.0) for run in phases])
+        for phase in (phases[0] if phases else {})
+    }
+    return {
+        "times_ms": [round(t * 1000, 3) for t in times],
+        "fs_calls": counts,
+        "peak_rss_kib": max(peaks) if None not in peaks else None,
+        "phases_ms": {phase: stats["median_ms"] for phase, stats in phase_stats.items()},
+        "phases_mad_ms": {phase: stats["mad_ms"] for phase, stats in phase_stats.items()},
+    }
+
+
+def hook_extra_env(name: str) -> Dict[str, str]:
+    """Environment a benchmark adds to hook_env."""
+    return {"DISCUSS_HOOKS_NO_CACHE": "0"} if name == "stop_hook_cached" else {}
+
+
+def run_worker(name: str, workspace: Path, repeat: int, count: bool = False) -> Dict[str, Any]:
+    """Run one benchmark in a fresh process (see worker)."""
+    args = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--worker",
+        name,
+        "--workspace",
+        str(workspace),
+        "--repeat",
+        str(repeat),
+    ]
+    if count:
+        args.append("--count")
+    result = subprocess.run(
+        args,
+        input=HOOK_INPUT,
+        capture_output=True,
+        text=True,
+        cwd=str(workspace),
+        env=hook_env(workspace, **hook_extra_env(name)),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{name} worker failed: {result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def function_setup(name: str, discuss_root: Path) -> Callable[[], Any]:
+    """Build the timed call of an in-process benchmark."""
+    from common.snapshot_manager import (
+        compare_and_update,
+        get_discuss_key,
+        hash_changed_files,
+        load_snapshot,
+        save_snapshot,
+        scan_discussion,
+        scan_discussions_indexed,
+        score_outline_change,
+    )
+
+    snapshot = load_snapshot(discuss_root)
+    active, _ = scan_discussions_indexed(discuss_root, None, hours=24)
+
+    if name == "find_active_cold":
+        return lambda: scan_discussions_indexed(discuss_root, None, hours=24)
+    if name == "find_active_warm":
+        index = snapshot.get("index")
+        return lambda: scan_discussions_indexed(discuss_root, index, hours=24)
+    if name == "scan_discussion":
+        return lambda: [scan_discussion(discuss_dir) for discuss_dir, _ in active]
+    if name == "compare_and_update":
+        discussions = snapshot.get("discussions", {})
+        pairs = [
+            (discuss_dir, observed, discussions.get(get_discuss_key(discuss_dir, discuss_root), {}))
+            for discuss_dir, observed in active
+        ]
+
+        def compare():
+            for discuss_dir, observed, old_state in pairs:
+                new_state = copy.deepcopy(observed)
+                hash_changed_files(old_state, new_state, discuss_dir)
+                magnitude = score_outline_change(old_state, new_state, discuss_dir)
+                compare_and_update(old_state, new_state, magnitude, 0.05)
+
+        return compare
+    if name == "load_snapshot":
+        return lambda: load_snapshot(discuss_root)
+    if name == "save_snapshot":
+        return lambda: save_snapshot(discuss_root, snapshot, force=True)
+    raise ValueError(f"unknown benchmark: {name}")
+
+
+def worker(name: str, workspace: Path, repeat: int, count: bool) -> None:
+    """
+    Run a benchmark in this process and print its result as one JSON line.
+
+    With count, runs it once under count_fs_calls instead of timing it
+    (stop_hook benchmarks run the hook's main in this process).
+    """
+    if name in HOOK_BENCHMARKS:
+        import runpy
+
+        with count_fs_calls() as counts:
+            try:
+                runpy.run_path(str(HOOK), run_name="__main__")
+            except SystemExit:
+                pass
+        print()
+        print(json.dumps({"fs_calls": counts}))
+        return
+
+    func = function_setup(name, workspace / ".discuss")
+    func()  # Warm-up: imports, page cache
+    if count:
+        with count_fs_calls() as counts:
+            func()
+        print(json.dumps({"fs_calls": counts}))
+        return
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    peak = rss_kib(resource.getrusage(resource.RUSAGE_SELF)) if resource else None
+    print(json.dumps({"times_ms": [round(t * 1000, 3) for t in times], "peak_rss_kib": peak}))
+
+
+def summarize(times_ms: List[float]) -> Dict[str, float]:
+    """Median and median absolute deviation of repeated timings."""
+    median = statistics.median(times_ms)
+    return {
+        "median_ms": round(median, 3),
+        "mad_ms": round(statistics.median(abs(t - median) for t in times_ms), 3),
+    }
+
+
+def run_suite(
+    sizes: List[TreeSpec],
+    benchmarks: List[str],
+    repeat: int,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run benchmarks at several sizes.
+
+    Args:
+        sizes: Tree specs
+        benchmarks: Benchmark names (from BENCHMARKS)
+        repeat: Timed repetitions per benchmark
+        progress: Called with a line of text per finished benchmark
+
+    Returns:
+        Results document (see --json)
+    """
+    results = []
+    for spec in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            workspace = Path(tmp)
+            tree = build_tree(workspace / ".discuss", spec)
+            run_hook(workspace, hook_env(workspace))  # Writes the snapshot and index
+            for name in benchmarks:
+                if name in HOOK_BENCHMARKS:
+                    measured = measure_hook(name, workspace, repeat)
+                else:
+                    measured = run_worker(name, workspace, repeat)
+                    measured["fs_calls"] = run_worker(name, workspace, 0, count=True)["fs_calls"]
+                result = dict(
+                    {"benchmark": name, "size": size_label(spec), "tree": tree, "repeat": repeat},
+                    **summarize(measured["times_ms"]),
+                    **measured,
+                )
+                results.append(result)
+                if progress:
+                    progress(format_result(result))
+    base = sizes[0] if sizes else TreeSpec()
+    return {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "machine": platform.machine(),
+        "spec": {
+            field: getattr(base, field)
+            for field in ("decisions", "notes", "file_size", "recent", "seed")
+        },
+        "results": results,
+    }
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    """One table row of a result."""
+    calls = result["fs_calls"]
+    rss = result.get("peak_rss_kib")
+    return (
+        f"{result['benchmark']:<20} {result['size']:>8} {result['tree']['topics']:>7} "
+        f"{result['median_ms']:>10.2f} {result['mad_ms']:>8.2f} "
+        f"{calls['stat']:>7} {calls['scandir']:>7} {calls['open']:>6} "
+        f"{(rss / 1024 if rss else 0):>8.1f}"
+    )
+
+
+HEADER = (
+    f"{'benchmark':<20} {'size':>8} {'topics':>7} {'median ms':>10} {'mad ms':>8} "
+    f"{'stat':>7} {'scandir':>7} {'open':>6} {'rss MiB':>8}"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark how the Stop hook scales with the .discuss tree"
+    )
+    parser.add_argument(
+        "--sizes", default="s,m,l", help="Comma-separated sizes: s, m, l or DATESxTOPICS"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark")
+    parser.add_argument(
+        "--benchmarks", default=",".join(BENCHMARKS), help="Comma-separated benchmarks"
+    )
+    parser.add_argument("--json", help="Write machine-readable results to this file")
+    defaults = TreeSpec()
+    parser.add_argument(
+        "--decisions", type=int, default=defaults.decisions, help="Decision files per topic"
+    )
+    parser.add_argument("--notes", type=int, default=defaults.notes, help="Note files per topic")
+    parser.add_argument("--file-size", type=int, default=defaults.file_size, help="Bytes per file")
+    parser.add_argument(
+        "--recent", type=float, default=defaults.recent, help="Fraction of topics touched recently"
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--workspace", help=argparse.SUPPRESS)
+    parser.add_argument("--count", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, Path(args.workspace), args.repeat, args.count)
+        return
+
+    base = TreeSpec(
+        decisions=args.decisions,
+        notes=args.notes,
+        file_size=args.file_size,
+        recent=args.recent,
+        seed=args.seed,
+    )
+    try:
+        sizes = [parse_size(size.strip(), base) for size in args.sizes.split(",") if size.strip()]
+    except ValueError as e:
+        parser.error(str(e))
+    benchmarks = [name.strip() for name in args.benchmarks.split(",") if name.strip()]
+    unknown = [name for name in benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(
+            f"unknown benchmark(s): {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})"
+        )
+
+    print(HEADER)
+    document = run_suite(
+        sizes, benchmarks, args.repeat, progress=lambda line: print(line, flush=True)
+    )
+    if args.json:
+        Path(args.json).write_text(json.dumps(document, indent=2) + "\n")
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
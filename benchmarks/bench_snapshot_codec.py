@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: snapshot load + save time per codec.
+
+Builds synthetic snapshots (each discussion has an outline, 3 decisions and
+2 notes), then times one save (dumps + write) and one load (read + loads)
+through every codec in hooks/common/snapshot_codec.py. "yaml-pure" is the
+pure-Python PyYAML path the hooks used before the codec layer, for reference.
+
+Usage:
+    python benchmarks/bench_snapshot_codec.py [--sizes 10,1000,10000] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+
+from common.snapshot_codec import CODECS, SnapshotCodec
+
+
+def _pure_yaml_codec() -> SnapshotCodec:
+    import yaml
+
+    def loads(data):
+        return yaml.load(data, Loader=yaml.SafeLoader)
+
+    def dumps(snapshot):
+        return yaml.dump(
+            snapshot,
+            Dumper=yaml.SafeDumper,
+            sort_keys=False,
+            allow_unicode=True,
+            default_flow_style=False,
+        ).encode("utf-8")
+
+    return SnapshotCodec("yaml-pure", ".snapshot.pure.yaml", loads, dumps)
+
+
+def build_snapshot(discussions: int) -> dict:
+    """Build a deterministic snapshot with the given number of discussions."""
+    base = 1706600000.0
+    entries = {}
+    for i in range(discussions):
+        key = f"2026-{1 + i // 900 % 12:02d}-{1 + i // 30 % 28:02d}/topic-{i:05d}"
+        entries[key] = {
+            "outline": {"mtime": base + i * 7.25, "change_count": i % 5},
+            "decisions": [
+                {"name": f"D{d:02d}-decision-{i}.md", "mtime": base + i * 7.25 - d}
+                for d in range(1, 4)
+            ],
+            "notes": [
+                {"name": f"note-{n}.md", "mtime": base + i * 7.25 - 10 - n} for n in range(2)
+            ],
+        }
+    return {"version": 1, "config": {"stale_threshold": 3}, "discussions": entries}
+
+
+def time_codec(codec: SnapshotCodec, snapshot: dict, directory: Path, repeat: int) -> dict:
+    """Time save and load for one codec, returning medians in milliseconds."""
+    path = directory / codec.file_name
+    save_times, load_times = [], []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = codec.dumps(snapshot)
+        with open(path, "wb") as f:
+            f.write(data)
+        save_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            loaded = codec.loads(f.read())
+        load_times.append(time.perf_counter() - start)
+
+    assert loaded == snapshot, f"{codec.name} did not round-trip"
+    return {
+        "save_ms": statistics.median(save_times) * 1000,
+        "load_ms": statistics.median(load_times) * 1000,
+        "bytes": path.stat().st_size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark snapshot codecs")
+    parser.add_argument(
+        "--sizes", default="10,1000,10000", help="Comma-separated discussion counts"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs per measurement (median reported)"
+    )
+    args = parser.parse_args()
+
+    codecs = list(CODECS.values()) + [_pure_yaml_codec()]
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    print(
+        f"{'discussions':>11}  {'codec':<10} {'load ms':>10} {'save ms':>10} "
+        f"{'total ms':>10} {'size KB':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            snapshot = build_snapshot(size)
+            for codec in codecs:
+                r = time_codec(codec, snapshot, Path(tmp), args.repeat)
+                print(
+                    f"{size:>11}  {codec.name:<10} {r['load_ms']:>10.2f} {r['save_ms']:>10.2f} "
+                    f"{r['load_ms'] + r['save_ms']:>10.2f} {r['bytes'] / 1024:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
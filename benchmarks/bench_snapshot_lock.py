@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: snapshot update throughput with concurrent hook processes.
+
+Each process owns one discussion and repeatedly rewrites its outline (new
+content, new mtime) and runs the precipitation check, as concurrent agent
+sessions in one workspace would. Reports checks per second and verifies that every
+edit was counted exactly once (no lost or duplicated updates).
+
+Usage:
+    python benchmarks/bench_snapshot_lock.py [--processes 1,4,16] [--edits 20]
+                                             [--format yaml] [--layout single,sharded]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+
+from common.precipitation import run_check
+from common.snapshot_manager import convert_snapshot_layout, load_snapshot
+
+
+def edit_and_check(workspace: Path, topic: Path, edits: int) -> None:
+    """Edit one topic's outline and run the check after each edit."""
+    outline = topic / "outline.md"
+    base = time.time()
+    for i in range(edits):
+        temp = topic / ".outline.md.tmp"
+        temp.write_text(f"# Outline {i}")
+        os.utime(temp, (base + i + 1, base + i + 1))
+        os.replace(temp, outline)
+        run_check({"status": "completed"}, workspace)
+
+
+def run(processes: int, edits: int, layout: str) -> tuple:
+    """Run one measurement; returns (checks per second, lost or extra updates)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        workspace = Path(tmp)
+        topics = []
+        for i in range(processes):
+            topic = workspace / ".discuss" / "2026-01-30" / f"topic-{i:02d}"
+            topic.mkdir(parents=True)
+            (topic / "outline.md").write_text("# Outline")
+            topics.append(topic)
+        run_check({"status": "completed"}, workspace)
+        convert_snapshot_layout(workspace / ".discuss", layout)
+
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=edit_and_check, args=(workspace, topic, edits))
+            for topic in topics
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        discussions = load_snapshot(workspace / ".discuss")["discussions"]
+        errors = sum(
+            abs(state["outline"]["change_count"] - (edits + 1)) for state in discussions.values()
+        )
+        return processes * edits / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent snapshot updates")
+    parser.add_argument("--processes", default="1,4,16", help="Comma-separated process counts")
+    parser.add_argument("--edits", type=int, default=20, help="Edits (checks) per process")
+    parser.add_argument("--format", default="yaml", help="Snapshot format (yaml, json, marshal)")
+    parser.add_argument(
+        "--layout", default="single", help="Comma-separated layouts (single, sharded)"
+    )
+    args = parser.parse_args()
+
+    os.environ["DISCUSS_SNAPSHOT_FORMAT"] = args.format
+    print(f"{'layout':>7}  {'processes':>9}  {'checks':>7}  {'checks/s':>9}  {'miscounted':>10}")
+    for layout in args.layout.split(","):
+        for processes in [int(p) for p in args.processes.split(",")]:
+            throughput, errors = run(processes, args.edits, layout)
+            checks = processes * args.edits
+            print(f"{layout:>7}  {processes:>9}  {checks:>7}  {throughput:>9.0f}  {errors:>10}")
+
+
+if __name__ == "__main__":
+    main()
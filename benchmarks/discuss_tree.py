@@ -0,0 +1,311 @@
+"""
+Deterministic .discuss tree generator and filesystem call counter, shared
+by the scaling benchmarks (bench_scaling.py).
+
+A TreeSpec describes the tree: date directories, topics per date, decision
+and note files per topic, the size of each file, and the fraction of topics
+touched within the last hour (the rest are 30+ days old). The same spec and
+seed always produce the same names, contents and relative mtimes.
+
+Usage:
+    python benchmarks/discuss_tree.py DIR [--dates 40] [--topics 10]
+                                          [--decisions 3] [--notes 2]
+                                          [--file-size 2048] [--recent 0.1]
+                                          [--seed 1]
+"""
+
+import argparse
+import os
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple
+
+# Name of the first date directory (the others follow day by day)
+FIRST_DATE = date(2025, 1, 1)
+
+# Words file contents are drawn from (outline-like markdown)
+WORDS = (
+    "storage",
+    "cache",
+    "index",
+    "latency",
+    "snapshot",
+    "decision",
+    "option",
+    "tradeoff",
+    "reader",
+    "writer",
+    "journal",
+    "shard",
+    "budget",
+    "retry",
+    "timeout",
+    "session",
+    "problem",
+    "confirmed",
+    "pending",
+    "rejected",
+)
+
+
+class TreeSpec(NamedTuple):
+    """Shape of a generated .discuss tree."""
+
+    dates: int = 40
+    topics: int = 10
+    decisions: int = 3
+    notes: int = 2
+    file_size: int = 2048
+    recent: float = 0.1
+    seed: int = 1
+
+    @property
+    def total_topics(self) -> int:
+        return self.dates * self.topics
+
+    @property
+    def total_files(self) -> int:
+        return self.total_topics * (1 + self.decisions + self.notes)
+
+
+# Named sizes used by the benchmark suite (date directories x topics per date)
+PRESETS = {
+    "s": TreeSpec(dates=10, topics=5),
+    "m": TreeSpec(dates=40, topics=10),
+    "l": TreeSpec(dates=100, topics=20),
+}
+
+
+def parse_size(value: str, base: TreeSpec = TreeSpec()) -> TreeSpec:
+    """
+    Parse a size: a preset name (s, m, l) or DATESxTOPICS (e.g. 40x10).
+
+    Args:
+        value: Size text
+        base: Spec providing the other fields
+
+    Returns:
+        TreeSpec
+    """
+    if value in PRESETS:
+        return PRESETS[value]._replace(
+            **{
+                field: getattr(base, field)
+                for field in ("decisions", "notes", "file_size", "recent", "seed")
+            }
+        )
+    dates, sep, topics = value.partition("x")
+    if not sep or not dates.isdigit() or not topics.isdigit():
+        raise ValueError(f"expected s, m, l or DATESxTOPICS, got {value!r}")
+    return base._replace(dates=int(dates), topics=int(topics))
+
+
+def size_label(spec: TreeSpec) -> str:
+    """Label of a spec in results (DATESxTOPICS)."""
+    return f"{spec.dates}x{spec.topics}"
+
+
+def _text(rng: random.Random, title: str, size: int) -> str:
+    """Markdown of about size bytes."""
+    lines = [f"# {title}", ""]
+    length = len(lines[0]) + 1
+    while length < size:
+        line = "- " + " ".join(rng.choice(WORDS) for _ in range(8))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def build_tree(discuss_root: Path, spec: TreeSpec) -> Dict[str, int]:
+    """
+    Build a .discuss tree.
+
+    Args:
+        discuss_root: .discuss directory to create
+        spec: Tree shape
+
+    Returns:
+        {"topics", "recent_topics", "files", "bytes"}
+    """
+    rng = random.Random(spec.seed)
+    now = time.time()
+    recent_topics = 0
+    total_bytes = 0
+    for d in range(spec.dates):
+        date_dir = discuss_root / (FIRST_DATE + timedelta(days=d)).isoformat()
+        for t in range(spec.topics):
+            topic = date_dir / f"topic-{t:03d}"
+            files = [(topic / "outline.md", f"Outline {d}/{t}")]
+            files += [
+                (topic / "decisions" / f"D{i + 1:02d}-choice-{i}.md", f"Decision {i + 1}")
+                for i in range(spec.decisions)
+            ]
+            files += [(topic / "notes" / f"note-{i}.md", f"Note {i}") for i in range(spec.notes)]
+            is_recent = rng.random() < spec.recent
+            mtime = now - rng.uniform(60, 3600) if is_recent else now - rng.uniform(30, 300) * 86400
+            recent_topics += is_recent
+            for path, title in files:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                text = _text(rng, title, spec.file_size)
+                path.write_text(text)
+                total_bytes += len(text)
+                os.utime(path, (mtime, mtime))
+            for directory in (topic / "decisions", topic / "notes", topic):
+                if directory.exists():
+                    os.utime(directory, (mtime, mtime))
+    return {
+        "topics": spec.total_topics,
+        "recent_topics": recent_topics,
+        "files": spec.total_files,
+        "bytes": total_bytes,
+    }
+
+
+def edit_recent_outlines(discuss_root: Path, round_number: int) -> int:
+    """
+    Append a line to the outline of every topic touched within the last day.
+
+    Args:
+        discuss_root: .discuss directory
+        round_number: Added to the line (so each round is a content change)
+
+    Returns:
+        Number of outlines edited
+    """
+    cutoff = time.time() - 86400
+    edited = 0
+    for outline in sorted(discuss_root.glob("*/*/outline.md")):
+        if outline.stat().st_mtime > cutoff:
+            with open(outline, "a") as f:
+                f.write(f"- round {round_number}: new point\n")
+            edited += 1
+    return edited
+
+
+class _CountingEntry:
+    """DirEntry proxy counting stat() calls that reach the filesystem."""
+
+    def __init__(self, entry, counts: Dict[str, int]):
+        self._entry = entry
+        self._counts = counts
+        self._stat = None
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def __fspath__(self):
+        return self._entry.path
+
+    def stat(self, *, follow_symlinks=True):
+        if self._stat is None:
+            self._counts["stat"] += 1
+            self._stat = self._entry.stat(follow_symlinks=follow_symlinks)
+        return self._stat
+
+
+class _CountingScandir:
+    """os.scandir replacement yielding counting entries."""
+
+    def __init__(self, path, counts: Dict[str, int], real_scandir):
+        counts["scandir"] += 1
+        self._it = real_scandir(path)
+        self._counts = counts
+
+    def __iter__(self):
+        for entry in self._it:
+            yield _CountingEntry(entry, self._counts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._it.close()
+
+
+@contextmanager
+def count_fs_calls() -> Iterator[Dict[str, int]]:
+    """
+    Count filesystem calls made through the os and io modules.
+
+    Counts stat (os.stat, os.lstat, first DirEntry.stat), scandir
+    (os.scandir, os.listdir), open (open, os.open) and rename (os.replace,
+    os.rename). Calls made by C code (e.g. the import system) are not seen.
+
+    Yields:
+        The live counts dictionary
+    """
+    import builtins
+    import io
+
+    counts = {"stat": 0, "scandir": 0, "open": 0, "rename": 0}
+    real = {
+        (os, "stat"): os.stat,
+        (os, "lstat"): os.lstat,
+        (os, "scandir"): os.scandir,
+        (os, "listdir"): os.listdir,
+        (os, "open"): os.open,
+        (os, "replace"): os.replace,
+        (os, "rename"): os.rename,
+        (builtins, "open"): builtins.open,
+        (io, "open"): io.open,
+    }
+
+    def counting(kind: str, func):
+        def wrapper(*args, **kwargs):
+            counts[kind] += 1
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    patched: List = [
+        (os, "stat", counting("stat", os.stat)),
+        (os, "lstat", counting("stat", os.lstat)),
+        (os, "scandir", lambda path=".": _CountingScandir(path, counts, real[(os, "scandir")])),
+        (os, "listdir", counting("scandir", os.listdir)),
+        (os, "open", counting("open", os.open)),
+        (os, "replace", counting("rename", os.replace)),
+        (os, "rename", counting("rename", os.rename)),
+        (builtins, "open", counting("open", builtins.open)),
+        (io, "open", counting("open", io.open)),
+    ]
+    for module, name, func in patched:
+        setattr(module, name, func)
+    try:
+        yield counts
+    finally:
+        for (module, name), func in real.items():
+            setattr(module, name, func)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic .discuss tree")
+    parser.add_argument("directory", help="Workspace directory (the tree goes to DIR/.discuss)")
+    defaults = TreeSpec()
+    parser.add_argument("--dates", type=int, default=defaults.dates, help="Date directories")
+    parser.add_argument("--topics", type=int, default=defaults.topics, help="Topics per date")
+    parser.add_argument(
+        "--decisions", type=int, default=defaults.decisions, help="Decision files per topic"
+    )
+    parser.add_argument("--notes", type=int, default=defaults.notes, help="Note files per topic")
+    parser.add_argument("--file-size", type=int, default=defaults.file_size, help="Bytes per file")
+    parser.add_argument(
+        "--recent", type=float, default=defaults.recent, help="Fraction of topics touched recently"
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed")
+    args = parser.parse_args()
+
+    spec = TreeSpec(
+        args.dates, args.topics, args.decisions, args.notes, args.file_size, args.recent, args.seed
+    )
+    summary = build_tree(Path(args.directory) / ".discuss", spec)
+    print(" ".join(f"{key}={value}" for key, value in summary.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Performance gate: compare the scaling benchmarks with a stored baseline.
+
+Runs bench_scaling.py at the sizes and repetitions recorded in the baseline
+(benchmarks/perf_baseline.json) and prints one row per benchmark, and per
+phase of the Stop hook, with the baseline and current medians. A metric is
+slower or faster only when the difference exceeds all of:
+
+- --mads times the combined noise of both runs (MAD scaled to a standard
+  deviation)
+- --tolerance times the baseline median
+- --floor-ms
+
+Slowdowns of the Stop hook (stop_hook, stop_hook_edited), in total or in any
+check_precipitation phase, are regressions; the sizes that have one are run
+again and the gate fails (exit 1) only if the regression shows up again.
+Slowdowns of the in-process benchmarks are reported but do not fail.
+
+Timings depend on the machine: refresh the baseline on the machine the gate
+runs on, deliberately, when a slowdown is accepted or the benchmarks change.
+The gate is not part of the pytest suite.
+
+Usage:
+    python benchmarks/perf_gate.py [--baseline PATH] [--json PATH]
+                                   [--mads 4] [--tolerance 0.2] [--floor-ms 1]
+    python benchmarks/perf_gate.py --update [--sizes s,m] [--repeat 7]
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_scaling import BENCHMARKS, HOOK_BENCHMARKS, run_suite
+from discuss_tree import TreeSpec, parse_size, size_label
+
+DEFAULT_BASELINE = Path(__file__).parent / "perf_baseline.json"
+DEFAULT_SIZES = "s,m"
+DEFAULT_REPEAT = 7
+
+# MAD of normally distributed noise times this is its standard deviation
+MAD_SCALE = 1.4826
+
+OK = "ok"
+FASTER = "faster"
+SLOWER = "slower"
+REGRESSION = "REGRESSION"
+NEW = "new"
+MISSING = "missing"
+
+
+def run_gate_suite(specs: List[TreeSpec], repeat: int, benchmarks=BENCHMARKS) -> Dict[str, Any]:
+    """Run the benchmarks, printing each result to stderr."""
+    return run_suite(
+        specs,
+        list(benchmarks),
+        repeat,
+        progress=lambda line: print(f"  {line}", file=sys.stderr, flush=True),
+    )
+
+
+def gate_specs(baseline: Dict[str, Any]) -> List[TreeSpec]:
+    """Tree specs of the sizes recorded in a baseline."""
+    base = TreeSpec(**baseline["spec"])
+    return [parse_size(size, base) for size in baseline["gate"]["sizes"]]
+
+
+def metrics(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Metrics of one result.
+
+    Returns:
+        {metric: (median_ms, mad_ms, gated)}; "total" plus "phase:NAME" for
+        each Stop-hook phase
+    """
+    gated = result["benchmark"] in HOOK_BENCHMARKS
+    rows = {"total": (result["median_ms"], result["mad_ms"], gated)}
+    mads = result.get("phases_mad_ms", {})
+    for phase, median in result.get("phases_ms", {}).items():
+        rows[f"phase:{phase}"] = (median, mads.get(phase, 0.0), gated)
+    return rows
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    mads: float = 4.0,
+    tolerance: float = 0.2,
+    floor_ms: float = 1.0,
+) -> List[Dict[str, Any]]:
+    """
+    Compare current results with a baseline.
+
+    Args:
+        baseline: Baseline results document
+        current: Current results document
+        mads: Noise multiple a difference must exceed
+        tolerance: Fraction of the baseline median a difference must exceed
+        floor_ms: Milliseconds a difference must exceed
+
+    Returns:
+        Rows {benchmark, size, metric, base_ms, current_ms, limit_ms, status}
+        in baseline order, then metrics only in the current results
+    """
+
+    def by_key(document):
+        return {
+            (result["benchmark"], result["size"], metric): values
+            for result in document["results"]
+            for metric, values in metrics(result).items()
+        }
+
+    base_metrics = by_key(baseline)
+    current_metrics = by_key(current)
+    rows = []
+    for key, (base_ms, base_mad, gated) in base_metrics.items():
+        row = dict(
+            zip(("benchmark", "size", "metric"), key),
+            base_ms=base_ms,
+            current_ms=None,
+            limit_ms=None,
+            status=MISSING,
+        )
+        if key in current_metrics:
+            current_ms, current_mad, _ = current_metrics[key]
+            noise = MAD_SCALE * math.hypot(base_mad, current_mad)
+            limit = max(mads * noise, tolerance * base_ms, floor_ms)
+            if current_ms - base_ms > limit:
+                status = REGRESSION if gated else SLOWER
+            elif base_ms - current_ms > limit:
+                status = FASTER
+            else:
+                status = OK
+            row.update(current_ms=current_ms, limit_ms=round(limit, 3), status=status)
+        rows.append(row)
+    for key, (current_ms, _, _) in current_metrics.items():
+        if key not in base_metrics:
+            rows.append(
+                dict(
+                    zip(("benchmark", "size", "metric"), key),
+                    base_ms=None,
+                    current_ms=current_ms,
+                    limit_ms=None,
+                    status=NEW,
+                )
+            )
+    return rows
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    """Diff table of compare() rows."""
+
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.2f}"
+
+    lines = [
+        f"{'benchmark':<20} {'size':>8} {'metric':<32} {'base ms':>9} {'now ms':>9} "
+        f"{'change':>8} {'limit ms':>9}  status"
+    ]
+    for row in rows:
+        if row["base_ms"] and row["current_ms"] is not None:
+            change = f"{(row['current_ms'] - row['base_ms']) / row['base_ms']:+.1%}"
+        else:
+            change = "-"
+        lines.append(
+            f"{row['benchmark']:<20} {row['size']:>8} {row['metric']:<32} {ms(row['base_ms']):>9} "
+            f"{ms(row['current_ms']):>9} {change:>8} {ms(row['limit_ms']):>9}  {row['status']}"
+        )
+    return "\n".join(lines)
+
+
+def environment_mismatch(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Fields of the environment that differ from the baseline's."""
+    return [
+        f"{field} {baseline.get(field)} -> {current.get(field)}"
+        for field in ("python", "platform", "machine")
+        if baseline.get(field) != current.get(field)
+    ]
+
+
+def update_baseline(path: Path, sizes: str, repeat: int) -> None:
+    """Run the benchmarks and store the results as the baseline."""
+    specs = [parse_size(size.strip()) for size in sizes.split(",") if size.strip()]
+    print(
+        f"Running benchmarks at {', '.join(size_label(spec) for spec in specs)} "
+        f"(repeat {repeat})...",
+        file=sys.stderr,
+    )
+    document = run_gate_suite(specs, repeat)
+    document["gate"] = {"sizes": [size_label(spec) for spec in specs], "repeat": repeat}
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    print(f"Baseline written to {path}")
+
+
+def check(baseline_path: Path, args: argparse.Namespace) -> int:
+    """Run the gate; returns the exit code."""
+    baseline = json.loads(baseline_path.read_text())
+    specs = gate_specs(baseline)
+    repeat = baseline["gate"]["repeat"]
+    print(
+        f"Running benchmarks at {', '.join(baseline['gate']['sizes'])} (repeat {repeat})...",
+        file=sys.stderr,
+    )
+    current = run_gate_suite(specs, repeat)
+
+    mismatch = environment_mismatch(baseline, current)
+    if mismatch:
+        print(f"Warning: baseline was recorded elsewhere ({'; '.join(mismatch)})", file=sys.stderr)
+
+    thresholds = {"mads": args.mads, "tolerance": args.tolerance, "floor_ms": args.floor_ms}
+    rows = compare(baseline, current, **thresholds)
+    regressed = {row["size"] for row in rows if row["status"] == REGRESSION}
+    if regressed:
+        # Confirm on a second run of the affected sizes: only slowdowns seen twice fail
+        print(f"Re-running {', '.join(sorted(regressed))} to confirm...", file=sys.stderr)
+        again = run_gate_suite(
+            [spec for spec in specs if size_label(spec) in regressed], repeat, HOOK_BENCHMARKS
+        )
+        confirmed = {
+            (row["benchmark"], row["size"], row["metric"])
+            for row in compare(baseline, again, **thresholds)
+            if row["status"] == REGRESSION
+        }
+        for row in rows:
+            if (
+                row["status"] == REGRESSION
+                and (row["benchmark"], row["size"], row["metric"]) not in confirmed
+            ):
+                row["status"] = f"{SLOWER} (not confirmed)"
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(dict(current, comparison=rows), indent=2) + "\n")
+
+    print(format_table(rows))
+    failures = [row for row in rows if row["status"] == REGRESSION]
+    if failures:
+        print(
+            f"\n{len(failures)} significant slowdown(s) of the Stop hook; if intended, "
+            "refresh the baseline with: python benchmarks/perf_gate.py --update"
+        )
+        return 1
+    print("\nNo significant slowdowns")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fail on significant Stop-hook slowdowns against a baseline"
+    )
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline results file")
+    parser.add_argument(
+        "--update", action="store_true", help="Run the benchmarks and overwrite the baseline"
+    )
+    parser.add_argument(
+        "--sizes", default=DEFAULT_SIZES, help="With --update: comma-separated sizes"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=DEFAULT_REPEAT, help="With --update: repetitions"
+    )
+    parser.add_argument(
+        "--mads", type=float, default=4.0, help="Noise multiple a slowdown must exceed"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Fraction of the baseline a slowdown must exceed",
+    )
+    parser.add_argument(
+        "--floor-ms", type=float, default=1.0, help="Milliseconds a slowdown must exceed"
+    )
+    parser.add_argument("--json", help="Write current results and the comparison to this file")
+    args = parser.parse_args()
+
+    baseline_path = Path(args.baseline)
+    if args.update:
+        if args.repeat < 3:
+            parser.error("--repeat must be at least 3 for a meaningful MAD")
+        try:
+            update_baseline(baseline_path, args.sizes, args.repeat)
+        except ValueError as e:
+            parser.error(str(e))
+        return
+    if not baseline_path.exists():
+        parser.error(f"no baseline at {baseline_path}; create one with --update")
+    sys.exit(check(baseline_path, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+Change journal for the .discuss directory (optional, Linux only).
+
+A watcher process (stop/change_watcher.py) watches .discuss/ recursively
+with inotify and appends the relative path of every changed entry to
+.discuss/.journal. The Stop hook then replays the journal from the position
+recorded in the snapshot and rescans only the discussions that changed,
+instead of walking the tree.
+
+Journal format (text, one entry per line):
+    {"journal": 1, "id": "3f9c...", "pid": 4242}     <- header (JSON)
+    2026-01-30/topic-slug/outline.md
+    2026-01-30/topic-slug/decisions
+    2026-01-31                                       <- date dir changed
+
+The hook falls back to a full scan (and resynchronizes its position) when
+the journal is missing or unreadable, was truncated, was started by
+another watcher (id differs from the snapshot's), or its watcher is no
+longer running. The watcher starts a new journal (new id) when the file
+grows past MAX_JOURNAL_BYTES or the inotify queue overflows.
+
+inotify is used through ctypes, so no third-party dependency is needed.
+Only the reader is on the hook's path: it uses json/os only.
+"""
+
+import json
+import os
+import select
+import struct
+import uuid
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from .logging_utils import log_debug, log_info, log_warning
+
+# Journal file name under .discuss/
+JOURNAL_FILE_NAME = ".journal"
+
+# Journal format version (header "journal" field)
+JOURNAL_VERSION = 1
+
+# The watcher starts a new journal beyond this size (bytes)
+MAX_JOURNAL_BYTES = 1 << 20
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class JournalState(NamedTuple):
+    """Result of reading the journal for one hook run."""
+
+    # Position to store in the snapshot ({"id": ..., "offset": ...}), or
+    # None if there is no usable journal
+    position: Optional[Dict[str, Any]]
+    # Paths changed since the stored position, or None if the journal
+    # cannot vouch for them (a full scan is needed)
+    changed: Optional[Set[str]]
+
+
+def get_journal_path(discuss_root) -> str:
+    """Get the path to the journal file under a .discuss directory."""
+    return os.path.join(str(discuss_root), JOURNAL_FILE_NAME)
+
+
+def is_process_alive(pid: int) -> bool:
+    """Check whether a process with the given pid exists."""
+    if not isinstance(pid, int) or pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def read_journal(discuss_root, position: Optional[Dict[str, Any]]) -> JournalState:
+    """
+    Read the journal entries written since a stored position.
+
+    Args:
+        discuss_root: Path to .discuss directory
+        position: Position stored by the previous run (snapshot["journal"])
+
+    Returns:
+        JournalState; changed is None when a full scan is needed
+    """
+    try:
+        with open(get_journal_path(discuss_root), "rb") as f:
+            header_line = f.readline()
+            header = json.loads(header_line.decode("utf-8"))
+            if not isinstance(header, dict) or header.get("journal") != JOURNAL_VERSION:
+                raise ValueError("Unknown journal header")
+
+            journal_id = header.get("id")
+            if not is_process_alive(header.get("pid")):
+                log_debug("Change journal watcher is not running, full scan")
+                return JournalState(None, None)
+
+            offset = len(header_line)
+            replay = (
+                isinstance(position, dict)
+                and position.get("id") == journal_id
+                and isinstance(position.get("offset"), int)
+                and offset <= position["offset"] <= os.fstat(f.fileno()).st_size
+            )
+            if replay:
+                f.seek(position["offset"])
+                offset = position["offset"]
+            data = f.read()
+    except FileNotFoundError:
+        return JournalState(None, None)
+    except (OSError, ValueError) as e:
+        log_warning(f"Unreadable change journal, full scan: {e}")
+        return JournalState(None, None)
+
+    # Only consume complete lines (the watcher may be mid-write)
+    end = data.rfind(b"\n") + 1
+    new_position = {"id": journal_id, "offset": offset + end}
+
+    if not replay:
+        if isinstance(position, dict) and position.get("id") == journal_id:
+            log_info("Change journal was truncated, full scan")
+        return JournalState(new_position, None)
+
+    changed = set(data[:end].decode("utf-8", "replace").splitlines())
+    changed.discard("")
+    log_debug("Change journal: %s changed path(s)", len(changed))
+    return JournalState(new_position, changed)
+
+
+class JournalWriter:
+    """Append-only writer for the journal file (used by the watcher)."""
+
+    def __init__(self, discuss_root, max_bytes: int = MAX_JOURNAL_BYTES):
+        self.path = get_journal_path(discuss_root)
+        self.max_bytes = max_bytes
+        self.journal_id = ""
+        self.size = 0
+        self._fd = -1
+
+    def start(self) -> None:
+        """Start a new journal with a fresh id (replaces any existing one)."""
+        self.close()
+        self.journal_id = uuid.uuid4().hex
+        header = json.dumps({"journal": JOURNAL_VERSION, "id": self.journal_id, "pid": os.getpid()})
+        data = (header + "\n").encode("utf-8")
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        self.size = len(data)
+        log_info(f"Started change journal {self.journal_id[:8]}")
+
+    def append(self, paths: Iterable[str]) -> None:
+        """Append changed paths (one write per batch, rotating when too large)."""
+        lines = "".join(f"{path}\n" for path in paths if "\n" not in path)
+        if not lines:
+            return
+        if self.size >= self.max_bytes:
+            self.start()
+        data = lines.encode("utf-8")
+        os.write(self._fd, data)
+        self.size += len(data)
+
+    def close(self, remove: bool = False) -> None:
+        """Close the journal; remove=True deletes it (hooks fall back to scanning)."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        if remove:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class Inotify:
+    """Minimal ctypes binding for inotify."""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._get_errno = ctypes.get_errno
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        """Watch a directory, returning the watch descriptor."""
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = self._get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read_events(self, timeout: Optional[float] = None) -> List[tuple]:
+        """
+        Wait for events.
+
+        Args:
+            timeout: Seconds to wait (None: forever)
+
+        Returns:
+            List of (wd, mask, name) tuples, empty on timeout
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        data = os.read(self.fd, 64 * 1024)
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + name_len].rstrip(b"\0")
+            offset += name_len
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        """Close the inotify descriptor (drops all watches)."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def is_inotify_supported() -> bool:
+    """Check whether inotify can be used on this platform."""
+    if not hasattr(os, "O_CLOEXEC") or not os.path.isdir("/proc"):
+        return False
+    try:
+        Inotify().close()
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+class ChangeWatcher:
+    """Watch a .discuss directory recursively and journal changed paths."""
+
+    def __init__(self, discuss_root, max_bytes: int = MAX_JOURNAL_BYTES):
+        self.discuss_root = os.path.abspath(str(discuss_root))
+        self.writer = JournalWriter(self.discuss_root, max_bytes)
+        self.inotify = None
+        self._watches: Dict[int, str] = {}
+        self.running = False
+
+    def start(self) -> None:
+        """Set up watches for the whole tree and start a new journal."""
+        self.inotify = Inotify()
+        self._watches = {}
+        self._watch_tree(self.discuss_root, [])
+        self.writer.start()
+        self.running = True
+
+    def stop(self) -> None:
+        """Stop watching and remove the journal."""
+        self.running = False
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+        self.writer.close(remove=True)
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.discuss_root).replace(os.sep, "/")
+
+    def _watch_tree(self, top: str, found: List[str]) -> None:
+        """Add watches for top and every directory below it, collecting entries."""
+        pending = [top]
+        while pending:
+            directory = pending.pop()
+            try:
+                self._watches[self.inotify.add_watch(directory)] = directory
+                entries = list(os.scandir(directory))
+            except OSError as e:
+                log_warning(f"Cannot watch {directory}: {e}")
+                continue
+            for entry in entries:
+                if directory == self.discuss_root and entry.name.startswith("."):
+                    continue
+                found.append(self._relative(entry.path))
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+
+    def process_once(self, timeout: Optional[float] = None) -> int:
+        """
+        Wait for one batch of events and journal it.
+
+        Args:
+            timeout: Seconds to wait (None: forever)
+
+        Returns:
+            Number of journal entries written
+        """
+        changed: List[str] = []
+        seen: Set[str] = set()
+
+        for wd, mask, name in self.inotify.read_events(timeout):
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost: a new journal forces hooks to rescan
+                log_warning("inotify queue overflow, starting a new journal")
+                self.writer.start()
+                return 0
+
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._watches[wd]
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF) and directory == self.discuss_root:
+                log_info("Watched .discuss directory was removed, stopping")
+                self.running = False
+                break
+
+            path = os.path.join(directory, name) if name else directory
+            if directory == self.discuss_root and (not name or name.startswith(".")):
+                # Snapshot, journal and other bookkeeping files
+                continue
+
+            found = [self._relative(path)]
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # Entries created before the watch existed are journaled too
+                self._watch_tree(path, found)
+            for relative in found:
+                if relative not in seen:
+                    seen.add(relative)
+                    changed.append(relative)
+
+        self.writer.append(changed)
+        return len(changed)
+
+    def run(self, timeout: Optional[float] = None) -> None:
+        """Process events until stopped or the .discuss directory is removed."""
+        while self.running:
+            self.process_once(timeout)
@@ -0,0 +1,117 @@
+"""
+Change-magnitude scoring for outline edits.
+
+A typo fix and a round of new content both change the outline's digest; to
+tell them apart, the snapshot keeps a compact fingerprint of the outline and
+the hook counts how many of its shingles an edit added or removed.
+
+Every run of SHINGLE_WORDS consecutive words is a shingle, hashed with
+CRC-32 and truncated to 16 bits. The fingerprint is the sorted set of those
+hashes, at most FINGERPRINT_SIZE of them (the smallest), stored as one hex
+string (4 digits per hash) under outline.fingerprint:
+
+    "outline": {"mtime": ..., "digest": ..., "fingerprint": "00a1f3c2...",
+                "change_count": 2}
+
+so it stays under 4 KB whatever the outline's length. Outlines of up to
+about FINGERPRINT_SIZE distinct shingles are compared exactly; for longer
+ones, both sets are compared over the hash range both fingerprints cover
+and the counts are scaled up to the full range.
+
+The magnitude is the number of shingles added or removed (the larger of
+the two), relative to the smaller version of the outline but capped at
+CHANGE_SCALE shingles: it does not shrink as the outline grows. Editing one
+word touches at most SHINGLE_WORDS shingles, so a typo fix scores 0.02 or
+less in any outline of 100 to about 1000 words, while a new bullet point of
+eight words scores about 0.08 in a 200-word outline and in an 800-word one
+alike. Beyond FINGERPRINT_SIZE shingles the counts are estimates and a typo
+fix may score a few hundredths more.
+"""
+
+import struct
+import zlib
+from typing import Optional, Set, Tuple
+
+# Number of words per shingle (consecutive word pairs)
+SHINGLE_WORDS = 2
+
+# Maximum number of hashes in a fingerprint (4 hex digits each)
+FINGERPRINT_SIZE = 1024
+
+# Changed shingles that score 1.0; outlines with fewer shingles score the
+# changed share of the smaller version instead
+CHANGE_SCALE = 100
+
+# Hash values: CRC-32 truncated to 16 bits
+_HASH_RANGE = 1 << 16
+
+# Hex digits per hash in the stored fingerprint
+_HASH_DIGITS = 4
+
+
+def _shingle_hashes(text: str) -> Set[int]:
+    """Hash every pair of consecutive words of the text (case-insensitive)."""
+    # Whitespace-separated words; CRC-32 chained over a pair equals the
+    # CRC-32 of the two words concatenated, without building the string
+    words = text.lower().encode("utf-8").split()
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(b"".join(words)) >> 16}
+    crc32 = zlib.crc32
+    return {crc32(second, crc32(first)) >> 16 for first, second in zip(words, words[1:])}
+
+
+def fingerprint(text: str) -> str:
+    """
+    Compute the fingerprint of an outline.
+
+    Args:
+        text: Outline content
+
+    Returns:
+        Hex string of the (at most FINGERPRINT_SIZE smallest) shingle hashes
+    """
+    hashes = sorted(_shingle_hashes(text))[:FINGERPRINT_SIZE]
+    return struct.pack(f">{len(hashes)}H", *hashes).hex()
+
+
+def _decode(value: str) -> Tuple[int, ...]:
+    """Decode a stored fingerprint into its sorted hashes."""
+    if len(value) % _HASH_DIGITS:
+        raise ValueError("truncated fingerprint")
+    return struct.unpack(f">{len(value) // _HASH_DIGITS}H", bytes.fromhex(value))
+
+
+def change_magnitude(old: Optional[str], new: Optional[str]) -> Optional[float]:
+    """
+    Score how much of an outline changed between two fingerprints.
+
+    Args:
+        old: Fingerprint of the previous version
+        new: Fingerprint of the current version
+
+    Returns:
+        Shingles added or removed, divided by the smaller version's shingle
+        count capped at CHANGE_SCALE (0.0 same text, at most 1.0), or None
+        if either fingerprint is missing or malformed
+    """
+    if not old or not new:
+        return None
+    try:
+        old_hashes = _decode(old)
+        new_hashes = _decode(new)
+    except (ValueError, struct.error):
+        return None
+
+    # A full fingerprint only covers hashes up to its largest one: compare
+    # over the range both cover and scale the counts to the whole range
+    limit = _HASH_RANGE
+    for hashes in (old_hashes, new_hashes):
+        if len(hashes) >= FINGERPRINT_SIZE:
+            limit = min(limit, hashes[-1] + 1)
+    old_set = {h for h in old_hashes if h < limit} if limit < _HASH_RANGE else set(old_hashes)
+    new_set = {h for h in new_hashes if h < limit} if limit < _HASH_RANGE else set(new_hashes)
+    scale = _HASH_RANGE / limit
+
+    changed = max(len(new_set - old_set), len(old_set - new_set)) * scale
+    smaller = min(len(old_set), len(new_set)) * scale
+    return min(1.0, changed / max(1.0, min(smaller, CHANGE_SCALE)))
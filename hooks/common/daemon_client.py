@@ -0,0 +1,129 @@
+"""
+Thin client for the resident precipitation check daemon.
+
+The daemon (hooks/stop/check_daemon.py) keeps snapshots in memory and runs
+the precipitation check over a Unix domain socket. This client forwards the
+hook input to it and returns the verdict, so the installed hook does not pay
+for PyYAML, logging or a snapshot parse on every turn.
+
+This module is imported on the hook's hot path: keep it limited to
+json/os/socket (no typing, no other common.* modules).
+
+Protocol (one request per connection, newline-terminated JSON):
+- Request:  {"input": {...}, "workspace_root": "/path/to/project",
+             "multi_root": false, "env": {"DISCUSS_...": "..."}}
+- Response: {"output": {...}}
+
+The hook's DISCUSS_* environment is forwarded with each request and the
+daemon applies it for that request only, so settings such as
+DISCUSS_REMINDER_MODE or DISCUSS_HOOKS_LOG_LEVEL take effect as they would
+in-process, whatever the daemon was started with.
+
+Environment:
+- DISCUSS_HOOKS_SOCKET: Override socket path
+- DISCUSS_HOOKS_NO_DAEMON: Set to "1" to always run in-process
+"""
+
+import json
+import os
+import socket
+
+# Environment variables
+SOCKET_ENV = "DISCUSS_HOOKS_SOCKET"
+NO_DAEMON_ENV = "DISCUSS_HOOKS_NO_DAEMON"
+
+# Socket file name under ~/.discuss-for-specs/run/
+SOCKET_FILE_NAME = "check-daemon.sock"
+
+# Prefix of the environment variables forwarded to the daemon
+FORWARDED_ENV_PREFIX = "DISCUSS_"
+
+# Seconds to wait for the daemon's verdict before falling back
+RESPONSE_TIMEOUT = 10.0
+
+# Upper bound for a response, protects against a misbehaving peer
+MAX_RESPONSE_BYTES = 1 << 20
+
+
+def get_socket_path() -> str:
+    """
+    Get the daemon socket path.
+
+    Returns:
+        Socket path (DISCUSS_HOOKS_SOCKET or ~/.discuss-for-specs/run/check-daemon.sock)
+    """
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return override
+    return os.path.join(os.path.expanduser("~"), ".discuss-for-specs", "run", SOCKET_FILE_NAME)
+
+
+def is_daemon_supported() -> bool:
+    """Check whether Unix domain sockets are available on this platform."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def get_forwarded_env() -> dict:
+    """Get the DISCUSS_* environment variables of this process."""
+    return {
+        name: value for name, value in os.environ.items() if name.startswith(FORWARDED_ENV_PREFIX)
+    }
+
+
+def request_check(
+    input_data: "dict | None", workspace_root: str, multi_root: bool = False
+) -> "dict | None":
+    """
+    Ask the resident daemon to run the precipitation check.
+
+    Args:
+        input_data: Hook input parsed from stdin
+        workspace_root: Workspace root as seen by the hook process
+        multi_root: Check every .discuss root of the workspace
+
+    Returns:
+        Hook output dictionary, or None if the daemon is unavailable
+        (caller must fall back to the in-process check)
+    """
+    if os.environ.get(NO_DAEMON_ENV) == "1" or not is_daemon_supported():
+        return None
+
+    socket_path = get_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+
+    request = json.dumps(
+        {
+            "input": input_data,
+            "workspace_root": workspace_root,
+            "multi_root": multi_root,
+            "env": get_forwarded_env(),
+        }
+    )
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(RESPONSE_TIMEOUT)
+            sock.connect(socket_path)
+            sock.sendall(request.encode("utf-8") + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+
+            chunks = []
+            received = 0
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                received += len(chunk)
+                if received > MAX_RESPONSE_BYTES:
+                    return None
+                chunks.append(chunk)
+
+        response = json.loads(b"".join(chunks).decode("utf-8"))
+    except (OSError, ValueError):
+        # Stale socket, daemon crashed or timed out: run in-process instead
+        return None
+
+    if not isinstance(response, dict) or not isinstance(response.get("output"), dict):
+        return None
+    return response["output"]
@@ -2,15 +2,26 @@
 File system utilities for Hook scripts.
 """
 
+import hashlib
+import mmap
+import os
 import re
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
+
+from .metrics import count
 
 
 # Pattern to match discussion directory: .discuss/YYYY-MM-DD/[topic-slug]
 # This regex matches paths ending with .discuss/date/topic structure
 DISCUSS_DIR_PATTERN = re.compile(r"\.discuss[/\\]\d{4}-\d{2}-\d{2}[/\\][^/\\]+$")
 
+# Files at least this large are hashed through mmap instead of read()
+MMAP_THRESHOLD = 1024 * 1024
+
+# Size of content digests in bytes (blake2b)
+DIGEST_SIZE = 16
+
 
 def ensure_directory(path: str) -> Path:
     """
@@ -86,3 +97,28 @@ def get_decision_path(discuss_root: Path, decision_id: str, title: str) -> Path:
     
     filename = f"{num}-{slug}.md"
     return discuss_root / "decisions" / filename
+
+
+def file_digest(path: Union[str, Path]) -> Optional[str]:
+    """
+    Compute a fast content digest of a file (blake2b).
+
+    Large files are mapped into memory rather than read into a bytes
+    object, so hashing multi-megabyte notes does not copy them.
+
+    Args:
+        path: File path
+
+    Returns:
+        Hex digest, or None if the file cannot be read
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            count("bytes_read", size)
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+            return hashlib.blake2b(f.read(), digest_size=DIGEST_SIZE).hexdigest()
+    except (OSError, ValueError):
+        return None
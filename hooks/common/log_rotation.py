@@ -0,0 +1,344 @@
+"""
+Size-capped rotation, compression and retention of hook log files.
+
+Every hook process appends to the same active log file, so rotating it
+must not lose lines that other processes are writing at the same time:
+
+- Writers (append) open the active file with O_APPEND, take a shared flock
+  on it and check that it is still the file at that path (not rotated away
+  since the open) before their single write; otherwise they reopen
+- When a write leaves the file above the size cap, or starts a new file
+  (first write of a day, or after a rotation), the writer runs maintenance
+  under a non-blocking lock on logs/.maintenance.lock; if another process
+  holds it, the writer does not wait
+- Maintenance only renames an oversized active file to an archive name.
+  If there are logs to compress or archives to prune, it then starts a
+  detached cleanup process (this file run as a script) and returns: the
+  hook never gzips or waits for other writers
+- The cleanup process takes the maintenance lock (waiting for it), then
+  for each uncompressed log that is no longer active (rotated files,
+  previous days' text logs) takes an exclusive flock on it (waiting for
+  writers that opened it before the rename) and gzips it
+- Retention, also in the cleanup process, keeps the newest `keep` archives
+  and deletes archives older than `days` days
+
+Archives are named <stem>.<YYYYmmddTHHMMSS>-<pid>[-<n>]<suffix>.gz, e.g.
+discuss-hooks.20261018T101500-4242.jsonl.gz. Disk usage is bounded by about
+max_bytes * (1 + keep * compression ratio).
+
+Where fcntl is not available (Windows) files are rotated without locks.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Collection, Container, Iterator, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+# Environment variable setting the size cap of the active log file (bytes, 0 = no rotation)
+MAX_BYTES_ENV = "DISCUSS_HOOKS_LOG_MAX_BYTES"
+
+# Environment variable setting the number of archives kept
+KEEP_ENV = "DISCUSS_HOOKS_LOG_KEEP"
+
+# Environment variable setting the maximum archive age (days, 0 = no age limit)
+RETENTION_DAYS_ENV = "DISCUSS_HOOKS_LOG_RETENTION_DAYS"
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_KEEP = 20
+DEFAULT_RETENTION_DAYS = 30
+
+# Lock file serializing maintenance in the log directory
+MAINTENANCE_LOCK_NAME = ".maintenance.lock"
+
+# Suffix of compressed archives
+ARCHIVE_SUFFIX = ".gz"
+
+# Attempts to open the active file while it is being rotated
+_MAX_REOPEN = 5
+
+
+def _get_int(name: str, default: int) -> int:
+    """Read a non-negative integer environment variable."""
+    try:
+        return max(0, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+def get_max_bytes() -> int:
+    """Get the size cap from DISCUSS_HOOKS_LOG_MAX_BYTES (default DEFAULT_MAX_BYTES)."""
+    return _get_int(MAX_BYTES_ENV, DEFAULT_MAX_BYTES)
+
+
+def get_keep() -> int:
+    """Get the archive count from DISCUSS_HOOKS_LOG_KEEP (default DEFAULT_KEEP)."""
+    return _get_int(KEEP_ENV, DEFAULT_KEEP)
+
+
+def get_retention_days() -> int:
+    """Get the archive age limit from DISCUSS_HOOKS_LOG_RETENTION_DAYS (default 30)."""
+    return _get_int(RETENTION_DAYS_ENV, DEFAULT_RETENTION_DAYS)
+
+
+def append(get_path: Callable[[], Path], data: bytes) -> Tuple[Path, int, bool]:
+    """
+    Append data to the active log file with one O_APPEND write.
+
+    Args:
+        get_path: Returns the active log file path (re-evaluated when the
+                  file was rotated away, e.g. across midnight)
+        data: Complete lines to append
+
+    Returns:
+        (path written, file size after the write, whether the file was empty)
+    """
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    for _ in range(_MAX_REOPEN):
+        path = get_path()
+        try:
+            fd = os.open(path, flags, 0o644)
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(path, flags, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_SH)
+            st = os.fstat(fd)
+            if fcntl is not None and not _is_current(path, st):
+                continue  # Rotated away between open and lock
+            # Regular files take the whole write at once; the loop only
+            # guards against a short write (e.g. disk full)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+            return path, st.st_size + len(data), st.st_size == 0
+        finally:
+            os.close(fd)
+    raise OSError(f"log file kept being rotated: {path}")
+
+
+def _is_current(path: Path, st: os.stat_result) -> bool:
+    """Check whether an open file is still the one at path."""
+    try:
+        current = os.stat(path)
+    except OSError:
+        return False
+    return (current.st_ino, current.st_dev) == (st.st_ino, st.st_dev)
+
+
+@contextmanager
+def _maintenance_lock(log_dir: Path, wait: bool = False) -> Iterator[bool]:
+    """Take the maintenance lock (without waiting unless wait); yields whether it is held."""
+    if fcntl is None:
+        yield True
+        return
+    try:
+        fd = os.open(log_dir / MAINTENANCE_LOCK_NAME, os.O_WRONLY | os.O_CREAT, 0o644)
+    except OSError:
+        yield False
+        return
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        yield True
+    finally:
+        os.close(fd)
+
+
+def archive_name(path: Path) -> str:
+    """Get an unused (uncompressed) archive name for a log file rotated now."""
+    base = f"{path.stem}.{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    name = base + path.suffix
+    n = 1
+    # Several rotations in the same second must not overwrite each other
+    while (path.parent / name).exists() or (path.parent / (name + ARCHIVE_SUFFIX)).exists():
+        n += 1
+        name = f"{base}-{n}{path.suffix}"
+    return name
+
+
+def compress(path: Path) -> Path:
+    """
+    Gzip a log file that is no longer active, then remove it.
+
+    Waits for writers that still hold the file (they opened it before it
+    was rotated away). The archive keeps the file's mtime, which is what
+    retention goes by.
+
+    Args:
+        path: Uncompressed log file
+
+    Returns:
+        Path of the compressed archive
+    """
+    import gzip
+    import shutil
+
+    archive = path.with_name(path.name + ARCHIVE_SUFFIX)
+    temp = path.with_name(path.name + ARCHIVE_SUFFIX + ".tmp")
+    with open(path, "rb") as source:
+        if fcntl is not None:
+            fcntl.flock(source.fileno(), fcntl.LOCK_EX)
+        st = os.fstat(source.fileno())
+        with gzip.open(temp, "wb", compresslevel=6) as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        os.utime(temp, (st.st_atime, st.st_mtime))
+        os.replace(temp, archive)
+        os.unlink(path)
+    return archive
+
+
+def list_archives(log_dir: Path, prefix: str) -> List[Path]:
+    """List compressed archives of a log, newest first."""
+    archives = []
+    for entry in os.scandir(log_dir):
+        if entry.name.startswith(prefix) and entry.name.endswith(ARCHIVE_SUFFIX):
+            archives.append((entry.stat().st_mtime, entry.name))
+    return [log_dir / name for _, name in sorted(archives, reverse=True)]
+
+
+def _inactive_logs(log_dir: Path, prefix: str, active_names: Container[str]) -> List[Path]:
+    """List the uncompressed logs of a directory that are no longer written."""
+    inactive = []
+    for entry in os.scandir(log_dir):
+        name = entry.name
+        if (
+            name.startswith(prefix)
+            and name not in active_names
+            and not name.endswith((ARCHIVE_SUFFIX, ".tmp"))
+            and entry.is_file()
+        ):
+            inactive.append(log_dir / name)
+    return inactive
+
+
+def _expired_archives(log_dir: Path, prefix: str, keep: int, days: int) -> List[Path]:
+    """List the archives beyond the count or age limit."""
+    cutoff = time.time() - days * 86400
+    expired = []
+    for i, archive in enumerate(list_archives(log_dir, prefix)):
+        try:
+            if i >= keep or (days > 0 and archive.stat().st_mtime < cutoff):
+                expired.append(archive)
+        except OSError:
+            pass
+    return expired
+
+
+def maintain(
+    active: Path, prefix: str, active_names: Collection[str], max_bytes: int, keep: int, days: int
+) -> bool:
+    """
+    Rotate the active log file and start a cleanup if needed (see module docstring).
+
+    Args:
+        active: Active log file just written
+        prefix: File name prefix of the logs (e.g. "discuss-hooks")
+        active_names: Names of files that are still being written (the
+                      active files of every log format)
+        max_bytes: Size cap of the active file (0 = no rotation)
+        keep: Number of archives kept
+        days: Maximum archive age in days (0 = no age limit)
+
+    Returns:
+        True if maintenance ran, False if another process is running it
+    """
+    log_dir = active.parent
+    with _maintenance_lock(log_dir) as locked:
+        if not locked:
+            return False
+
+        try:
+            oversized = max_bytes > 0 and active.stat().st_size > max_bytes
+        except OSError:
+            oversized = False
+        if oversized:
+            os.rename(active, log_dir / archive_name(active))
+
+        if _inactive_logs(log_dir, prefix, active_names) or _expired_archives(
+            log_dir, prefix, keep, days
+        ):
+            start_cleanup(log_dir, prefix, active_names, keep, days)
+    return True
+
+
+def start_cleanup(
+    log_dir: Path, prefix: str, active_names: Collection[str], keep: int, days: int
+) -> None:
+    """
+    Run cleanup in a detached process (arguments as for cleanup).
+
+    The process is not waited for; failing to start it is ignored, as the
+    next maintenance starts another one.
+    """
+    import subprocess
+    import sys
+
+    try:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), str(log_dir), prefix, str(keep), str(days)]
+            + sorted(active_names),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def cleanup(log_dir: Path, prefix: str, active_names: Container[str], keep: int, days: int) -> None:
+    """
+    Compress the logs that are no longer active and prune the archives.
+
+    Runs in the process started by start_cleanup, under the maintenance
+    lock (waiting for it).
+
+    Args:
+        log_dir: Log directory
+        prefix: File name prefix of the logs (e.g. "discuss-hooks")
+        active_names: Names of files that are still being written
+        keep: Number of archives kept
+        days: Maximum archive age in days (0 = no age limit)
+    """
+    with _maintenance_lock(log_dir, wait=True) as locked:
+        if not locked:
+            return
+        for path in _inactive_logs(log_dir, prefix, active_names):
+            try:
+                compress(path)
+            except OSError:
+                pass
+        for archive in _expired_archives(log_dir, prefix, keep, days):
+            try:
+                archive.unlink()
+            except OSError:
+                pass
+
+
+def main(argv: List[str]) -> int:
+    """Cleanup process: log_rotation.py LOG_DIR PREFIX KEEP DAYS [ACTIVE_NAME ...]."""
+    if len(argv) < 4:
+        return 2
+    try:
+        cleanup(Path(argv[0]), argv[1], set(argv[4:]), int(argv[2]), int(argv[3]))
+    except (OSError, ValueError):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main(sys.argv[1:]))
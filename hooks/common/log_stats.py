@@ -0,0 +1,367 @@
+"""
+Streaming statistics over hook logs.
+
+Reads every hook log in the log directory (the active text or JSON-lines
+log and the rotated .gz archives, see log_rotation.py) and aggregates hook
+runs into groups by any of platform, session, day and hook:
+
+- latency percentiles from a log-bucketed histogram: buckets are
+  RESOLUTION apart, so a percentile is within about 1% of the exact value,
+  and a group's memory is bounded by its number of buckets, not of runs
+- verdict counts (allow, skip, suggest, block, error) and the error rate
+
+Files are read in CHUNK_SIZE blocks. In JSON-lines logs only the END
+record of each run is decoded, since it carries every field; it is found
+with bytes.find, so other records are never split into lines. In text
+logs, the START, platform and END lines of a run are joined by their
+[hook:exec_id] tag; runs without an END (crashed hooks) are dropped, with
+at most MAX_PENDING open at a time. Text logs from before END lines
+carried duration_ms/verdict are counted without a latency, the verdict
+being inferred from the run's SKIP/Blocking/Suggesting lines.
+
+Runs of check_precipitation.py that end at a cheap exit or on a cached
+verdict are in the logs too, as an END record the hook writes itself (see
+log_fast_exit there).
+"""
+
+import gzip
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# Read size for log files (bytes)
+CHUNK_SIZE = 1 << 20
+
+# Ratio between consecutive latency buckets
+RESOLUTION = 1.02
+
+# Smallest latency told apart from zero (ms)
+MIN_LATENCY_MS = 0.001
+
+# Maximum number of text-log runs waiting for their END line
+MAX_PENDING = 10000
+
+# Fields runs can be grouped by
+GROUP_FIELDS = ("platform", "session", "day", "hook")
+
+VERDICTS = ("allow", "skip", "suggest", "block", "error")
+
+# Marker of the END record in JSON-lines logs (json.dumps default separators)
+_JSON_END = b'"msg": "END ['
+
+_LOG_RESOLUTION = math.log(RESOLUTION)
+
+
+class RunRecord(NamedTuple):
+    """One hook run, from its END record."""
+
+    day: str
+    hook: str
+    platform: Optional[str]
+    session: Optional[str]
+    duration_ms: Optional[float]
+    verdict: str
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with bounded relative error."""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a latency in milliseconds."""
+        index = math.floor(math.log(max(value, MIN_LATENCY_MS)) / _LOG_RESOLUTION)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimate a percentile.
+
+        Args:
+            q: Quantile between 0 and 1 (e.g. 0.95)
+
+        Returns:
+            Latency in milliseconds (the middle of its bucket), or None if
+            the histogram is empty
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        if rank >= self.count:
+            return self.max
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(RESOLUTION ** (index + 0.5), self.max)
+        return self.max
+
+
+class GroupStats:
+    """Run count, verdicts and latency of a group of runs."""
+
+    def __init__(self):
+        self.runs = 0
+        self.verdicts: Dict[str, int] = {}
+        self.latency = LatencyHistogram()
+
+    def add(self, record: RunRecord) -> None:
+        """Add a run."""
+        self.runs += 1
+        self.verdicts[record.verdict] = self.verdicts.get(record.verdict, 0) + 1
+        if record.duration_ms is not None:
+            self.latency.add(record.duration_ms)
+
+    @property
+    def error_rate(self) -> float:
+        """Share of runs that failed."""
+        return self.verdicts.get("error", 0) / self.runs if self.runs else 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        """Summary for JSON output."""
+        return {
+            "runs": self.runs,
+            "timed_runs": self.latency.count,
+            "p50_ms": self.latency.percentile(0.50),
+            "p95_ms": self.latency.percentile(0.95),
+            "p99_ms": self.latency.percentile(0.99),
+            "max_ms": self.latency.max if self.latency.count else None,
+            "verdicts": {verdict: self.verdicts.get(verdict, 0) for verdict in VERDICTS},
+            "error_rate": round(self.error_rate, 4),
+        }
+
+
+def iter_log_files(log_dir: Path, prefix: str, since_mtime: float = 0.0) -> Iterator[Path]:
+    """
+    List the hook logs of a directory, including compressed archives.
+
+    Args:
+        log_dir: Log directory
+        prefix: Log file name prefix (e.g. "discuss-hooks")
+        since_mtime: Skip files last written before this time
+
+    Yields:
+        Paths of .log/.jsonl files and their .gz archives
+    """
+    try:
+        entries = sorted(os.scandir(log_dir), key=lambda entry: entry.name)
+    except OSError:
+        return
+    for entry in entries:
+        name = entry.name[:-3] if entry.name.endswith(".gz") else entry.name
+        if not entry.name.startswith(prefix) or not name.endswith((".log", ".jsonl")):
+            continue
+        try:
+            if entry.stat().st_mtime < since_mtime:
+                continue
+        except OSError:
+            continue
+        yield Path(entry.path)
+
+
+def is_json_log(path: Path) -> bool:
+    """Check whether a log file uses the JSON-lines format."""
+    return path.name.endswith((".jsonl", ".jsonl.gz"))
+
+
+def _read_blocks(path: Path) -> Iterator[bytes]:
+    """Read a (possibly gzipped) file in blocks that end at a line break."""
+    opener = gzip.open if path.name.endswith(".gz") else open
+    with opener(path, "rb") as file:
+        tail = b""
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            cut = chunk.rfind(b"\n")
+            if cut < 0:
+                tail += chunk
+                continue
+            yield tail + chunk[: cut + 1]
+            tail = chunk[cut + 1 :]
+        if tail:
+            yield tail
+
+
+def iter_json_runs(path: Path) -> Iterator[RunRecord]:
+    """Extract the runs of a JSON-lines log from its END records."""
+    for block in _read_blocks(path):
+        pos = 0
+        while True:
+            found = block.find(_JSON_END, pos)
+            if found < 0:
+                break
+            start = block.rfind(b"\n", 0, found) + 1
+            end = block.find(b"\n", found)
+            if end < 0:
+                end = len(block)
+            pos = end + 1
+            try:
+                record = json.loads(block[start:end])
+                yield RunRecord(
+                    record["ts"][:10],
+                    record.get("hook") or "unknown",
+                    record.get("platform"),
+                    record.get("session"),
+                    record.get("duration_ms"),
+                    record.get("verdict") or "allow",
+                )
+            except (ValueError, KeyError, TypeError):
+                continue
+
+
+def _parse_fields(text: bytes) -> Dict[str, str]:
+    """Parse "key=value key=value" into a dict."""
+    fields = {}
+    for token in text.decode("utf-8", "replace").split():
+        key, sep, value = token.partition("=")
+        if sep:
+            fields[key] = value
+    return fields
+
+
+def iter_text_runs(path: Path) -> Iterator[RunRecord]:
+    """Extract the runs of a text log by joining their lines by tag."""
+    # tag -> [day, platform, session, inferred verdict]
+    pending: Dict[bytes, List[Optional[str]]] = {}
+    for block in _read_blocks(path):
+        for line in block.split(b"\n"):
+            open_at = line.find(b"| [")
+            if open_at < 0:
+                continue
+            close_at = line.find(b"] ", open_at)
+            if close_at < 0:
+                continue
+            tag = line[open_at + 3 : close_at]
+            message = line[close_at + 2 :]
+
+            if message.startswith(b"START "):
+                pending[tag] = [line[:10].decode("ascii", "replace"), None, None, None]
+                if len(pending) > MAX_PENDING:
+                    del pending[next(iter(pending))]
+                continue
+            run = pending.get(tag)
+            if run is None:
+                continue
+            if message.startswith(b"platform="):
+                fields = _parse_fields(message)
+                run[1] = fields.get("platform")
+                run[2] = (
+                    None if fields.get("session") in (None, "N/A", "None") else fields["session"]
+                )
+            elif message.startswith(b"-- SKIP: "):
+                run[3] = "skip"
+            elif message.startswith(b">> Blocking"):
+                run[3] = "block"
+            elif message.startswith(b">> Suggesting"):
+                run[3] = "suggest"
+            elif message.startswith(b"END ["):
+                del pending[tag]
+                fields = _parse_fields(message)
+                try:
+                    duration = float(fields["duration_ms"]) if "duration_ms" in fields else None
+                except ValueError:
+                    duration = None
+                verdict = fields.get("verdict")
+                if not verdict:
+                    verdict = "error" if message.startswith(b"END [FAIL]") else run[3] or "allow"
+                hook = tag.rsplit(b":", 1)[0].decode("utf-8", "replace")
+                yield RunRecord(run[0], hook, run[1], run[2], duration, verdict)
+
+
+def iter_runs(path: Path) -> Iterator[RunRecord]:
+    """Extract the runs of a log file of either format."""
+    return iter_json_runs(path) if is_json_log(path) else iter_text_runs(path)
+
+
+def collect_stats(
+    paths: Sequence[Path],
+    by: Sequence[str] = ("platform",),
+    since: Optional[str] = None,
+    hook: Optional[str] = None,
+    platform: Optional[str] = None,
+) -> Dict[Tuple[str, ...], GroupStats]:
+    """
+    Aggregate the runs of log files.
+
+    Args:
+        paths: Log files (see iter_log_files)
+        by: Fields to group by (from GROUP_FIELDS)
+        since: Only runs on or after this day (YYYY-MM-DD)
+        hook: Only runs of this hook
+        platform: Only runs on this platform
+
+    Returns:
+        Mapping of group key (one value per `by` field, "-" if unknown) to
+        its statistics
+    """
+    groups: Dict[Tuple[str, ...], GroupStats] = {}
+    for path in paths:
+        try:
+            for record in iter_runs(path):
+                if since and record.day < since:
+                    continue
+                if hook and record.hook != hook:
+                    continue
+                if platform and record.platform != platform:
+                    continue
+                key = tuple(getattr(record, field) or "-" for field in by)
+                stats = groups.get(key)
+                if stats is None:
+                    stats = groups[key] = GroupStats()
+                stats.add(record)
+        except (OSError, EOFError):
+            continue  # Truncated archive or file removed by rotation
+    return groups
+
+
+def format_stats(groups: Dict[Tuple[str, ...], GroupStats], by: Sequence[str]) -> str:
+    """
+    Format statistics as a table, largest groups first.
+
+    Args:
+        groups: Result of collect_stats
+        by: Fields the groups are keyed by
+
+    Returns:
+        Table text
+    """
+
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.1f}"
+
+    headers = list(by) + ["runs", "p50 ms", "p95 ms", "p99 ms"] + list(VERDICTS) + ["error %"]
+    rows = []
+    for key, stats in sorted(groups.items(), key=lambda item: (-item[1].runs, item[0])):
+        rows.append(
+            list(key)
+            + [
+                str(stats.runs),
+                ms(stats.latency.percentile(0.50)),
+                ms(stats.latency.percentile(0.95)),
+                ms(stats.latency.percentile(0.99)),
+            ]
+            + [str(stats.verdicts.get(verdict, 0)) for verdict in VERDICTS]
+            + [
+                f"{stats.error_rate * 100:.1f}",
+            ]
+        )
+    if not rows:
+        return "No hook runs found"
+    widths = [max(len(row[i]) for row in rows + [headers]) for i in range(len(headers))]
+    lines = [
+        "  ".join(
+            cell.ljust(width) if i < len(by) else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        )
+        for row in [headers] + rows
+    ]
+    return "\n".join(line.rstrip() for line in lines)
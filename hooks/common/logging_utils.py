@@ -15,15 +15,62 @@ Example log output:
   22:13:29 | INFO     | [check_precipitation:a3f2] platform=claude_code
   22:13:29 | INFO     | [check_precipitation:a3f2] >> Checking discussions for precipitation
   22:13:29 | INFO     | [check_precipitation:a3f2] >> Stale items: 1 found
-  22:13:29 | INFO     | [check_precipitation:a3f2] END [OK]
+  22:13:29 | INFO     | [check_precipitation:a3f2] END [OK] duration_ms=12.31 verdict=suggest
+
+Pipeline (cheap enough to run on every response):
+- Records below the log level (DISCUSS_HOOKS_LOG_LEVEL, default INFO) are
+  dropped before any formatting; helpers take %-style arguments
+  (log_debug("Found %s", key)) so suppressed messages are never built
+- Between log_hook_start and log_hook_end, lines are buffered in memory
+  and written with a single O_APPEND write, so concurrent hooks never
+  interleave partial lines; records outside a run (daemon, watcher) are
+  written immediately, and an exit handler flushes a run that never ended
+- The standard logging module is not used (get_logger remains for callers
+  that want a logging.Logger on the same file)
+
+Formats (DISCUSS_HOOKS_LOG_FORMAT):
+- text (default): the lines above, in discuss-hooks-YYYY-MM-DD.log
+- json: one JSON object per line in discuss-hooks.jsonl, with fixed fields
+  for analysis without parsing messages:
+
+  {"ts": "2026-01-30T22:13:29.412", "level": "INFO", "hook": "check_precipitation",
+   "exec_id": "a3f2", "platform": "claude_code", "session": "abc", "phase": "end",
+   "duration_ms": 12.31, "verdict": "suggest", "msg": "END [OK]"}
+
+  phase is "start" / "end" for the records of log_hook_start / log_hook_end
+  and "run" in between; duration_ms and verdict (allow, skip, suggest,
+  block or error) are set on the "end" record only
+
+Both formats are size-capped, compressed and pruned by log_rotation.py.
+
+With DISCUSS_HOOKS_TIMING set, log_hook_end also writes the run's phase
+timings (a "phases:" line, and with "json" a record in hook-timings.jsonl;
+see metrics.py).
 """
 
-import logging
+import atexit
+import contextlib
 import os
-import uuid
-from datetime import datetime
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Collection, Dict, Iterator, List, Optional
+
+from . import log_rotation, metrics
+from .metrics import (
+    TIMING_JSON,
+    TIMINGS_FILE,
+    TIMINGS_NAME,
+    format_counters,
+    format_phases,
+    get_counters,
+    get_phases,
+    get_timing,
+    reset_counters,
+)
+
+if TYPE_CHECKING:
+    import logging
 
 
 # Directory paths
@@ -53,18 +100,223 @@ def ensure_directories() -> None:
     get_log_dir().mkdir(parents=True, exist_ok=True)
 
 
-# Logger configuration
-_logger: Optional[logging.Logger] = None
+# Log levels (same values as the logging module)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+# Environment variable setting the log level (DEBUG, INFO, WARNING, ERROR or OFF)
+LOG_LEVEL_ENV = "DISCUSS_HOOKS_LOG_LEVEL"
+
+DEFAULT_LOG_LEVEL = INFO
+
+# Level above every record, used for OFF
+_LEVEL_OFF = 100
 
-# Current hook context (thread-local would be better, but hooks are single-threaded)
+# Log file name prefix (followed by the date)
+LOG_NAME = "discuss-hooks"
+
+# Environment variable selecting the log format
+LOG_FORMAT_ENV = "DISCUSS_HOOKS_LOG_FORMAT"
+
+LOG_FORMAT_TEXT = "text"
+LOG_FORMAT_JSON = "json"
+
+# Maximum length of the input/output payloads logged at DEBUG
+MAX_PAYLOAD_LENGTH = 500
+
+# Logger configuration
+_logger: Optional["logging.Logger"] = None
+_level: Optional[int] = None
+_format: Optional[str] = None
+
+# Lines waiting for the end of the current run
+_buffer: List[str] = []
+_buffer_lock = threading.Lock()
+_in_run = False
+_atexit_registered = False
+
+# Current hook context (the run's; worker threads inside root_context keep
+# their lines and actions apart until merge_root_context)
 _current_hook_name: str = "unknown"
 _current_exec_id: str = "0000"
 _current_hook_actions: List[str] = []
+_current_platform: Optional[str] = None
+_current_session: Optional[str] = None
+_run_started: float = 0.0
+_local = threading.local()
+
+
+class RootContext:
+    """Log lines, actions and metrics of one .discuss root of a run."""
+
+    __slots__ = ("lines", "actions", "metrics")
+
+    def __init__(self, metrics_context: metrics.Context):
+        self.lines: List[str] = []
+        self.actions: List[str] = []
+        self.metrics = metrics_context
+
+
+def _root() -> Optional[RootContext]:
+    """Get the calling thread's root context, if any."""
+    return getattr(_local, "root", None)
+
+
+def _actions() -> List[str]:
+    """Get the action list of the calling thread's root, or of the run."""
+    root = _root()
+    return root.actions if root is not None else _current_hook_actions
+
+
+@contextlib.contextmanager
+def root_context() -> Iterator[RootContext]:
+    """
+    Keep the calling thread's log lines, actions and metrics apart.
+
+    Multi-root checks run each .discuss root on a worker thread inside a
+    root context, then merge the contexts in root order, so the run's log
+    reads as if the roots had been checked one after another.
+
+    Yields:
+        The root's context, to pass to merge_root_context
+    """
+    previous = _root()
+    with metrics.root_context() as metrics_context:
+        _local.root = root = RootContext(metrics_context)
+        try:
+            yield root
+        finally:
+            _local.root = previous
 
 
-def get_logger(name: str = "discuss-hooks") -> logging.Logger:
+def merge_root_context(root: RootContext) -> None:
     """
-    Get or create a logger instance.
+    Add a root's log lines, actions and metrics to the run.
+
+    Args:
+        root: Context yielded by root_context
+    """
+    _current_hook_actions.extend(root.actions)
+    metrics.merge_context(root.metrics)
+    with _buffer_lock:
+        _buffer.extend(root.lines)
+    if not _in_run:
+        flush_log()
+
+
+def bind_root_context(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Make func log and count into the calling thread's root on any thread.
+
+    Args:
+        func: Function to run on worker threads (scan workers)
+
+    Returns:
+        func itself outside root_context, else a wrapper
+    """
+    root = _root()
+    if root is None:
+        return func
+    func = metrics.bind(func)
+
+    def bound(*args: Any, **kwargs: Any) -> Any:
+        previous = _root()
+        _local.root = root
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.root = previous
+
+    return bound
+
+
+def get_log_level() -> int:
+    """
+    Get the log level.
+
+    Returns:
+        Level from DISCUSS_HOOKS_LOG_LEVEL, or DEFAULT_LOG_LEVEL if unset
+        or invalid (read once per process)
+    """
+    global _level
+
+    if _level is None:
+        name = os.environ.get(LOG_LEVEL_ENV, "").strip().upper()
+        if name == "OFF":
+            _level = _LEVEL_OFF
+        else:
+            _level = next(
+                (level for level, level_name in LEVEL_NAMES.items() if level_name == name),
+                DEFAULT_LOG_LEVEL,
+            )
+    return _level
+
+
+def set_log_level(level: Optional[int]) -> None:
+    """
+    Set the log level for this process.
+
+    Args:
+        level: Level (DEBUG, INFO, ...), or None to re-read the environment
+    """
+    global _level
+    _level = level
+
+
+def is_enabled(level: int) -> bool:
+    """Check whether records of a level are written."""
+    return level >= get_log_level()
+
+
+def get_log_format() -> str:
+    """
+    Get the log format.
+
+    Returns:
+        LOG_FORMAT_JSON if DISCUSS_HOOKS_LOG_FORMAT is "json", otherwise
+        LOG_FORMAT_TEXT (read once per process)
+    """
+    global _format
+
+    if _format is None:
+        value = os.environ.get(LOG_FORMAT_ENV, "").strip().lower()
+        _format = LOG_FORMAT_JSON if value in ("json", "jsonl") else LOG_FORMAT_TEXT
+    return _format
+
+
+def set_log_format(log_format: Optional[str]) -> None:
+    """
+    Set the log format for this process.
+
+    Args:
+        log_format: LOG_FORMAT_TEXT or LOG_FORMAT_JSON, or None to re-read
+                    the environment
+    """
+    global _format
+    _format = log_format
+
+
+def _active_log_names() -> List[str]:
+    """Names of the files currently written in each format."""
+    return [f"{LOG_NAME}-{time.strftime('%Y-%m-%d')}.log", f"{LOG_NAME}.jsonl"]
+
+
+def get_log_file() -> Path:
+    """Get the active log file path (today's text log, or the JSON-lines log)."""
+    text_name, json_name = _active_log_names()
+    return get_log_dir() / (json_name if get_log_format() == LOG_FORMAT_JSON else text_name)
+
+
+def get_logger(name: str = LOG_NAME) -> "logging.Logger":
+    """
+    Get or create a standard logger writing to the hook log file.
+
+    The hook helpers below do not use it; it is kept for code that needs
+    the logging API.
     
     Args:
         name: Logger name (used as log file prefix)
@@ -77,12 +329,14 @@ def get_logger(name: str = "discuss-hooks") -> logging.Logger:
     if _logger is not None:
         return _logger
     
+    import logging
+
     # Ensure directories exist
     ensure_directories()
     
     # Create logger
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(min(get_log_level(), logging.CRITICAL))
     
     # Avoid adding handlers multiple times
     if logger.handlers:
@@ -90,13 +344,10 @@ def get_logger(name: str = "discuss-hooks") -> logging.Logger:
         return logger
     
     # Create log file path with date
-    today = datetime.now().strftime("%Y-%m-%d")
-    log_file = get_log_dir() / f"{name}-{today}.log"
+    log_file = get_log_dir() / f"{name}-{time.strftime('%Y-%m-%d')}.log"
     
-    # File handler - detailed logging
+    # File handler - same format as the hook helpers
     file_handler = logging.FileHandler(log_file, encoding="utf-8")
-    file_handler.setLevel(logging.DEBUG)
-    # Format: full datetime for cross-day log analysis
     file_format = logging.Formatter(
         "%(asctime)s | %(levelname)-8s | %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S"
@@ -111,84 +362,250 @@ def get_logger(name: str = "discuss-hooks") -> logging.Logger:
     return logger
 
 
-def _log(level: int, message: str) -> None:
+def _append_rotated(
+    get_path: Callable[[], Path], prefix: str, active_names: Collection[str], data: bytes
+) -> None:
+    """Append data to an active file of the log directory, rotating it when it is over the cap."""
+    path, size, created = log_rotation.append(get_path, data)
+    max_bytes = log_rotation.get_max_bytes()
+    if created or 0 < max_bytes < size:
+        log_rotation.maintain(
+            path,
+            prefix,
+            active_names,
+            max_bytes,
+            log_rotation.get_keep(),
+            log_rotation.get_retention_days(),
+        )
+
+
+def _write(data: bytes) -> None:
+    """Append data to the active log file, rotating it when it is over the cap."""
+    _append_rotated(get_log_file, LOG_NAME, _active_log_names(), data)
+
+
+def _write_timings(phases: Dict[str, Dict[str, Any]], duration_ms: float, verdict: str) -> None:
+    """Append a run's phase timings to the JSON sidecar (see metrics.py)."""
+    import json
+
+    record = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "hook": _current_hook_name,
+        "exec_id": _current_exec_id,
+        "platform": _current_platform,
+        "session": _current_session,
+        "duration_ms": duration_ms,
+        "verdict": verdict,
+        "phases": phases,
+    }
+    data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8", "replace")
+    try:
+        _append_rotated(lambda: get_log_dir() / TIMINGS_FILE, TIMINGS_NAME, (TIMINGS_FILE,), data)
+    except OSError:
+        pass
+
+
+def flush_log() -> None:
+    """
+    Write buffered lines to the log file.
+
+    Logging must never break a hook, so write errors are ignored.
+    """
+    with _buffer_lock:
+        if not _buffer:
+            return
+        data = "".join(_buffer).encode("utf-8", "replace")
+        _buffer.clear()
+    try:
+        _write(data)
+    except OSError:
+        pass
+
+
+def _json_line(level: int, message: str, phase: str, fields: Optional[Dict[str, Any]]) -> str:
+    """Format a record as a JSON line with the fixed fields."""
+    import json
+
+    now = time.time()
+    record = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now))
+        + f".{int(now % 1 * 1000):03d}",
+        "level": LEVEL_NAMES[level],
+        "hook": _current_hook_name,
+        "exec_id": _current_exec_id,
+        "platform": _current_platform,
+        "session": _current_session,
+        "phase": phase if _in_run else None,
+        "duration_ms": None,
+        "verdict": None,
+        "msg": message,
+    }
+    if fields:
+        record.update(fields)
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _log(
+    level: int,
+    message: str,
+    args: tuple = (),
+    phase: str = "run",
+    fields: Optional[Dict[str, Any]] = None,
+) -> None:
     """
     Internal log function that adds hook context prefix.
     
     Args:
-        level: Logging level (logging.INFO, logging.DEBUG, etc.)
-        message: Log message
+        level: Logging level (INFO, DEBUG, etc.)
+        message: Log message, %-formatted with args when there are any
+        args: Arguments for message (only formatted if the level is enabled)
+        phase: Phase of the run, for the JSON format
+        fields: Values of other fixed fields (appended as key=value in the
+                text format)
     """
-    logger = get_logger()
-    prefix = f"[{_current_hook_name}:{_current_exec_id}]"
-    logger.log(level, f"{prefix} {message}")
+    global _atexit_registered
+
+    if level < get_log_level():
+        return
+    if args:
+        try:
+            message = message % args
+        except (TypeError, ValueError):
+            message = f"{message} {args!r}"
+    if get_log_format() == LOG_FORMAT_JSON:
+        line = _json_line(level, message, phase, fields)
+    else:
+        if fields:
+            message += "".join(f" {key}={value}" for key, value in fields.items())
+        line = (
+            f"{time.strftime('%Y-%m-%d %H:%M:%S')} | {LEVEL_NAMES[level]:<8} | "
+            f"[{_current_hook_name}:{_current_exec_id}] {message}\n"
+        )
+    root = _root()
+    with _buffer_lock:
+        if root is not None:
+            root.lines.append(line)
+            return
+        _buffer.append(line)
+    if not _in_run:
+        flush_log()
+    elif not _atexit_registered:
+        atexit.register(flush_log)
+        _atexit_registered = True
+
+
+def _truncate(data: Any) -> str:
+    """Serialize a payload for a DEBUG record, truncated to MAX_PAYLOAD_LENGTH."""
+    import json
+
+    text = json.dumps(data, ensure_ascii=False)
+    if len(text) > MAX_PAYLOAD_LENGTH:
+        text = text[:MAX_PAYLOAD_LENGTH] + "...(truncated)"
+    return text
 
 
 def log_hook_start(hook_name: str, input_data: dict = None) -> None:
     """
-    Log hook start with input data.
+    Log hook start with input data, and start buffering the run's lines.
     
     Args:
         hook_name: Name of the hook (e.g., "check_precipitation")
         input_data: Input JSON data received from stdin
     """
-    global _current_hook_name, _current_exec_id, _current_hook_actions
+    global _current_hook_name, _current_exec_id, _current_hook_actions, _in_run
+    global _current_platform, _current_session, _run_started
+
+    # Write what an unfinished previous run (daemon) left behind
+    flush_log()
     
     # Set context for this hook execution
     _current_hook_name = hook_name
-    _current_exec_id = uuid.uuid4().hex[:4]  # Short 4-char ID
+    _current_exec_id = os.urandom(2).hex()  # Short 4-char ID
     _current_hook_actions = []
-    
+    _current_platform = None
+    _current_session = None
+    _run_started = time.perf_counter()
+    _in_run = True
+    reset_counters()
+
+    if input_data:
+        # Extract key info from input (also used by WARNING/ERROR records)
+        _current_platform = _detect_platform_from_input(input_data)
+        _current_session = input_data.get("session_id") or input_data.get("conversation_id")
+
+    if not is_enabled(INFO):
+        return
+
     # Log start
-    _log(logging.INFO, f"START cwd={os.getcwd()}")
-    
+    _log(INFO, "START cwd=%s", (os.getcwd(),), phase="start")
+
     if input_data:
-        # Extract key info from input
-        platform = _detect_platform_from_input(input_data)
-        session_id = input_data.get("session_id") or input_data.get("conversation_id") or "N/A"
         file_path = _extract_file_path(input_data)
-        
-        _log(logging.INFO, f"platform={platform} session={session_id}")
+
+        _log(
+            INFO,
+            "platform=%s session=%s",
+            (_current_platform, _current_session or "N/A"),
+            phase="start",
+        )
         if file_path:
-            _log(logging.INFO, f"target={file_path}")
+            _log(INFO, "target=%s", (file_path,), phase="start")
         
-        # Log full input data at debug level
-        import json
-        input_str = json.dumps(input_data, ensure_ascii=False)
-        if len(input_str) > 500:
-            input_str = input_str[:500] + "...(truncated)"
-        _log(logging.DEBUG, f"input={input_str}")
+        # Log full input data at debug level (serialized only when enabled)
+        if is_enabled(DEBUG):
+            _log(DEBUG, "input=%s", (_truncate(input_data),), phase="start")
 
 
 def log_hook_end(hook_name: str, output_data: dict = None, success: bool = True) -> None:
     """
-    Log hook end with output data.
+    Log hook end with output data, and write the run's lines.
     
     Args:
         hook_name: Name of the hook
         output_data: Output JSON data to be written to stdout
         success: Whether the hook completed successfully
     """
-    global _current_hook_actions
-    
-    # Log summary of actions
-    if _current_hook_actions:
-        summary = " | ".join(_current_hook_actions)
-        _log(logging.INFO, f"summary: {summary}")
-    
-    # Log end status
-    status = "[OK]" if success else "[FAIL]"
-    _log(logging.INFO, f"END {status}")
-    
-    if output_data:
-        import json
-        output_str = json.dumps(output_data, ensure_ascii=False)
-        if len(output_str) > 500:
-            output_str = output_str[:500] + "...(truncated)"
-        _log(logging.DEBUG, f"output={output_str}")
-    
-    # Reset actions
+    global _current_hook_actions, _in_run
+
+    duration_ms = round((time.perf_counter() - _run_started) * 1000, 2)
+    verdict = _get_verdict(output_data, success)
+    phases = get_phases()
+    
+    if is_enabled(INFO):
+        # Log summary of actions
+        if _current_hook_actions:
+            _log(INFO, "summary: %s", (" | ".join(_current_hook_actions),), phase="end")
+
+        # Log counters collected during this run
+        counters = get_counters()
+        if counters:
+            _log(INFO, "metrics: %s", (format_counters(counters),), phase="end")
+
+        # Log phase timings (DISCUSS_HOOKS_TIMING only)
+        if phases:
+            _log(INFO, "phases: %s", (format_phases(phases),), phase="end")
+
+        # Log end status
+        _log(
+            INFO,
+            "END [OK]" if success else "END [FAIL]",
+            phase="end",
+            fields={
+                "duration_ms": duration_ms,
+                "verdict": verdict,
+            },
+        )
+
+    if phases and get_timing() == TIMING_JSON:
+        _write_timings(phases, duration_ms, verdict)
+    
+    if output_data and is_enabled(DEBUG):
+        _log(DEBUG, "output=%s", (_truncate(output_data),), phase="end")
+    
+    # Reset actions and write the run's lines at once
     _current_hook_actions = []
+    _in_run = False
+    flush_log()
 
 
 def log_action(action: str) -> None:
@@ -198,9 +615,8 @@ def log_action(action: str) -> None:
     Args:
         action: Description of the action (e.g., "Round: 5 -> 6")
     """
-    global _current_hook_actions
-    _current_hook_actions.append(action)
-    _log(logging.INFO, f">> {action}")
+    _actions().append(action)
+    _log(INFO, ">> %s", (action,))
 
 
 def log_skip(reason: str) -> None:
@@ -210,9 +626,8 @@ def log_skip(reason: str) -> None:
     Args:
         reason: Why the hook is skipping
     """
-    global _current_hook_actions
-    _current_hook_actions.append(f"SKIP: {reason}")
-    _log(logging.INFO, f"-- SKIP: {reason}")
+    _actions().append(f"SKIP: {reason}")
+    _log(INFO, "-- SKIP: %s", (reason,))
 
 
 def log_file_operation(operation: str, file_path: str, details: str = None) -> None:
@@ -224,10 +639,10 @@ def log_file_operation(operation: str, file_path: str, details: str = None) -> N
         file_path: Path to the file
         details: Additional details
     """
-    msg = f"[{operation}] {file_path}"
     if details:
-        msg += f" - {details}"
-    _log(logging.DEBUG, msg)
+        _log(DEBUG, "[%s] %s - %s", (operation, file_path, details))
+    else:
+        _log(DEBUG, "[%s] %s", (operation, file_path))
 
 
 def log_discuss_detection(discuss_path: str, file_type: str = None) -> None:
@@ -238,8 +653,6 @@ def log_discuss_detection(discuss_path: str, file_type: str = None) -> None:
         discuss_path: Path to the discussion directory
         file_type: Type of file detected (outline/decisions/notes)
     """
-    global _current_hook_actions
-    
     # Extract just the relative discuss path for readability
     discuss_short = _shorten_path(discuss_path)
     
@@ -248,8 +661,8 @@ def log_discuss_detection(discuss_path: str, file_type: str = None) -> None:
     else:
         action = f"Detected: {discuss_short}"
     
-    _current_hook_actions.append(action)
-    _log(logging.INFO, f">> {action}")
+    _actions().append(action)
+    _log(INFO, ">> %s", (action,))
 
 
 def log_meta_update(discuss_path: str, changes: dict) -> None:
@@ -260,16 +673,14 @@ def log_meta_update(discuss_path: str, changes: dict) -> None:
         discuss_path: Path to the discussion directory
         changes: Dictionary of changes made
     """
-    global _current_hook_actions
-    
     # Build a concise change description
     change_parts = []
     for key, value in changes.items():
         change_parts.append(f"{key}={value}")
     
     action = f"Meta updated: {', '.join(change_parts)}"
-    _current_hook_actions.append(action)
-    _log(logging.INFO, f">> {action}")
+    _actions().append(action)
+    _log(INFO, ">> %s", (action,))
 
 
 def log_stale_detection(discuss_path: str, stale_items: list) -> None:
@@ -280,19 +691,17 @@ def log_stale_detection(discuss_path: str, stale_items: list) -> None:
         discuss_path: Path to the discussion directory
         stale_items: List of stale items detected
     """
-    global _current_hook_actions
-    
     if stale_items:
         action = f"Stale items: {len(stale_items)} found"
-        _current_hook_actions.append(action)
-        _log(logging.WARNING, f"!! {action}")
+        _actions().append(action)
+        _log(WARNING, "!! %s", (action,))
         
         for item in stale_items:
             file_type, stale_runs, is_force = item
             level = "FORCE" if is_force else "SUGGEST"
-            _log(logging.WARNING, f"   [{level}] {file_type}: {stale_runs} rounds stale")
+            _log(WARNING, "   [%s] %s: %s rounds stale", (level, file_type, stale_runs))
     else:
-        _log(logging.DEBUG, "-- No stale items")
+        _log(DEBUG, "-- No stale items")
 
 
 def log_error(message: str, exc: Exception = None) -> None:
@@ -303,33 +712,43 @@ def log_error(message: str, exc: Exception = None) -> None:
         message: Error message
         exc: Exception object if available
     """
-    global _current_hook_actions
-    
     if exc:
         error_msg = f"ERROR: {message}: {type(exc).__name__}: {exc}"
     else:
         error_msg = f"ERROR: {message}"
     
-    _current_hook_actions.append(error_msg)
-    _log(logging.ERROR, f"!! {error_msg}")
+    _actions().append(error_msg)
+    _log(ERROR, "!! %s", (error_msg,))
 
 
-def log_warning(message: str) -> None:
-    """Log warning message."""
-    _log(logging.WARNING, f"! {message}")
+def log_warning(message: str, *args: Any) -> None:
+    """Log warning message (%-formatted with args only if written)."""
+    _log(WARNING, "! " + message, args)
 
 
-def log_info(message: str) -> None:
-    """Log info message."""
-    _log(logging.INFO, f"> {message}")
+def log_info(message: str, *args: Any) -> None:
+    """Log info message (%-formatted with args only if written)."""
+    _log(INFO, "> " + message, args)
 
 
-def log_debug(message: str) -> None:
-    """Log debug message."""
-    _log(logging.DEBUG, f". {message}")
+def log_debug(message: str, *args: Any) -> None:
+    """Log debug message (%-formatted with args only if written)."""
+    _log(DEBUG, ". " + message, args)
 
 
 # Helper functions
+def _get_verdict(output_data: Optional[dict], success: bool) -> str:
+    """Summarize a run's outcome: error, block, suggest, skip or allow."""
+    if not success:
+        return "error"
+    action = (output_data or {}).get("action")
+    if action:
+        return str(action)
+    if any(item.startswith("SKIP: ") for item in _current_hook_actions):
+        return "skip"
+    return "allow"
+
+
 def _detect_platform_from_input(input_data: dict) -> str:
     """Detect platform from input data."""
     if not input_data:
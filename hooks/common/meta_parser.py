@@ -11,8 +11,6 @@ For new code, use snapshot_manager.py instead.
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-import yaml
-
 
 def load_meta(discuss_path: str) -> Optional[Dict[str, Any]]:
     """
@@ -30,6 +28,9 @@ def load_meta(discuss_path: str) -> Optional[Dict[str, Any]]:
         return None
     
     try:
+        # Imported lazily: only old discussions still have meta.yaml
+        import yaml
+
         with open(meta_path, encoding="utf-8") as f:
             return yaml.safe_load(f)
     except Exception:
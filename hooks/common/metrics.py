@@ -0,0 +1,345 @@
+"""
+Per-run metrics for Hook scripts.
+
+Counters are reset by log_hook_start and written to the log by log_hook_end,
+so every hook run ends with one line such as:
+
+  metrics: snapshot_writes=0 snapshot_writes_skipped=1
+
+Counters are process-global (hooks handle one run at a time; the daemon
+serializes requests), except on threads inside root_context: multi-root
+checks run each .discuss root on a worker thread with counters and phases
+of its own, merged into the run's in root order afterwards (merge_context).
+Increments are locked, since a root's scan workers share its context (see
+bind).
+
+Phase timings are opt-in (DISCUSS_HOOKS_TIMING=1, or "json" to also append
+one JSON object per run to logs/hook-timings.jsonl). Each phase records its
+wall time (time.perf_counter), how often it ran, and the counts made while
+it was current (stat_calls, discussions_scanned, bytes_read,
+bytes_written):
+
+  phases: load_snapshot=0.41ms(bytes_read=1830) scan_compare=1.20ms(...)
+
+Counts made on a thread with no phase of its own (scan workers) go to the
+phase most recently entered in the same context. When timing is disabled, phase() returns a
+shared no-op context manager and count() returns at once.
+"""
+
+import contextlib
+import os
+import threading
+import time
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional
+
+# Environment variable enabling phase timings ("1": log line, "json": also the sidecar)
+TIMING_ENV = "DISCUSS_HOOKS_TIMING"
+
+TIMING_OFF = "off"
+TIMING_LOG = "log"
+TIMING_JSON = "json"
+
+# JSON sidecar of phase timings, in the log directory (not a "discuss-hooks"
+# name, so hook log rotation leaves it alone; it is rotated on its own)
+TIMINGS_NAME = "hook-timings"
+TIMINGS_FILE = TIMINGS_NAME + ".jsonl"
+
+_lock = threading.Lock()
+_timing: Optional[str] = None
+_local = threading.local()
+_NO_PHASE = contextlib.nullcontext()
+
+# Called with (phase name, True) when a timed phase starts and (name, False)
+# when it ends (see profiling.py)
+_phase_listeners: List[Callable[[str, bool], None]] = []
+
+
+class Context:
+    """Counters and phases of a run, or of one .discuss root of it."""
+
+    __slots__ = ("counters", "phases", "last_phase")
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        # Phase name -> {"seconds": float, "calls": int, "counts": {name: int}}
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.last_phase: Optional[str] = None
+
+
+# Context of the run (threads outside root_context)
+_run = Context()
+
+
+def _context() -> Context:
+    """Get the calling thread's context."""
+    return getattr(_local, "context", None) or _run
+
+
+@contextlib.contextmanager
+def root_context() -> Iterator[Context]:
+    """
+    Give the calling thread counters and phases of its own.
+
+    Yields:
+        The new context, to pass to merge_context once the thread is done
+    """
+    previous = getattr(_local, "context", None)
+    _local.context = context = Context()
+    try:
+        yield context
+    finally:
+        _local.context = previous
+
+
+def merge_context(context: Context) -> None:
+    """
+    Add a root's counters and phases to the calling thread's context.
+
+    Args:
+        context: Context yielded by root_context
+    """
+    target = _context()
+    with _lock:
+        for name, value in context.counters.items():
+            target.counters[name] = target.counters.get(name, 0) + value
+        for name, entry in context.phases.items():
+            merged = _phase_entry(target, name)
+            merged["seconds"] += entry["seconds"]
+            merged["calls"] += entry["calls"]
+            for key, value in entry["counts"].items():
+                merged["counts"][key] = merged["counts"].get(key, 0) + value
+        if context.last_phase is not None:
+            target.last_phase = context.last_phase
+
+
+def bind(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Make func count into the calling thread's context on any thread.
+
+    Args:
+        func: Function to run on worker threads (scan workers)
+
+    Returns:
+        func itself outside root_context, else a wrapper
+    """
+    context = getattr(_local, "context", None)
+    if context is None:
+        return func
+
+    def bound(*args: Any, **kwargs: Any) -> Any:
+        previous = getattr(_local, "context", None)
+        _local.context = context
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.context = previous
+
+    return bound
+
+
+def incr(name: str, amount: int = 1) -> None:
+    """
+    Increment a counter.
+
+    Args:
+        name: Counter name (e.g., "snapshot_writes")
+        amount: Amount to add
+    """
+    counters = _context().counters
+    with _lock:
+        counters[name] = counters.get(name, 0) + amount
+
+
+def get_counters() -> Dict[str, int]:
+    """Get a copy of the current counters."""
+    return dict(_context().counters)
+
+
+def reset_counters() -> None:
+    """Reset all counters and phases (start of a hook run)."""
+    context = _context()
+    context.counters.clear()
+    context.phases.clear()
+    context.last_phase = None
+
+
+def format_counters(counters: Dict[str, int]) -> str:
+    """
+    Format counters for the log.
+
+    Args:
+        counters: Counter dictionary
+
+    Returns:
+        "name=value" pairs sorted by name, space separated
+    """
+    return " ".join(f"{name}={value}" for name, value in sorted(counters.items()))
+
+
+def _parse_timing(value: str) -> str:
+    """Map a DISCUSS_HOOKS_TIMING value to a timing mode."""
+    value = value.strip().lower()
+    if value == TIMING_JSON:
+        return TIMING_JSON
+    if value in ("", "0", "false", "no", "off"):
+        return TIMING_OFF
+    return TIMING_LOG
+
+
+def set_timing(mode: Optional[str]) -> None:
+    """
+    Set the timing mode.
+
+    Args:
+        mode: TIMING_OFF, TIMING_LOG or TIMING_JSON; None re-reads
+              DISCUSS_HOOKS_TIMING
+    """
+    global _timing
+    _timing = _parse_timing(os.environ.get(TIMING_ENV, "")) if mode is None else mode
+
+
+def get_timing() -> str:
+    """Get the timing mode (DISCUSS_HOOKS_TIMING, read once)."""
+    if _timing is None:
+        set_timing(None)
+    return _timing
+
+
+def timing_enabled() -> bool:
+    """Check whether phase timings are recorded."""
+    return (_timing or get_timing()) != TIMING_OFF
+
+
+def _phase_entry(context: Context, name: str) -> Dict[str, Any]:
+    """Get a phase's entry in a context, creating it (call with _lock held)."""
+    entry = context.phases.get(name)
+    if entry is None:
+        entry = context.phases[name] = {"seconds": 0.0, "calls": 0, "counts": {}}
+    return entry
+
+
+class _PhaseTimer:
+    """Context manager timing one run of a phase."""
+
+    __slots__ = ("name", "previous", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "_PhaseTimer":
+        self.previous = getattr(_local, "phase", None)
+        _local.phase = _context().last_phase = self.name
+        for listener in _phase_listeners:
+            listener(self.name, True)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        record_phase(self.name, time.perf_counter() - self.started)
+        for listener in _phase_listeners:
+            listener(self.name, False)
+        _local.phase = self.previous
+
+
+def add_phase_listener(listener: Callable[[str, bool], None]) -> None:
+    """
+    Call listener(name, entering) around every timed phase.
+
+    Args:
+        listener: Called with True when a phase starts, False when it ends
+    """
+    _phase_listeners.append(listener)
+
+
+def remove_phase_listener(listener: Callable[[str, bool], None]) -> None:
+    """Stop calling a listener added with add_phase_listener."""
+    if listener in _phase_listeners:
+        _phase_listeners.remove(listener)
+
+
+def phase(name: str) -> ContextManager:
+    """
+    Time a phase of the run (no-op unless timing is enabled).
+
+    Args:
+        name: Phase name (e.g., "load_snapshot")
+
+    Returns:
+        Context manager to wrap the phase in
+    """
+    if (_timing or get_timing()) == TIMING_OFF:
+        return _NO_PHASE
+    return _PhaseTimer(name)
+
+
+def record_phase(name: str, seconds: float) -> None:
+    """
+    Add a run of a phase timed by the caller.
+
+    Args:
+        name: Phase name
+        seconds: Duration in seconds
+    """
+    context = _context()
+    with _lock:
+        entry = _phase_entry(context, name)
+        entry["seconds"] += seconds
+        entry["calls"] += 1
+
+
+def count(name: str, amount: int = 1) -> None:
+    """
+    Add to a count of the current phase (no-op unless timing is enabled).
+
+    Args:
+        name: Count name (e.g., "bytes_read")
+        amount: Amount to add
+    """
+    if (_timing or get_timing()) == TIMING_OFF:
+        return
+    context = _context()
+    current = getattr(_local, "phase", None) or context.last_phase or "run"
+    with _lock:
+        counts = _phase_entry(context, current)["counts"]
+        counts[name] = counts.get(name, 0) + amount
+
+
+def get_phases() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the phases recorded in this run.
+
+    Returns:
+        Phase name -> {"ms": total milliseconds, "calls": runs, plus counts},
+        in the order the phases first ran
+    """
+    context = _context()
+    with _lock:
+        return {
+            name: dict(
+                {"ms": round(entry["seconds"] * 1000, 3), "calls": entry["calls"]},
+                **entry["counts"],
+            )
+            for name, entry in context.phases.items()
+        }
+
+
+def format_phases(phases: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Format phases for the log.
+
+    Args:
+        phases: Result of get_phases
+
+    Returns:
+        "name=1.23ms(calls=2 count=value ...)" per phase, in run order
+    """
+    parts = []
+    for name, entry in phases.items():
+        # Runs are only shown for phases that ran more than once
+        counts = " ".join(
+            f"{key}={value}"
+            for key, value in entry.items()
+            if key != "ms" and (key != "calls" or value > 1)
+        )
+        parts.append(f"{name}={entry['ms']:.2f}ms" + (f"({counts})" if counts else ""))
+    return " ".join(parts)
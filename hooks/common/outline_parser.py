@@ -0,0 +1,362 @@
+"""
+Incremental parser for the problem states of a discussion outline.
+
+The skill tracks each problem's lifecycle in outline.md by moving it between
+sections whose headings carry a status marker:
+
+    ## 🔵 Current Focus      -> discussing
+    ## ⚪ Pending            -> pending
+    ## ✅ Confirmed          -> resolved
+    ## ❌ Rejected           -> rejected
+    ## ⏸️ Deferred           -> deferred
+    ## 📁 Archive            -> archived
+
+Problems are the top-level list items and table rows of those sections;
+sections without a marker are ignored. A problem is identified by the slug
+of its title, so moving it to another section keeps its id.
+
+Parse results are cached in the discussion state under outline.problems:
+
+    "problems": {
+        "digest": "9f86d081...",          # outline digest the parse is for
+        "sections": [
+            {"digest": "1c2d...", "status": "resolved",
+             "problems": [{"id": "snapshot-scheme", "status": "resolved",
+                           "refs": ["D1", "D01-snapshot-scheme.md"]}]}
+        ],
+        "unrecorded": ["snapshot-scheme"]   # decided, no decision document
+    }
+
+Only sections whose text digest changed are re-parsed. Titles are not
+cached (they are only needed for a reminder, which re-reads the outline),
+which keeps the cache inside the stdlib YAML subset (see snapshot_yaml.py).
+
+A problem is "unrecorded" once it turns resolved or rejected while tracked
+and no file in decisions/ matches it: by a link to the file, by its
+decision ID (D01 matches D01-xxx.md and 01-xxx.md) or by slug. Problems
+already decided when the outline is first parsed are not reported.
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .metrics import count
+
+# Section heading markers and the status they stand for
+STATUS_MARKERS = (
+    ("🔵", "discussing"),
+    ("⚪", "pending"),
+    ("✅", "resolved"),
+    ("❌", "rejected"),
+    ("⏸", "deferred"),
+    ("📁", "archived"),
+)
+
+# Statuses that call for a decision document
+DECIDED_STATUSES = frozenset({"resolved", "rejected"})
+
+# Maximum length of a problem id
+MAX_ID_LENGTH = 60
+
+# Size of section digests in bytes (blake2b)
+SECTION_DIGEST_SIZE = 8
+
+_SECTION_HEADING = re.compile(r"^##(?!#)\s*(.*)$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_LIST_ITEM = re.compile(r"^ {0,1}(?:[-*+]|\d+[.)])\s+(?:\[([ xX])\]\s+)?(.*)$")
+_TABLE_SEPARATOR = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+_LINK = re.compile(r"\[([^\]]*)\]\(([^)\s]*)[^)]*\)")
+_DECISION_ID = re.compile(r"\bD(\d{1,3})\b")
+_DECISION_FILE = re.compile(r"^(?:D?(\d+)[-_]?)?(.*)\.md$", re.IGNORECASE)
+_ID_PREFIX = re.compile(r"^D\d{1,3}\s*[:.)-]\s*")
+_POINTER = re.compile(r"\s+(?:→|->)\s*(?:D\d|\S*decisions/|\S*\.md\b).*$")
+_SLUG_SEPARATORS = re.compile(r"[^a-z0-9_]+")
+
+
+def section_digest(text: str) -> str:
+    """Digest of a section's text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=SECTION_DIGEST_SIZE).hexdigest()
+
+
+def split_sections(text: str) -> List[str]:
+    """
+    Split an outline at its level-2 headings.
+
+    Args:
+        text: Outline content
+
+    Returns:
+        Section texts (the first one holds anything before the first
+        heading); headings inside code fences do not split
+    """
+    sections = [[]]
+    in_fence = False
+    for line in text.splitlines(keepends=True):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and _SECTION_HEADING.match(line):
+            sections.append([])
+        sections[-1].append(line)
+    return ["".join(lines) for lines in sections]
+
+
+def get_section_status(section: str) -> Optional[str]:
+    """Get the status a section heading stands for, or None."""
+    match = _SECTION_HEADING.match(section.split("\n", 1)[0])
+    if not match:
+        return None
+    heading = match.group(1)
+    for marker, status in STATUS_MARKERS:
+        if marker in heading:
+            return status
+    return None
+
+
+def problem_id(title: str) -> str:
+    """
+    Get the id of a problem from its title.
+
+    Args:
+        title: Problem title
+
+    Returns:
+        Lowercase slug, or "p-" and a short digest for titles without
+        ASCII letters or digits (e.g. Chinese titles)
+    """
+    slug = _SLUG_SEPARATORS.sub("-", title.lower()).strip("-")[:MAX_ID_LENGTH].rstrip("-")
+    if slug:
+        return slug
+    return "p-" + hashlib.blake2b(title.encode("utf-8"), digest_size=4).hexdigest()
+
+
+def _clean_text(text: str) -> Tuple[str, List[str]]:
+    """Strip Markdown from an item; returns (title, decision refs)."""
+    refs = set()
+    for _, target in _LINK.findall(text):
+        if "decisions/" in target:
+            refs.add(target.rsplit("/", 1)[-1])
+    text = _LINK.sub(r"\1", text)
+    refs.update(f"D{int(number)}" for number in _DECISION_ID.findall(text))
+    for marker, _ in STATUS_MARKERS:
+        text = text.replace(marker, "")
+    text = text.replace("`", "").replace("**", "").replace("__", "").strip(" \t*_~️")
+    # "D01: Title → D01-title.md": keep the title only
+    text = _POINTER.sub("", _ID_PREFIX.sub("", text))
+    return text.strip(), sorted(refs)
+
+
+def _is_placeholder(title: str) -> bool:
+    """Check for template placeholders such as "(None yet)"."""
+    return not title or (title.startswith("(") and title.endswith(")"))
+
+
+def _parse_items(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    """Extract (title, refs) of the top-level list items and table rows."""
+    items = []
+    in_fence = False
+    for i, line in enumerate(lines):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+
+        match = _LIST_ITEM.match(line)
+        if match:
+            items.append(_clean_text(match.group(2)))
+            continue
+
+        stripped = line.strip()
+        if not stripped.startswith("|") or _TABLE_SEPARATOR.match(stripped):
+            continue
+        if i + 1 < len(lines) and _TABLE_SEPARATOR.match(lines[i + 1].strip()):
+            continue  # Header row
+        cells = [_clean_text(cell) for cell in stripped.strip("|").split("|")]
+        refs = sorted({ref for _, cell_refs in cells for ref in cell_refs})
+        # The title is the first cell that is more than a decision ID
+        titles = [title for title, _ in cells if title and not _DECISION_ID.fullmatch(title)]
+        items.append((titles[0] if titles else "", refs))
+    return [(title, refs) for title, refs in items if not _is_placeholder(title)]
+
+
+def parse_section(section: str) -> Dict[str, Any]:
+    """
+    Parse one outline section.
+
+    Args:
+        section: Section text, starting with its heading
+
+    Returns:
+        {"digest", "status", "problems"}; each problem has "id", "title",
+        "status" and "refs". Sections without a status marker have no
+        problems.
+    """
+    status = get_section_status(section)
+    problems = []
+    if status is not None:
+        lines = section.splitlines()[1:]
+        for title, refs in _parse_items(lines):
+            problems.append(
+                {"id": problem_id(title), "title": title, "status": status, "refs": refs}
+            )
+    return {"digest": section_digest(section), "status": status, "problems": problems}
+
+
+def parse_outline(
+    text: str, cached_sections: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Parse an outline, reusing cached results of unchanged sections.
+
+    Args:
+        text: Outline content
+        cached_sections: Sections from a previous parse (may lack titles)
+
+    Returns:
+        (sections, number of sections re-parsed)
+    """
+    cache = {section.get("digest"): section for section in cached_sections or []}
+    sections = []
+    reparsed = 0
+    for section_text in split_sections(text):
+        cached = cache.get(section_digest(section_text))
+        if cached is not None:
+            sections.append(cached)
+        else:
+            sections.append(parse_section(section_text))
+            reparsed += 1
+    return sections, reparsed
+
+
+def iter_problems(sections: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+    """Iterate over the problems of parsed sections."""
+    for section in sections:
+        yield from section.get("problems", [])
+
+
+def has_problem_sections(sections: Iterable[Dict[str, Any]]) -> bool:
+    """Check whether an outline uses status sections at all."""
+    return any(section.get("status") for section in sections)
+
+
+def is_recorded(problem: Dict[str, Any], decision_names: Iterable[str]) -> bool:
+    """
+    Check whether a decision document matches a problem.
+
+    Args:
+        problem: Parsed problem
+        decision_names: File names in decisions/
+
+    Returns:
+        True if a decision file is linked from the problem, has one of its
+        decision IDs, or has the problem's slug in its name
+    """
+    refs = set(problem.get("refs", []))
+    for name in decision_names:
+        if name in refs:
+            return True
+        match = _DECISION_FILE.match(name)
+        if not match:
+            continue
+        if match.group(1) and f"D{int(match.group(1))}" in refs:
+            return True
+        slug = match.group(2).lower()
+        if slug and (slug == problem["id"] or (len(slug) >= 8 and slug in problem["id"])):
+            return True
+    return False
+
+
+def update_problem_index(
+    old_state: Dict[str, Any], new_state: Dict[str, Any], discuss_dir: Path
+) -> Optional[List[str]]:
+    """
+    Refresh a discussion's problem index and its unrecorded decisions.
+
+    The outline is only read when its digest differs from the parsed one,
+    and then only changed sections are parsed (see module docstring).
+
+    Args:
+        old_state: Previous state from snapshot
+        new_state: Current state with digests (updated in place)
+        discuss_dir: Discussion directory
+
+    Returns:
+        Ids of decided problems without a decision document, or None if the
+        outline has no status sections (or could not be read)
+    """
+    outline = new_state.get("outline", {})
+    digest = outline.get("digest")
+    if not digest:
+        return None
+    old_index = old_state.get("outline", {}).get("problems")
+    if not isinstance(old_index, dict):
+        old_index = None
+
+    if old_index is not None and old_index.get("digest") == digest:
+        sections = old_index.get("sections", [])
+    else:
+        try:
+            text = (discuss_dir / "outline.md").read_text(encoding="utf-8")
+        except (OSError, ValueError):
+            return None
+        count("bytes_read", outline.get("size", len(text)))
+        sections, _ = parse_outline(text, old_index.get("sections") if old_index else None)
+        sections = [
+            dict(
+                section,
+                problems=[
+                    {key: problem[key] for key in ("id", "status", "refs")}
+                    for problem in section["problems"]
+                ],
+            )
+            for section in sections
+        ]
+    if not has_problem_sections(sections):
+        outline.pop("problems", None)
+        return None
+
+    decided = {
+        problem["id"]: problem
+        for problem in iter_problems(sections)
+        if problem["status"] in DECIDED_STATUSES
+    }
+    unrecorded: Set[str] = set()
+    if old_index is not None:
+        decided_before = {
+            problem["id"]
+            for problem in iter_problems(old_index.get("sections", []))
+            if problem.get("status") in DECIDED_STATUSES
+        }
+        unrecorded = (set(old_index.get("unrecorded", [])) | (set(decided) - decided_before)) & set(
+            decided
+        )
+
+    decision_names = [item.get("name", "") for item in new_state.get("decisions", [])]
+    unrecorded = sorted(key for key in unrecorded if not is_recorded(decided[key], decision_names))
+    outline["problems"] = {"digest": digest, "sections": sections, "unrecorded": unrecorded}
+    return unrecorded
+
+
+def get_problem_titles(discuss_dir: Path, ids: Iterable[str]) -> Dict[str, str]:
+    """
+    Look up the titles of problems (for reminders).
+
+    Args:
+        discuss_dir: Discussion directory
+        ids: Problem ids
+
+    Returns:
+        Mapping of id to title; ids no longer in the outline map to themselves
+    """
+    titles = {key: key for key in ids}
+    try:
+        text = (discuss_dir / "outline.md").read_text(encoding="utf-8")
+    except (OSError, ValueError):
+        return titles
+    sections, _ = parse_outline(text)
+    for problem in iter_problems(sections):
+        if problem["id"] in titles:
+            titles[problem["id"]] = problem["title"]
+    return titles
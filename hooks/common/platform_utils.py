@@ -111,39 +111,60 @@ def is_stop_hook_active(input_data: Dict[str, Any]) -> bool:
     return input_data.get("stop_hook_active", False)
 
 
-def format_output_allow() -> str:
+def build_output_allow() -> Dict[str, Any]:
     """
-    Format output to allow the operation to continue.
+    Build output that allows the operation to continue.
     
     Returns:
-        JSON string for allow/pass output
+        Output dictionary for allow/pass
     """
-    return json.dumps({})
+    return {}
 
 
-def format_output_block(message: str, platform: Platform) -> str:
+def build_output_block(message: str, platform: Platform) -> Dict[str, Any]:
     """
-    Format output to block/remind with a message.
+    Build output that blocks/reminds with a message.
     
     Args:
         message: Reminder message to display
         platform: Target platform
         
     Returns:
-        JSON string for block output
+        Output dictionary for block
     """
     if platform == Platform.CURSOR:
         # Cursor uses followup_message
-        return json.dumps({"followup_message": message})
+        return {"followup_message": message}
     elif platform == Platform.CLAUDE_CODE:
         # Claude Code uses decision: block with reason
-        return json.dumps({
-            "decision": "block",
-            "reason": message
-        })
+        return {"decision": "block", "reason": message}
     else:
         # Unknown platform, use generic format
-        return json.dumps({"message": message})
+        return {"message": message}
+
+
+def format_output_allow() -> str:
+    """
+    Format output to allow the operation to continue.
+
+    Returns:
+        JSON string for allow/pass output
+    """
+    return json.dumps(build_output_allow())
+
+
+def format_output_block(message: str, platform: Platform) -> str:
+    """
+    Format output to block/remind with a message.
+
+    Args:
+        message: Reminder message to display
+        platform: Target platform
+
+    Returns:
+        JSON string for block output
+    """
+    return json.dumps(build_output_block(message, platform))
 
 
 def write_output(output: str) -> None:
@@ -0,0 +1,536 @@
+"""
+Precipitation check logic (snapshot-based).
+
+Runs the Stop hook's check for one workspace and returns the hook output.
+Used by the in-process hook (stop/check_precipitation.py) and the resident
+daemon (stop/check_daemon.py). The hook entry point only imports this module
+once its cheap exits have been ruled out, so heavy dependencies (PyYAML,
+logging) are fine here.
+
+Workflow:
+1. Check if stop_hook_active is true (prevent infinite loop)
+2. Load snapshot from .discuss/.snapshot.yaml
+3. Find active discussions (modified within 24h), scanning their state
+   in the same pass and skipping subtrees the directory index vouches for
+   (or replaying the change journal when a watcher is running); topics are
+   checked most recent first until the time budget (scan_deadline_ms) is
+   spent, and the next run resumes from a cursor stored in the index
+4. Compare each discussion's state with snapshot (restoring it from the
+   cold archive if it was archived)
+5. Update snapshot with new state, archiving long-idle discussions
+6. Emit reminder if change_count >= threshold (or, with reminder_mode
+   "problems", if a problem in outline.md turned resolved/rejected without
+   a decision document; see outline_parser.py)
+7. Save snapshot (only if something changed) under .discuss/.snapshot.lock,
+   re-applying steps 4-5 on top of a snapshot another session saved
+   meanwhile (see snapshot_lock.py)
+8. Store the verdict behind a fingerprint of .discuss if the check allowed
+   the stop (single-root mode), so that the next hook can skip all of the
+   above while nothing changed (see verdict_cache.py)
+"""
+
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .change_journal import read_journal
+from .logging_utils import (
+    RootContext,
+    log_action,
+    log_debug,
+    log_error,
+    log_hook_end,
+    log_hook_start,
+    log_info,
+    log_skip,
+    log_stale_detection,
+    merge_root_context,
+    root_context,
+)
+from .metrics import count, phase, record_phase
+from .outline_parser import get_problem_titles, update_problem_index
+from .platform_utils import (
+    Platform,
+    build_output_allow,
+    build_output_block,
+    detect_platform,
+    is_stop_hook_active,
+)
+from .root_discovery import (
+    find_workspace_top,
+    get_discuss_roots,
+    get_root_label,
+    is_multi_root_enabled,
+)
+from .snapshot_lock import commit_snapshot
+from .snapshot_manager import (
+    REMINDER_MODE_PROBLEMS,
+    archive_idle_discussions,
+    cleanup_deleted_discussions,
+    compare_and_update,
+    get_archive_days,
+    get_discuss_key,
+    get_index_keys,
+    get_min_outline_change,
+    get_reminder_mode,
+    get_scan_deadline,
+    get_scan_workers,
+    get_snapshot_signature,
+    hash_changed_files,
+    load_snapshot,
+    restore_archived_discussions,
+    save_snapshot,
+    scan_discussion,
+    score_outline_change,
+    scan_discussions_indexed,
+    scan_discussions_journaled,
+    set_discussion_state,
+    set_index,
+    set_journal_position,
+)
+from .verdict_cache import build_fingerprint, get_root_names, is_cache_enabled, write_verdict_cache
+
+HOOK_NAME = "check_precipitation"
+
+# Maximum number of .discuss roots checked concurrently (multi-root mode)
+MAX_ROOT_WORKERS = 8
+
+
+def format_stale_reminder(
+    discuss_key: str,
+    change_count: int,
+    threshold: int,
+    is_force: bool = False,
+    root_label: Optional[str] = None,
+) -> str:
+    """
+    Format a reminder message for stale discussion.
+
+    Args:
+        discuss_key: Discussion key (e.g., "2026-01-30/topic-name")
+        change_count: Current change_count value
+        threshold: Staleness threshold
+        is_force: Whether this is a force update (exceeded force threshold)
+        root_label: Directory containing the .discuss root, relative to the
+                    workspace top (multi-root mode; None for .discuss)
+
+    Returns:
+        Formatted reminder message
+    """
+    if is_force:
+        header = "## ⚠️ Precipitation Required\n\n"
+        header += (
+            "The discussion outline has been updated multiple times, "
+            "but decisions/notes haven't been updated:\n\n"
+        )
+    else:
+        header = "## 💡 Precipitation Suggestion\n\n"
+        header += (
+            "The discussion outline has been updated, but decisions/notes may need updating:\n\n"
+        )
+
+    discuss_dir = f".discuss/{discuss_key}"
+    items_text = f"- Discussion: `{discuss_key}`\n"
+    if root_label and root_label != ".":
+        items_text += f"- Root: `{root_label}`\n"
+        discuss_dir = f"{root_label}/{discuss_dir}"
+    items_text += f"- Outline changes without updates: {change_count} (threshold: {threshold})\n"
+
+    footer = f"\n📁 Discussion: `{discuss_dir}`\n"
+
+    if is_force:
+        footer += "\n**Please update the discussion files before continuing.**\n"
+        footer += "This ensures important decisions are properly documented.\n"
+    else:
+        footer += "\nWould you like me to help update the decisions/notes?\n"
+        footer += "This helps maintain a complete record of our discussion.\n"
+
+    return header + items_text + footer
+
+
+def format_problem_reminder(
+    discuss_key: str, titles: List[str], root_label: Optional[str] = None
+) -> str:
+    """
+    Format a reminder for decided problems without a decision document.
+
+    Args:
+        discuss_key: Discussion key (e.g., "2026-01-30/topic-name")
+        titles: Titles of the problems
+        root_label: Directory containing the .discuss root, relative to the
+                    workspace top (multi-root mode; None for .discuss)
+
+    Returns:
+        Formatted reminder message
+    """
+    header = "## 💡 Precipitation Suggestion\n\n"
+    header += (
+        "Problems in the outline were resolved or rejected, but have no decision document yet:\n\n"
+    )
+
+    discuss_dir = f".discuss/{discuss_key}"
+    items_text = f"- Discussion: `{discuss_key}`\n"
+    if root_label and root_label != ".":
+        items_text += f"- Root: `{root_label}`\n"
+        discuss_dir = f"{root_label}/{discuss_dir}"
+    items_text += "".join(f"- Problem: {title}\n" for title in titles)
+
+    footer = f"\n📁 Discussion: `{discuss_dir}`\n"
+    footer += "\nWould you like me to record these decisions in decisions/?\n"
+    footer += "This helps maintain a complete record of our discussion.\n"
+
+    return header + items_text + footer
+
+
+def check_discuss_root(
+    discuss_root: Path,
+    load: Callable[[Path], Dict[str, Any]],
+    save: Callable[[Path, Dict[str, Any]], bool],
+    root_label: Optional[str] = None,
+    started: Optional[float] = None,
+    cache: bool = False,
+) -> List[Tuple[str, bool]]:
+    """
+    Check one .discuss root and update its snapshot.
+
+    Args:
+        discuss_root: Path to .discuss directory
+        load: Snapshot loader
+        save: Snapshot saver
+        root_label: Label shown in reminders (multi-root mode only)
+        started: time.monotonic() at the start of the check, from which
+                 the time budget is counted (default: now)
+        cache: Store an allow verdict in the verdict cache (and remove the
+               cache otherwise)
+
+    Returns:
+        List of (reminder message, is_force) tuples
+    """
+    root_names = snapshot_signature = None
+    if cache:
+        # Observed before the scan: a change made while the check runs
+        # does not match the fingerprint
+        root_names = get_root_names(discuss_root)
+        snapshot_signature = get_snapshot_signature(discuss_root)
+
+    # Load snapshot
+    with phase("load_snapshot"):
+        snapshot = load(discuss_root)
+    threshold = snapshot.get("config", {}).get("stale_threshold", 3)
+    force_threshold = threshold * 2  # Force at 2x the suggest threshold
+    track_problems = get_reminder_mode(snapshot.get("config")) == REMINDER_MODE_PROBLEMS
+    min_change = get_min_outline_change(snapshot.get("config"))
+    workers = get_scan_workers(snapshot.get("config"))
+    budget = get_scan_deadline(snapshot.get("config"))
+    deadline = None
+    if budget is not None:
+        deadline = (time.monotonic() if started is None else started) + budget
+
+    # Find active discussions (modified within 24h) and scan their state:
+    # from the change journal when a watcher keeps one, otherwise by
+    # walking the tree, skipping subtrees the directory index vouches for
+    # and stopping at the deadline (the next run resumes from the cursor)
+    with phase("find_active_discussions"):
+        journal = read_journal(discuss_root, snapshot.get("journal"))
+        if journal.changed is not None and snapshot.get("index"):
+            log_debug("Replaying %s journaled change(s)", len(journal.changed))
+            active_discussions, index = scan_discussions_journaled(
+                discuss_root,
+                snapshot["index"],
+                snapshot.get("discussions", {}),
+                journal.changed,
+                hours=24,
+                workers=workers,
+            )
+        else:
+            active_discussions, index = scan_discussions_indexed(
+                discuss_root, snapshot.get("index"), hours=24, workers=workers, deadline=deadline
+            )
+    existing_keys = get_index_keys(index)
+    log_debug("Found %s active discussion(s) in %s", len(active_discussions), discuss_root)
+    active_keys = [
+        get_discuss_key(discuss_dir, discuss_root) for discuss_dir, _ in active_discussions
+    ]
+    archive_days = get_archive_days(snapshot.get("config"))
+
+    def compare_discussions(
+        target: Dict[str, Any],
+    ) -> List[Tuple[Path, str, int, Optional[List[str]]]]:
+        """Compare the active discussions with their states in a snapshot."""
+        # Active again after being archived: bring back its history
+        restore_archived_discussions(target, discuss_root, active_keys)
+
+        counts = []
+        for (discuss_dir, observed), discuss_key in zip(active_discussions, active_keys):
+            old_state = target.get("discussions", {}).get(discuss_key, {})
+
+            if target is not snapshot:
+                # Another session saved after our scan may have run: rescan
+                # (under the lock) so a stored state never goes back to an
+                # older observation
+                if not discuss_dir.is_dir():
+                    continue
+                observed = scan_discussion(discuss_dir)
+
+            # Compare with the stored state (hashing only files whose mtime
+            # or size changed) and update change_count
+            new_state = copy.deepcopy(observed)
+            hash_changed_files(old_state, new_state, discuss_dir)
+            magnitude = None
+            if min_change > 0:
+                # Minor edits (typo fixes) are not rounds
+                magnitude = score_outline_change(old_state, new_state, discuss_dir)
+            change_count = compare_and_update(old_state, new_state, magnitude, min_change)
+            unrecorded = None
+            if track_problems:
+                unrecorded = update_problem_index(old_state, new_state, discuss_dir)
+
+            # Update snapshot with new state (marks it dirty if it changed)
+            set_discussion_state(target, discuss_key, new_state)
+            counts.append((discuss_dir, discuss_key, change_count, unrecorded))
+        count("discussions_scanned", len(counts))
+        return counts
+
+    def apply(target: Dict[str, Any]) -> List[Tuple[Path, str, int, Optional[List[str]]]]:
+        """
+        Record this run's scan in a snapshot.
+
+        Returns (dir, key, change_count, unrecorded problem ids) per active
+        discussion; the ids are None unless problems are tracked.
+        """
+        nonlocal snapshot_signature
+        set_index(target, index)
+        set_journal_position(target, journal.position)
+
+        with phase("scan_compare"):
+            counts = compare_discussions(target)
+
+        with phase("cleanup"):
+            # Clean up deleted discussions (after a concurrent save, check the
+            # paths: our key set may predate discussions the other session saw)
+            cleanup_deleted_discussions(
+                target, discuss_root, existing_keys if target is snapshot else None
+            )
+
+            # Move long-idle discussions to the cold archive
+            archive_idle_discussions(
+                target,
+                index,
+                archive_days,
+                set(active_keys),
+                existing_keys if target is snapshot else None,
+            )
+
+        if cache and getattr(target, "dirty", True):
+            # The snapshot file is only known once saved (never, if the
+            # lock times out)
+            snapshot_signature = None
+        return counts
+
+    def timed_save(root: Path, target: Dict[str, Any]) -> bool:
+        """Save a snapshot as the save_snapshot phase."""
+        nonlocal snapshot_signature
+        written = getattr(target, "dirty", True)
+        with phase("save_snapshot"):
+            saved = save(root, target)
+        if cache and written and saved:
+            # Still under the lock: this is the file we wrote
+            snapshot_signature = get_snapshot_signature(root)
+        return saved
+
+    # Apply and save under the snapshot lock; if another session saved
+    # meanwhile, this run is re-applied on top of its snapshot
+    counts = commit_snapshot(discuss_root, snapshot, apply, save=timed_save)
+
+    # Check each discussion for staleness
+    stale_reminders = []
+
+    for discuss_dir, discuss_key, change_count, unrecorded in counts:
+        if unrecorded is not None:
+            # Outline with status sections: remind about decided problems
+            # only, however often the outline was edited
+            if unrecorded:
+                titles = get_problem_titles(discuss_dir, unrecorded)
+                reminder = format_problem_reminder(
+                    discuss_key, [titles[key] for key in unrecorded], root_label
+                )
+                stale_reminders.append((reminder, False))
+                log_info(f"Unrecorded decisions in {discuss_key}: {', '.join(unrecorded)}")
+            continue
+        if change_count >= threshold:
+            is_force = change_count >= force_threshold
+            reminder = format_stale_reminder(
+                discuss_key, change_count, threshold, is_force, root_label
+            )
+            stale_reminders.append((reminder, is_force))
+
+            log_stale_detection(str(discuss_dir), [("outline", change_count, is_force)])
+
+    if cache:
+        record = None
+        if not stale_reminders:
+            active_states = {
+                key: observed for key, (_, observed) in zip(active_keys, active_discussions)
+            }
+            record = build_fingerprint(
+                discuss_root, root_names, snapshot_signature, index, active_states, journal.position
+            )
+        write_verdict_cache(discuss_root, record)
+
+    return stale_reminders
+
+
+def _check_roots(
+    discuss_roots: List[Path],
+    load: Callable[[Path], Dict[str, Any]],
+    save: Callable[[Path, Dict[str, Any]], bool],
+    top: Optional[Path],
+    started: Optional[float] = None,
+) -> List[Tuple[str, bool]]:
+    """
+    Check several .discuss roots concurrently (one snapshot per root).
+
+    Each root logs and counts into its own context (see
+    logging_utils.root_context), merged into the run's in root order.
+    A root that fails is logged and skipped; the others are still checked.
+
+    Args:
+        discuss_roots: .discuss directories to check
+        load: Snapshot loader
+        save: Snapshot saver
+        top: Workspace top used for root labels (None: no labels)
+        started: time.monotonic() at the start of the check (shared budget)
+
+    Returns:
+        Reminders of all roots, in root order
+    """
+
+    def check(discuss_root: Path) -> List[Tuple[str, bool]]:
+        label = get_root_label(discuss_root, top) if top is not None else None
+        try:
+            return check_discuss_root(discuss_root, load, save, label, started)
+        except Exception as e:
+            log_error(f"Failed to check {discuss_root}", e)
+            return []
+
+    def check_apart(discuss_root: Path) -> Tuple[List[Tuple[str, bool]], RootContext]:
+        with root_context() as context:
+            return check(discuss_root), context
+
+    if len(discuss_roots) == 1:
+        return check(discuss_roots[0])
+
+    with ThreadPoolExecutor(max_workers=min(len(discuss_roots), MAX_ROOT_WORKERS)) as executor:
+        results = list(executor.map(check_apart, discuss_roots))
+
+    reminders = []
+    for root_reminders, context in results:
+        merge_root_context(context)
+        reminders.extend(root_reminders)
+    return reminders
+
+
+def run_check(
+    input_data: Optional[Dict[str, Any]],
+    workspace_root: Union[str, Path],
+    load: Optional[Callable[[Path], Dict[str, Any]]] = None,
+    save: Optional[Callable[[Path, Dict[str, Any]], bool]] = None,
+    multi_root: Optional[bool] = None,
+    read_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Run the precipitation check and return the hook output.
+
+    Shared by the in-process hook and the resident daemon.
+
+    Args:
+        input_data: Hook input parsed from stdin
+        workspace_root: Workspace root directory
+        load: Snapshot loader (default: snapshot_manager.load_snapshot)
+        save: Snapshot saver (default: snapshot_manager.save_snapshot)
+        multi_root: Check every .discuss root of the workspace (default:
+                    DISCUSS_HOOKS_MULTI_ROOT)
+        read_seconds: Time the caller spent reading stdin, recorded as the
+                      read_stdin phase (timed only with DISCUSS_HOOKS_TIMING)
+
+    Returns:
+        Output dictionary to write to stdout
+    """
+    started = time.monotonic()
+    workspace_root = Path(workspace_root)
+    load = load or load_snapshot
+    save = save or save_snapshot
+    if multi_root is None:
+        multi_root = is_multi_root_enabled()
+    platform = Platform.UNKNOWN
+
+    try:
+        log_hook_start(HOOK_NAME, input_data)
+        if read_seconds is not None:
+            record_phase("read_stdin", read_seconds)
+
+        # Detect platform
+        platform = detect_platform(input_data) if input_data else Platform.UNKNOWN
+        log_info(f"Detected platform: {platform.value}")
+
+        # Check if this is a continuation after stop hook already triggered
+        if input_data and is_stop_hook_active(input_data):
+            log_skip("stop_hook_active is True, bypassing check")
+            log_hook_end(HOOK_NAME, {}, success=True)
+            return build_output_allow()
+
+        log_debug("Workspace root: %s", workspace_root)
+
+        # Get .discuss directories
+        top = None
+        if multi_root:
+            top = find_workspace_top(workspace_root)
+            discuss_roots = get_discuss_roots(workspace_root)
+        else:
+            discuss_root = workspace_root / ".discuss"
+            discuss_roots = [discuss_root] if discuss_root.exists() else []
+
+        if not discuss_roots:
+            log_skip("No .discuss directory found")
+            log_hook_end(HOOK_NAME, {}, success=True)
+            return build_output_allow()
+
+        log_action("Checking discussions for precipitation")
+        if multi_root:
+            log_info(f"Checking {len(discuss_roots)} .discuss root(s) under {top}")
+            stale_reminders = _check_roots(discuss_roots, load, save, top, started)
+        else:
+            stale_reminders = check_discuss_root(
+                discuss_roots[0], load, save, started=started, cache=is_cache_enabled()
+            )
+
+        # Summary logging
+        log_info(f"Stale reminders: {len(stale_reminders)}")
+
+        # If there are stale reminders, check if any require forcing
+        if stale_reminders:
+            # Check if any reminder is force-level
+            has_force = any(is_force for _, is_force in stale_reminders)
+
+            combined_reminder = "\n\n---\n\n".join(reminder for reminder, _ in stale_reminders)
+
+            if has_force:
+                log_action(f"Blocking: {len(stale_reminders)} stale reminder(s) [FORCE]")
+                log_hook_end(HOOK_NAME, {"action": "block", "force": True}, success=True)
+            else:
+                # Suggest but don't block for non-force reminders
+                log_action(f"Suggesting update: {len(stale_reminders)} stale item(s)")
+                log_hook_end(HOOK_NAME, {"action": "suggest"}, success=True)
+            return build_output_block(combined_reminder, platform)
+
+        # No issues, allow and exit
+        log_hook_end(HOOK_NAME, {}, success=True)
+        return build_output_allow()
+
+    except Exception as e:
+        log_error(f"Unexpected error in {HOOK_NAME}", e)
+        log_hook_end(HOOK_NAME, {}, success=False)
+        # Still allow operation to continue even on error
+        return build_output_allow()
@@ -0,0 +1,427 @@
+"""
+Opt-in profiling of hook runs, for diagnosing slow hooks in the field.
+
+With DISCUSS_HOOKS_PROFILE set, check_precipitation.py runs its main
+function under profile_call, which writes two files per invocation to
+~/.discuss-for-specs/profiles/:
+
+- <hook>-<YYYYmmddTHHMMSS>-<pid>.prof: cProfile stats (pstats format)
+- <hook>-<YYYYmmddTHHMMSS>-<pid>.json: duration, exit code, tracemalloc
+  peak and, per phase (see metrics.phase), time, counts, peak traced
+  memory and the allocation sites that grew most
+
+DISCUSS_HOOKS_PROFILE values: "1" (cProfile and tracemalloc), "cpu"
+(cProfile only) or "memory" (tracemalloc only). tracemalloc slows the run
+down several times, so cProfile times are only comparable between
+invocations profiled with the same mode. The per-phase tracemalloc
+snapshots are not counted in the cProfile stats, the phase times or the
+duration (they are reported as overhead_ms). Profiling also enables phase
+timings (DISCUSS_HOOKS_TIMING) and bypasses the resident daemon, so the
+check itself is profiled. Only the newest DISCUSS_HOOKS_PROFILE_KEEP
+invocations are kept (default 50).
+
+cProfile only sees the main thread: work done on root and scan worker
+threads shows up as time waiting for them. Phase times and counts are kept
+per .discuss root (see logging_utils.root_context) and memory snapshots per
+thread, but tracemalloc's peak is process-wide: in multi-root mode a
+phase's peak_kib includes what concurrent roots allocated meanwhile.
+
+merge_profiles aggregates many invocations into one ranked report (see the
+"profiles" command of stop/discuss_hooks.py).
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from . import metrics
+from .logging_utils import get_base_dir
+
+# Environment variable enabling profiling ("1", "cpu" or "memory")
+PROFILE_ENV = "DISCUSS_HOOKS_PROFILE"
+
+# Environment variable setting the number of profiled invocations kept
+PROFILE_KEEP_ENV = "DISCUSS_HOOKS_PROFILE_KEEP"
+
+DEFAULT_PROFILE_KEEP = 50
+
+PROFILE_ALL = "all"
+PROFILE_CPU = "cpu"
+PROFILE_MEMORY = "memory"
+
+# Allocation sites kept per phase
+TOP_ALLOCATIONS = 10
+
+
+def get_profile_mode() -> Optional[str]:
+    """
+    Get the profiling mode from DISCUSS_HOOKS_PROFILE.
+
+    Returns:
+        PROFILE_ALL, PROFILE_CPU, PROFILE_MEMORY, or None if profiling is off
+    """
+    value = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return None
+    if value in (PROFILE_CPU, PROFILE_MEMORY):
+        return value
+    return PROFILE_ALL
+
+
+def get_profile_dir() -> Path:
+    """Get the directory profiles are written to."""
+    return get_base_dir() / "profiles"
+
+
+def get_profile_keep() -> int:
+    """Get the number of profiled invocations kept (DISCUSS_HOOKS_PROFILE_KEEP)."""
+    try:
+        return max(1, int(os.environ.get(PROFILE_KEEP_ENV, DEFAULT_PROFILE_KEEP)))
+    except ValueError:
+        return DEFAULT_PROFILE_KEEP
+
+
+def _top_allocations(snapshot, baseline=None) -> List[Dict[str, Any]]:
+    """Largest allocation sites of a snapshot (growth since baseline if given)."""
+    import tracemalloc
+
+    # Sites are filtered after grouping: Snapshot.filter_traces is far slower
+    ignored = (tracemalloc.__file__, __file__)
+    if baseline is not None:
+        stats = [stat for stat in snapshot.compare_to(baseline, "lineno") if stat.size_diff > 0]
+        stats.sort(key=lambda stat: stat.size_diff, reverse=True)
+        sizes = ((stat, stat.size_diff, stat.count_diff) for stat in stats)
+    else:
+        sizes = ((stat, stat.size, stat.count) for stat in snapshot.statistics("lineno"))
+    top = []
+    for stat, size, count in sizes:
+        frame = stat.traceback[0]
+        if frame.filename in ignored:
+            continue
+        top.append(
+            {
+                "where": f"{frame.filename}:{frame.lineno}",
+                "size_kib": round(size / 1024, 1),
+                "count": count,
+            }
+        )
+        if len(top) == TOP_ALLOCATIONS:
+            break
+    return top
+
+
+class _PhaseMemory:
+    """
+    Phase listener recording peak memory and allocation growth per phase.
+
+    Its own time (tracemalloc snapshots) is kept out of the cProfile stats
+    and added up in overhead.
+    """
+
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        # (thread, phase name) -> snapshot at the start of the phase
+        self.started: Dict[Any, Any] = {}
+        self.lock = threading.Lock()
+        self.overhead = 0.0
+
+    def __call__(self, name: str, entering: bool) -> None:
+        import tracemalloc
+
+        began = time.perf_counter()
+        key = (threading.get_ident(), name)
+        # cProfile only profiles the main thread, where the hook runs
+        on_main = threading.current_thread() is threading.main_thread()
+        if self.profiler is not None and on_main:
+            self.profiler.disable()
+        try:
+            if entering:
+                snapshot = tracemalloc.take_snapshot()
+                with self.lock:
+                    self.started[key] = snapshot
+                tracemalloc.reset_peak()
+                return
+            peak = tracemalloc.get_traced_memory()[1]
+            with self.lock:
+                baseline = self.started.pop(key, None)
+            top = _top_allocations(tracemalloc.take_snapshot(), baseline)
+            with self.lock:
+                entry = self.phases.setdefault(name, {"peak_kib": 0.0, "top": []})
+                entry["peak_kib"] = max(entry["peak_kib"], round(peak / 1024, 1))
+                # A phase that ran twice keeps the sites of its largest run
+                if sum(item["size_kib"] for item in top) >= sum(
+                    item["size_kib"] for item in entry["top"]
+                ):
+                    entry["top"] = top
+        finally:
+            if self.profiler is not None and on_main:
+                self.profiler.enable()
+            with self.lock:
+                self.overhead += time.perf_counter() - began
+
+
+def profile_call(hook_name: str, func: Callable[[], Any], mode: Optional[str] = None) -> Any:
+    """
+    Run func with profiling and write its profile (see module docstring).
+
+    Profile write errors are ignored; exceptions of func (including
+    SystemExit) propagate after the profile is written.
+
+    Args:
+        hook_name: Hook name, used in the profile file names
+        func: Function to profile
+        mode: Profiling mode (default: DISCUSS_HOOKS_PROFILE, or PROFILE_ALL)
+
+    Returns:
+        Result of func
+    """
+    import cProfile
+    import tracemalloc
+
+    mode = mode or get_profile_mode() or PROFILE_ALL
+    if not metrics.timing_enabled():
+        metrics.set_timing(metrics.TIMING_LOG)
+    metrics.reset_counters()
+
+    profiler = cProfile.Profile() if mode != PROFILE_MEMORY else None
+    memory = None
+    if mode != PROFILE_CPU:
+        memory = _PhaseMemory(profiler)
+        metrics.add_phase_listener(memory)
+        tracemalloc.start()
+
+    exit_code = None
+    started = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        return func()
+    except SystemExit as e:
+        exit_code = e.code
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        duration = time.perf_counter() - started
+        overhead = memory.overhead if memory is not None else 0.0
+        report = {
+            "hook": hook_name,
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "pid": os.getpid(),
+            "mode": mode,
+            "duration_ms": round((duration - overhead) * 1000, 2),
+            "overhead_ms": round(overhead * 1000, 2),
+            "exit_code": exit_code,
+            "phases": metrics.get_phases(),
+        }
+        if memory is not None:
+            metrics.remove_phase_listener(memory)
+            report["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            report["top"] = _top_allocations(tracemalloc.take_snapshot())
+            tracemalloc.stop()
+            for name, entry in memory.phases.items():
+                report["phases"].setdefault(name, {}).update(entry)
+        try:
+            write_profile(get_profile_dir(), hook_name, profiler, report)
+        except OSError:
+            pass
+
+
+def write_profile(profile_dir: Path, hook_name: str, profiler, report: Dict[str, Any]) -> Path:
+    """
+    Write an invocation's profile files and prune old ones.
+
+    Args:
+        profile_dir: Profile directory
+        hook_name: Hook name
+        profiler: cProfile.Profile, or None (memory mode)
+        report: JSON report
+
+    Returns:
+        Path of the JSON report
+    """
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    base = f"{hook_name}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    json_path = profile_dir / (base + ".json")
+    n = 1
+    while json_path.exists():
+        n += 1
+        json_path = profile_dir / f"{base}-{n}.json"
+    if profiler is not None:
+        profiler.dump_stats(str(json_path.with_suffix(".prof")))
+    json_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    prune_profiles(profile_dir, get_profile_keep())
+    return json_path
+
+
+def list_profiles(
+    profile_dir: Path, hook: Optional[str] = None, since_mtime: float = 0.0
+) -> List[Path]:
+    """
+    List profiled invocations, newest first.
+
+    Args:
+        profile_dir: Profile directory
+        hook: Only invocations of this hook
+        since_mtime: Only invocations written at or after this time
+
+    Returns:
+        Paths of the JSON reports
+    """
+    found = []
+    try:
+        entries = list(os.scandir(profile_dir))
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.name.endswith(".json"):
+            continue
+        if hook and not entry.name.startswith(hook + "-"):
+            continue
+        try:
+            mtime = entry.stat().st_mtime
+        except OSError:
+            continue
+        if mtime >= since_mtime:
+            found.append((mtime, entry.name))
+    return [profile_dir / name for _, name in sorted(found, reverse=True)]
+
+
+def prune_profiles(profile_dir: Path, keep: int) -> None:
+    """Delete all but the newest keep invocations."""
+    for json_path in list_profiles(profile_dir)[keep:]:
+        for path in (json_path, json_path.with_suffix(".prof")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def merge_profiles(json_paths: Sequence[Path]) -> Dict[str, Any]:
+    """
+    Aggregate profiled invocations.
+
+    Args:
+        json_paths: JSON reports (see list_profiles); their .prof files are
+                    merged when present
+
+    Returns:
+        {"invocations", "duration_ms" (mean/max), "peak_kib" (max),
+        "phases": {name: {"runs", "mean_ms", "max_ms", "max_peak_kib",
+        counts (totals)...}}, "allocations": [{"where", "size_kib" (total),
+        "runs"}] largest first, "prof_files": [...]}
+    """
+    durations = []
+    peak = None
+    phases: Dict[str, Dict[str, Any]] = {}
+    allocations: Dict[str, List[float]] = {}
+    prof_files = []
+    for json_path in json_paths:
+        try:
+            report = json.loads(json_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        durations.append(report.get("duration_ms") or 0.0)
+        if report.get("peak_kib") is not None:
+            peak = max(peak or 0.0, report["peak_kib"])
+        for name, entry in (report.get("phases") or {}).items():
+            merged = phases.setdefault(name, {"runs": 0, "total_ms": 0.0, "max_ms": 0.0})
+            merged["runs"] += 1
+            merged["total_ms"] += entry.get("ms", 0.0)
+            merged["max_ms"] = max(merged["max_ms"], entry.get("ms", 0.0))
+            if "peak_kib" in entry:
+                merged["max_peak_kib"] = max(merged.get("max_peak_kib", 0.0), entry["peak_kib"])
+            for key, value in entry.items():
+                if key not in ("ms", "calls", "peak_kib", "top") and isinstance(value, int):
+                    merged[key] = merged.get(key, 0) + value
+            for item in entry.get("top", []):
+                site = allocations.setdefault(item["where"], [0.0, 0])
+                site[0] += item["size_kib"]
+                site[1] += 1
+        prof_path = json_path.with_suffix(".prof")
+        if prof_path.exists():
+            prof_files.append(prof_path)
+
+    for merged in phases.values():
+        merged["mean_ms"] = round(merged.pop("total_ms") / merged["runs"], 3)
+    return {
+        "invocations": len(durations),
+        "mean_ms": round(sum(durations) / len(durations), 2) if durations else None,
+        "max_ms": max(durations) if durations else None,
+        "peak_kib": peak,
+        "phases": phases,
+        "allocations": [
+            {"where": where, "size_kib": round(size, 1), "runs": runs}
+            for where, (size, runs) in sorted(allocations.items(), key=lambda item: -item[1][0])
+        ],
+        "prof_files": [str(path) for path in prof_files],
+    }
+
+
+def format_profile_report(merged: Dict[str, Any], sort: str = "cumulative", limit: int = 25) -> str:
+    """
+    Format merged profiles as a ranked report.
+
+    Args:
+        merged: Result of merge_profiles
+        sort: pstats sort key for the function ranking (e.g. "cumulative",
+              "tottime", "calls")
+        limit: Functions and allocation sites listed
+
+    Returns:
+        Report text
+    """
+    import io
+    import pstats
+
+    if not merged["invocations"]:
+        return "No profiles found"
+
+    lines = [
+        f"Invocations: {merged['invocations']}  mean {merged['mean_ms']:.1f} ms  "
+        f"max {merged['max_ms']:.1f} ms"
+        + (
+            f"  peak traced memory {merged['peak_kib']:.0f} KiB"
+            if merged["peak_kib"] is not None
+            else ""
+        )
+    ]
+
+    if merged["phases"]:
+        lines += ["", "Phases (slowest first):"]
+        for name, entry in sorted(merged["phases"].items(), key=lambda item: -item[1]["mean_ms"]):
+            counts = " ".join(
+                f"{key}={value}"
+                for key, value in entry.items()
+                if key not in ("runs", "mean_ms", "max_ms", "max_peak_kib")
+            )
+            memory = f"  peak {entry['max_peak_kib']:.0f} KiB" if "max_peak_kib" in entry else ""
+            lines.append(
+                f"  {name:<26} runs={entry['runs']:<5} mean {entry['mean_ms']:>8.2f} ms  "
+                f"max {entry['max_ms']:>8.2f} ms{memory}  {counts}".rstrip()
+            )
+
+    if merged["allocations"]:
+        lines += ["", "Allocation sites (total growth over phases):"]
+        for item in merged["allocations"][:limit]:
+            lines.append(f"  {item['size_kib']:>10.1f} KiB  runs={item['runs']:<5} {item['where']}")
+
+    if merged["prof_files"]:
+        stream = io.StringIO()
+        stats = pstats.Stats(*merged["prof_files"], stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        # Drop the header listing every merged file
+        text = stream.getvalue()
+        calls_at = text.find("function calls")
+        if calls_at >= 0:
+            text = text[text.rfind("\n", 0, calls_at) + 1 :]
+        lines += [
+            "",
+            f"Functions (by {sort}, {len(merged['prof_files'])} profile(s) merged):",
+            text.rstrip(),
+        ]
+    return "\n".join(lines)
@@ -0,0 +1,201 @@
+"""
+Discovery of .discuss roots in a workspace (multi-root mode).
+
+By default the Stop hook only checks <workspace>/.discuss. In a monorepo,
+discussions may live next to each package (packages/api/.discuss, ...), and
+a session started in a subdirectory would not see the others. With
+DISCUSS_HOOKS_MULTI_ROOT=1 the hook checks every .discuss directory under
+the workspace top instead:
+
+- Workspace top: the nearest ancestor of the workspace root containing .git
+  (the workspace root itself if there is none)
+- The tree is walked with os.scandir up to MAX_DISCOVERY_DEPTH levels,
+  skipping SKIPPED_DIRS and hidden directories, and not descending into a
+  .discuss directory
+- The root list is cached in ~/.discuss-for-specs/cache/ for ROOTS_CACHE_TTL
+  seconds (DISCUSS_HOOKS_ROOTS_TTL), so most turns do not walk the tree
+
+Environment:
+- DISCUSS_HOOKS_MULTI_ROOT: Set to "1" (or true/yes/on) to check all .discuss roots
+- DISCUSS_HOOKS_ROOTS_TTL: Root list cache lifetime in seconds (0 disables it)
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Union
+
+from .logging_utils import get_base_dir, log_debug, log_warning
+
+# Environment variables
+MULTI_ROOT_ENV = "DISCUSS_HOOKS_MULTI_ROOT"
+ROOTS_TTL_ENV = "DISCUSS_HOOKS_ROOTS_TTL"
+
+# Default root list cache lifetime (seconds)
+ROOTS_CACHE_TTL = 300
+
+# Maximum directory depth below the workspace top to look for .discuss
+MAX_DISCOVERY_DEPTH = 8
+
+# Directories never searched for .discuss roots
+SKIPPED_DIRS = {
+    "node_modules",
+    "__pycache__",
+    "venv",
+    "dist",
+    "build",
+    "target",
+    "vendor",
+}
+
+DISCUSS_DIR_NAME = ".discuss"
+
+
+def is_multi_root_enabled() -> bool:
+    """Check whether DISCUSS_HOOKS_MULTI_ROOT enables multi-root mode.
+
+    Parsed like the hook's other opt-in flags (see check_precipitation.env_flag).
+    """
+    return os.environ.get(MULTI_ROOT_ENV, "").strip().lower() not in ("", "0", "false", "no", "off")
+
+
+def find_workspace_top(workspace_root: Union[str, Path]) -> Path:
+    """
+    Find the top of the workspace containing workspace_root.
+
+    Args:
+        workspace_root: Directory the session runs in
+
+    Returns:
+        Nearest ancestor (or workspace_root itself) containing .git, else
+        workspace_root
+    """
+    start = Path(os.path.abspath(str(workspace_root)))
+    for directory in [start, *start.parents]:
+        if os.path.exists(os.path.join(directory, ".git")):
+            return directory
+    return start
+
+
+def find_discuss_roots(top: Union[str, Path], max_depth: int = MAX_DISCOVERY_DEPTH) -> List[Path]:
+    """
+    Find all .discuss directories under top.
+
+    Args:
+        top: Directory to search
+        max_depth: Maximum depth below top
+
+    Returns:
+        Sorted list of .discuss directory paths
+    """
+    roots = []
+    pending = [(str(top), 0)]
+    while pending:
+        directory, depth = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+
+        for entry in entries:
+            try:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+            except OSError:
+                continue
+            if entry.name == DISCUSS_DIR_NAME:
+                roots.append(Path(entry.path))
+            elif (
+                depth < max_depth
+                and not entry.name.startswith(".")
+                and entry.name not in SKIPPED_DIRS
+            ):
+                pending.append((entry.path, depth + 1))
+
+    return sorted(roots)
+
+
+def get_cache_path(top: Path) -> Path:
+    """Get the root list cache file for a workspace top."""
+    digest = hashlib.sha1(str(top).encode("utf-8")).hexdigest()[:16]
+    return get_base_dir() / "cache" / f"roots-{digest}.json"
+
+
+def get_cache_ttl() -> float:
+    """Get the root list cache lifetime from DISCUSS_HOOKS_ROOTS_TTL."""
+    try:
+        return float(os.environ.get(ROOTS_TTL_ENV, ROOTS_CACHE_TTL))
+    except ValueError:
+        return ROOTS_CACHE_TTL
+
+
+def _load_cached_roots(cache_path: Path, top: Path, ttl: float) -> Optional[List[Path]]:
+    """Load a fresh cached root list, or None if missing, stale or invalid."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("top") != str(top) or time.time() - cached["created"] > ttl:
+            return None
+        return [Path(root) for root in cached["roots"]]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _save_cached_roots(cache_path: Path, top: Path, roots: List[Path]) -> None:
+    """Write the root list cache (best effort, atomic)."""
+    data = {"top": str(top), "created": time.time(), "roots": [str(root) for root in roots]}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        log_warning(f"Failed to cache .discuss roots: {e}")
+
+
+def get_discuss_roots(workspace_root: Union[str, Path]) -> List[Path]:
+    """
+    Get every .discuss root of the workspace, using the cached list if fresh.
+
+    Args:
+        workspace_root: Directory the session runs in
+
+    Returns:
+        Sorted list of existing .discuss directories
+    """
+    top = find_workspace_top(workspace_root)
+    cache_path = get_cache_path(top)
+    ttl = get_cache_ttl()
+
+    roots = _load_cached_roots(cache_path, top, ttl) if ttl > 0 else None
+    if roots is None:
+        roots = find_discuss_roots(top)
+        log_debug("Discovered %s .discuss root(s) under %s", len(roots), top)
+        if ttl > 0:
+            _save_cached_roots(cache_path, top, roots)
+    else:
+        log_debug("Using %s cached .discuss root(s) for %s", len(roots), top)
+
+    # A cached root may have been deleted since
+    return [root for root in roots if root.is_dir()]
+
+
+def get_root_label(discuss_root: Path, top: Path) -> str:
+    """
+    Get a short label for a .discuss root in reminders.
+
+    Args:
+        discuss_root: .discuss directory
+        top: Workspace top (see find_workspace_top)
+
+    Returns:
+        Path of the directory containing .discuss relative to top ("." for
+        top itself)
+    """
+    try:
+        return str(discuss_root.parent.relative_to(top)).replace("\\", "/")
+    except ValueError:
+        return str(discuss_root.parent)
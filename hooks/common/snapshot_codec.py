@@ -0,0 +1,149 @@
+"""
+Snapshot codecs for Hook scripts.
+
+A codec turns the snapshot dictionary into bytes and back, and owns the
+snapshot file name. snapshot_manager picks the codec to write with and
+migrates files written by another codec on the next save.
+
+Codecs:
+- yaml:    .discuss/.snapshot.yaml (default, human-readable). Read and
+           written by the stdlib-only snapshot_yaml module; PyYAML (with
+           libyaml's C loader/dumper when available) is only used for
+           hand-edited or unusual files outside its subset.
+- json:    .discuss/.snapshot.json, compact single-line JSON.
+- marshal: .discuss/.snapshot.marshal, Python's internal binary format.
+           Fastest, but not meant to be read by humans or other tools.
+
+PyYAML is imported lazily, so it is only loaded for such fallback files.
+
+Selecting a codec (first match wins):
+1. DISCUSS_SNAPSHOT_FORMAT environment variable
+2. config.snapshot_format in the snapshot itself
+3. DEFAULT_CODEC ("yaml")
+"""
+
+import json
+import marshal
+import os
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from . import snapshot_yaml
+
+# Environment variable overriding the snapshot format
+SNAPSHOT_FORMAT_ENV = "DISCUSS_SNAPSHOT_FORMAT"
+
+# Snapshot config key selecting the snapshot format
+SNAPSHOT_FORMAT_KEY = "snapshot_format"
+
+# Codec used when nothing is configured
+DEFAULT_CODEC = "yaml"
+
+# Magic prefix for marshal files (guards against truncated/foreign files)
+MARSHAL_MAGIC = b"DFSM\x01"
+
+
+class SnapshotCodec(NamedTuple):
+    """Serialization format for the snapshot file."""
+
+    name: str
+    file_name: str
+    loads: Callable[[bytes], Any]
+    dumps: Callable[[Dict[str, Any]], bytes]
+
+
+def _yaml_loads(data: bytes) -> Any:
+    text = data.decode("utf-8")
+    try:
+        return snapshot_yaml.loads(text)
+    except snapshot_yaml.UnsupportedYamlError:
+        pass
+
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(text, Loader=loader)
+
+
+def _yaml_dumps(snapshot: Dict[str, Any]) -> bytes:
+    try:
+        return snapshot_yaml.dumps(snapshot).encode("utf-8")
+    except snapshot_yaml.UnsupportedYamlError:
+        pass
+
+    import yaml
+
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    text = yaml.dump(
+        snapshot,
+        Dumper=dumper,
+        sort_keys=False,
+        allow_unicode=True,
+        default_flow_style=False,
+    )
+    return text.encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    return json.loads(data.decode("utf-8"))
+
+
+def _json_dumps(snapshot: Dict[str, Any]) -> bytes:
+    return json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _marshal_loads(data: bytes) -> Any:
+    if not data.startswith(MARSHAL_MAGIC):
+        raise ValueError("Not a snapshot marshal file")
+    return marshal.loads(data[len(MARSHAL_MAGIC) :])
+
+
+def _marshal_dumps(snapshot: Dict[str, Any]) -> bytes:
+    return MARSHAL_MAGIC + marshal.dumps(snapshot)
+
+
+CODECS: Dict[str, SnapshotCodec] = {
+    "yaml": SnapshotCodec("yaml", ".snapshot.yaml", _yaml_loads, _yaml_dumps),
+    "json": SnapshotCodec("json", ".snapshot.json", _json_loads, _json_dumps),
+    "marshal": SnapshotCodec("marshal", ".snapshot.marshal", _marshal_loads, _marshal_dumps),
+}
+
+
+def get_codec(name: Optional[str]) -> SnapshotCodec:
+    """
+    Get codec by name.
+
+    Args:
+        name: Codec name ("yaml", "json", "marshal"); None or unknown names
+              fall back to DEFAULT_CODEC
+
+    Returns:
+        SnapshotCodec
+    """
+    return CODECS.get(str(name).lower(), CODECS[DEFAULT_CODEC])
+
+
+def get_env_codec_name() -> Optional[str]:
+    """Get codec name from DISCUSS_SNAPSHOT_FORMAT, if set to a known codec."""
+    name = os.environ.get(SNAPSHOT_FORMAT_ENV, "").strip().lower()
+    return name if name in CODECS else None
+
+
+def select_codec(config: Optional[Dict[str, Any]] = None) -> SnapshotCodec:
+    """
+    Select the codec to write the snapshot with.
+
+    Args:
+        config: Snapshot config section
+
+    Returns:
+        SnapshotCodec (environment > config.snapshot_format > default)
+    """
+    name = get_env_codec_name()
+    if name is None and config:
+        name = config.get(SNAPSHOT_FORMAT_KEY)
+    return get_codec(name)
+
+
+def all_codecs() -> List[SnapshotCodec]:
+    """Get all codecs in preference order (default codec first)."""
+    return [CODECS[DEFAULT_CODEC]] + [c for n, c in CODECS.items() if n != DEFAULT_CODEC]
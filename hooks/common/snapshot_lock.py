@@ -0,0 +1,177 @@
+"""
+Locked read-modify-write of the snapshot for concurrent sessions.
+
+Several agent sessions (e.g. Claude Code and Cursor) may run Stop hooks in
+the same workspace at the same time. Each one loads the snapshot, scans
+and writes it back, so without coordination the last writer would erase
+the change_count increments of the others.
+
+Protocol (commit_snapshot):
+1. The scan and comparison run without any lock, against the snapshot as
+   loaded (the slow part never blocks other sessions)
+2. The writer takes an exclusive fcntl lock on .discuss/.snapshot.lock,
+   waiting at most LOCK_TIMEOUT seconds (DISCUSS_SNAPSHOT_LOCK_TIMEOUT)
+3. If the snapshot file still has the stat signature it was loaded with,
+   or else still has the same content digest, the snapshot is saved as is
+4. Otherwise another session saved in between: the fresh snapshot is
+   re-read from disk and this run's observations are re-applied on top of
+   it (per discussion compare-and-swap), then saved
+5. If the lock cannot be taken in time, nothing is written; the stored
+   state is unchanged, so the next run sees the same file changes again
+
+Where fcntl is not available (Windows) the lock is a no-op.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+from .logging_utils import log_debug, log_warning
+from .metrics import incr
+from .snapshot_manager import (
+    Snapshot,
+    get_snapshot_digest,
+    get_snapshot_signature,
+    load_snapshot,
+    save_snapshot,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+# Lock file name under .discuss/
+LOCK_FILE_NAME = ".snapshot.lock"
+
+# Environment variable overriding the lock wait (seconds)
+LOCK_TIMEOUT_ENV = "DISCUSS_SNAPSHOT_LOCK_TIMEOUT"
+
+# Default maximum wait for the lock (seconds)
+LOCK_TIMEOUT = 2.0
+
+# Polling interval bounds while waiting for the lock (seconds)
+_POLL_MIN = 0.001
+_POLL_MAX = 0.05
+
+T = TypeVar("T")
+
+
+def get_lock_timeout() -> float:
+    """Get the lock wait from DISCUSS_SNAPSHOT_LOCK_TIMEOUT (default LOCK_TIMEOUT)."""
+    try:
+        return max(0.0, float(os.environ.get(LOCK_TIMEOUT_ENV, LOCK_TIMEOUT)))
+    except ValueError:
+        return LOCK_TIMEOUT
+
+
+@contextmanager
+def snapshot_lock(discuss_root: Path, timeout: Optional[float] = None) -> Iterator[bool]:
+    """
+    Hold the exclusive snapshot lock of a .discuss directory.
+
+    Args:
+        discuss_root: Path to .discuss directory
+        timeout: Maximum wait in seconds (default: get_lock_timeout())
+
+    Yields:
+        True if the lock is held, False if it could not be taken in time
+    """
+    if fcntl is None:
+        yield True
+        return
+
+    timeout = get_lock_timeout() if timeout is None else timeout
+    try:
+        fd = os.open(os.path.join(str(discuss_root), LOCK_FILE_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError as e:
+        log_warning(f"Cannot open snapshot lock: {e}")
+        yield False
+        return
+
+    try:
+        deadline = time.monotonic() + timeout
+        delay = _POLL_MIN
+        locked = False
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked = True
+                break
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                log_warning(f"Cannot lock snapshot: {e}")
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            incr("snapshot_lock_waits")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, _POLL_MAX)
+
+        yield locked
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+def _changed_since_load(discuss_root: Path, snapshot: Snapshot) -> bool:
+    """Tell whether the snapshot file was saved since the snapshot was loaded."""
+    if snapshot.signature is not None and snapshot.signature == get_snapshot_signature(
+        discuss_root
+    ):
+        return False
+    # No usable signature, or the file was rewritten: compare the content
+    return snapshot.digest != get_snapshot_digest(discuss_root)
+
+
+def commit_snapshot(
+    discuss_root: Path,
+    snapshot: Dict[str, Any],
+    apply: Callable[[Dict[str, Any]], T],
+    save: Callable[[Path, Dict[str, Any]], bool] = save_snapshot,
+    timeout: Optional[float] = None,
+) -> T:
+    """
+    Apply this run's observations to the snapshot and save it under the lock.
+
+    apply must be repeatable: it is called on the loaded snapshot and, if
+    another session saved in the meantime, again on the fresh snapshot.
+
+    Args:
+        discuss_root: Path to .discuss directory
+        snapshot: Snapshot loaded at the start of the run
+        apply: Function updating a snapshot in place (returns the run result)
+        save: Snapshot saver
+        timeout: Maximum lock wait in seconds (default: get_lock_timeout())
+
+    Returns:
+        Result of the last apply call
+    """
+    result = apply(snapshot)
+    if isinstance(snapshot, Snapshot) and not snapshot.dirty:
+        # Nothing to write (save only counts the skipped write): no need to lock
+        save(discuss_root, snapshot)
+        return result
+
+    with snapshot_lock(discuss_root, timeout) as locked:
+        if not locked:
+            incr("snapshot_lock_timeouts")
+            log_warning("Snapshot is locked by another session, not saving this run")
+            return result
+
+        if isinstance(snapshot, Snapshot) and _changed_since_load(discuss_root, snapshot):
+            # Another session saved since we loaded: re-apply on its snapshot,
+            # read from disk (a caller's cache may not have noticed the change)
+            incr("snapshot_merges")
+            log_debug("Snapshot changed since load, merging")
+            snapshot = load_snapshot(discuss_root)
+            result = apply(snapshot)
+
+        save(discuss_root, snapshot)
+
+    return result
@@ -4,210 +4,1571 @@ Snapshot Manager for Hook scripts.
 Manages snapshot.yaml file to track discussion state changes.
 Snapshot file is stored at: .discuss/.snapshot.yaml
 
+The on-disk format is pluggable (see snapshot_codec.py): the snapshot may
+also be stored as .discuss/.snapshot.json or .discuss/.snapshot.marshal.
+Loading picks the newest existing snapshot file whatever its format; saving
+writes the selected format and removes files left by other formats, so a
+format change migrates the snapshot once.
+
 Snapshot File Structure:
 {
     "version": 1,
     "config": {
-        "stale_threshold": 3
+        "stale_threshold": 3,
+        "snapshot_format": "yaml",     # optional: yaml | json | marshal
+        "fsync": false,                # optional: fsync before replacing
+        "scan_workers": 1,             # optional: scan threads (1 = serial)
+        "scan_deadline_ms": 5000,      # optional: time budget of a check (0 = none)
+        "min_outline_change": 0.03,    # optional: minimum outline change magnitude (0 = any)
+        "reminder_mode": "edits"       # optional: edits | problems
     },
     "discussions": {
         "2026-01-30/multi-agent-platform-support": {
             "outline": {
                 "mtime": 1706621400.0,
+                "size": 2048,
+                "digest": "9f86d081884c7d65...",    # blake2b of the content
+                "fingerprint": "00a1f3c2...",       # shingle sketch (change_magnitude.py)
                 "change_count": 2
             },
             "decisions": [
-                {"name": "D01-xxx.md", "mtime": 1706620000.0}
+                {"name": "D01-xxx.md", "mtime": 1706620000.0, "size": 512, "digest": "..."}
             ],
             "notes": [
-                {"name": "analysis.md", "mtime": 1706619000.0}
+                {"name": "analysis.md", "mtime": 1706619000.0, "size": 4096, "digest": "..."}
             ]
         }
     }
 }
 
-Core Logic:
-- outline mtime changed → change_count++
-- decisions/notes changed → change_count = 0 (reset)
-- Trigger reminder when change_count >= threshold
-"""
+Directory index (optional "index" key, maintained by scan_discussions_indexed):
+    "index": {
+        "dates": {
+            "2026-01-30": {
+                "mtime": 1706621400.0,              # date directory mtime
+                "topics": {
+                    "multi-agent-platform-support": {
+                        "mtime": 1706621400.0,      # topic directory mtime
+                        "outline": 1706621400.0,    # outline.md mtime
+                        "decisions": 1706620000.0,  # decisions/ mtime
+                        "notes": 1706619000.0,      # notes/ mtime
+                        "newest": 1706621400.0      # newest file seen
+                    }
+                }
+            }
+        },
+        "cursor": {                                 # only after a check ran out of time
+            "pending": ["2026-01-29/other-topic"],  # recent topics not checked yet
+            "next": "2025-11-02/old-topic"          # where the sweep of idle topics resumes
+        }
+    }
+
+Change journal position (optional "journal" key, see change_journal.py):
+    "journal": {"id": "3f9c...", "offset": 1234}
+
+Problem index (optional outline "problems" key, kept with reminder_mode
+"problems"; see outline_parser.py)
+
+Archived discussions (optional "archived" key, see archive_idle_discussions):
+    "archived": ["2025-06-02/old-topic", ...]
+With config.archive_after_days set (off by default), states of discussions
+idle for longer than that are moved to .discuss/.snapshot-archive.json,
+which is only read when one of them becomes active again (its state,
+including change_count, is restored).
+
+Core Logic:
+- outline content changed → change_count++
+- decisions/notes changed → change_count = 0 (reset)
+- Files carry size and a blake2b content digest; a file is only re-hashed
+  when its mtime or size changed, and a new mtime with the same content is
+  not a change
+- An outline change smaller than config.min_outline_change (shingles
+  added or removed against the last counted version, see
+  change_magnitude.py) is not a round: by default a one-word edit (typo
+  fix) is not, a new bullet point is; 0 counts every content change
+- Trigger reminder when change_count >= threshold
+
+Writes:
+- load_snapshot returns a Snapshot (a dict with a `dirty` flag); changes made
+  through set_discussion_state / cleanup_deleted_discussions mark it dirty,
+  and save_snapshot skips clean snapshots, so unchanged runs write nothing
+- Real writes go to a temp file in .discuss and are renamed over the
+  snapshot with os.replace, so a crash never leaves a truncated file;
+  fsync before the rename is enabled by config.fsync or DISCUSS_SNAPSHOT_FSYNC
+- A snapshot that cannot be parsed is kept as <file>.corrupt before the
+  default snapshot is used
+
+Sharded layout (optional, see snapshot_shards.py): if .discuss/.state/
+holds a manifest, load_snapshot returns a Snapshot whose "discussions" is a
+ShardedDiscussions mapping that reads discussion states on demand, and
+save_snapshot only writes the shards that changed. convert_snapshot_layout
+converts between the two layouts.
+"""
+
+import os
+import re
+import shutil
+import stat
+import tempfile
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .change_magnitude import change_magnitude, fingerprint
+from .file_utils import file_digest
+from .logging_utils import bind_root_context, log_debug, log_error, log_info, log_warning
+from .metrics import count, incr
+from .snapshot_codec import SnapshotCodec, all_codecs, select_codec
+from .snapshot_shards import (
+    INDEX_FILE_NAME,
+    LAYOUT_SHARDED,
+    LAYOUT_SINGLE,
+    ShardedDiscussions,
+    content_digest,
+    encode,
+    get_manifest_path,
+    get_shard_path,
+    get_state_dir,
+    is_sharded,
+    list_shard_keys,
+    read_file,
+)
+
+# Default staleness threshold
+DEFAULT_STALE_THRESHOLD = 3
+
+# Snapshot file name (default YAML codec)
+SNAPSHOT_FILE_NAME = ".snapshot.yaml"
+
+# Detection window (hours)
+DETECTION_WINDOW_HOURS = 24
+
+# Date directory names under .discuss
+_DATE_DIR_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}$")
+
+# Discussion subdirectories whose *.md files are part of the state
+_TRACKED_DIRS = ("decisions", "notes")
+
+# (index key, entry name) stat'ed to decide whether a topic changed
+_SIGNATURE_ENTRIES = (("outline", "outline.md"), ("decisions", "decisions"), ("notes", "notes"))
+
+# Environment variable overriding config.scan_workers
+SCAN_WORKERS_ENV = "DISCUSS_SCAN_WORKERS"
+
+# Snapshot config key setting the number of scan threads (1 = serial)
+SCAN_WORKERS_KEY = "scan_workers"
+
+# Upper bound for scan threads
+MAX_SCAN_WORKERS = 32
+
+# Environment variable overriding config.scan_deadline_ms
+SCAN_DEADLINE_ENV = "DISCUSS_SCAN_DEADLINE_MS"
+
+# Snapshot config key: time budget of a check in milliseconds (0 = none)
+SCAN_DEADLINE_KEY = "scan_deadline_ms"
+
+# Default time budget (ms), well inside the platforms' hook timeouts
+DEFAULT_SCAN_DEADLINE_MS = 5000
+
+# Share of the remaining budget reserved for sweeping idle topics
+SWEEP_SHARE = 0.2
+
+# Environment variable overriding config.fsync ("1" / "0")
+SNAPSHOT_FSYNC_ENV = "DISCUSS_SNAPSHOT_FSYNC"
+
+# Snapshot config key enabling fsync before the snapshot is replaced
+SNAPSHOT_FSYNC_KEY = "fsync"
+
+# Suffix for snapshot files that failed to parse
+CORRUPT_SUFFIX = ".corrupt"
+
+# Cold archive of idle discussion states
+ARCHIVE_FILE_NAME = ".snapshot-archive.json"
+
+# Environment variable overriding config.archive_after_days
+ARCHIVE_DAYS_ENV = "DISCUSS_SNAPSHOT_ARCHIVE_DAYS"
+
+# Snapshot config key: days without activity before a state is archived (0 = never)
+ARCHIVE_DAYS_KEY = "archive_after_days"
+
+# Default archive age (days): archiving is opt-in, like shards and codecs
+DEFAULT_ARCHIVE_DAYS = 0
+
+# Environment variable overriding config.min_outline_change
+MIN_CHANGE_ENV = "DISCUSS_MIN_OUTLINE_CHANGE"
+
+# Snapshot config key: change magnitude an edit must reach (against the last
+# counted version) to count as a round (0 = any change)
+MIN_CHANGE_KEY = "min_outline_change"
+
+# Default minimum change magnitude (see change_magnitude.py): a one-word edit
+# scores at most 0.02, a new bullet point about 0.08 whatever the outline size
+DEFAULT_MIN_CHANGE = 0.03
+
+# Environment variable overriding config.reminder_mode
+REMINDER_MODE_ENV = "DISCUSS_REMINDER_MODE"
+
+# Snapshot config key selecting what triggers reminders
+REMINDER_MODE_KEY = "reminder_mode"
+
+# Reminder modes: outline edits without decision/note updates (default), or
+# problems that turned resolved/rejected without a decision document
+REMINDER_MODE_EDITS = "edits"
+REMINDER_MODE_PROBLEMS = "problems"
+
+
+# Stat signature of a snapshot file: (path, inode, size, mtime_ns)
+SnapshotSignature = Optional[Tuple[str, int, int, int]]
+
+# A snapshot file modified less than this many seconds before it was loaded
+# gets no load signature: a write in the same mtime tick could reuse its
+# inode and size and go unnoticed by a signature comparison
+SIGNATURE_SETTLE = 2.0
+
+
+class Snapshot(dict):
+    """
+    Snapshot dictionary that remembers whether it differs from the file.
+
+    `dirty` is False right after loading an up-to-date file and is set by
+    the functions in this module that change the snapshot. Code that edits
+    the dictionary directly must set it too (or pass force=True on save).
+
+    `digest` is the content digest of the file the snapshot was loaded
+    from or last saved to (None if there was none), so a writer can tell
+    whether another process saved in the meantime (stat signatures are not
+    enough: inode numbers are reused and mtimes are coarse).
+
+    `signature` is the stat signature of the file it was loaded from, taken
+    before reading and only if the file had settled (see SIGNATURE_SETTLE),
+    else None. While the file still has it, nobody saved since the load and
+    the digest need not be recomputed.
+    """
+
+    def __init__(
+        self,
+        *args,
+        dirty: bool = False,
+        digest: Optional[str] = None,
+        signature: SnapshotSignature = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.dirty = dirty
+        self.digest = digest
+        self.signature = signature
+        # Pending archive changes, applied by save_snapshot:
+        # key -> state to archive, or None to drop the key from the archive
+        self.archive_updates: Dict[str, Optional[Dict[str, Any]]] = {}
+
+
+def get_snapshot_path(discuss_root: Path, codec: Optional[SnapshotCodec] = None) -> Path:
+    """
+    Get the path to the snapshot file written by a codec.
+
+    Args:
+        discuss_root: Path to .discuss directory
+        codec: Snapshot codec (default: selected from environment, i.e. YAML
+               unless DISCUSS_SNAPSHOT_FORMAT is set)
+
+    Returns:
+        Path to snapshot file (e.g. .discuss/.snapshot.yaml)
+    """
+    codec = codec or select_codec()
+    return discuss_root / codec.file_name
+
+
+def find_snapshot_file(discuss_root: Path) -> Optional[Tuple[SnapshotCodec, Path]]:
+    """
+    Find the existing snapshot file, whatever its format.
+
+    If several formats exist (e.g. a migration was interrupted), the most
+    recently modified file wins.
+
+    Args:
+        discuss_root: Path to .discuss directory
+
+    Returns:
+        (codec, path) tuple, or None if no snapshot file exists
+    """
+    found = None
+    newest_mtime = -1
+
+    for codec in all_codecs():
+        path = discuss_root / codec.file_name
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        if mtime > newest_mtime:
+            found = (codec, path)
+            newest_mtime = mtime
+
+    return found
+
+
+def get_snapshot_signature(discuss_root: Path) -> SnapshotSignature:
+    """
+    Get the stat signature of the current snapshot file.
+
+    Args:
+        discuss_root: Path to .discuss directory
+
+    Returns:
+        (path, inode, size, mtime_ns) tuple (of the manifest in the sharded
+        layout), or None if there is no snapshot file
+    """
+    if is_sharded(discuss_root):
+        path = get_manifest_path(discuss_root)
+    else:
+        found = find_snapshot_file(discuss_root)
+        if found is None:
+            return None
+        path = found[1]
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (str(path), st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _settled_signature(path: Path) -> SnapshotSignature:
+    """Stat signature of a file about to be read, or None if it changed too recently."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if st.st_mtime_ns > time.time_ns() - int(SIGNATURE_SETTLE * 1e9):
+        return None
+    return (str(path), st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def get_snapshot_digest(discuss_root: Path) -> Optional[str]:
+    """
+    Get the content digest of the current snapshot file.
+
+    Args:
+        discuss_root: Path to .discuss directory
+
+    Returns:
+        Digest comparable with Snapshot.digest (of the manifest in the
+        sharded layout), or None if there is no readable snapshot file
+    """
+    if is_sharded(discuss_root):
+        path = get_manifest_path(discuss_root)
+    else:
+        found = find_snapshot_file(discuss_root)
+        if found is None:
+            return None
+        path = found[1]
+    try:
+        with open(path, "rb") as f:
+            return content_digest(f.read())
+    except OSError:
+        return None
+
+
+def load_snapshot(discuss_root: Path) -> Snapshot:
+    """
+    Load snapshot from .discuss directory.
+
+    Args:
+        discuss_root: Path to .discuss directory
+
+    Returns:
+        Snapshot with default structure if file doesn't exist (marked dirty
+        whenever it has to be written back, e.g. after a format change)
+    """
+    if is_sharded(discuss_root):
+        return _load_sharded_snapshot(discuss_root)
+
+    found = find_snapshot_file(discuss_root)
+
+    if found is None:
+        log_debug("Snapshot file not found, creating default: %s", get_snapshot_path(discuss_root))
+        return create_default_snapshot()
+
+    codec, snapshot_path = found
+    # Taken before reading: a save in between changes the signature
+    signature = _settled_signature(snapshot_path)
+
+    try:
+        with open(snapshot_path, "rb") as f:
+            raw = f.read()
+        count("bytes_read", len(raw))
+        digest = content_digest(raw)
+        data = codec.loads(raw) or {}
+
+        if not isinstance(data, dict):
+            raise ValueError(f"Snapshot is not a mapping: {type(data).__name__}")
+
+    except Exception as e:
+        log_error(f"Failed to load snapshot: {snapshot_path}", e)
+        _preserve_corrupt_snapshot(snapshot_path)
+        return create_default_snapshot()
+
+    snapshot = Snapshot(data, digest=digest, signature=signature)
+    _ensure_structure(snapshot)
+
+    # Pending format migration: the next save must rewrite the file
+    if select_codec(snapshot["config"]).name != codec.name:
+        snapshot.dirty = True
+
+    log_debug("Loaded %s snapshot with %s discussions", codec.name, len(snapshot["discussions"]))
+    return snapshot
+
+
+def _ensure_structure(snapshot: Snapshot) -> None:
+    """Add missing top-level sections to a loaded snapshot (marking it dirty)."""
+    if "version" not in snapshot:
+        snapshot["version"] = 1
+        snapshot.dirty = True
+    if not isinstance(snapshot.get("config"), dict):
+        snapshot["config"] = {}
+        snapshot.dirty = True
+    if not isinstance(snapshot.get("discussions"), (dict, ShardedDiscussions)):
+        snapshot["discussions"] = {}
+        snapshot.dirty = True
+
+    # Ensure config has stale_threshold
+    if "stale_threshold" not in snapshot["config"]:
+        snapshot["config"]["stale_threshold"] = DEFAULT_STALE_THRESHOLD
+        snapshot.dirty = True
+
+
+def _load_sharded_snapshot(discuss_root: Path) -> Snapshot:
+    """
+    Load the manifest and index of a sharded snapshot (not the discussions).
+
+    A corrupt manifest is kept as <file>.corrupt; the key list is then
+    rebuilt from the shard files, so no discussion history is lost.
+
+    Args:
+        discuss_root: Path to .discuss directory
+
+    Returns:
+        Snapshot whose "discussions" is a ShardedDiscussions mapping
+    """
+    state_dir = get_state_dir(discuss_root)
+    manifest_path = get_manifest_path(discuss_root)
+    signature = _settled_signature(manifest_path)
+    found = read_file(manifest_path)
+
+    if found is None or not isinstance(found[0], dict):
+        log_error(f"Failed to load snapshot manifest: {manifest_path}")
+        _preserve_corrupt_snapshot(manifest_path)
+        manifest, digest = {"keys": sorted(list_shard_keys(state_dir))}, None
+    else:
+        manifest, digest = found
+
+    discussions = ShardedDiscussions(
+        state_dir, manifest.pop("keys", None) or [], manifest.pop("revision", 0)
+    )
+    manifest.pop("layout", None)
+    snapshot = Snapshot(manifest, digest=digest, dirty=digest is None, signature=signature)
+    snapshot["discussions"] = discussions
+
+    index_found = read_file(state_dir / INDEX_FILE_NAME)
+    if index_found is not None and isinstance(index_found[0], dict):
+        snapshot["index"], discussions.index_digest = index_found
+
+    _ensure_structure(snapshot)
+    log_debug("Loaded sharded snapshot with %s discussions", len(discussions))
+    return snapshot
+
+
+def _preserve_corrupt_snapshot(snapshot_path: Path) -> None:
+    """
+    Keep an unreadable snapshot file as <file>.corrupt for inspection.
+
+    Args:
+        snapshot_path: Path to the snapshot file that failed to load
+    """
+    corrupt_path = snapshot_path.with_name(snapshot_path.name + CORRUPT_SUFFIX)
+    try:
+        os.replace(snapshot_path, corrupt_path)
+    except OSError as e:
+        log_warning(f"Failed to preserve corrupt snapshot: {e}")
+        return
+    log_warning(f"Corrupt snapshot preserved as {corrupt_path.name}, change counts reset")
+
+
+def save_snapshot(discuss_root: Path, snapshot: Dict[str, Any], force: bool = False) -> bool:
+    """
+    Save snapshot to .discuss directory.
+
+    A Snapshot that is not dirty is already on disk and is not written again
+    (plain dictionaries are always written). The file is replaced atomically
+    with the selected codec, and snapshot files written by other codecs are
+    removed (one-time migration after a format change).
+
+    Args:
+        discuss_root: Path to .discuss directory
+        snapshot: Snapshot dictionary
+        force: Write even if the snapshot is not dirty
+
+    Returns:
+        True if successful (or nothing to write), False otherwise
+    """
+    if isinstance(snapshot, Snapshot) and not snapshot.dirty and not force:
+        incr("snapshot_writes_skipped")
+        log_debug("Snapshot unchanged, skipping write")
+        return True
+
+    archive_updates = getattr(snapshot, "archive_updates", None)
+    if archive_updates:
+        # States are archived before they leave the hot snapshot
+        archived = {key: state for key, state in archive_updates.items() if state is not None}
+        if archived and not _update_archive(discuss_root, archived, set()):
+            return False
+
+    if isinstance(snapshot.get("discussions"), ShardedDiscussions):
+        saved = _save_sharded_snapshot(discuss_root, snapshot)
+    else:
+        saved = _save_single_snapshot(discuss_root, snapshot)
+
+    if saved and archive_updates:
+        # ... and only dropped from the archive once restored in the hot one
+        restored = {key for key, state in archive_updates.items() if state is None}
+        if restored:
+            _update_archive(discuss_root, {}, restored)
+        archive_updates.clear()
+    return saved
+
+
+def _save_single_snapshot(discuss_root: Path, snapshot: Dict[str, Any]) -> bool:
+    """Save the snapshot as one file with the selected codec."""
+    config = snapshot.get("config") or {}
+    codec = select_codec(config)
+    snapshot_path = get_snapshot_path(discuss_root, codec)
+
+    try:
+        # Ensure .discuss directory exists
+        discuss_root.mkdir(parents=True, exist_ok=True)
+
+        # Codecs only accept plain dictionaries
+        data = codec.dumps(dict(snapshot))
+        _write_atomic(snapshot_path, data, fsync=_fsync_enabled(config))
+        if isinstance(snapshot, Snapshot):
+            snapshot.digest = content_digest(data)
+            snapshot.signature = None
+
+        log_debug("Saved snapshot: %s", snapshot_path)
+
+    except Exception as e:
+        log_error(f"Failed to save snapshot: {snapshot_path}", e)
+        return False
+
+    incr("snapshot_writes")
+    if isinstance(snapshot, Snapshot):
+        snapshot.dirty = False
+
+    _remove_other_snapshot_files(discuss_root, codec)
+    return True
+
+
+def get_archive_path(discuss_root: Path) -> Path:
+    """Get the path to the cold archive of idle discussion states."""
+    return discuss_root / ARCHIVE_FILE_NAME
+
+
+def get_archive_days(config: Optional[Dict[str, Any]] = None) -> float:
+    """
+    Get the number of idle days after which a discussion state is archived.
+
+    Args:
+        config: Snapshot config section
+
+    Returns:
+        DISCUSS_SNAPSHOT_ARCHIVE_DAYS if set, else config.archive_after_days,
+        else DEFAULT_ARCHIVE_DAYS; 0 disables archiving
+    """
+    value = os.environ.get(ARCHIVE_DAYS_ENV, "").strip()
+    if not value and config:
+        value = config.get(ARCHIVE_DAYS_KEY, "")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return DEFAULT_ARCHIVE_DAYS
+
+
+def load_archive(discuss_root: Path) -> Dict[str, Any]:
+    """
+    Load the archived discussion states.
+
+    Args:
+        discuss_root: Path to .discuss directory
+
+    Returns:
+        Mapping of discussion key to state (empty if there is no archive)
+    """
+    found = read_file(get_archive_path(discuss_root))
+    if found is None or not isinstance(found[0], dict):
+        return {}
+    discussions = found[0].get("discussions")
+    return discussions if isinstance(discussions, dict) else {}
+
+
+def _update_archive(discuss_root: Path, added: Dict[str, Any], removed: Set[str]) -> bool:
+    """Add and remove archived states (read-modify-write of the archive file)."""
+    archive = load_archive(discuss_root)
+    archive.update(added)
+    for key in removed:
+        archive.pop(key, None)
+
+    archive_path = get_archive_path(discuss_root)
+    try:
+        if archive:
+            data = encode({"version": 1, "discussions": archive})
+            _write_atomic(archive_path, data, fsync=False)
+        elif archive_path.exists():
+            os.remove(archive_path)
+    except OSError as e:
+        log_error(f"Failed to update snapshot archive: {archive_path}", e)
+        return False
+
+    incr("archive_writes")
+    return True
+
+
+def _save_sharded_snapshot(discuss_root: Path, snapshot: Dict[str, Any]) -> bool:
+    """
+    Save a sharded snapshot: changed shards, the index if it changed, and
+    the manifest (always, with the next revision).
+
+    Args:
+        discuss_root: Path to .discuss directory
+        snapshot: Snapshot whose "discussions" is a ShardedDiscussions
+
+    Returns:
+        True if successful, False otherwise
+    """
+    discussions = snapshot["discussions"]
+    state_dir = discussions.state_dir
+    fsync = _fsync_enabled(snapshot.get("config") or {})
+    writes = discussions.pending_writes()
+
+    manifest = {
+        key: value for key, value in snapshot.items() if key not in ("discussions", "index")
+    }
+    manifest.update(
+        {
+            "layout": LAYOUT_SHARDED,
+            "revision": discussions.revision + 1,
+            "keys": list(discussions),
+        }
+    )
+    manifest_data = encode(manifest)
+
+    try:
+        for key in discussions.pending_deletes():
+            try:
+                os.remove(get_shard_path(state_dir, key))
+            except FileNotFoundError:
+                pass
+
+        for key, data in writes.items():
+            shard_path = get_shard_path(state_dir, key)
+            shard_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(shard_path, data, fsync=fsync)
+
+        index_digest = discussions.index_digest
+        if "index" in snapshot:
+            index_data = encode(snapshot["index"])
+            index_digest = content_digest(index_data)
+            if index_digest != discussions.index_digest:
+                state_dir.mkdir(parents=True, exist_ok=True)
+                _write_atomic(state_dir / INDEX_FILE_NAME, index_data, fsync=fsync)
+
+        # Manifest last: it lists the keys whose shards now exist
+        state_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(get_manifest_path(discuss_root), manifest_data, fsync=fsync)
+
+        log_debug("Saved sharded snapshot (%s shard(s) written)", len(writes))
+
+    except Exception as e:
+        log_error(f"Failed to save sharded snapshot: {state_dir}", e)
+        return False
+
+    incr("snapshot_writes")
+    incr("snapshot_shard_writes", len(writes))
+    discussions.mark_saved(writes)
+    discussions.index_digest = index_digest
+    discussions.revision += 1
+    if isinstance(snapshot, Snapshot):
+        snapshot.dirty = False
+        snapshot.digest = content_digest(manifest_data)
+        snapshot.signature = None
+    return True
+
+
+def convert_snapshot_layout(discuss_root: Path, layout: str) -> bool:
+    """
+    Convert the snapshot between the single-file and sharded layouts.
+
+    The new layout is written completely before the old one is removed, so
+    an interrupted conversion leaves a loadable snapshot. Callers running
+    next to live hooks should hold the snapshot lock (see snapshot_lock.py).
+
+    Args:
+        discuss_root: Path to .discuss directory
+        layout: LAYOUT_SINGLE ("single") or LAYOUT_SHARDED ("sharded")
+
+    Returns:
+        True if converted, False if already in that layout or saving failed
+
+    Raises:
+        ValueError: If layout is unknown
+    """
+    if layout not in (LAYOUT_SINGLE, LAYOUT_SHARDED):
+        raise ValueError(f"Unknown snapshot layout: {layout}")
+
+    snapshot = load_snapshot(discuss_root)
+    discussions = snapshot["discussions"]
+    if isinstance(discussions, ShardedDiscussions) == (layout == LAYOUT_SHARDED):
+        return False
+
+    state_dir = get_state_dir(discuss_root)
+    if layout == LAYOUT_SHARDED:
+        converted = ShardedDiscussions(state_dir)
+        for key, state in discussions.items():
+            converted[key] = state
+    else:
+        converted = {key: discussions[key] for key in discussions}
+
+    new_snapshot = Snapshot(snapshot, dirty=True)
+    new_snapshot["discussions"] = converted
+
+    if layout == LAYOUT_SHARDED:
+        if not _save_sharded_snapshot(discuss_root, new_snapshot):
+            return False
+        # Shards left over from an earlier sharded period
+        for key in list_shard_keys(state_dir) - set(converted):
+            os.remove(get_shard_path(state_dir, key))
+        for codec in all_codecs():
+            try:
+                os.remove(discuss_root / codec.file_name)
+            except FileNotFoundError:
+                pass
+    else:
+        if not save_snapshot(discuss_root, new_snapshot, force=True):
+            return False
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    log_info(f"Converted snapshot to the {layout} layout ({len(converted)} discussions)")
+    return True
+
+
+def _fsync_enabled(config: Dict[str, Any]) -> bool:
+    """
+    Check whether snapshot writes should be fsynced.
+
+    Args:
+        config: Snapshot config section
+
+    Returns:
+        DISCUSS_SNAPSHOT_FSYNC if set, else config.fsync (default False)
+    """
+    override = os.environ.get(SNAPSHOT_FSYNC_ENV, "").strip()
+    if override:
+        return override not in ("0", "false", "no")
+    return bool(config.get(SNAPSHOT_FSYNC_KEY, False))
+
+
+def _read_umask() -> int:
+    """Current process umask (os.umask can only be read by setting it)."""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Read once at import: setting the umask to read it is not thread-safe
+_UMASK = _read_umask()
+
+
+def _file_mode(path: Path) -> int:
+    """Permission bits for a rewrite of path: its current mode, or 0666 minus the umask."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def _write_atomic(path: Path, data: bytes, fsync: bool = False) -> None:
+    """
+    Write data to path via a temp file in the same directory and os.replace.
+
+    Readers see either the old or the new file, never a partial one. The
+    file keeps its permissions (a new one gets the umask's, not the 0600 of
+    mkstemp), so other users of a shared workspace can still read it.
+
+    Args:
+        path: Target file path
+        data: File content
+        fsync: Flush the temp file (and the directory entry) to disk
+    """
+    mode = _file_mode(path)
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=path.name + ".", suffix=".tmp")
+    try:
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            count("bytes_written", len(data))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync:
+        incr("snapshot_fsyncs")
+        _fsync_directory(path.parent)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Flush a directory entry to disk (best effort, POSIX only)."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _remove_other_snapshot_files(discuss_root: Path, codec: SnapshotCodec) -> None:
+    """
+    Remove snapshot files written by codecs other than the given one.
+
+    Args:
+        discuss_root: Path to .discuss directory
+        codec: Codec the snapshot was just saved with
+    """
+    for other in all_codecs():
+        if other.name == codec.name:
+            continue
+        try:
+            os.remove(discuss_root / other.file_name)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            log_warning(f"Failed to remove old {other.name} snapshot: {e}")
+            continue
+        log_info(f"Migrated snapshot from {other.name} to {codec.name}")
+
+
+def create_default_snapshot() -> Snapshot:
+    """
+    Create default snapshot structure.
+
+    Returns:
+        Default snapshot (dirty, as it is not on disk yet)
+    """
+    return Snapshot(
+        {
+            "version": 1,
+            "config": {
+                "stale_threshold": DEFAULT_STALE_THRESHOLD,
+            },
+            "discussions": {},
+        },
+        dirty=True,
+    )
+
+
+def set_discussion_state(snapshot: Dict[str, Any], discuss_key: str, state: Dict[str, Any]) -> bool:
+    """
+    Store a discussion's state, marking the snapshot dirty if it changed.
+
+    Args:
+        snapshot: Snapshot dictionary
+        discuss_key: Discussion key ("YYYY-MM-DD/topic-slug")
+        state: New state (after compare_and_update)
+
+    Returns:
+        True if the stored state changed
+    """
+    discussions = snapshot.setdefault("discussions", {})
+    if discussions.get(discuss_key) == state:
+        return False
+
+    discussions[discuss_key] = state
+    if isinstance(snapshot, Snapshot):
+        snapshot.dirty = True
+    return True
+
+
+def get_discuss_key(discuss_dir: Path, discuss_root: Path) -> str:
+    """
+    Get discussion key from directory path.
+
+    Key format: "YYYY-MM-DD/topic-slug"
+
+    Args:
+        discuss_dir: Path to discussion directory
+        discuss_root: Path to .discuss root directory
+
+    Returns:
+        Discussion key string
+    """
+    try:
+        relative_path = discuss_dir.relative_to(discuss_root)
+        return str(relative_path).replace("\\", "/")  # Normalize path separators
+    except ValueError:
+        # Fallback: use directory name
+        return discuss_dir.name
+
+
+def get_min_outline_change(config: Optional[Dict[str, Any]] = None) -> float:
+    """
+    Get the change magnitude an outline edit must reach to count as a round.
+
+    Args:
+        config: Snapshot config section
+
+    Returns:
+        DISCUSS_MIN_OUTLINE_CHANGE if set, else config.min_outline_change,
+        else DEFAULT_MIN_CHANGE, clamped to [0, 1]; 0 counts any change
+    """
+    value = os.environ.get(MIN_CHANGE_ENV, "").strip()
+    if not value and config:
+        value = config.get(MIN_CHANGE_KEY, "")
+    try:
+        return min(1.0, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return DEFAULT_MIN_CHANGE
+
+
+def get_reminder_mode(config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Get what triggers precipitation reminders.
+
+    Args:
+        config: Snapshot config section
+
+    Returns:
+        DISCUSS_REMINDER_MODE if set, else config.reminder_mode, else
+        REMINDER_MODE_EDITS; unknown values also give REMINDER_MODE_EDITS
+    """
+    value = os.environ.get(REMINDER_MODE_ENV, "").strip()
+    if not value and config:
+        value = config.get(REMINDER_MODE_KEY, "")
+    if value == REMINDER_MODE_PROBLEMS:
+        return REMINDER_MODE_PROBLEMS
+    return REMINDER_MODE_EDITS
+
+
+def get_scan_workers(config: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Get the number of threads used to scan discussion directories.
+
+    Args:
+        config: Snapshot config section
+
+    Returns:
+        DISCUSS_SCAN_WORKERS if set, else config.scan_workers, else 1
+        (serial), capped at MAX_SCAN_WORKERS
+    """
+    value = os.environ.get(SCAN_WORKERS_ENV, "").strip()
+    if not value and config:
+        value = config.get(SCAN_WORKERS_KEY, "")
+    try:
+        workers = int(value)
+    except (TypeError, ValueError):
+        return 1
+    return max(1, min(workers, MAX_SCAN_WORKERS))
+
+
+def get_scan_deadline(config: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """
+    Get the time budget of a check.
+
+    Args:
+        config: Snapshot config section
+
+    Returns:
+        Seconds from DISCUSS_SCAN_DEADLINE_MS if set, else
+        config.scan_deadline_ms, else DEFAULT_SCAN_DEADLINE_MS; None when
+        the value is 0 or negative (no deadline)
+    """
+    value = os.environ.get(SCAN_DEADLINE_ENV, "").strip()
+    if not value and config:
+        value = config.get(SCAN_DEADLINE_KEY, "")
+    try:
+        milliseconds = float(value)
+    except (TypeError, ValueError):
+        milliseconds = DEFAULT_SCAN_DEADLINE_MS
+    if milliseconds <= 0:
+        return None
+    return milliseconds / 1000
+
+
+def _map_ordered(func: Callable[[Any], Any], items: List[Any], workers: int) -> List[Any]:
+    """
+    Apply func to every item, in a bounded thread pool if workers > 1.
+
+    Results are returned in input order either way, so the parallel path
+    produces exactly the serial path's output.
+
+    Args:
+        func: Function to apply (must only do filesystem reads)
+        items: Items to process
+        workers: Maximum number of threads (1 = serial)
+
+    Returns:
+        List of results, in the order of items
+    """
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    # Workers log and count into the calling thread's root (multi-root checks)
+    func = bind_root_context(func)
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
+
+# Result of _map_until for items not processed before the deadline
+_SKIPPED = object()
+
+
+def _map_until(
+    func: Callable[[Any], Any], items: List[Any], until: float, workers: int
+) -> List[Any]:
+    """
+    Apply func to items in order until a deadline, like _map_ordered.
+
+    The first item is always processed, so every call makes progress.
+
+    Args:
+        func: Function to apply (must only do filesystem reads)
+        items: Items to process
+        until: time.monotonic() value after which items are skipped
+        workers: Maximum number of threads (1 = serial)
+
+    Returns:
+        List of results in the order of items, _SKIPPED for skipped items
+    """
+
+    def run(position_item: Tuple[int, Any]) -> Any:
+        position, item = position_item
+        if position and time.monotonic() >= until:
+            return _SKIPPED
+        return func(item)
+
+    return _map_ordered(run, list(enumerate(items)), workers)
 
-import os
-import re
-from datetime import datetime, timedelta, timezone
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
 
-import yaml
+def _topic_priority(old_topic: Optional[Dict[str, Any]], date_mtime: float) -> float:
+    """Most recent mtime the index knows for a topic (its date directory's if unknown)."""
+    if not old_topic:
+        return date_mtime
+    return max(value for value in old_topic.values() if isinstance(value, (int, float)))
 
-from .logging_utils import log_debug, log_error, log_info, log_warning
 
+def _order_topics(
+    topics: List[Tuple[str, str]],
+    priorities: Dict[Tuple[str, str], float],
+    cursor: Dict[str, Any],
+    cutoff: float,
+) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """
+    Order topics for a check with a deadline.
 
-# Default staleness threshold
-DEFAULT_STALE_THRESHOLD = 3
+    Args:
+        topics: (date, topic) names
+        priorities: Topic priorities (see _topic_priority)
+        cursor: Cursor left by the previous check ({} if it finished)
+        cutoff: Activity cutoff (Unix timestamp)
 
-# Snapshot file name
-SNAPSHOT_FILE_NAME = ".snapshot.yaml"
+    Returns:
+        (recent topics: those the previous check did not reach first, then
+        most recent first; idle topics: newest first, starting at the sweep
+        cursor and wrapping around)
+    """
+    pending = set(cursor.get("pending") or [])
+    recent = sorted(
+        (topic for topic in topics if priorities[topic] > cutoff),
+        key=lambda topic: ("/".join(topic) not in pending, -priorities[topic], topic),
+    )
+    idle = sorted((topic for topic in topics if priorities[topic] <= cutoff), reverse=True)
+    resume = cursor.get("next")
+    if resume:
+        start = next((i for i, topic in enumerate(idle) if "/".join(topic) <= resume), 0)
+        idle = idle[start:] + idle[:start]
+    return recent, idle
 
-# Detection window (hours)
-DETECTION_WINDOW_HOURS = 24
+
+def _list_date_dirs(discuss_root: Path) -> List[os.DirEntry]:
+    """List date directories (YYYY-MM-DD) under .discuss, sorted by name."""
+    try:
+        entries = sorted(os.scandir(discuss_root), key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+    date_entries = []
+    for entry in entries:
+        if not _DATE_DIR_PATTERN.match(entry.name):
+            continue
+        try:
+            if entry.is_dir():
+                date_entries.append(entry)
+        except OSError:
+            continue
+    return date_entries
 
 
-def get_snapshot_path(discuss_root: Path) -> Path:
+def _list_topic_dirs(date_path: str) -> Optional[List[os.DirEntry]]:
+    """List topic directories of a date directory sorted by name, or None if unreadable."""
+    try:
+        entries = sorted(os.scandir(date_path), key=lambda entry: entry.name)
+    except OSError:
+        return None
+
+    topic_entries = []
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                topic_entries.append(entry)
+        except OSError:
+            continue
+    return topic_entries
+
+
+def find_active_discussions(
+    discuss_root: Path, hours: int = DETECTION_WINDOW_HOURS, workers: int = 1
+) -> List[Path]:
     """
-    Get the path to snapshot.yaml file.
+    Find discussion directories modified within the specified time window.
     
     Args:
         discuss_root: Path to .discuss directory
+        hours: Time window in hours (default: 24)
+        workers: Threads used to scan topic directories (1 = serial)
         
     Returns:
-        Path to snapshot.yaml
+        List of discussion directory paths
     """
-    return discuss_root / SNAPSHOT_FILE_NAME
+    return [discuss_dir for discuss_dir, _ in scan_active_discussions(discuss_root, hours, workers)]
 
 
-def load_snapshot(discuss_root: Path) -> Dict[str, Any]:
+def scan_active_discussions(
+    discuss_root: Path, hours: int = DETECTION_WINDOW_HOURS, workers: int = 1
+) -> List[Tuple[Path, Dict[str, Any]]]:
     """
-    Load snapshot.yaml from .discuss directory.
+    Find active discussions and scan their state in a single pass.
+
+    Equivalent to calling scan_discussion on every directory returned by
+    find_active_discussions, but walks each topic once with os.scandir and
+    stats every file at most once (DirEntry caches the result).
     
     Args:
         discuss_root: Path to .discuss directory
+        hours: Time window in hours (default: 24)
+        workers: Threads used to list date directories and scan topics
+                 (1 = serial; useful where stat is a network round trip)
         
     Returns:
-        Snapshot dictionary with default structure if file doesn't exist
+        List of (discussion directory, state) tuples, sorted by key
     """
-    snapshot_path = get_snapshot_path(discuss_root)
+    cutoff = time.time() - hours * 3600
     
-    if not snapshot_path.exists():
-        log_debug(f"Snapshot file not found, creating default: {snapshot_path}")
-        return create_default_snapshot()
+    # Scan .discuss directory for date directories, then their topics
+    topic_lists = _map_ordered(
+        lambda date_entry: _list_topic_dirs(date_entry.path) or [],
+        _list_date_dirs(discuss_root),
+        workers,
+    )
+    topic_entries = [entry for topics in topic_lists for entry in topics]
     
-    try:
-        with open(snapshot_path, encoding="utf-8") as f:
-            snapshot = yaml.safe_load(f) or {}
-        
-        # Ensure structure
-        if "version" not in snapshot:
-            snapshot["version"] = 1
-        if "config" not in snapshot:
-            snapshot["config"] = {}
-        if "discussions" not in snapshot:
-            snapshot["discussions"] = {}
-        
-        # Ensure config has stale_threshold
-        if "stale_threshold" not in snapshot["config"]:
-            snapshot["config"]["stale_threshold"] = DEFAULT_STALE_THRESHOLD
-        
-        log_debug(f"Loaded snapshot with {len(snapshot.get('discussions', {}))} discussions")
-        return snapshot
-        
-    except Exception as e:
-        log_error(f"Failed to load snapshot: {snapshot_path}", e)
-        return create_default_snapshot()
+    def scan(topic_entry: os.DirEntry) -> Optional[Dict[str, Any]]:
+        try:
+            topic_mtime = topic_entry.stat().st_mtime
+        except OSError:
+            return None
+        is_active, state, _ = _scan_topic(topic_entry.path, topic_mtime, cutoff)
+        return state if is_active else None
+
+    active_discussions = []
+    for topic_entry, state in zip(topic_entries, _map_ordered(scan, topic_entries, workers)):
+        if state is not None:
+            discuss_dir = Path(topic_entry.path)
+            active_discussions.append((discuss_dir, state))
+            log_debug("Found active discussion: %s", get_discuss_key(discuss_dir, discuss_root))
+
+    return active_discussions
 
 
-def save_snapshot(discuss_root: Path, snapshot: Dict[str, Any]) -> bool:
+def scan_discussions_indexed(
+    discuss_root: Path,
+    index: Optional[Dict[str, Any]],
+    hours: int = DETECTION_WINDOW_HOURS,
+    workers: int = 1,
+    deadline: Optional[float] = None,
+) -> Tuple[List[Tuple[Path, Dict[str, Any]]], Dict[str, Any]]:
     """
-    Save snapshot.yaml to .discuss directory.
+    Find and scan active discussions, skipping subtrees the index vouches for.
+
+    Same result as scan_active_discussions, but uses the snapshot's
+    directory index (see module docstring) to avoid walking untouched
+    history:
+    - A date directory whose mtime matches the index is not listed; its
+      topics are taken from the index
+    - A topic whose directory, outline.md, decisions/ and notes/ mtimes all
+      match the index, and whose newest file is outside the window, costs
+      four stat calls and is not walked
+
+    Trade-off: an in-place edit of an existing file under decisions/ or
+    notes/ (or of an untracked file) changes no directory mtime, so it is
+    not seen in a discussion idle for longer than the window until
+    outline.md or a directory changes. Edits to outline.md are always seen.
+
+    With a deadline, date directories are still all listed, but topics are
+    checked in priority order until time runs out: first the recent ones
+    (the newest mtime in the index, or the date directory's mtime for
+    topics the index does not know, inside the window), those the previous
+    check did not reach first, then the most recent; then idle topics,
+    newest first from where the previous sweep stopped, with SWEEP_SHARE
+    of the time reserved for them. At least one topic of each kind is
+    checked. A topic not reached keeps its index entry (an empty one if it
+    had none, so it is still listed), and the new index gets a "cursor"
+    recording where the next check resumes; the whole tree is therefore
+    checked within a bounded number of runs.
     
     Args:
         discuss_root: Path to .discuss directory
-        snapshot: Snapshot dictionary
+        index: Index from the previous run (snapshot["index"]), or None
+        hours: Time window in hours (default: 24)
+        workers: Threads used for date directories and topics (1 = serial)
+        deadline: time.monotonic() value by which to stop checking topics
+                  (None: check all)
         
     Returns:
-        True if successful, False otherwise
+        (active discussions as (directory, state) tuples, new index)
     """
-    snapshot_path = get_snapshot_path(discuss_root)
+    cutoff = time.time() - hours * 3600
+    old_dates = (index or {}).get("dates") or {}
     
-    try:
-        # Ensure .discuss directory exists
-        discuss_root.mkdir(parents=True, exist_ok=True)
+    def list_date(date_entry: os.DirEntry) -> Optional[Tuple[float, List[str]]]:
+        try:
+            date_mtime = date_entry.stat().st_mtime
+        except OSError:
+            return None
+        count("stat_calls")
         
-        with open(snapshot_path, "w", encoding="utf-8") as f:
-            yaml.safe_dump(snapshot, f, sort_keys=False, allow_unicode=True, default_flow_style=False)
+        old_date = old_dates.get(date_entry.name) or {}
+        if old_date.get("mtime") == date_mtime:
+            # No topic added, removed or renamed since the last run
+            return date_mtime, list(old_date.get("topics") or {})
         
-        log_debug(f"Saved snapshot: {snapshot_path}")
-        return True
+        topic_entries = _list_topic_dirs(date_entry.path)
+        if topic_entries is None:
+            return None
+        return date_mtime, [entry.name for entry in topic_entries]
+
+    date_entries = _list_date_dirs(discuss_root)
+    new_dates = {}
+    topics = []
+    for date_entry, listed in zip(date_entries, _map_ordered(list_date, date_entries, workers)):
+        if listed is None:
+            continue
+        date_mtime, topic_names = listed
+        new_dates[date_entry.name] = {"mtime": date_mtime, "topics": {}}
+        topics.extend((date_entry.name, topic_name) for topic_name in topic_names)
+
+    def check_topic(
+        topic: Tuple[str, str],
+    ) -> Optional[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        date_name, topic_name = topic
+        topic_path = os.path.join(str(discuss_root), date_name, topic_name)
+        signature = _topic_signature(topic_path)
+        if signature is None:
+            return None
         
-    except Exception as e:
-        log_error(f"Failed to save snapshot: {snapshot_path}", e)
-        return False
+        old_topic = ((old_dates.get(date_name) or {}).get("topics") or {}).get(topic_name)
+        if (
+            old_topic is not None
+            and old_topic.get("newest", cutoff + 1) <= cutoff
+            and all(old_topic.get(key) == value for key, value in signature.items())
+        ):
+            # Untouched and outside the window: not active
+            return old_topic, None
+
+        is_active, state, newest = _scan_topic(topic_path, signature["mtime"], cutoff, full=True)
+        return dict(signature, newest=newest), (state if is_active else None)
+
+    def old_topic(topic: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        return ((old_dates.get(topic[0]) or {}).get("topics") or {}).get(topic[1])
+
+    cursor = {}
+    if deadline is None:
+        results = dict(zip(topics, _map_ordered(check_topic, topics, workers)))
+    else:
+        priorities = {
+            topic: _topic_priority(old_topic(topic), new_dates[topic[0]]["mtime"])
+            for topic in topics
+        }
+        recent, idle = _order_topics(topics, priorities, (index or {}).get("cursor") or {}, cutoff)
+        reserve = SWEEP_SHARE * max(0.0, deadline - time.monotonic())
+        results = dict(zip(recent, _map_until(check_topic, recent, deadline - reserve, workers)))
+        results.update(zip(idle, _map_until(check_topic, idle, deadline, workers)))
+
+        pending = ["/".join(topic) for topic in recent if results[topic] is _SKIPPED]
+        swept = [topic for topic in idle if results[topic] is _SKIPPED]
+        if pending:
+            cursor["pending"] = pending
+        if swept:
+            cursor["next"] = "/".join(swept[0])
+        deferred = len(pending) + len(swept)
+        if deferred:
+            count("topics_deferred", deferred)
+            log_info(
+                f"Scan deadline reached: {deferred} of {len(topics)} topic(s) left for the next run"
+            )
+
+    active_discussions = []
+    for topic in topics:
+        date_name, topic_name = topic
+        checked = results[topic]
+        if checked is _SKIPPED:
+            # Not reached in time: keep what the index knew
+            new_dates[date_name]["topics"][topic_name] = old_topic(topic) or {}
+            continue
+        if checked is None:
+            continue
+        entry, state = checked
+        new_dates[date_name]["topics"][topic_name] = entry
+        if state is not None:
+            discuss_dir = discuss_root / date_name / topic_name
+            active_discussions.append((discuss_dir, state))
+            log_debug("Found active discussion: %s/%s", date_name, topic_name)
+
+    new_index = {"dates": new_dates}
+    if cursor:
+        new_index["cursor"] = cursor
+    return active_discussions, new_index
 
 
-def create_default_snapshot() -> Dict[str, Any]:
+def scan_discussions_journaled(
+    discuss_root: Path,
+    index: Dict[str, Any],
+    discussions: Dict[str, Any],
+    changed_paths: Set[str],
+    hours: int = DETECTION_WINDOW_HOURS,
+    workers: int = 1,
+) -> Tuple[List[Tuple[Path, Dict[str, Any]]], Dict[str, Any]]:
     """
-    Create default snapshot structure.
+    Find and scan active discussions from a change journal, without a walk.
+
+    Only discussions with journaled changes are rescanned. Discussions the
+    index still shows as active (newest file inside the window) are reported
+    with their snapshot state, so their reminders keep firing as with a
+    full scan.
     
+    Args:
+        discuss_root: Path to .discuss directory
+        index: Index from the previous run (snapshot["index"])
+        discussions: Discussion states from the previous run
+        changed_paths: Paths relative to discuss_root from the journal
+        hours: Time window in hours (default: 24)
+        workers: Threads used to rescan changed discussions (1 = serial)
+
     Returns:
-        Default snapshot dictionary
+        (active discussions as (directory, state) tuples, new index)
     """
+    cutoff = time.time() - hours * 3600
+    dates = {
+        name: {"mtime": date.get("mtime"), "topics": dict(date.get("topics") or {})}
+        for name, date in (index.get("dates") or {}).items()
+    }
+
+    # Group changes by date directory and discussion
+    changed_dates = set()
+    changed_keys = set()
+    for path in changed_paths:
+        parts = path.split("/", 2)
+        if not _DATE_DIR_PATTERN.match(parts[0]):
+            continue
+        if len(parts) == 1:
+            changed_dates.add(parts[0])
+        else:
+            changed_keys.add((parts[0], parts[1]))
+
+    # Re-list changed date directories (topics added, removed or renamed)
+    for date_name in changed_dates:
+        date_path = os.path.join(str(discuss_root), date_name)
+        try:
+            date_mtime = os.stat(date_path).st_mtime
+            topic_names = {entry.name for entry in os.scandir(date_path) if entry.is_dir()}
+        except OSError:
+            dates.pop(date_name, None)
+            continue
+        date = dates.setdefault(date_name, {"mtime": date_mtime, "topics": {}})
+        date["mtime"] = date_mtime
+        for topic_name in set(date["topics"]) - topic_names:
+            del date["topics"][topic_name]
+        changed_keys.update((date_name, name) for name in topic_names - set(date["topics"]))
+
+    # Rescan changed discussions
+    def rescan(
+        topic: Tuple[str, str],
+    ) -> Optional[Tuple[Dict[str, float], bool, Dict[str, Any], float]]:
+        topic_path = os.path.join(str(discuss_root), *topic)
+        signature = _topic_signature(topic_path)
+        if signature is None:
+            return None
+        return (signature,) + _scan_topic(topic_path, signature["mtime"], cutoff, full=True)
+
+    scanned = {}
+    changed_topics = sorted(changed_keys)
+    for (date_name, topic_name), rescanned in zip(
+        changed_topics, _map_ordered(rescan, changed_topics, workers)
+    ):
+        date = dates.get(date_name)
+        if rescanned is None:
+            if date is not None:
+                date["topics"].pop(topic_name, None)
+            continue
+        if date is None:
+            # Date directory created after the index; re-listed on fallback
+            date = dates[date_name] = {"mtime": 0.0, "topics": {}}
+
+        signature, is_active, state, newest = rescanned
+        date["topics"][topic_name] = dict(signature, newest=newest)
+        if is_active:
+            scanned[f"{date_name}/{topic_name}"] = state
+
+    # Collect active discussions in index order
+    active_discussions = []
+    for date_name in sorted(dates):
+        for topic_name in sorted(dates[date_name]["topics"]):
+            key = f"{date_name}/{topic_name}"
+            state = scanned.get(key)
+            if state is None and (date_name, topic_name) not in changed_keys:
+                if dates[date_name]["topics"][topic_name].get("newest", 0.0) > cutoff:
+                    state = _copy_state(discussions.get(key))
+                    if state is None:
+                        topic_path = os.path.join(str(discuss_root), date_name, topic_name)
+                        state = _scan_topic(topic_path, 0.0, None)[1]
+            if state is not None:
+                discuss_dir = discuss_root / date_name / topic_name
+                active_discussions.append((discuss_dir, state))
+                log_debug("Found active discussion: %s", key)
+
+    new_index = {"dates": {name: dates[name] for name in sorted(dates)}}
+    if index.get("cursor"):
+        # The next walk resumes where the last one stopped
+        new_index["cursor"] = index["cursor"]
+    return active_discussions, new_index
+
+
+def _copy_state(state: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Copy a stored discussion state so that updating it leaves the original intact."""
+    if not isinstance(state, dict):
+        return None
     return {
-        "version": 1,
-        "config": {
-            "stale_threshold": DEFAULT_STALE_THRESHOLD,
-        },
-        "discussions": {},
+        "outline": dict(state.get("outline") or {"mtime": 0.0, "change_count": 0}),
+        "decisions": [dict(item) for item in state.get("decisions", [])],
+        "notes": [dict(item) for item in state.get("notes", [])],
     }
 
 
-def get_discuss_key(discuss_dir: Path, discuss_root: Path) -> str:
+def _topic_signature(topic_path: str) -> Optional[Dict[str, float]]:
     """
-    Get discussion key from directory path.
-    
-    Key format: "YYYY-MM-DD/topic-slug"
+    Stat a discussion directory and the entries that hold its state.
     
     Args:
-        discuss_dir: Path to discussion directory
-        discuss_root: Path to .discuss root directory
+        topic_path: Discussion directory path
         
     Returns:
-        Discussion key string
+        mtimes of the directory, outline.md, decisions/ and notes/ (0.0 when
+        missing), or None if the discussion directory is gone
     """
     try:
-        relative_path = discuss_dir.relative_to(discuss_root)
-        return str(relative_path).replace("\\", "/")  # Normalize path separators
-    except ValueError:
-        # Fallback: use directory name
-        return discuss_dir.name
+        st = os.stat(topic_path)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(st.st_mode):
+        return None
+
+    signature = {"mtime": st.st_mtime}
+    count("stat_calls", 1 + len(_SIGNATURE_ENTRIES))
+    for key, name in _SIGNATURE_ENTRIES:
+        try:
+            signature[key] = os.stat(os.path.join(topic_path, name)).st_mtime
+        except OSError:
+            signature[key] = 0.0
+    return signature
 
 
-def find_active_discussions(discuss_root: Path, hours: int = DETECTION_WINDOW_HOURS) -> List[Path]:
+def get_index_keys(index: Dict[str, Any]) -> Set[str]:
     """
-    Find discussion directories modified within the specified time window.
+    Get the discussion keys ("YYYY-MM-DD/topic-slug") listed in an index.
     
     Args:
-        discuss_root: Path to .discuss directory
-        hours: Time window in hours (default: 24)
+        index: Index returned by scan_discussions_indexed
         
     Returns:
-        List of discussion directory paths
+        Set of discussion keys
     """
-    if not discuss_root.exists():
-        return []
-    
-    active_discussions = []
-    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+    return {
+        f"{date_name}/{topic_name}"
+        for date_name, date in index.get("dates", {}).items()
+        for topic_name in date.get("topics", {})
+    }
+
+
+def set_journal_position(snapshot: Dict[str, Any], position: Optional[Dict[str, Any]]) -> bool:
+    """
+    Store the change journal position, marking the snapshot dirty if it changed.
     
-    # Scan .discuss directory for date directories (YYYY-MM-DD)
-    for date_dir in discuss_root.iterdir():
-        if not date_dir.is_dir():
-            continue
+    Args:
+        snapshot: Snapshot dictionary
+        position: Position from change_journal.read_journal (None: no journal)
         
-        # Check if directory name matches date pattern
-        if not re.match(r"\d{4}-\d{2}-\d{2}$", date_dir.name):
-            continue
+    Returns:
+        True if the stored position changed
+    """
+    if snapshot.get("journal") == position:
+        return False
+
+    if position is None:
+        snapshot.pop("journal", None)
+    else:
+        snapshot["journal"] = position
+    if isinstance(snapshot, Snapshot):
+        snapshot.dirty = True
+    return True
+
+
+def set_index(snapshot: Dict[str, Any], index: Dict[str, Any]) -> bool:
+    """
+    Store the directory index, marking the snapshot dirty if it changed.
+
+    Args:
+        snapshot: Snapshot dictionary
+        index: Index returned by scan_discussions_indexed
         
-        # Scan topic directories within date directory
-        for topic_dir in date_dir.iterdir():
-            if not topic_dir.is_dir():
-                continue
-            
-            # Check if any file in the discussion directory was modified recently
-            if is_recently_modified(topic_dir, cutoff_time):
-                active_discussions.append(topic_dir)
-                log_debug(f"Found active discussion: {get_discuss_key(topic_dir, discuss_root)}")
+    Returns:
+        True if the stored index changed
+    """
+    if snapshot.get("index") == index:
+        return False
     
-    return active_discussions
+    snapshot["index"] = index
+    if isinstance(snapshot, Snapshot):
+        snapshot.dirty = True
+    return True
 
 
 def is_recently_modified(directory: Path, cutoff_time: datetime) -> bool:
@@ -221,28 +1582,11 @@ def is_recently_modified(directory: Path, cutoff_time: datetime) -> bool:
     Returns:
         True if recently modified
     """
-    # Check directory itself
-    try:
-        dir_mtime = datetime.fromtimestamp(directory.stat().st_mtime, tz=timezone.utc)
-        if dir_mtime > cutoff_time:
-            return True
-    except (OSError, ValueError):
-        pass
-    
-    # Check files recursively (limit depth to avoid performance issues)
     try:
-        for item in directory.rglob("*"):
-            if item.is_file():
-                try:
-                    file_mtime = datetime.fromtimestamp(item.stat().st_mtime, tz=timezone.utc)
-                    if file_mtime > cutoff_time:
-                        return True
-                except (OSError, ValueError):
-                    continue
-    except (OSError, ValueError):
-        pass
-    
-    return False
+        dir_mtime = os.stat(directory).st_mtime
+    except OSError:
+        dir_mtime = 0.0
+    return _scan_topic(str(directory), dir_mtime, cutoff_time.timestamp())[0]
 
 
 def scan_discussion(discuss_dir: Path) -> Dict[str, Any]:
@@ -255,48 +1599,192 @@ def scan_discussion(discuss_dir: Path) -> Dict[str, Any]:
     Returns:
         State dictionary with outline, decisions, and notes
     """
+    return _scan_topic(str(discuss_dir), 0.0, None)[1]
+
+
+def _scan_topic(
+    topic_path: str, topic_mtime: float, cutoff: Optional[float], full: bool = False
+) -> Tuple[bool, Dict[str, Any], float]:
+    """
+    Walk a discussion directory once, collecting its state and activity.
+
+    Tracked files (outline.md, decisions/*.md, notes/*.md) are always
+    stat'ed; other files only until the topic is known to be active, or all
+    of them with full=True. Raw float mtimes are compared against cutoff.
+
+    Args:
+        topic_path: Discussion directory path
+        topic_mtime: mtime of the discussion directory itself
+        cutoff: Activity cutoff (Unix timestamp); None to only scan state
+        full: Stat every file so that the returned newest mtime is exact
+
+    Returns:
+        (is_active, state, newest) tuple; is_active is False when cutoff is
+        None, newest is the largest mtime seen (directory included)
+    """
     state = {
         "outline": {"mtime": 0.0, "change_count": 0},
         "decisions": [],
         "notes": [],
     }
+    is_active = cutoff is not None and topic_mtime > cutoff
+    newest = topic_mtime
+    stat_calls = 0
     
-    # Scan outline.md
-    outline_path = discuss_dir / "outline.md"
-    if outline_path.exists():
+    # (directory path, depth, state list collecting its *.md files)
+    pending = [(topic_path, 0, None)]
+    while pending:
+        dir_path, depth, tracked_files = pending.pop()
         try:
-            state["outline"]["mtime"] = outline_path.stat().st_mtime
+            entries = list(os.scandir(dir_path))
         except OSError:
-            pass
-    
-    # Scan decisions directory
-    decisions_dir = discuss_dir / "decisions"
-    if decisions_dir.exists() and decisions_dir.is_dir():
-        for decision_file in decisions_dir.glob("*.md"):
+            continue
+
+        for entry in entries:
+            name = entry.name
             try:
-                state["decisions"].append({
-                    "name": decision_file.name,
-                    "mtime": decision_file.stat().st_mtime,
-                })
+                if entry.is_dir():
+                    if depth == 0 and name in _TRACKED_DIRS:
+                        pending.append((entry.path, 1, state[name]))
+                    elif cutoff is not None and not entry.is_symlink():
+                        pending.append((entry.path, depth + 1, None))
+                    continue
+
+                if tracked_files is not None:
+                    tracked = name.endswith(".md")
+                else:
+                    tracked = depth == 0 and name == "outline.md"
+                if not tracked and not full and (is_active or cutoff is None):
+                    continue
+                if not entry.is_file():
+                    continue
+                stat_calls += 1
+                st = entry.stat()
+                mtime = st.st_mtime
             except OSError:
                 continue
+
+            if mtime > newest:
+                newest = mtime
+            if cutoff is not None and mtime > cutoff:
+                is_active = True
+            if tracked_files is not None:
+                tracked_files.append({"name": name, "mtime": mtime, "size": st.st_size})
+            elif tracked:
+                state["outline"]["mtime"] = mtime
+                state["outline"]["size"] = st.st_size
     
-    # Scan notes directory
-    notes_dir = discuss_dir / "notes"
-    if notes_dir.exists() and notes_dir.is_dir():
-        for note_file in notes_dir.glob("*.md"):
-            try:
-                state["notes"].append({
-                    "name": note_file.name,
-                    "mtime": note_file.stat().st_mtime,
-                })
-            except OSError:
-                continue
+    count("stat_calls", stat_calls)
+    return is_active, state, newest
+
+
+def hash_changed_files(
+    old_state: Dict[str, Any], new_state: Dict[str, Any], discuss_dir: Path
+) -> int:
+    """
+    Fill in the content digests of a scanned state.
+
+    A file whose mtime and size match the stored state keeps the stored
+    digest; only the others are read and hashed, so a run where nothing
+    was written hashes nothing.
+
+    Args:
+        old_state: Previous state from snapshot
+        new_state: Current state from scan (updated in place)
+        discuss_dir: Discussion directory
+
+    Returns:
+        Number of files hashed
+    """
+    hashed = 0
+
+    def fill(old: Dict[str, Any], new: Dict[str, Any], path: Path) -> None:
+        nonlocal hashed
+        if (
+            old.get("digest")
+            and old.get("mtime") == new.get("mtime")
+            and old.get("size") == new.get("size")
+        ):
+            new["digest"] = old["digest"]
+            return
+        digest = file_digest(path)
+        hashed += 1
+        if digest is not None:
+            new["digest"] = digest
+        else:
+            new.pop("digest", None)
+
+    outline = new_state.get("outline", {})
+    if outline.get("mtime"):
+        fill(old_state.get("outline", {}), outline, discuss_dir / "outline.md")
+    for kind in _TRACKED_DIRS:
+        old_files = {item.get("name"): item for item in old_state.get(kind, [])}
+        for item in new_state.get(kind, []):
+            fill(old_files.get(item["name"], {}), item, discuss_dir / kind / item["name"])
+
+    if hashed:
+        incr("files_hashed", hashed)
+    return hashed
+
+
+def score_outline_change(
+    old_state: Dict[str, Any], new_state: Dict[str, Any], discuss_dir: Path
+) -> Optional[float]:
+    """
+    Fingerprint the outline and estimate how much it changed.
+
+    Call after hash_changed_files. The outline is only read when its digest
+    changed; the new fingerprint is stored in new_state and compared with
+    the stored one, which compare_and_update keeps as the baseline until an
+    edit counts (so small edits add up).
     
-    return state
+    Args:
+        old_state: Previous state from snapshot
+        new_state: Current state with digests (updated in place)
+        discuss_dir: Discussion directory
+
+    Returns:
+        Change magnitude in [0, 1], or None if it cannot be estimated (no
+        stored fingerprint yet, or the outline is unreadable)
+    """
+    old_outline = old_state.get("outline", {})
+    outline = new_state.get("outline", {})
+    if outline.get("digest") and outline.get("digest") == old_outline.get("digest"):
+        if old_outline.get("fingerprint"):
+            outline["fingerprint"] = old_outline["fingerprint"]
+        return 0.0
+    try:
+        text = (discuss_dir / "outline.md").read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        outline.pop("fingerprint", None)
+        return None
+    count("bytes_read", outline.get("size", len(text)))
+    outline["fingerprint"] = fingerprint(text)
+    return change_magnitude(old_outline.get("fingerprint"), outline["fingerprint"])
 
 
-def compare_and_update(old_state: Dict[str, Any], new_state: Dict[str, Any]) -> int:
+def _same_content(old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+    """Compare two file entries by digest, or by mtime if either has none."""
+    if old.get("digest") and new.get("digest"):
+        return old["digest"] == new["digest"]
+    return old.get("mtime", 0.0) == new.get("mtime", 0.0)
+
+
+def _files_changed(old_files: List[Dict[str, Any]], new_files: List[Dict[str, Any]]) -> bool:
+    """Check whether files were added, removed or had their content changed."""
+    old_by_name = {item.get("name", ""): item for item in old_files}
+    new_by_name = {item.get("name", ""): item for item in new_files}
+    if old_by_name.keys() != new_by_name.keys():
+        return True
+    return not all(_same_content(old_by_name[name], new_by_name[name]) for name in new_by_name)
+
+
+def compare_and_update(
+    old_state: Dict[str, Any],
+    new_state: Dict[str, Any],
+    magnitude: Optional[float] = None,
+    min_change: float = 0.0,
+) -> int:
     """
     Compare old and new state, update change_count logic.
     
@@ -305,9 +1793,21 @@ def compare_and_update(old_state: Dict[str, Any], new_state: Dict[str, Any]) ->
     - If decisions/notes changed (added/modified/deleted) → change_count = 0 (reset)
     - If outline mtime decreased → don't increase (conservative handling)
     
+    When both states carry content digests (see hash_changed_files), the
+    digests decide instead of mtimes: a file only counts as modified if its
+    content differs (whichever way its mtime moved), so rewrites that keep
+    the content (editors, formatters, git checkout) change nothing.
+
+    An outline content change whose magnitude (see score_outline_change) is
+    below min_change is not a round either; the stored fingerprint is kept
+    so that later edits are measured against the last counted version.
+
     Args:
         old_state: Previous state from snapshot
         new_state: Current state from scan
+        magnitude: Estimated share of the outline that changed, or None if
+                   unknown (any change counts)
+        min_change: Minimum magnitude for an edit to count
         
     Returns:
         Updated change_count
@@ -318,30 +1818,52 @@ def compare_and_update(old_state: Dict[str, Any], new_state: Dict[str, Any]) ->
     new_outline_mtime = new_state.get("outline", {}).get("mtime", 0.0)
     
     # Check if decisions/notes changed
-    old_decisions = _normalize_file_list(old_state.get("decisions", []))
-    new_decisions = _normalize_file_list(new_state.get("decisions", []))
-    old_notes = _normalize_file_list(old_state.get("notes", []))
-    new_notes = _normalize_file_list(new_state.get("notes", []))
-    
-    decisions_changed = old_decisions != new_decisions
-    notes_changed = old_notes != new_notes
+    decisions_changed = _files_changed(
+        old_state.get("decisions", []), new_state.get("decisions", [])
+    )
+    notes_changed = _files_changed(old_state.get("notes", []), new_state.get("notes", []))
     
     # If decisions or notes changed, reset change_count
     if decisions_changed or notes_changed:
-        log_debug(f"Decisions/notes changed, resetting change_count to 0")
+        log_debug("Decisions/notes changed, resetting change_count to 0")
         new_state["outline"]["change_count"] = 0
         return 0
     
-    # Check outline mtime change
+    # Check outline change by content when both sides have a digest
+    old_digest = old_state.get("outline", {}).get("digest")
+    new_digest = new_state.get("outline", {}).get("digest")
+    if old_digest and new_digest:
+        if old_digest == new_digest:
+            log_debug("Outline content unchanged, keeping change_count: %s", old_change_count)
+            new_state["outline"]["change_count"] = old_change_count
+            return old_change_count
+        if magnitude is not None and magnitude < min_change:
+            log_debug(
+                "Minor outline edit (%.2f < %.2f), keeping change_count: %s",
+                magnitude,
+                min_change,
+                old_change_count,
+            )
+            new_state["outline"]["change_count"] = old_change_count
+            new_state["outline"]["fingerprint"] = old_state["outline"]["fingerprint"]
+            return old_change_count
+        new_change_count = old_change_count + 1
+        log_debug(
+            "Outline content changed, change_count: %s -> %s", old_change_count, new_change_count
+        )
+        new_state["outline"]["change_count"] = new_change_count
+        return new_change_count
+
+    # Otherwise check outline mtime change
     if new_outline_mtime > old_outline_mtime:
         # Outline was modified, increment change_count
         new_change_count = old_change_count + 1
-        log_debug(f"Outline modified, change_count: {old_change_count} -> {new_change_count}")
+        log_debug("Outline modified, change_count: %s -> %s", old_change_count, new_change_count)
         new_state["outline"]["change_count"] = new_change_count
         return new_change_count
     elif new_outline_mtime < old_outline_mtime:
         # Outline mtime decreased (file discarded?), conservative handling
-        log_debug(f"Outline mtime decreased, keeping change_count: {old_change_count}")
+        log_debug("Outline mtime decreased, keeping change_count: %s", old_change_count)
         new_state["outline"]["change_count"] = old_change_count
         return old_change_count
     else:
@@ -350,53 +1872,163 @@ def compare_and_update(old_state: Dict[str, Any], new_state: Dict[str, Any]) ->
         return old_change_count
 
 
-def _normalize_file_list(file_list: List[Dict[str, Any]]) -> List[Tuple[str, float]]:
-    """
-    Normalize file list for comparison.
-    
-    Args:
-        file_list: List of file dictionaries
-        
-    Returns:
-        List of (name, mtime) tuples
-    """
-    result = []
-    for item in file_list:
-        name = item.get("name", "")
-        mtime = item.get("mtime", 0.0)
-        result.append((name, mtime))
-    return sorted(result)
-
-
-def cleanup_deleted_discussions(snapshot: Dict[str, Any], discuss_root: Path) -> int:
+def cleanup_deleted_discussions(
+    snapshot: Dict[str, Any],
+    discuss_root: Path,
+    existing_keys: Optional[Set[str]] = None,
+    workers: int = 1,
+) -> int:
     """
     Remove entries for discussions that no longer exist.
     
     Args:
         snapshot: Snapshot dictionary
         discuss_root: Path to .discuss directory
+        existing_keys: Keys of all existing discussions (e.g. from
+                       get_index_keys); if given, no paths are stat'ed
+        workers: Threads used to check the paths otherwise (1 = serial)
         
     Returns:
         Number of discussions cleaned up
     """
     discussions = snapshot.get("discussions", {})
     cleaned = 0
+    keys = list(discussions.keys())
     
-    for key in list(discussions.keys()):
+    def check_key(key: str) -> Tuple[bool, Optional[Exception]]:
+        if existing_keys is not None:
+            return key in existing_keys, None
         # Reconstruct path from key
         try:
-            discuss_path = discuss_root / key
-            if not discuss_path.exists() or not discuss_path.is_dir():
-                del discussions[key]
-                cleaned += 1
-                log_debug(f"Removed deleted discussion from snapshot: {key}")
+            return (discuss_root / key).is_dir(), None
         except (ValueError, OSError) as e:
+            return False, e
+
+    for key, (exists, error) in zip(keys, _map_ordered(check_key, keys, workers)):
+        if exists:
+            continue
+        del discussions[key]
+        cleaned += 1
+        if error is None:
+            log_debug("Removed deleted discussion from snapshot: %s", key)
+        else:
             # Invalid key or path error, remove it
-            del discussions[key]
-            cleaned += 1
-            log_warning(f"Removed invalid discussion key from snapshot: {key} ({e})")
+            log_warning(f"Removed invalid discussion key from snapshot: {key} ({error})")
     
     if cleaned > 0:
         log_info(f"Cleaned up {cleaned} deleted discussion(s) from snapshot")
+        if isinstance(snapshot, Snapshot):
+            snapshot.dirty = True
     
     return cleaned
+
+
+def archive_idle_discussions(
+    snapshot: Dict[str, Any],
+    index: Dict[str, Any],
+    max_age_days: float,
+    keep_keys: Set[str] = frozenset(),
+    existing_keys: Optional[Set[str]] = None,
+) -> int:
+    """
+    Move states of discussions idle for more than max_age_days to the archive.
+
+    Idleness is the newest file mtime recorded for the topic in the
+    directory index. The move happens on the next save_snapshot; the key is
+    listed in snapshot["archived"] so that restore_archived_discussions knows
+    when the archive must be read.
+
+    Args:
+        snapshot: Snapshot (only Snapshot instances can be archived from)
+        index: Directory index of this run
+        max_age_days: Idle days before archiving (0 disables archiving)
+        keep_keys: Keys never archived (e.g. the active discussions)
+        existing_keys: Keys of all existing discussions; archived keys not in
+                       it are dropped from the archive (None: keep all)
+
+    Returns:
+        Number of discussions archived
+    """
+    if not isinstance(snapshot, Snapshot):
+        return 0
+
+    discussions = snapshot.get("discussions", {})
+    archived_keys = set(snapshot.get("archived", []))
+    listed = set(archived_keys)
+    archived = 0
+
+    if max_age_days > 0:
+        cutoff = time.time() - max_age_days * 86400
+        newest_by_key = {
+            f"{date_name}/{topic_name}": topic.get("newest")
+            for date_name, date_entry in index.get("dates", {}).items()
+            for topic_name, topic in date_entry.get("topics", {}).items()
+        }
+        for key in list(discussions):
+            newest = newest_by_key.get(key)
+            if key in keep_keys or newest is None or newest > cutoff:
+                continue
+            snapshot.archive_updates[key] = discussions[key]
+            del discussions[key]
+            archived_keys.add(key)
+            archived += 1
+            log_debug("Archived idle discussion: %s", key)
+
+    if existing_keys is not None:
+        for key in archived_keys - existing_keys:
+            # Deleted while archived
+            archived_keys.discard(key)
+            snapshot.archive_updates[key] = None
+
+    if archived_keys != listed:
+        if archived_keys:
+            snapshot["archived"] = sorted(archived_keys)
+        else:
+            snapshot.pop("archived", None)
+        snapshot.dirty = True
+    if archived:
+        incr("discussions_archived", archived)
+        log_info(f"Archived {archived} idle discussion(s)")
+    return archived
+
+
+def restore_archived_discussions(
+    snapshot: Dict[str, Any], discuss_root: Path, keys: List[str]
+) -> int:
+    """
+    Bring archived discussions back into the snapshot, keeping their history.
+
+    The archive is only read if one of the keys is listed as archived.
+
+    Args:
+        snapshot: Snapshot dictionary
+        discuss_root: Path to .discuss directory
+        keys: Keys of discussions about to be compared (the active ones)
+
+    Returns:
+        Number of discussions restored
+    """
+    archived_keys = set(snapshot.get("archived", []))
+    wanted = [key for key in keys if key in archived_keys]
+    if not wanted:
+        return 0
+
+    archive = load_archive(discuss_root)
+    updates = getattr(snapshot, "archive_updates", {})
+    discussions = snapshot.setdefault("discussions", {})
+    for key in wanted:
+        state = updates.get(key) or archive.get(key)
+        if state is not None and key not in discussions:
+            discussions[key] = state
+        archived_keys.discard(key)
+        updates[key] = None
+        log_debug("Restored archived discussion: %s", key)
+
+    if archived_keys:
+        snapshot["archived"] = sorted(archived_keys)
+    else:
+        snapshot.pop("archived", None)
+    if isinstance(snapshot, Snapshot):
+        snapshot.dirty = True
+    incr("discussions_restored", len(wanted))
+    return len(wanted)
@@ -0,0 +1,202 @@
+"""
+Sharded snapshot layout (optional).
+
+The default layout keeps every discussion in one snapshot file, so each run
+parses and rewrites the whole history. The sharded layout splits it:
+
+    .discuss/.state/
+        manifest.json                  # version, config, journal, keys, revision
+        index.json                     # directory index (see snapshot_manager)
+        2026-01-30/
+            topic-slug.json            # one discussion's state
+
+Discussion states are only read when a run looks them up (in practice, the
+active discussions) and only the shards whose content changed are written.
+The manifest is rewritten on every save with an incremented revision, so
+its content digest tells concurrent writers that the snapshot changed (see
+snapshot_lock.py).
+
+Shards, index and manifest are always compact JSON; config.snapshot_format
+only applies to the single-file layout. The layout in use is whatever is on
+disk: a manifest means sharded. snapshot_manager.convert_snapshot_layout
+switches between the two.
+"""
+
+import hashlib
+import json
+import os
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from .logging_utils import log_warning
+from .metrics import count
+
+# Directory under .discuss/ holding the sharded snapshot
+STATE_DIR_NAME = ".state"
+
+# Manifest and index file names under the state directory
+MANIFEST_FILE_NAME = "manifest.json"
+INDEX_FILE_NAME = "index.json"
+
+# Suffix of discussion state files
+SHARD_SUFFIX = ".json"
+
+# Layout names (convert_snapshot_layout, manifest "layout" field)
+LAYOUT_SINGLE = "single"
+LAYOUT_SHARDED = "sharded"
+
+
+def get_state_dir(discuss_root: Path) -> Path:
+    """Get the sharded snapshot directory under a .discuss directory."""
+    return discuss_root / STATE_DIR_NAME
+
+
+def get_manifest_path(discuss_root: Path) -> Path:
+    """Get the path to the sharded snapshot manifest."""
+    return get_state_dir(discuss_root) / MANIFEST_FILE_NAME
+
+
+def is_sharded(discuss_root: Path) -> bool:
+    """Check whether a .discuss directory uses the sharded layout."""
+    return get_manifest_path(discuss_root).is_file()
+
+
+def get_shard_path(state_dir: Path, discuss_key: str) -> Path:
+    """Get the state file of a discussion key ("YYYY-MM-DD/topic-slug")."""
+    return state_dir / (discuss_key + SHARD_SUFFIX)
+
+
+def encode(data: Any) -> bytes:
+    """Encode a manifest, index or shard (compact JSON)."""
+    return json.dumps(data, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def decode(data: bytes) -> Any:
+    """Decode a manifest, index or shard."""
+    return json.loads(data.decode("utf-8"))
+
+
+def content_digest(data: bytes) -> str:
+    """Digest of a file's content (same as the single-file snapshot's)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def read_file(path: Path) -> Optional[Tuple[Any, str]]:
+    """
+    Read and decode a state file.
+
+    Args:
+        path: File path
+
+    Returns:
+        (decoded data, content digest), or None if missing or unreadable
+    """
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        count("bytes_read", len(raw))
+        return decode(raw), content_digest(raw)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log_warning(f"Unreadable snapshot shard {path.name}: {e}")
+        return None
+
+
+def list_shard_keys(state_dir: Path) -> Set[str]:
+    """List the discussion keys that have a state file (used by conversion)."""
+    keys = set()
+    try:
+        date_entries = list(os.scandir(state_dir))
+    except OSError:
+        return keys
+    for date_entry in date_entries:
+        if not date_entry.is_dir():
+            continue
+        try:
+            with os.scandir(date_entry.path) as it:
+                for entry in it:
+                    if entry.name.endswith(SHARD_SUFFIX) and entry.is_file():
+                        keys.add(f"{date_entry.name}/{entry.name[:-len(SHARD_SUFFIX)]}")
+        except OSError:
+            continue
+    return keys
+
+
+class ShardedDiscussions(MutableMapping):
+    """
+    Discussion states of a sharded snapshot, read from their shards on demand.
+
+    Iterating or taking the length only uses the key list of the manifest.
+    Also carries the bookkeeping needed to save only what changed: digests
+    of the shards and index as read, keys deleted since loading, and the
+    manifest revision.
+    """
+
+    def __init__(self, state_dir: Path, keys: Iterable[str] = (), revision: int = 0):
+        self.state_dir = state_dir
+        self.revision = revision
+        self.index_digest: Optional[str] = None
+        self._keys: Set[str] = set(keys)
+        self._states: Dict[str, Any] = {}
+        self._digests: Dict[str, str] = {}
+        self._deleted: Set[str] = set()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys:
+            raise KeyError(key)
+        if key not in self._states:
+            found = read_file(get_shard_path(self.state_dir, key))
+            if found is None:
+                # Listed but missing or corrupt: history for it is lost
+                self._states[key] = {}
+                self._digests[key] = content_digest(encode({}))
+            else:
+                self._states[key], self._digests[key] = found
+        return self._states[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._keys.add(key)
+        self._states[key] = value
+        self._deleted.discard(key)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._keys:
+            raise KeyError(key)
+        self._keys.discard(key)
+        self._states.pop(key, None)
+        self._deleted.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"ShardedDiscussions({len(self._keys)} keys, {len(self._states)} loaded)"
+
+    def pending_writes(self) -> Dict[str, bytes]:
+        """Encoded states of loaded or new discussions whose shard content changed."""
+        writes = {}
+        for key, state in self._states.items():
+            data = encode(state)
+            if self._digests.get(key) != content_digest(data):
+                writes[key] = data
+        return writes
+
+    def pending_deletes(self) -> Set[str]:
+        """Keys whose shard must be removed."""
+        return set(self._deleted)
+
+    def mark_saved(self, written: Dict[str, bytes]) -> None:
+        """Record shards as written (after a successful save)."""
+        for key, data in written.items():
+            self._digests[key] = content_digest(data)
+        for key in self._deleted:
+            self._digests.pop(key, None)
+        self._deleted.clear()
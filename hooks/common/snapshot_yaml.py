@@ -0,0 +1,382 @@
+"""
+Dependency-free reader/writer for the snapshot YAML dialect.
+
+The snapshot has a narrow, fixed schema (version/config/discussions ->
+outline/decisions/notes) and is normally written by this module or by
+yaml.safe_dump(sort_keys=False, allow_unicode=True, default_flow_style=False).
+This module handles exactly that block-style subset with the standard
+library only, so the hooks don't need to import PyYAML on every turn.
+
+Supported subset:
+- Block mappings with string keys; sequences of mappings/scalars written
+  indentless under their key (PyYAML's default layout)
+- Empty collections as `{}` / `[]`
+- Scalars: int, float (incl. .inf/.nan), true/false, null, and strings made
+  of [A-Za-z0-9_./-] (plain, or single-quoted when PyYAML would resolve them
+  to another type, e.g. '2026-01-30')
+
+Anything else (comments, flow collections, other quoting styles, non-ASCII
+or spaced strings, ...) raises UnsupportedYamlError; callers then fall back
+to PyYAML. Within the subset, dumps() produces the same bytes as
+yaml.safe_dump, so files round-trip byte-for-byte.
+"""
+
+import re
+from typing import Any, Dict, List, Tuple
+
+
+class UnsupportedYamlError(ValueError):
+    """Input is valid for PyYAML but outside the snapshot subset."""
+
+
+# Strings that can be written without quotes (conservative subset of
+# what PyYAML's analyze_scalar allows as plain)
+_SAFE_STRING = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_./-]*\Z")
+
+# Simple keys must be shorter than 128 characters in PyYAML
+_MAX_KEY_LENGTH = 120
+
+# PyYAML's implicit resolvers (yaml/resolver.py); a string matching one of
+# these must be quoted to stay a string
+_IMPLICIT_RESOLVER_PATTERNS = [
+    re.compile(
+        r"""^(?:yes|Yes|YES|no|No|NO
+                |true|True|TRUE|false|False|FALSE
+                |on|On|ON|off|Off|OFF)$""",
+        re.X,
+    ),
+    re.compile(
+        r"""^(?:[-+]?(?:[0-9][0-9_]*)\.[0-9_]*(?:[eE][-+][0-9]+)?
+                |\.[0-9][0-9_]*(?:[eE][-+][0-9]+)?
+                |[-+]?[0-9][0-9_]*(?::[0-5]?[0-9])+\.[0-9_]*
+                |[-+]?\.(?:inf|Inf|INF)
+                |\.(?:nan|NaN|NAN))$""",
+        re.X,
+    ),
+    re.compile(
+        r"""^(?:[-+]?0b[0-1_]+
+                |[-+]?0[0-7_]+
+                |[-+]?(?:0|[1-9][0-9_]*)
+                |[-+]?0x[0-9a-fA-F_]+
+                |[-+]?[1-9][0-9_]*(?::[0-5]?[0-9])+)$""",
+        re.X,
+    ),
+    re.compile(r"^(?:<<)$"),
+    re.compile(
+        r"""^(?: ~
+                |null|Null|NULL
+                | )$""",
+        re.X,
+    ),
+    re.compile(
+        r"""^(?:[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]
+                |[0-9][0-9][0-9][0-9] -[0-9][0-9]? -[0-9][0-9]?
+                 (?:[Tt]|[ \t]+)[0-9][0-9]?
+                 :[0-9][0-9] :[0-9][0-9] (?:\.[0-9]*)?
+                 (?:[ \t]*(?:Z|[-+][0-9][0-9]?(?::[0-9][0-9])?))?)$""",
+        re.X,
+    ),
+    re.compile(r"^(?:=)$"),
+]
+_IMPLICIT = re.compile("|".join(f"(?:{p.pattern})" for p in _IMPLICIT_RESOLVER_PATTERNS), re.X)
+
+# Scalars the reader converts itself (canonical forms written by PyYAML)
+_INT = re.compile(r"-?(?:0|[1-9][0-9]*)\Z")
+_FLOAT = re.compile(r"-?[0-9]+\.[0-9]*(?:e[-+][0-9]+)?\Z")
+_SPECIAL_FLOATS = {".inf": float("inf"), "-.inf": float("-inf"), ".nan": float("nan")}
+_CONSTANTS = {"true": True, "false": False, "null": None, "~": None}
+
+
+# Keys repeat on every discussion entry; cache their formatted/parsed forms
+_KEY_CACHE_LIMIT = 1024
+_formatted_keys: Dict[str, str] = {}
+_parsed_keys: Dict[str, str] = {}
+
+
+def _is_implicit(value: str) -> bool:
+    """Check whether PyYAML would resolve a plain scalar to a non-string."""
+    return _IMPLICIT.match(value) is not None
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+
+def _format_float(value: float) -> str:
+    """Format a float like PyYAML's SafeRepresenter.represent_float."""
+    if value != value:
+        return ".nan"
+    if value == float("inf"):
+        return ".inf"
+    if value == float("-inf"):
+        return "-.inf"
+    text = repr(value).lower()
+    if "." not in text and "e" in text:
+        text = text.replace("e", ".0e", 1)
+    return text
+
+
+def _format_scalar(value: Any) -> str:
+    """Format a scalar value, raising UnsupportedYamlError outside the subset."""
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if type(value) is int:
+        return str(value)
+    if type(value) is float:
+        return _format_float(value)
+    if type(value) is str and _SAFE_STRING.match(value):
+        return f"'{value}'" if _is_implicit(value) else value
+    raise UnsupportedYamlError(f"Unsupported scalar: {value!r}")
+
+
+def _format_key(key: Any) -> str:
+    """Format a mapping key (cached, keys repeat across entries)."""
+    formatted = _formatted_keys.get(key) if type(key) is str else None
+    if formatted is not None:
+        return formatted
+    if type(key) is not str or len(key) > _MAX_KEY_LENGTH:
+        raise UnsupportedYamlError(f"Unsupported key: {key!r}")
+    formatted = _format_scalar(key)
+    if len(_formatted_keys) < _KEY_CACHE_LIMIT:
+        _formatted_keys[key] = formatted
+    return formatted
+
+
+def _emit_mapping(
+    mapping: Dict[str, Any], indent: int, out: List[str], first_prefix: str = ""
+) -> None:
+    """
+    Emit a non-empty block mapping.
+
+    first_prefix replaces the indentation of the first line (used for
+    mappings that start on a sequence item's "- " line).
+    """
+    pad = " " * indent
+    prefix = first_prefix or pad
+    for key, value in mapping.items():
+        line = f"{prefix}{_format_key(key)}:"
+        prefix = pad
+        if isinstance(value, dict) and type(value) is not dict:
+            value = dict(value)
+        if type(value) is dict:
+            if value:
+                out.append(line + "\n")
+                _emit_mapping(value, indent + 2, out)
+            else:
+                out.append(line + " {}\n")
+        elif type(value) is list:
+            if value:
+                out.append(line + "\n")
+                _emit_sequence(value, indent, out)
+            else:
+                out.append(line + " []\n")
+        else:
+            out.append(f"{line} {_format_scalar(value)}\n")
+
+
+def _emit_sequence(sequence: List[Any], indent: int, out: List[str]) -> None:
+    """Emit a non-empty, indentless block sequence."""
+    pad = " " * indent
+    for item in sequence:
+        if type(item) is dict:
+            if item:
+                _emit_mapping(item, indent + 2, out, first_prefix=pad + "- ")
+            else:
+                out.append(pad + "- {}\n")
+        elif type(item) is list:
+            raise UnsupportedYamlError("Nested sequences are not supported")
+        else:
+            out.append(f"{pad}- {_format_scalar(item)}\n")
+
+
+def dumps(snapshot: Dict[str, Any]) -> str:
+    """
+    Serialize a snapshot to YAML text.
+
+    Args:
+        snapshot: Snapshot dictionary
+
+    Returns:
+        YAML text identical to yaml.safe_dump(snapshot, sort_keys=False,
+        allow_unicode=True, default_flow_style=False)
+
+    Raises:
+        UnsupportedYamlError: If the snapshot contains values outside the subset
+    """
+    if not isinstance(snapshot, dict):
+        raise UnsupportedYamlError("Top-level value must be a mapping")
+    if not snapshot:
+        return "{}\n"
+    out: List[str] = []
+    _emit_mapping(snapshot, 0, out)
+    return "".join(out)
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+
+
+def _parse_scalar(token: str) -> Any:
+    """Convert a scalar token to a Python value."""
+    if token.startswith("'"):
+        if len(token) < 2 or not token.endswith("'") or "'" in token[1:-1]:
+            raise UnsupportedYamlError(f"Unsupported quoted scalar: {token}")
+        return token[1:-1]
+    if token in _CONSTANTS:
+        return _CONSTANTS[token]
+    if _FLOAT.match(token):
+        return float(token)
+    if _INT.match(token):
+        return int(token)
+    if token in _SPECIAL_FLOATS:
+        return _SPECIAL_FLOATS[token]
+    if _SAFE_STRING.match(token) and not _is_implicit(token):
+        return token
+    raise UnsupportedYamlError(f"Unsupported scalar: {token}")
+
+
+def _parse_value(token: str) -> Any:
+    if token == "{}":
+        return {}
+    if token == "[]":
+        return []
+    return _parse_scalar(token)
+
+
+def _split_key(text: str) -> Tuple[str, str]:
+    """
+    Split "key: value" / "key:" into (key, value token).
+
+    Raises:
+        UnsupportedYamlError: If the line is not a simple key/value pair
+    """
+    if text.startswith("'"):
+        end = text.find("'", 1)
+        if end < 0:
+            raise UnsupportedYamlError(f"Unterminated quoted key: {text}")
+        key_token, rest = text[: end + 1], text[end + 1 :]
+    else:
+        colon = text.find(":")
+        if colon < 0:
+            raise UnsupportedYamlError(f"Expected 'key: value': {text}")
+        key_token, rest = text[:colon], text[colon:]
+
+    if rest == ":":
+        value = ""
+    elif rest.startswith(": ") and rest[2:].strip() == rest[2:] and rest[2:]:
+        value = rest[2:]
+    else:
+        raise UnsupportedYamlError(f"Expected 'key: value': {text}")
+
+    key = _parsed_keys.get(key_token)
+    if key is None:
+        key = _parse_scalar(key_token)
+        if type(key) is not str:
+            raise UnsupportedYamlError(f"Unsupported key: {key_token}")
+        if len(_parsed_keys) < _KEY_CACHE_LIMIT:
+            _parsed_keys[key_token] = key
+    return key, value
+
+
+class _Reader:
+    """Recursive-descent reader over (indent, text) lines."""
+
+    def __init__(self, text: str):
+        if "\t" in text or "\r" in text:
+            raise UnsupportedYamlError("Tabs and carriage returns are not supported")
+        self.lines: List[Tuple[int, str]] = []
+        for raw in text.split("\n"):
+            if not raw:
+                continue
+            content = raw.lstrip(" ")
+            if not content or content != content.rstrip():
+                raise UnsupportedYamlError("Blank or trailing-space lines are not supported")
+            if content.startswith(("#", "---", "...", "%")):
+                raise UnsupportedYamlError(f"Unsupported line: {raw}")
+            self.lines.append((len(raw) - len(content), content))
+        self.pos = 0
+
+    def peek(self) -> Tuple[int, str]:
+        if self.pos < len(self.lines):
+            return self.lines[self.pos]
+        return (-1, "")
+
+    def read_document(self) -> Dict[str, Any]:
+        if not self.lines:
+            raise UnsupportedYamlError("Empty document")
+        indent, text = self.lines[0]
+        if indent != 0:
+            raise UnsupportedYamlError("Document must start at column 0")
+        if text == "{}" and len(self.lines) == 1:
+            return {}
+        result = self.read_mapping(0)
+        if self.pos != len(self.lines):
+            raise UnsupportedYamlError(f"Unexpected content: {self.lines[self.pos][1]}")
+        return result
+
+    def read_mapping(self, indent: int) -> Dict[str, Any]:
+        mapping: Dict[str, Any] = {}
+        while True:
+            line_indent, text = self.peek()
+            if line_indent != indent or text.startswith("-"):
+                break
+            self.pos += 1
+            key, token = _split_key(text)
+            if key in mapping:
+                raise UnsupportedYamlError(f"Duplicate key: {key}")
+            if token:
+                mapping[key] = _parse_value(token)
+            else:
+                mapping[key] = self.read_block(indent)
+        if not mapping:
+            raise UnsupportedYamlError("Expected a mapping")
+        return mapping
+
+    def read_block(self, parent_indent: int) -> Any:
+        """Read the collection nested under "key:" at parent_indent."""
+        line_indent, text = self.peek()
+        if line_indent == parent_indent and text.startswith("- "):
+            return self.read_sequence(parent_indent)
+        if line_indent > parent_indent and not text.startswith("-"):
+            return self.read_mapping(line_indent)
+        # "key:" with nothing nested is null in YAML
+        return None
+
+    def read_sequence(self, indent: int) -> List[Any]:
+        sequence: List[Any] = []
+        while True:
+            line_indent, text = self.peek()
+            if line_indent != indent or not text.startswith("- "):
+                break
+            item = text[2:]
+            is_mapping = (": " in item or item.endswith(":")) and not item.startswith("'")
+            if item in ("{}", "[]") or not is_mapping:
+                self.pos += 1
+                sequence.append(_parse_value(item))
+            else:
+                # Mapping item: first key shares the "- " line
+                self.lines[self.pos] = (indent + 2, item)
+                sequence.append(self.read_mapping(indent + 2))
+        return sequence
+
+
+def loads(text: str) -> Dict[str, Any]:
+    """
+    Parse snapshot YAML text.
+
+    Args:
+        text: YAML text
+
+    Returns:
+        Parsed snapshot dictionary (same result as yaml.safe_load)
+
+    Raises:
+        UnsupportedYamlError: If the text is outside the supported subset
+    """
+    return _Reader(text).read_document()
@@ -0,0 +1,307 @@
+"""
+Verdict cache: skip the whole check when nothing under .discuss changed.
+
+Most Stop events follow turns that touched no discussion file. After a
+check that allowed the stop, the check writes .discuss/.verdict-cache.json
+with a fingerprint of everything its verdict depends on; the next hook
+compares the fingerprint with the filesystem and, if it still matches,
+prints the cached verdict without loading the snapshot, walking the tree,
+saving or logging.
+
+Fingerprint (values observed during the check, never after it, so a change
+made while the check ran is a mismatch):
+- Hook environment that changes the verdict (CACHE_KEY_ENV)
+- Stat signature of the snapshot file (saved by this check, or as loaded):
+  another session's save or a config edit is a mismatch
+- Names in the .discuss directory (dot entries excepted, listed before the
+  scan; its mtime also changes with every snapshot save) and the mtime of
+  every date directory: dates and topics added, removed or renamed
+- The change journal position, if a live watcher keeps one: while the
+  journal has not grown, has been quiet for JOURNAL_SETTLE seconds and its
+  watcher runs, the per-topic stats below are skipped
+- Per topic, the mtimes of its directory, outline.md, decisions/ and
+  notes/ (as in the directory index): in-place outline edits, files added
+  or removed, even in discussions idle for weeks
+- For active discussions, the mtime and size of the outline and of each
+  decision and note: in-place edits that change no directory mtime. These
+  are always checked, journal or not: the watcher appends an event shortly
+  after the edit, and the turn that just ended most likely edited an
+  active discussion
+
+A hit therefore costs one read, a listing of .discuss, one stat per tracked
+file of the active discussions and, without a settled journal, one stat per
+date directory and up to four per topic (the same stats the directory index
+makes), but none of the imports, the snapshot parse, the walk of active
+discussions or the log write. Only allow verdicts are cached (reminders
+depend on the platform and are rare); single-root mode only.
+
+This module is imported on the hook's hot path: keep it limited to
+json/os/time (no typing, no other common.* modules).
+
+Environment:
+- DISCUSS_HOOKS_NO_CACHE: Set to "1" to neither read nor write the cache
+"""
+
+import json
+import os
+import time
+
+# Cache file name under .discuss/
+CACHE_FILE_NAME = ".verdict-cache.json"
+
+# Cache format version
+CACHE_VERSION = 1
+
+# Environment variable disabling the cache
+NO_CACHE_ENV = "DISCUSS_HOOKS_NO_CACHE"
+
+# Environment variables whose values are part of the fingerprint (they
+# change the verdict or what a check writes; see snapshot_manager.py)
+CACHE_KEY_ENV = (
+    "DISCUSS_REMINDER_MODE",
+    "DISCUSS_MIN_OUTLINE_CHANGE",
+    "DISCUSS_SNAPSHOT_FORMAT",
+    "DISCUSS_SNAPSHOT_ARCHIVE_DAYS",
+)
+
+# Seconds after which a cached verdict is checked again anyway, so that
+# maintenance (archiving idle discussions) is not deferred indefinitely
+CACHE_MAX_AGE = 3600.0
+
+# Seconds the change journal must have been quiet before it vouches for the
+# tree: the watcher appends events as it reads them, so a journal written
+# just now may still be catching up with a burst of changes
+JOURNAL_SETTLE = 1.0
+
+# (index key, entry name) of the per-topic stats, as in the directory index
+_TOPIC_ENTRIES = (
+    ("mtime", ""),
+    ("outline", "outline.md"),
+    ("decisions", "decisions"),
+    ("notes", "notes"),
+)
+
+
+def is_cache_enabled() -> bool:
+    """Check whether the verdict cache is used (DISCUSS_HOOKS_NO_CACHE not set)."""
+    return os.environ.get(NO_CACHE_ENV) != "1"
+
+
+def get_cache_path(discuss_root) -> str:
+    """Get the path to the verdict cache under a .discuss directory."""
+    return os.path.join(str(discuss_root), CACHE_FILE_NAME)
+
+
+def get_root_names(discuss_root) -> "list | None":
+    """Sorted names in a .discuss directory, dot entries excepted, or None."""
+    try:
+        return sorted(name for name in os.listdir(str(discuss_root)) if not name.startswith("."))
+    except OSError:
+        return None
+
+
+def _cache_env() -> dict:
+    """Values of CACHE_KEY_ENV (unset ones omitted)."""
+    return {name: os.environ[name] for name in CACHE_KEY_ENV if name in os.environ}
+
+
+def _read_journal_header(path: str) -> "tuple[dict, os.stat_result] | None":
+    """Header of the change journal and its stat result, or None if unreadable."""
+    try:
+        with open(path, "rb") as f:
+            header = json.loads(f.readline().decode("utf-8"))
+            st = os.fstat(f.fileno())
+    except (OSError, ValueError):
+        return None
+    return (header, st) if isinstance(header, dict) else None
+
+
+def _journal_unchanged(discuss_root: str, journal: dict) -> bool:
+    """Check that the journal has not grown since the check, has settled, and its watcher runs."""
+    read = _read_journal_header(os.path.join(discuss_root, ".journal"))
+    if read is None:
+        return False
+    header, st = read
+    pid = header.get("pid")
+    if (
+        header.get("id") != journal.get("id")
+        or pid != journal.get("pid")
+        or st.st_size != journal.get("offset")
+    ):
+        return False
+    if time.time() - st.st_mtime < JOURNAL_SETTLE:
+        return False
+    if not isinstance(pid, int) or pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _same_mtime(path: str, mtime: float) -> bool:
+    try:
+        return os.stat(path).st_mtime == mtime
+    except OSError:
+        return False
+
+
+def build_fingerprint(
+    discuss_root,
+    root_names: "list | None",
+    snapshot_signature,
+    index: dict,
+    active_states: dict,
+    journal_position: "dict | None" = None,
+) -> "dict | None":
+    """
+    Build the cache record of a check that allowed the stop.
+
+    Args:
+        discuss_root: Path to .discuss directory
+        root_names: get_root_names() taken before the scan
+        snapshot_signature: (path, inode, size, mtime_ns) of the snapshot
+                            file as saved (or loaded) by the check
+        index: Directory index of the check (snapshot["index"])
+        active_states: Discussion states of the active discussions, by key
+        journal_position: Journal position the check read up to, if any
+
+    Returns:
+        Cache record, or None if the check cannot be cached (unreadable
+        .discuss, no snapshot file, or an index left incomplete by the
+        deadline)
+    """
+    if root_names is None or snapshot_signature is None or index.get("cursor"):
+        return None
+
+    journal = None
+    if journal_position:
+        read = _read_journal_header(os.path.join(str(discuss_root), ".journal"))
+        if read is not None and read[0].get("id") == journal_position.get("id"):
+            journal = dict(journal_position, pid=read[0].get("pid"))
+
+    files = {}
+    for key, state in active_states.items():
+        outline = state.get("outline") or {}
+        if outline.get("mtime"):
+            files[f"{key}/outline.md"] = [outline["mtime"], outline.get("size")]
+        for kind in ("decisions", "notes"):
+            for item in state.get(kind, []):
+                files[f"{key}/{kind}/{item['name']}"] = [item["mtime"], item.get("size")]
+
+    return {
+        "version": CACHE_VERSION,
+        "created": time.time(),
+        "verdict": {},
+        "env": _cache_env(),
+        "snapshot": list(snapshot_signature),
+        "names": root_names,
+        "journal": journal,
+        "dates": {
+            date_name: {
+                "mtime": date.get("mtime"),
+                "topics": {
+                    topic_name: [topic.get(key, 0.0) for key, _ in _TOPIC_ENTRIES]
+                    for topic_name, topic in (date.get("topics") or {}).items()
+                },
+            }
+            for date_name, date in (index.get("dates") or {}).items()
+        },
+        "files": files,
+    }
+
+
+def write_verdict_cache(discuss_root, record: "dict | None") -> bool:
+    """
+    Store a cache record (atomically), or remove the cache if record is None.
+
+    Args:
+        discuss_root: Path to .discuss directory
+        record: Record from build_fingerprint, or None
+
+    Returns:
+        True if a record was written
+    """
+    path = get_cache_path(discuss_root)
+    if record is None:
+        remove_verdict_cache(discuss_root)
+        return False
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def remove_verdict_cache(discuss_root) -> None:
+    """Remove the verdict cache (after a reminder or an incomplete check)."""
+    try:
+        os.remove(get_cache_path(discuss_root))
+    except OSError:
+        pass
+
+
+def cached_verdict(discuss_root) -> "dict | None":
+    """
+    Return the cached verdict if nothing it depends on changed.
+
+    Args:
+        discuss_root: Path to .discuss directory
+
+    Returns:
+        Hook output, or None if the check must run
+    """
+    discuss_root = str(discuss_root)
+    try:
+        with open(get_cache_path(discuss_root), "rb") as f:
+            record = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(record, dict) or record.get("version") != CACHE_VERSION:
+        return None
+
+    try:
+        if (
+            not 0 <= time.time() - record["created"] < CACHE_MAX_AGE
+            or record["env"] != _cache_env()
+        ):
+            return None
+
+        snapshot_path, inode, size, mtime_ns = record["snapshot"]
+        st = os.stat(snapshot_path)
+        if (st.st_ino, st.st_size, st.st_mtime_ns) != (inode, size, mtime_ns):
+            return None
+        if get_root_names(discuss_root) != record["names"]:
+            return None
+
+        if record["journal"] is None or not _journal_unchanged(discuss_root, record["journal"]):
+            for date_name, date in record["dates"].items():
+                date_path = os.path.join(discuss_root, date_name)
+                if not _same_mtime(date_path, date["mtime"]):
+                    return None
+                for topic_name, mtimes in date["topics"].items():
+                    topic_path = os.path.join(date_path, topic_name)
+                    for (_, name), mtime in zip(_TOPIC_ENTRIES, mtimes):
+                        # A missing entry that appears changes the topic's mtime
+                        if mtime and not _same_mtime(os.path.join(topic_path, name), mtime):
+                            return None
+        for relative, (mtime, size) in record["files"].items():
+            st = os.stat(os.path.join(discuss_root, relative))
+            if st.st_mtime != mtime or (size is not None and st.st_size != size):
+                return None
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+
+    verdict = record.get("verdict")
+    return verdict if isinstance(verdict, dict) else None
@@ -85,8 +85,9 @@ def copy_hooks_to_install_dir(platform: str) -> Path:
     for file in (HOOKS_DIR / "common").glob("*.py"):
         shutil.copy(file, install_dir / "common" / file.name)
     
-    # Copy hook scripts
-    shutil.copy(CHECK_PRECIPITATION, install_dir / "stop" / "check_precipitation.py")
+    # Copy hook scripts (check_precipitation.py and its optional daemon)
+    for file in (HOOKS_DIR / "stop").glob("*.py"):
+        shutil.copy(file, install_dir / "stop" / file.name)
     
     # Make scripts executable
     (install_dir / "stop" / "check_precipitation.py").chmod(0o755)
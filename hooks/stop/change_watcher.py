@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Change watcher for a workspace's .discuss directory (optional, Linux only).
+
+Watches .discuss/ recursively with inotify and appends changed paths to
+.discuss/.journal. While it runs, the Stop hook replays the journal and
+rescans only the discussions that changed instead of walking the tree.
+Stopping the watcher removes the journal and the hook scans as before.
+
+Usage:
+    python3 change_watcher.py [--workspace PATH]
+"""
+
+import argparse
+import os
+import signal
+import sys
+from pathlib import Path
+
+# Add parent directory to path for common imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.change_journal import ChangeWatcher, is_inotify_supported
+from common.logging_utils import log_info
+
+
+def watch(workspace_root: str) -> int:
+    """
+    Watch workspace_root/.discuss until it is removed or the process is interrupted.
+
+    Args:
+        workspace_root: Workspace root directory
+
+    Returns:
+        Process exit code
+    """
+    discuss_root = os.path.join(workspace_root, ".discuss")
+    if not os.path.isdir(discuss_root):
+        print(f"Error: {discuss_root} is not a directory", file=sys.stderr)
+        return 1
+    if not is_inotify_supported():
+        print("Error: inotify is not available on this platform", file=sys.stderr)
+        return 1
+
+    # Exit through the finally below so the journal is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    watcher = ChangeWatcher(discuss_root)
+    watcher.start()
+    log_info(f"Watching {discuss_root}")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+    log_info("Watcher stopped")
+    return 0
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Journal changes under .discuss/ for the Stop hook"
+    )
+    parser.add_argument(
+        "--workspace",
+        default=os.getcwd(),
+        help="Workspace root containing .discuss (default: current directory)",
+    )
+    args = parser.parse_args()
+    sys.exit(watch(os.path.abspath(args.workspace)))
+
+
+if __name__ == "__main__":
+    main()
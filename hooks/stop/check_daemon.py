@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Resident daemon for the precipitation check (optional).
+
+Runs the same logic as precipitation.run_check, but inside one
+long-lived process that keeps each workspace's snapshot in memory. The
+installed Stop hook forwards its stdin over a Unix domain socket and prints
+the verdict; when the daemon is not running it falls back to the in-process
+check, so starting the daemon is purely an optimization.
+
+Usage:
+    python3 check_daemon.py [--socket PATH] [--idle-timeout SECONDS]
+
+Behavior:
+- Requests are handled one at a time (snapshots and log context are
+  process-global, and a turn only takes milliseconds), each with the
+  DISCUSS_* environment of the hook that sent it
+- Cached snapshots are revalidated against the snapshot file's stat
+  signature, so writes from other processes are picked up
+- The daemon exits after --idle-timeout seconds without requests
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Add parent directory to path for common imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.daemon_client import FORWARDED_ENV_PREFIX, get_socket_path, is_daemon_supported
+from common.logging_utils import log_error, log_info, set_log_format, set_log_level
+from common.metrics import set_timing
+from common.precipitation import run_check
+from common.snapshot_manager import (
+    SnapshotSignature,
+    get_snapshot_signature,
+    load_snapshot,
+    save_snapshot,
+)
+
+# Default idle timeout before the daemon exits (seconds)
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+# Upper bound for a single request
+MAX_REQUEST_BYTES = 1 << 20
+
+# Time a client has to send its request line (seconds); the daemon serves
+# one connection at a time, so a stalled client must not hold it up
+REQUEST_TIMEOUT = 2.0
+
+
+class SnapshotCache:
+    """
+    In-memory snapshots keyed by .discuss root.
+
+    A cached snapshot is reused while the file on disk still has the
+    signature recorded when it was loaded or last saved by the daemon.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Path, Tuple[SnapshotSignature, Dict[str, Any]]] = {}
+
+    def load(self, discuss_root: Path) -> Dict[str, Any]:
+        """Load snapshot, reusing the cached copy when the file is unchanged."""
+        signature = get_snapshot_signature(discuss_root)
+        entry = self._entries.get(discuss_root)
+        if entry is not None and signature is not None and entry[0] == signature:
+            return entry[1]
+
+        snapshot = load_snapshot(discuss_root)
+        self._entries[discuss_root] = (signature, snapshot)
+        return snapshot
+
+    def save(self, discuss_root: Path, snapshot: Dict[str, Any]) -> bool:
+        """Save snapshot and remember the new file signature."""
+        saved = save_snapshot(discuss_root, snapshot)
+        if saved:
+            signature = get_snapshot_signature(discuss_root)
+            self._entries[discuss_root] = (signature, snapshot)
+        else:
+            self.invalidate(discuss_root)
+        return saved
+
+    def invalidate(self, discuss_root: Optional[Path] = None) -> None:
+        """Drop one cached snapshot, or all of them."""
+        if discuss_root is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(discuss_root, None)
+
+
+def _reset_env_settings() -> None:
+    """Make settings read once per process re-read the environment."""
+    set_log_level(None)
+    set_log_format(None)
+    set_timing(None)
+
+
+@contextlib.contextmanager
+def request_environment(env: Optional[Dict[str, str]]) -> Iterator[None]:
+    """
+    Run a request with the hook's DISCUSS_* environment.
+
+    The daemon's own DISCUSS_* variables are replaced for the duration of
+    the request and restored afterwards (requests are handled one at a
+    time, so nothing else sees the change).
+
+    Args:
+        env: DISCUSS_* variables sent by the hook, or None (older clients)
+             to keep the daemon's environment
+    """
+    if env is None:
+        yield
+        return
+
+    saved = {
+        name: value for name, value in os.environ.items() if name.startswith(FORWARDED_ENV_PREFIX)
+    }
+    try:
+        for name in saved:
+            del os.environ[name]
+        os.environ.update(env)
+        _reset_env_settings()
+        yield
+    finally:
+        for name in [name for name in os.environ if name.startswith(FORWARDED_ENV_PREFIX)]:
+            del os.environ[name]
+        os.environ.update(saved)
+        _reset_env_settings()
+
+
+def parse_request_env(value: Any) -> Optional[Dict[str, str]]:
+    """
+    Validate the "env" of a request.
+
+    Returns:
+        DISCUSS_* string variables, or None if the request has none
+
+    Raises:
+        TypeError: If env is not a mapping of DISCUSS_* names to strings
+    """
+    if value is None:
+        return None
+    if not isinstance(value, dict) or not all(
+        isinstance(name, str) and name.startswith(FORWARDED_ENV_PREFIX) and isinstance(item, str)
+        for name, item in value.items()
+    ):
+        raise TypeError("env must map DISCUSS_* names to strings")
+    return value
+
+
+class CheckRequestHandler(socketserver.StreamRequestHandler):
+    """Handle one check request: JSON line in, JSON line out."""
+
+    # Socket timeout (set by StreamRequestHandler.setup)
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self):
+        try:
+            line = self.rfile.readline(MAX_REQUEST_BYTES)
+        except socket.timeout:
+            # No complete request in time: treated as malformed
+            return
+        try:
+            request = json.loads(line.decode("utf-8"))
+            input_data = request.get("input")
+            workspace_root = Path(request["workspace_root"])
+            multi_root = request.get("multi_root") is True
+            env = parse_request_env(request.get("env"))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Malformed request: close without answering, client falls back
+            return
+
+        cache = self.server.snapshot_cache
+        try:
+            with request_environment(env):
+                output = run_check(
+                    input_data,
+                    workspace_root,
+                    load=cache.load,
+                    save=cache.save,
+                    multi_root=multi_root,
+                )
+        except Exception as e:
+            # run_check handles its own errors; this guards the cache state
+            cache.invalidate()
+            log_error("Daemon failed to run check", e)
+            return
+
+        self.wfile.write(json.dumps({"output": output}).encode("utf-8") + b"\n")
+
+
+class CheckDaemon(socketserver.UnixStreamServer):
+    """Single-threaded Unix socket server with an idle timeout."""
+
+    def __init__(self, socket_path: str, idle_timeout: float):
+        self.snapshot_cache = SnapshotCache()
+        self.idle = False
+        self.timeout = idle_timeout
+        super().__init__(socket_path, CheckRequestHandler)
+
+    def handle_timeout(self):
+        self.idle = True
+
+    def serve_until_idle(self) -> None:
+        """Handle requests until no request arrives within the idle timeout."""
+        while not self.idle:
+            self.handle_request()
+
+
+def is_daemon_running(socket_path: str) -> bool:
+    """Check whether a daemon is accepting connections on socket_path."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def prepare_socket_path(socket_path: str) -> bool:
+    """
+    Prepare the socket location before binding.
+
+    Creates the parent directory (mode 0700) and removes a stale socket
+    left behind by a crashed daemon.
+
+    Returns:
+        False if another daemon is already listening on socket_path
+    """
+    if os.path.exists(socket_path):
+        if is_daemon_running(socket_path):
+            return False
+        os.unlink(socket_path)
+
+    parent = os.path.dirname(socket_path)
+    if parent:
+        os.makedirs(parent, mode=0o700, exist_ok=True)
+    return True
+
+
+def serve(socket_path: Optional[str] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> int:
+    """
+    Run the daemon until it has been idle for idle_timeout seconds.
+
+    Args:
+        socket_path: Socket path (default: daemon_client.get_socket_path())
+        idle_timeout: Seconds without requests before exiting
+
+    Returns:
+        Process exit code
+    """
+    if not is_daemon_supported():
+        print("Error: Unix domain sockets are not supported on this platform", file=sys.stderr)
+        return 1
+
+    socket_path = socket_path or get_socket_path()
+    if not prepare_socket_path(socket_path):
+        print(f"Daemon already running on {socket_path}", file=sys.stderr)
+        return 1
+
+    old_umask = os.umask(0o177)
+    try:
+        server = CheckDaemon(socket_path, idle_timeout)
+    finally:
+        os.umask(old_umask)
+
+    log_info(f"Daemon listening on {socket_path} (idle timeout: {idle_timeout}s)")
+    try:
+        server.serve_until_idle()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    log_info("Daemon stopped")
+    return 0
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Resident precipitation check daemon")
+    parser.add_argument(
+        "--socket", help="Socket path (default: ~/.discuss-for-specs/run/check-daemon.sock)"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="Exit after this many seconds without requests",
+    )
+    args = parser.parse_args()
+    sys.exit(serve(args.socket, args.idle_timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -23,231 +23,256 @@ Output (stdout JSON):
 - Block (Cursor): {"followup_message": "..."}
 - Block (Claude Code): {"decision": "block", "reason": "..."}
 
-Workflow:
-1. Check if stop_hook_active is true (prevent infinite loop)
-2. Load snapshot from .discuss/.snapshot.yaml
-3. Find active discussions (modified within 24h)
-4. Compare each discussion's state with snapshot
-5. Update snapshot with new state
-6. Emit reminder if change_count >= threshold
-7. Save snapshot
+Execution:
+1. Cheap exits, using only json/sys/os/time:
+   - stop_hook_active is true (prevent infinite loop)
+   - No .discuss directory in the workspace (unless
+     DISCUSS_HOOKS_MULTI_ROOT=1, which checks every .discuss root below the
+     repository top, see common/root_discovery.py)
+2. If nothing under .discuss changed since a check that allowed the stop,
+   its cached verdict is printed (see common/verdict_cache.py, disabled
+   with DISCUSS_HOOKS_NO_CACHE=1)
+3. If the resident daemon (stop/check_daemon.py) is running, stdin is
+   forwarded over its Unix socket and its verdict is printed as-is
+4. Otherwise the check runs in-process (see common/precipitation.py)
+
+With DISCUSS_HOOKS_PROFILE set, the whole run is profiled in-process (the
+verdict cache and the daemon are bypassed) and its profile is written to
+~/.discuss-for-specs/profiles/ (see common/profiling.py).
+
+Runs that end at steps 1 and 2 are not logged by common/logging_utils.py;
+log_fast_exit appends their END record (verdict and duration) to the hook
+log instead, so that the "stats" command counts them.
+
+This file is the startup path of every Stop event. Keep module-level imports
+limited to json/sys/os/time; everything else is imported after the cheap
+exits.
 """
 
+import json
 import os
 import sys
-from pathlib import Path
-from typing import List, Tuple
-
-# Add parent directory to path for common imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from common.logging_utils import (
-    log_action,
-    log_debug,
-    log_error,
-    log_hook_end,
-    log_hook_start,
-    log_info,
-    log_skip,
-    log_stale_detection,
-    log_warning,
-)
-from common.platform_utils import (
-    Platform,
-    allow_and_exit,
-    block_and_exit,
-    detect_platform,
-    is_stop_hook_active,
-    read_stdin_json,
-)
-from common.snapshot_manager import (
-    cleanup_deleted_discussions,
-    compare_and_update,
-    find_active_discussions,
-    get_discuss_key,
-    load_snapshot,
-    save_snapshot,
-    scan_discussion,
-)
-
+import time
 
 HOOK_NAME = "check_precipitation"
 
+# Hook log location, format and level settings of common/logging_utils.py
+LOG_DIR = os.path.join(".discuss-for-specs", "logs")
+LOG_NAME = "discuss-hooks"
+LOG_FORMAT_ENV = "DISCUSS_HOOKS_LOG_FORMAT"
+LOG_LEVEL_ENV = "DISCUSS_HOOKS_LOG_LEVEL"
+
+# Log levels that leave out END records (INFO)
+QUIET_LOG_LEVELS = ("WARNING", "ERROR", "OFF")
+
+
+def read_input() -> "dict | None":
+    """
+    Read and parse JSON input from stdin.
+
+    Same contract as platform_utils.read_stdin_json, without its imports.
+
+    Returns:
+        Parsed JSON dictionary, or None if input is empty or invalid
+    """
+    try:
+        input_text = sys.stdin.read().strip()
+        if not input_text:
+            return None
+        input_data = json.loads(input_text)
+    except ValueError:
+        return None
+    return input_data if isinstance(input_data, dict) else None
+
 
-def get_workspace_root() -> Path:
+def get_workspace_root() -> str:
     """
     Get the workspace root directory.
-    
+
     Uses environment variables or current working directory.
-    
+
     Returns:
         Path to workspace root
     """
     # Try common environment variables
     for env_var in ["WORKSPACE_ROOT", "PROJECT_ROOT", "PWD"]:
         if env_var in os.environ:
-            return Path(os.environ[env_var])
-    
+            return os.environ[env_var]
+
     # Fallback to current working directory
-    return Path.cwd()
+    return os.getcwd()
 
 
-def format_stale_reminder(
-    discuss_key: str,
-    change_count: int,
-    threshold: int,
-    is_force: bool = False
-) -> str:
+def log_fast_exit(input_data: "dict | None", verdict: str, started: float) -> None:
     """
-    Format a reminder message for stale discussion.
-    
+    Append the END record of a run that answered without the check.
+
+    Same file, format and fields as common/logging_utils.py writes for a
+    full run (a text log also gets the START and platform lines that
+    common/log_stats.py joins it by), in one O_APPEND write and without
+    importing it. The file is not locked or rotated here: the next logged
+    run rotates it. Write errors are ignored.
+
     Args:
-        discuss_key: Discussion key (e.g., "2026-01-30/topic-name")
-        change_count: Current change_count value
-        threshold: Staleness threshold
-        is_force: Whether this is a force update (exceeded force threshold)
-        
-    Returns:
-        Formatted reminder message
+        input_data: Hook input (platform and session)
+        verdict: "skip" (cheap exit) or "allow" (cached verdict)
+        started: time.perf_counter() at the start of the run
     """
-    if is_force:
-        header = "## ⚠️ Precipitation Required\n\n"
-        header += "The discussion outline has been updated multiple times, but decisions/notes haven't been updated:\n\n"
-    else:
-        header = "## 💡 Precipitation Suggestion\n\n"
-        header += "The discussion outline has been updated, but decisions/notes may need updating:\n\n"
-    
-    items_text = f"- Discussion: `{discuss_key}`\n"
-    items_text += f"- Outline changes without updates: {change_count} (threshold: {threshold})\n"
-    
-    footer = f"\n📁 Discussion: `.discuss/{discuss_key}`\n"
-    
-    if is_force:
-        footer += "\n**Please update the discussion files before continuing.**\n"
-        footer += "This ensures important decisions are properly documented.\n"
+    if os.environ.get(LOG_LEVEL_ENV, "").strip().upper() in QUIET_LOG_LEVELS:
+        return
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    exec_id = os.urandom(2).hex()
+    platform = "unknown"
+    session = None
+    if input_data:
+        # Same detection as logging_utils._detect_platform_from_input
+        if "hook_event_name" in input_data or "tool_name" in input_data:
+            platform = "claude_code"
+        else:
+            platform = "cursor"
+        session = input_data.get("session_id") or input_data.get("conversation_id")
+
+    now = time.time()
+    if os.environ.get(LOG_FORMAT_ENV, "").strip().lower() in ("json", "jsonl"):
+        name = LOG_NAME + ".jsonl"
+        record = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now))
+            + f".{int(now % 1 * 1000):03d}",
+            "level": "INFO",
+            "hook": HOOK_NAME,
+            "exec_id": exec_id,
+            "platform": platform,
+            "session": session,
+            "phase": "end",
+            "duration_ms": duration_ms,
+            "verdict": verdict,
+            "msg": "END [OK]",
+        }
+        data = json.dumps(record, ensure_ascii=False) + "\n"
     else:
-        footer += "\nWould you like me to help update the decisions/notes?\n"
-        footer += "This helps maintain a complete record of our discussion.\n"
-    
-    return header + items_text + footer
+        name = f"{LOG_NAME}-{time.strftime('%Y-%m-%d', time.localtime(now))}.log"
+        prefix = (
+            f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))} | INFO     | "
+            f"[{HOOK_NAME}:{exec_id}] "
+        )
+        data = (
+            f"{prefix}START cwd={os.getcwd()}\n"
+            f"{prefix}platform={platform} session={session or 'N/A'}\n"
+            f"{prefix}END [OK] duration_ms={duration_ms} verdict={verdict}\n"
+        )
 
+    log_dir = os.path.join(os.path.expanduser("~"), LOG_DIR)
+    path = os.path.join(log_dir, name)
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    try:
+        try:
+            fd = os.open(path, flags, 0o644)
+        except FileNotFoundError:
+            os.makedirs(log_dir, exist_ok=True)
+            fd = os.open(path, flags, 0o644)
+        try:
+            os.write(fd, data.encode("utf-8", "replace"))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def allow_and_exit(input_data: "dict | None" = None, started: "float | None" = None) -> None:
+    """
+    Allow the operation to continue and exit.
+
+    Args:
+        input_data: Hook input, for the log record of a cheap exit
+        started: time.perf_counter() at the start of the run; when given,
+                 the run is logged as skipped (see log_fast_exit)
+    """
+    if started is not None:
+        log_fast_exit(input_data, "skip", started)
+    print("{}")
+    sys.exit(0)
+
+
+def env_flag(name: str) -> bool:
+    """Check whether an opt-in environment variable is set (not empty/0/false/no/off)."""
+    return os.environ.get(name, "").strip().lower() not in ("", "0", "false", "no", "off")
+
+
+def add_hooks_dir() -> None:
+    """Make common/ importable."""
+    hooks_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if hooks_dir not in sys.path:
+        sys.path.insert(0, hooks_dir)
+
+
+def run(profiling: bool = False) -> None:
+    """
+    Run the hook: cheap exits, then the daemon or the in-process check.
+
+    Args:
+        profiling: Always check in-process, so that the check is profiled
+    """
+    started = time.perf_counter()
+    input_data = read_input()
+    read_seconds = None
+    if profiling or env_flag("DISCUSS_HOOKS_TIMING"):
+        read_seconds = time.perf_counter() - started
+
+    # Check if this is a continuation after stop hook already triggered
+    if input_data and input_data.get("stop_hook_active", False):
+        allow_and_exit(input_data, started)
+
+    workspace_root = get_workspace_root()
+    multi_root = env_flag("DISCUSS_HOOKS_MULTI_ROOT")
+    if not multi_root and not os.path.isdir(os.path.join(workspace_root, ".discuss")):
+        allow_and_exit(input_data, started)
+
+    # A scan may be needed from here on: make common/ importable
+    add_hooks_dir()
 
-def main():
-    """Main entry point for the precipitation check hook."""
-    input_data = None
-    platform = Platform.UNKNOWN
-    
     try:
-        # Read input from stdin
-        input_data = read_stdin_json()
-        log_hook_start(HOOK_NAME, input_data)
-        
-        # Detect platform
-        platform = detect_platform(input_data) if input_data else Platform.UNKNOWN
-        log_info(f"Detected platform: {platform.value}")
-        
-        # Check if this is a continuation after stop hook already triggered
-        if input_data and is_stop_hook_active(input_data):
-            log_skip("stop_hook_active is True, bypassing check")
-            log_hook_end(HOOK_NAME, {}, success=True)
-            allow_and_exit()
-        
-        # Get workspace root
-        workspace_root = get_workspace_root()
-        log_debug(f"Workspace root: {workspace_root}")
-        
-        # Get .discuss directory
-        discuss_root = workspace_root / ".discuss"
-        
-        if not discuss_root.exists():
-            log_skip("No .discuss directory found")
-            log_hook_end(HOOK_NAME, {}, success=True)
-            allow_and_exit()
-        
-        log_action("Checking discussions for precipitation")
-        
-        # Load snapshot
-        snapshot = load_snapshot(discuss_root)
-        threshold = snapshot.get("config", {}).get("stale_threshold", 3)
-        force_threshold = threshold * 2  # Force at 2x the suggest threshold
-        
-        # Find active discussions (modified within 24h)
-        active_discussions = find_active_discussions(discuss_root, hours=24)
-        log_debug(f"Found {len(active_discussions)} active discussion(s)")
-        
-        if not active_discussions:
-            log_skip("No active discussions found")
-            log_hook_end(HOOK_NAME, {}, success=True)
-            allow_and_exit()
-        
-        # Check each discussion for staleness
-        stale_reminders = []
-        
-        for discuss_dir in active_discussions:
-            discuss_key = get_discuss_key(discuss_dir, discuss_root)
-            log_debug(f"Checking discussion: {discuss_key}")
-            
-            # Get old state from snapshot
-            old_state = snapshot.get("discussions", {}).get(discuss_key, {})
-            
-            # Scan current state
-            new_state = scan_discussion(discuss_dir)
-            
-            # Compare and update change_count
-            change_count = compare_and_update(old_state, new_state)
-            
-            # Update snapshot with new state
-            if "discussions" not in snapshot:
-                snapshot["discussions"] = {}
-            snapshot["discussions"][discuss_key] = new_state
-            
-            # Check if reminder is needed
-            if change_count >= threshold:
-                is_force = change_count >= force_threshold
-                reminder = format_stale_reminder(discuss_key, change_count, threshold, is_force)
-                stale_reminders.append((reminder, is_force))
-                
-                log_stale_detection(
-                    str(discuss_dir),
-                    [("outline", change_count, is_force)]
-                )
-        
-        # Clean up deleted discussions
-        cleanup_deleted_discussions(snapshot, discuss_root)
-        
-        # Save snapshot
-        save_snapshot(discuss_root, snapshot)
-        
-        # Summary logging
-        log_info(f"Stale reminders: {len(stale_reminders)}")
-        
-        # If there are stale reminders, check if any require forcing
-        if stale_reminders:
-            # Check if any reminder is force-level
-            has_force = any(is_force for _, is_force in stale_reminders)
-            
-            combined_reminder = "\n\n---\n\n".join(reminder for reminder, _ in stale_reminders)
-            
-            if has_force:
-                log_action(f"Blocking: {len(stale_reminders)} stale reminder(s) [FORCE]")
-                log_hook_end(HOOK_NAME, {"action": "block", "force": True}, success=True)
-                block_and_exit(combined_reminder, platform)
-            else:
-                # Suggest but don't block for non-force reminders
-                log_action(f"Suggesting update: {len(stale_reminders)} stale item(s)")
-                log_hook_end(HOOK_NAME, {"action": "suggest"}, success=True)
-                block_and_exit(combined_reminder, platform)
-        
-        # No issues, allow and exit
-        log_hook_end(HOOK_NAME, {}, success=True)
-        allow_and_exit()
-        
-    except Exception as e:
-        log_error(f"Unexpected error in {HOOK_NAME}", e)
-        log_hook_end(HOOK_NAME, {}, success=False)
-        # Still allow operation to continue even on error
+        # Reuse the last verdict if nothing it depends on changed
+        if not multi_root and not profiling:
+            from common.verdict_cache import cached_verdict, is_cache_enabled
+
+            output = None
+            if is_cache_enabled():
+                output = cached_verdict(os.path.join(workspace_root, ".discuss"))
+            if output is not None:
+                log_fast_exit(input_data, "allow", started)
+                print(json.dumps(output))
+                sys.exit(0)
+
+        # Prefer the resident daemon; fall back to the in-process check
+        output = None
+        if not profiling:
+            from common.daemon_client import request_check
+
+            output = request_check(input_data, workspace_root, multi_root)
+        if output is None:
+            from common.precipitation import run_check
+
+            output = run_check(
+                input_data, workspace_root, multi_root=multi_root, read_seconds=read_seconds
+            )
+    except Exception:
+        # Never break the agent's Stop event: allow on any unexpected error
         allow_and_exit()
 
+    print(json.dumps(output))
+    sys.exit(0)
+
+
+def main():
+    """Main entry point for the precipitation check hook."""
+    if env_flag("DISCUSS_HOOKS_PROFILE"):
+        add_hooks_dir()
+        from common.profiling import profile_call
+
+        profile_call("check_precipitation", lambda: run(profiling=True))
+    else:
+        run()
+
 
 if __name__ == "__main__":
     main()
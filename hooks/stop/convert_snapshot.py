@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Convert a workspace's snapshot between the single-file and sharded layouts.
+
+The single-file layout keeps every discussion in .discuss/.snapshot.<format>;
+the sharded layout keeps one state file per discussion under .discuss/.state/
+so each Stop hook only reads and writes the active discussions (see
+common/snapshot_shards.py). The conversion holds the snapshot lock, so it is
+safe to run while agent sessions are active.
+
+Usage:
+    python3 convert_snapshot.py --layout sharded|single [--workspace PATH]
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path for common imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.snapshot_lock import snapshot_lock
+from common.snapshot_manager import convert_snapshot_layout
+from common.snapshot_shards import LAYOUT_SHARDED, LAYOUT_SINGLE
+
+# Lock wait for the conversion (seconds); hooks only hold it briefly
+CONVERT_LOCK_TIMEOUT = 30.0
+
+
+def convert(workspace_root: str, layout: str) -> int:
+    """
+    Convert workspace_root/.discuss to the given layout.
+
+    Args:
+        workspace_root: Workspace root directory
+        layout: "single" or "sharded"
+
+    Returns:
+        Process exit code
+    """
+    discuss_root = Path(workspace_root) / ".discuss"
+    if not discuss_root.is_dir():
+        print(f"Error: {discuss_root} is not a directory", file=sys.stderr)
+        return 1
+
+    with snapshot_lock(discuss_root, CONVERT_LOCK_TIMEOUT) as locked:
+        if not locked:
+            print("Error: snapshot is locked by another process", file=sys.stderr)
+            return 1
+        if convert_snapshot_layout(discuss_root, layout):
+            print(f"Converted {discuss_root} to the {layout} layout")
+        else:
+            print(f"{discuss_root} already uses the {layout} layout (or saving failed, see log)")
+    return 0
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Convert the snapshot layout of a workspace")
+    parser.add_argument(
+        "--layout", required=True, choices=[LAYOUT_SHARDED, LAYOUT_SINGLE], help="Target layout"
+    )
+    parser.add_argument(
+        "--workspace",
+        default=os.getcwd(),
+        help="Workspace root containing .discuss (default: current directory)",
+    )
+    args = parser.parse_args()
+    sys.exit(convert(os.path.abspath(args.workspace), args.layout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the installed discuss-for-specs hooks.
+
+Commands:
+    stats     Hook latency percentiles and verdict counts from the hook logs
+              (text or JSON lines, including rotated .gz archives), streamed
+              in constant memory (see common/log_stats.py)
+    profiles  One ranked report merging the invocations profiled with
+              DISCUSS_HOOKS_PROFILE: phases, allocation sites and cProfile
+              functions (see common/profiling.py)
+
+Usage:
+    python3 discuss_hooks.py stats [--by platform,day] [--since 7d|YYYY-MM-DD]
+                                   [--hook NAME] [--platform NAME] [--json]
+                                   [--log-dir PATH]
+    python3 discuss_hooks.py profiles [--since 7d|YYYY-MM-DD] [--hook NAME]
+                                      [--sort cumulative|tottime|calls]
+                                      [--limit N] [--last N] [--json]
+                                      [--profile-dir PATH]
+
+Example: p95 Stop-hook latency on Cursor over the last week:
+    python3 discuss_hooks.py stats --hook check_precipitation --platform cursor --since 7d
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path for common imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.log_stats import GROUP_FIELDS, collect_stats, format_stats, iter_log_files
+from common.logging_utils import LOG_NAME, get_base_dir, get_log_dir
+
+
+def parse_since(value: str) -> str:
+    """
+    Parse --since into a day.
+
+    Args:
+        value: "Nd" (the last N days, today included) or YYYY-MM-DD
+
+    Returns:
+        First day included (YYYY-MM-DD)
+    """
+    match = re.fullmatch(r"(\d+)d", value)
+    if match:
+        return (date.today() - timedelta(days=max(1, int(match.group(1))) - 1)).isoformat()
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected Nd or YYYY-MM-DD, got {value!r}")
+
+
+def parse_by(value: str) -> list:
+    """Parse --by into a list of group fields."""
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in GROUP_FIELDS]
+    if unknown or not fields:
+        raise argparse.ArgumentTypeError(
+            f"expected a comma-separated list of {', '.join(GROUP_FIELDS)}, got {value!r}"
+        )
+    return fields
+
+
+def since_to_mtime(since: "str | None") -> float:
+    """Convert a --since day into a Unix timestamp (0 if not given)."""
+    if not since:
+        return 0.0
+    return time.mktime(datetime.strptime(since, "%Y-%m-%d").timetuple())
+
+
+def stats(args: argparse.Namespace) -> int:
+    """
+    Print hook statistics.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        Process exit code
+    """
+    paths = list(iter_log_files(Path(args.log_dir), LOG_NAME, since_to_mtime(args.since)))
+    groups = collect_stats(paths, args.by, args.since, args.hook, args.platform)
+
+    if args.json:
+        print(
+            json.dumps(
+                [
+                    dict(zip(args.by, key), **group.to_dict())
+                    for key, group in sorted(
+                        groups.items(), key=lambda item: (-item[1].runs, item[0])
+                    )
+                ],
+                indent=2,
+            )
+        )
+    else:
+        print(format_stats(groups, args.by))
+    return 0
+
+
+def profiles(args: argparse.Namespace) -> int:
+    """
+    Print the merged report of profiled hook invocations.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        Process exit code
+    """
+    from common.profiling import format_profile_report, list_profiles, merge_profiles
+
+    paths = list_profiles(Path(args.profile_dir), args.hook, since_to_mtime(args.since))
+    if args.last:
+        paths = paths[: args.last]
+    merged = merge_profiles(paths)
+
+    if args.json:
+        print(json.dumps(merged, indent=2))
+    else:
+        print(format_profile_report(merged, args.sort, args.limit))
+    return 0
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="discuss-for-specs hook maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stats_parser = commands.add_parser("stats", help="Hook latency and verdict statistics")
+    stats_parser.add_argument(
+        "--by",
+        type=parse_by,
+        default=["platform"],
+        help=f"Comma-separated group fields: {', '.join(GROUP_FIELDS)} (default: platform)",
+    )
+    stats_parser.add_argument("--since", type=parse_since, help="Nd (last N days) or YYYY-MM-DD")
+    stats_parser.add_argument("--hook", help="Only runs of this hook (e.g. check_precipitation)")
+    stats_parser.add_argument("--platform", help="Only runs on this platform (e.g. cursor)")
+    stats_parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    stats_parser.add_argument(
+        "--log-dir",
+        default=str(get_log_dir()),
+        help="Log directory (default: ~/.discuss-for-specs/logs)",
+    )
+    stats_parser.set_defaults(func=stats)
+
+    profiles_parser = commands.add_parser("profiles", help="Merged report of profiled hook runs")
+    profiles_parser.add_argument("--since", type=parse_since, help="Nd (last N days) or YYYY-MM-DD")
+    profiles_parser.add_argument("--hook", help="Only runs of this hook (e.g. check_precipitation)")
+    profiles_parser.add_argument("--last", type=int, help="Only the N newest runs")
+    profiles_parser.add_argument(
+        "--sort",
+        choices=["cumulative", "tottime", "calls"],
+        default="cumulative",
+        help="Function ranking (default: cumulative)",
+    )
+    profiles_parser.add_argument(
+        "--limit", type=int, default=25, help="Functions and allocation sites listed"
+    )
+    profiles_parser.add_argument(
+        "--json", action="store_true", help="Print JSON (without the function ranking)"
+    )
+    profiles_parser.add_argument(
+        "--profile-dir",
+        default=str(get_base_dir() / "profiles"),
+        help="Profile directory (default: ~/.discuss-for-specs/profiles)",
+    )
+    profiles_parser.set_defaults(func=profiles)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,15 @@
  *   npx discuss-skills install [--platform <platform>]
  *   npx discuss-skills uninstall [--platform <platform>]
  *   npx discuss-skills platforms
+ *   npx discuss-skills stats [options]
+ *   npx discuss-skills profiles [options]
  *   npx discuss-skills --version
  */
 
 import { Command } from 'commander';
 import chalk from 'chalk';
 import { install, uninstall, listPlatforms } from '../src/index.js';
+import { runMaintenanceCommand } from '../src/utils.js';
 import { readFileSync } from 'fs';
 import { fileURLToPath } from 'url';
 import { dirname, join } from 'path';
@@ -50,6 +53,7 @@ Examples:
   $ discuss-for-specs install -p cursor        # Install for Cursor
   $ discuss-for-specs install -p kilocode      # Install for Kilocode (L1)
   $ discuss-for-specs platforms                # Show all platforms
+  $ discuss-for-specs stats --since 7d         # Hook latency and verdicts
   $ discuss-for-specs uninstall                # Remove installation`)
   .version(packageJson.version, '-v, --version', 'Show version number')
   .option('--no-color', 'Disable colored output')
@@ -146,4 +150,27 @@ program
     listPlatforms({ showStatus: true });
   });
 
+// Maintenance commands of the installed hooks (options are passed through)
+const MAINTENANCE_COMMANDS = {
+  stats: 'Hook latency percentiles and verdict counts from the hook logs',
+  profiles: 'Ranked report of the hook runs profiled with DISCUSS_HOOKS_PROFILE',
+};
+
+for (const [name, description] of Object.entries(MAINTENANCE_COMMANDS)) {
+  program
+    .command(name)
+    .description(`${description} (runs hooks/stop/discuss_hooks.py ${name}, see --help)`)
+    .argument('[args...]', 'Options of discuss_hooks.py ' + name)
+    .allowUnknownOption()
+    .helpOption(false)
+    .action((args) => {
+      try {
+        process.exit(runMaintenanceCommand(name, args));
+      } catch (err) {
+        console.error(`\n${chalk.red('✖')} ${chalk.bold(`${name} failed:`)} ${err.message}`);
+        process.exit(1);
+      }
+    });
+}
+
 program.parse();
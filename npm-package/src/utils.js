@@ -2,7 +2,7 @@
  * Utility functions for discuss-skills
  */
 
-import { exec as execCallback } from 'child_process';
+import { exec as execCallback, spawnSync } from 'child_process';
 import { promisify } from 'util';
 import { existsSync, mkdirSync, cpSync, rmSync, readdirSync, statSync } from 'fs';
 import { join } from 'path';
@@ -53,6 +53,37 @@ export function getLogsDir() {
   return join(getBaseDir(), 'logs');
 }
 
+/**
+ * Get the command line of an installed hooks maintenance command
+ * (stop/discuss_hooks.py: stats, profiles)
+ *
+ * @param {string} command - Maintenance command name
+ * @param {string[]} args - Arguments passed through to the command
+ * @returns {string[]} Arguments for python3
+ */
+export function getMaintenanceArgs(command, args = []) {
+  return [join(getHooksDir(), 'stop', 'discuss_hooks.py'), command, ...args];
+}
+
+/**
+ * Run an installed hooks maintenance command with inherited stdio
+ *
+ * @param {string} command - Maintenance command name
+ * @param {string[]} args - Arguments passed through to the command
+ * @returns {number} Exit code of the command
+ */
+export function runMaintenanceCommand(command, args = []) {
+  const [script, ...rest] = getMaintenanceArgs(command, args);
+  if (!existsSync(script)) {
+    throw new Error(`Hooks are not installed (${script} not found), run install first`);
+  }
+  const result = spawnSync('python3', [script, ...rest], { stdio: 'inherit' });
+  if (result.error) {
+    throw result.error;
+  }
+  return result.status ?? 1;
+}
+
 /**
  * Check Python environment and dependencies
  * 
@@ -14,6 +14,7 @@ import {
   getDataDir,
   getHooksDir,
   getLogsDir,
+  getMaintenanceArgs,
   copyDirectory,
   removeDirectory,
   ensureDirectory,
@@ -54,6 +55,20 @@ describe('Directory Path Functions', () => {
 });
 
 
+describe('getMaintenanceArgs', () => {
+  test('runs the installed discuss_hooks.py with the passed arguments', () => {
+    const result = getMaintenanceArgs('stats', ['--since', '7d', '--json']);
+    assert.deepStrictEqual(result, [
+      join(getHooksDir(), 'stop', 'discuss_hooks.py'),
+      'stats',
+      '--since',
+      '7d',
+      '--json',
+    ]);
+  });
+});
+
+
 describe('Directory Operations', () => {
   let testDir;
 
@@ -0,0 +1,74 @@
+"""
+Shared fixtures and helpers for the hook tests
+"""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+
+def make_topic(
+    discuss_root: Path,
+    key: str,
+    age_hours: float = 0,
+    decisions: int = 0,
+    notes: int = 0,
+    attachments: bool = False,
+) -> Path:
+    """
+    Create a discussion under a .discuss directory.
+
+    Args:
+        discuss_root: .discuss directory (created if missing)
+        key: Discussion key ("<date>/<topic>")
+        age_hours: Backdate the topic's files and directories by this many
+                   hours (0 leaves them as just written)
+        decisions: Number of decision documents (D01-decision.md, ...)
+        notes: Number of notes (note-1.md, ...)
+        attachments: Also add an assets/ subtree, which scans must skip
+
+    Returns:
+        Topic directory
+    """
+    topic = discuss_root / key
+    topic.mkdir(parents=True)
+    files = {topic / "outline.md": "# Outline"}
+    for i in range(1, decisions + 1):
+        files[topic / "decisions" / f"D{i:02d}-decision.md"] = "# Decision"
+    for i in range(1, notes + 1):
+        files[topic / "notes" / f"note-{i}.md"] = "# Note"
+    if attachments:
+        files[topic / "assets" / "img" / "diagram.txt"] = "diagram"
+
+    for path, text in files.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    if age_hours:
+        mtime = time.time() - age_hours * 3600
+        # Files first, then directories bottom-up, as writing changes the parent
+        for path in list(files) + sorted({p.parent for p in files}, reverse=True):
+            os.utime(path, (mtime, mtime))
+    return topic
+
+
+@pytest.fixture
+def discuss_root(tmp_path, monkeypatch):
+    """
+    Empty .discuss directory with a JSON snapshot and default settings.
+
+    Modules that need a populated tree override this fixture and build on it.
+    """
+    monkeypatch.setenv("DISCUSS_SNAPSHOT_FORMAT", "json")
+    for name in (
+        "DISCUSS_HOOKS_NO_CACHE",
+        "DISCUSS_REMINDER_MODE",
+        "DISCUSS_SCAN_DEADLINE_MS",
+        "DISCUSS_SNAPSHOT_ARCHIVE_DAYS",
+    ):
+        monkeypatch.delenv(name, raising=False)
+    root = tmp_path / ".discuss"
+    root.mkdir()
+    return root
@@ -0,0 +1,276 @@
+"""
+Tests for hooks/common/change_journal.py and the journal-driven scan
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+from common.change_journal import (
+    ChangeWatcher,
+    JournalWriter,
+    get_journal_path,
+    is_inotify_supported,
+    read_journal,
+)
+from common.precipitation import run_check
+from common.snapshot_manager import (
+    load_snapshot,
+    scan_active_discussions,
+    scan_discussions_indexed,
+    scan_discussions_journaled,
+)
+
+from .conftest import make_topic
+
+requires_inotify = pytest.mark.skipif(not is_inotify_supported(), reason="inotify not available")
+
+
+def normalize(result):
+    return sorted((str(path), state) for path, state in result)
+
+
+@pytest.fixture
+def discuss_root(discuss_root):
+    make_topic(discuss_root, "2025-10-01/old-topic", age_hours=24 * 30, decisions=1)
+    make_topic(discuss_root, "2025-10-01/other-old-topic", age_hours=24 * 30, decisions=1)
+    make_topic(discuss_root, "2026-01-30/active-topic", decisions=1)
+    return discuss_root
+
+
+@pytest.fixture
+def writer(discuss_root):
+    writer = JournalWriter(discuss_root)
+    writer.start()
+    yield writer
+    writer.close(remove=True)
+
+
+class TestReadJournal:
+    """Tests for read_journal."""
+
+    def test_missing_journal(self, discuss_root):
+        """Test no journal means a full scan without a position."""
+        assert read_journal(discuss_root, None) == (None, None)
+
+    def test_first_read_syncs_position(self, discuss_root, writer):
+        """Test a journal without a stored position needs a full scan."""
+        writer.append(["2026-01-30/active-topic/outline.md"])
+
+        state = read_journal(discuss_root, None)
+
+        assert state.changed is None
+        assert state.position == {
+            "id": writer.journal_id,
+            "offset": os.path.getsize(get_journal_path(discuss_root)),
+        }
+
+    def test_replays_changes(self, discuss_root, writer):
+        """Test entries after the stored position are returned."""
+        position = read_journal(discuss_root, None).position
+        writer.append(["2025-10-01/old-topic/outline.md", "2025-10-01/old-topic/outline.md"])
+        writer.append(["2025-10-02"])
+
+        state = read_journal(discuss_root, position)
+
+        assert state.changed == {"2025-10-01/old-topic/outline.md", "2025-10-02"}
+        assert read_journal(discuss_root, state.position).changed == set()
+
+    def test_ignores_partial_line(self, discuss_root, writer):
+        """Test a line still being written is left for the next run."""
+        position = read_journal(discuss_root, None).position
+        with open(get_journal_path(discuss_root), "a") as f:
+            f.write("2025-10-01/old-topic/outline.md\n2025-10-01/old")
+
+        state = read_journal(discuss_root, position)
+
+        assert state.changed == {"2025-10-01/old-topic/outline.md"}
+        with open(get_journal_path(discuss_root), "a") as f:
+            f.write("-topic/notes\n")
+        assert read_journal(discuss_root, state.position).changed == {"2025-10-01/old-topic/notes"}
+
+    def test_other_journal_id(self, discuss_root, writer):
+        """Test a journal from another watcher run needs a full scan."""
+        position = read_journal(discuss_root, None).position
+        writer.start()
+
+        state = read_journal(discuss_root, position)
+
+        assert state.changed is None
+        assert state.position["id"] == writer.journal_id
+
+    def test_truncated_journal(self, discuss_root, writer):
+        """Test a position beyond the end of the journal needs a full scan."""
+        writer.append(["2025-10-01/old-topic/outline.md"])
+        position = read_journal(discuss_root, None).position
+        position["offset"] += 100
+
+        assert read_journal(discuss_root, position).changed is None
+
+    def test_dead_watcher(self, discuss_root):
+        """Test a journal whose watcher is gone is not trusted."""
+        proc = subprocess.run(
+            [sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True
+        )
+        header = {"journal": 1, "id": "abc", "pid": int(proc.stdout)}
+        Path(get_journal_path(discuss_root)).write_text(json.dumps(header) + "\n")
+
+        assert read_journal(discuss_root, {"id": "abc", "offset": 0}) == (None, None)
+
+    def test_rotates_when_too_large(self, discuss_root):
+        """Test the writer starts a new journal past max_bytes."""
+        writer = JournalWriter(discuss_root, max_bytes=200)
+        writer.start()
+        first_id = writer.journal_id
+        try:
+            for _ in range(10):
+                writer.append(["2025-10-01/old-topic/outline.md"])
+        finally:
+            writer.close()
+
+        assert writer.journal_id != first_id
+        assert os.path.getsize(get_journal_path(discuss_root)) <= 200 + 40
+
+
+class TestScanDiscussionsJournaled:
+    """Tests for the journal-driven scan."""
+
+    def index_and_states(self, discuss_root):
+        _, index = scan_discussions_indexed(discuss_root, None)
+        discussions = {
+            f"{path.parent.name}/{path.name}": state
+            for path, state in scan_active_discussions(discuss_root)
+        }
+        return index, discussions
+
+    def test_no_changes_keeps_active_set(self, discuss_root):
+        """Test untouched active discussions are still reported."""
+        index, discussions = self.index_and_states(discuss_root)
+
+        result, new_index = scan_discussions_journaled(discuss_root, index, discussions, set())
+
+        assert normalize(result) == normalize(scan_active_discussions(discuss_root))
+        assert new_index == index
+
+    def test_outline_edit_in_old_topic(self, discuss_root):
+        """Test a journaled edit makes an old discussion active with fresh state."""
+        index, discussions = self.index_and_states(discuss_root)
+        (discuss_root / "2025-10-01" / "old-topic" / "outline.md").write_text("# Edited")
+
+        result, new_index = scan_discussions_journaled(
+            discuss_root, index, discussions, {"2025-10-01/old-topic/outline.md"}
+        )
+
+        assert normalize(result) == normalize(scan_active_discussions(discuss_root))
+        assert new_index == scan_discussions_indexed(discuss_root, None)[1]
+
+    def test_new_and_deleted_topics(self, discuss_root):
+        """Test journaled topic creation and deletion update the index."""
+        import shutil
+
+        index, discussions = self.index_and_states(discuss_root)
+        make_topic(discuss_root, "2025-10-01/new-topic")
+        shutil.rmtree(discuss_root / "2025-10-01" / "other-old-topic")
+
+        result, new_index = scan_discussions_journaled(
+            discuss_root, index, discussions, {"2025-10-01"}
+        )
+
+        assert normalize(result) == normalize(scan_active_discussions(discuss_root))
+        assert set(new_index["dates"]["2025-10-01"]["topics"]) == {"old-topic", "new-topic"}
+
+    def test_does_not_modify_stored_state(self, discuss_root):
+        """Test reported states are copies of the snapshot's."""
+        index, discussions = self.index_and_states(discuss_root)
+
+        result, _ = scan_discussions_journaled(discuss_root, index, discussions, set())
+        result[0][1]["outline"]["change_count"] = 99
+
+        assert discussions["2026-01-30/active-topic"]["outline"]["change_count"] == 0
+
+
+@requires_inotify
+class TestChangeWatcher:
+    """Tests for the inotify watcher (Linux only)."""
+
+    @pytest.fixture
+    def watcher(self, discuss_root):
+        watcher = ChangeWatcher(discuss_root)
+        watcher.start()
+        yield watcher
+        watcher.stop()
+
+    def journaled(self, discuss_root, watcher, position, expected):
+        """Process events until expected paths are journaled."""
+        deadline = time.time() + 5
+        changed = set()
+        while time.time() < deadline and not expected <= changed:
+            watcher.process_once(timeout=0.1)
+            state = read_journal(discuss_root, position)
+            changed |= state.changed or set()
+            position = state.position
+        return changed
+
+    def test_journals_file_changes(self, discuss_root, watcher):
+        """Test edits, new files and new directories are journaled."""
+        position = read_journal(discuss_root, None).position
+        (discuss_root / "2025-10-01" / "old-topic" / "outline.md").write_text("# Edited")
+        (discuss_root / "2025-10-01" / "old-topic" / "notes").mkdir()
+        (discuss_root / "2025-10-01" / "old-topic" / "notes" / "n.md").write_text("# Note")
+        make_topic(discuss_root, "2026-02-01/brand-new")
+
+        expected = {
+            "2025-10-01/old-topic/outline.md",
+            "2025-10-01/old-topic/notes",
+            "2026-02-01",
+            "2026-02-01/brand-new/outline.md",
+        }
+        assert expected <= self.journaled(discuss_root, watcher, position, expected)
+
+    def test_ignores_bookkeeping_files(self, discuss_root, watcher):
+        """Test snapshot and journal writes at the .discuss root are not journaled."""
+        position = read_journal(discuss_root, None).position
+        (discuss_root / ".snapshot.yaml").write_text("version: 1\n")
+        (discuss_root / "2025-10-01" / "old-topic" / "outline.md").write_text("# Edited")
+
+        changed = self.journaled(
+            discuss_root, watcher, position, {"2025-10-01/old-topic/outline.md"}
+        )
+
+        assert changed == {"2025-10-01/old-topic/outline.md"}
+
+    def test_stop_removes_journal(self, discuss_root, watcher):
+        """Test stopping the watcher removes the journal."""
+        watcher.stop()
+
+        assert not os.path.exists(get_journal_path(discuss_root))
+
+    def test_run_check_replays_journal(self, discuss_root, watcher, monkeypatch):
+        """Test the hook check uses the journal and matches a full scan."""
+        monkeypatch.setenv("DISCUSS_SNAPSHOT_FORMAT", "json")
+        workspace = discuss_root.parent
+        run_check({"status": "completed"}, workspace)
+        assert load_snapshot(discuss_root)["journal"]["id"] == watcher.writer.journal_id
+
+        outline = discuss_root / "2025-10-01" / "old-topic" / "outline.md"
+        position = load_snapshot(discuss_root)["journal"]
+        # First scan records the discussion, the next three count as changes
+        for i in range(4):
+            outline.write_text(f"# Edited {i}")
+            os.utime(outline, (time.time() + i + 1, time.time() + i + 1))
+            self.journaled(
+                discuss_root, watcher, dict(position), {"2025-10-01/old-topic/outline.md"}
+            )
+            output = run_check({"status": "completed"}, workspace)
+            position = load_snapshot(discuss_root)["journal"]
+
+        snapshot = load_snapshot(discuss_root)
+        assert snapshot["discussions"]["2025-10-01/old-topic"]["outline"]["change_count"] == 3
+        assert "old-topic" in json.dumps(output)
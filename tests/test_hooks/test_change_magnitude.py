@@ -0,0 +1,165 @@
+"""
+Tests for outline change-magnitude scoring (hooks/common/change_magnitude.py)
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+from common.change_magnitude import FINGERPRINT_SIZE, change_magnitude, fingerprint
+from common.precipitation import run_check
+from common.snapshot_manager import (
+    DEFAULT_MIN_CHANGE,
+    compare_and_update,
+    get_min_outline_change,
+    hash_changed_files,
+    load_snapshot,
+    scan_discussion,
+    score_outline_change,
+)
+
+# An outline of about 200 words
+OUTLINE = "# Discussion: Storage\n\n## 🔵 Current Focus\n\n" + "".join(
+    f"- Question {i}: should the cache keep entry {i} for {i + 2} minutes or evict it on write\n"
+    for i in range(14)
+)
+
+TYPO = OUTLINE.replace("evict it on write\n", "evcit it on write\n", 1)
+
+# An outline of about 800 words, every line different
+LONG_OUTLINE = "# Discussion: Platforms\n\n## ⚪ Pending\n\n" + "".join(
+    f"- Topic {i}: platform {i % 7} needs adapter {i * 3} before release {i % 5} ships widely\n"
+    for i in range(64)
+)
+
+NEW_BULLET = "- Decide who owns the retention policy for archived logs\n"
+
+NEW_ROUND = OUTLINE + (
+    "\n## ✅ Confirmed\n\n- Use an LRU with a five minute TTL, measured per workspace,"
+    " and flush it whenever the snapshot lock is taken by another session\n"
+)
+
+
+class TestChangeMagnitude:
+    """Tests for fingerprint / change_magnitude."""
+
+    def test_bounded_size(self):
+        """Test fingerprints do not grow with the outline."""
+        long_outline = " ".join(f"word{i}" for i in range(5000))
+
+        assert len(fingerprint(long_outline)) == FINGERPRINT_SIZE * 4
+        assert len(fingerprint("# Outline")) == 4
+
+    def test_identical_and_disjoint(self):
+        """Test the extremes of the score."""
+        assert change_magnitude(fingerprint(OUTLINE), fingerprint(OUTLINE)) == 0.0
+        assert (
+            change_magnitude(fingerprint("alpha beta gamma"), fingerprint("delta epsilon zeta"))
+            == 1.0
+        )
+
+    def test_small_outlines_score_changed_share(self):
+        """Test outlines under CHANGE_SCALE shingles score the share that changed."""
+        # Shingles: {a b, b c, c d} vs {a b, b c, c e}: 1 added, 1 removed of 3
+        assert change_magnitude(fingerprint("a b c d"), fingerprint("a b c e")) == 1 / 3
+
+    def test_typo_scores_below_new_content(self):
+        """Test a typo fix scores below the default threshold, a new round above it."""
+        base = fingerprint(OUTLINE)
+
+        assert change_magnitude(base, fingerprint(TYPO)) < DEFAULT_MIN_CHANGE
+        assert change_magnitude(base, fingerprint(NEW_ROUND)) > DEFAULT_MIN_CHANGE
+
+    def test_typo_in_short_outline_below_bullet_in_long_outline(self):
+        """Test the score does not shrink with the outline's length."""
+        typo = change_magnitude(fingerprint(OUTLINE), fingerprint(TYPO))
+        bullet = change_magnitude(fingerprint(LONG_OUTLINE), fingerprint(LONG_OUTLINE + NEW_BULLET))
+
+        assert len(LONG_OUTLINE.split()) > 700
+        assert typo < DEFAULT_MIN_CHANGE <= bullet
+        assert bullet == pytest.approx(
+            change_magnitude(fingerprint(OUTLINE), fingerprint(OUTLINE + NEW_BULLET)), abs=0.02
+        )
+
+    @pytest.mark.parametrize("old, new", [(None, "00000001"), ("", "00000001"), ("zz", "00000001")])
+    def test_unknown(self, old, new):
+        """Test missing or malformed fingerprints give None."""
+        assert change_magnitude(old, new) is None
+
+
+class TestScoring:
+    """Tests for score_outline_change with compare_and_update."""
+
+    @pytest.fixture
+    def discuss_dir(self, tmp_path):
+        discuss_dir = tmp_path / "2026-01-30" / "storage"
+        discuss_dir.mkdir(parents=True)
+        return discuss_dir
+
+    def check(self, discuss_dir, old_state, text):
+        """Write the outline and run one comparison with the default threshold."""
+        outline = discuss_dir / "outline.md"
+        outline.write_text(text)
+        mtime = time.time() + len(text)
+        os.utime(outline, (mtime, mtime))
+        new_state = scan_discussion(discuss_dir)
+        hash_changed_files(old_state, new_state, discuss_dir)
+        magnitude = score_outline_change(old_state, new_state, discuss_dir)
+        compare_and_update(old_state, new_state, magnitude, 0.05)
+        return new_state
+
+    def test_minor_edits_add_up(self, discuss_dir):
+        """Test minor edits keep the baseline until they amount to a round."""
+        state = self.check(discuss_dir, {}, OUTLINE)
+        baseline = state["outline"]["fingerprint"]
+        assert state["outline"]["change_count"] == 1
+
+        state = self.check(discuss_dir, state, TYPO)
+        assert state["outline"]["change_count"] == 1
+        assert state["outline"]["fingerprint"] == baseline
+
+        state = self.check(discuss_dir, state, TYPO.replace("minutes", "minuets", 4))
+        assert state["outline"]["change_count"] == 2
+        assert state["outline"]["fingerprint"] != baseline
+
+    def test_unchanged_outline_not_read(self, discuss_dir, monkeypatch):
+        """Test the stored fingerprint is reused while the digest matches."""
+        state = self.check(discuss_dir, {}, OUTLINE)
+        new_state = scan_discussion(discuss_dir)
+        hash_changed_files(state, new_state, discuss_dir)
+        monkeypatch.setattr(Path, "read_text", None)
+
+        assert score_outline_change(state, new_state, discuss_dir) == 0.0
+        assert new_state["outline"]["fingerprint"] == state["outline"]["fingerprint"]
+
+
+def test_min_outline_change(monkeypatch):
+    """Test environment > config > default."""
+    monkeypatch.delenv("DISCUSS_MIN_OUTLINE_CHANGE", raising=False)
+    assert get_min_outline_change({}) == DEFAULT_MIN_CHANGE
+    assert get_min_outline_change({"min_outline_change": 0.2}) == 0.2
+    monkeypatch.setenv("DISCUSS_MIN_OUTLINE_CHANGE", "0")
+    assert get_min_outline_change({"min_outline_change": 0.2}) == 0.0
+
+
+@pytest.mark.parametrize("min_change, expected", [("0.05", 1), ("0", 2), (None, 1)])
+def test_run_check_ignores_typo_fix(tmp_path, monkeypatch, min_change, expected):
+    """Test a typo fix is ignored by default and counted with the threshold disabled."""
+    monkeypatch.setenv("DISCUSS_SNAPSHOT_FORMAT", "json")
+    monkeypatch.delenv("DISCUSS_MIN_OUTLINE_CHANGE", raising=False)
+    if min_change is not None:
+        monkeypatch.setenv("DISCUSS_MIN_OUTLINE_CHANGE", min_change)
+    topic = tmp_path / ".discuss" / "2026-01-30" / "storage"
+    topic.mkdir(parents=True)
+    for i, text in enumerate([OUTLINE, TYPO]):
+        (topic / "outline.md").write_text(text)
+        os.utime(topic / "outline.md", (time.time() + i, time.time() + i))
+        run_check({"status": "completed"}, tmp_path)
+
+    discussions = load_snapshot(tmp_path / ".discuss")["discussions"]
+    assert discussions["2026-01-30/storage"]["outline"]["change_count"] == expected
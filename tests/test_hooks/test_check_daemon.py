@@ -0,0 +1,251 @@
+"""
+Tests for hooks/stop/check_daemon.py and hooks/common/daemon_client.py
+"""
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+HOOKS_DIR = Path(__file__).parent.parent.parent / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
+
+from common.daemon_client import get_forwarded_env, get_socket_path, request_check
+from common.snapshot_manager import load_snapshot
+from stop.check_daemon import (
+    CheckDaemon,
+    CheckRequestHandler,
+    SnapshotCache,
+    prepare_socket_path,
+    request_environment,
+)
+
+CHECK_PRECIPITATION = HOOKS_DIR / "stop" / "check_precipitation.py"
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires Unix sockets")
+
+
+@pytest.fixture
+def socket_path(monkeypatch):
+    """Short socket path (AF_UNIX paths are limited to ~100 bytes)."""
+    run_dir = tempfile.mkdtemp(prefix="dfs-", dir="/tmp")
+    path = os.path.join(run_dir, "d.sock")
+    monkeypatch.setenv("DISCUSS_HOOKS_SOCKET", path)
+    monkeypatch.delenv("DISCUSS_HOOKS_NO_DAEMON", raising=False)
+    yield path
+    shutil.rmtree(run_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def daemon(socket_path):
+    """Run a daemon in a background thread."""
+    assert prepare_socket_path(socket_path)
+    server = CheckDaemon(socket_path, idle_timeout=0.2)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05})
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def make_discussion(workspace: Path) -> Path:
+    discuss_dir = workspace / ".discuss" / "2026-01-30" / "topic"
+    discuss_dir.mkdir(parents=True)
+    (discuss_dir / "outline.md").write_text("# Outline")
+    return discuss_dir
+
+
+def raw_request(socket_path: str, request: dict) -> bytes:
+    """Send one request as the client does and return the raw response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(10)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        return sock.makefile("rb").read()
+
+
+class TestDaemonClient:
+    """Tests for request_check fallback behavior."""
+
+    def test_socket_path_override(self, socket_path):
+        """Test DISCUSS_HOOKS_SOCKET overrides the default path."""
+        assert get_socket_path() == socket_path
+
+    def test_no_daemon_returns_none(self, socket_path, tmp_path):
+        """Test missing socket means in-process fallback."""
+        assert request_check({"status": "completed"}, str(tmp_path)) is None
+
+    def test_stale_socket_returns_none(self, socket_path, tmp_path):
+        """Test a socket file nobody listens on means fallback."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(socket_path)
+        sock.close()
+
+        assert request_check({"status": "completed"}, str(tmp_path)) is None
+
+    def test_disabled_by_env(self, daemon, monkeypatch, tmp_path):
+        """Test DISCUSS_HOOKS_NO_DAEMON bypasses a running daemon."""
+        monkeypatch.setenv("DISCUSS_HOOKS_NO_DAEMON", "1")
+
+        assert request_check({"status": "completed"}, str(tmp_path)) is None
+
+
+class TestCheckDaemon:
+    """Tests for the daemon request handling."""
+
+    def test_allow_without_discuss_dir(self, daemon, tmp_path):
+        """Test daemon answers allow when there is nothing to check."""
+        output = request_check({"status": "completed"}, str(tmp_path))
+
+        assert output == {}
+
+    def test_updates_snapshot(self, daemon, tmp_path):
+        """Test daemon runs the check against the client's workspace."""
+        make_discussion(tmp_path)
+
+        output = request_check({"status": "completed"}, str(tmp_path))
+
+        assert output == {}
+        snapshot = load_snapshot(tmp_path / ".discuss")
+        assert snapshot["discussions"]["2026-01-30/topic"]["outline"]["change_count"] == 1
+
+    def test_reuses_cached_snapshot(self, daemon, tmp_path):
+        """Test the daemon keeps the snapshot in memory between requests."""
+        make_discussion(tmp_path)
+        discuss_root = tmp_path / ".discuss"
+
+        request_check({"status": "completed"}, str(tmp_path))
+        first = daemon.snapshot_cache.load(discuss_root)
+        request_check({"status": "completed"}, str(tmp_path))
+
+        assert daemon.snapshot_cache.load(discuss_root) is first
+
+    def test_hook_script_uses_daemon(self, daemon, socket_path, tmp_path):
+        """Test the installed hook forwards to the daemon."""
+        make_discussion(tmp_path)
+        env = os.environ.copy()
+        env["PWD"] = str(tmp_path)
+
+        result = subprocess.run(
+            [sys.executable, str(CHECK_PRECIPITATION)],
+            input=json.dumps({"status": "completed"}),
+            capture_output=True,
+            text=True,
+            cwd=str(tmp_path),
+            env=env,
+        )
+
+        assert result.returncode == 0
+        assert json.loads(result.stdout) == {}
+        assert tmp_path / ".discuss" in daemon.snapshot_cache._entries
+
+    def test_applies_request_environment(self, daemon, socket_path, tmp_path, monkeypatch):
+        """Test the check runs with the hook's DISCUSS_* environment, not the daemon's."""
+        monkeypatch.delenv("DISCUSS_SNAPSHOT_FORMAT", raising=False)
+        make_discussion(tmp_path)
+
+        response = raw_request(
+            socket_path,
+            {
+                "input": {"status": "completed"},
+                "workspace_root": str(tmp_path),
+                "env": {"DISCUSS_SNAPSHOT_FORMAT": "json", "DISCUSS_HOOKS_SOCKET": socket_path},
+            },
+        )
+
+        assert json.loads(response) == {"output": {}}
+        assert (tmp_path / ".discuss" / ".snapshot.json").exists()
+        assert not (tmp_path / ".discuss" / ".snapshot.yaml").exists()
+        assert "DISCUSS_SNAPSHOT_FORMAT" not in os.environ
+
+    def test_rejects_foreign_environment(self, daemon, socket_path, tmp_path):
+        """Test a request may only set DISCUSS_* variables."""
+        response = raw_request(
+            socket_path,
+            {
+                "input": {"status": "completed"},
+                "workspace_root": str(tmp_path),
+                "env": {"PATH": "/nowhere"},
+            },
+        )
+
+        assert response == b""
+        assert os.environ["PATH"] != "/nowhere"
+
+
+    def test_stalled_client_does_not_block(self, daemon, socket_path, tmp_path, monkeypatch):
+        """Test a client that never finishes its request is dropped after the timeout."""
+        monkeypatch.setattr(CheckRequestHandler, "timeout", 0.2)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+            stalled.settimeout(10)
+            stalled.connect(socket_path)
+            stalled.sendall(b'{"input": ')
+
+            assert stalled.makefile("rb").read() == b""
+            assert request_check({"status": "completed"}, str(tmp_path)) == {}
+
+
+class TestRequestEnvironment:
+    """Tests for forwarding the hook's environment."""
+
+    def test_client_forwards_discuss_variables(self, monkeypatch):
+        """Test the client sends DISCUSS_* variables only."""
+        monkeypatch.setenv("DISCUSS_REMINDER_MODE", "problems")
+
+        env = get_forwarded_env()
+
+        assert env["DISCUSS_REMINDER_MODE"] == "problems"
+        assert all(name.startswith("DISCUSS_") for name in env)
+
+    def test_replaces_and_restores(self, monkeypatch):
+        """Test the daemon's DISCUSS_* variables are replaced, then restored."""
+        monkeypatch.setenv("DISCUSS_REMINDER_MODE", "problems")
+        monkeypatch.delenv("DISCUSS_HOOKS_LOG_LEVEL", raising=False)
+
+        with request_environment({"DISCUSS_HOOKS_LOG_LEVEL": "DEBUG"}):
+            assert "DISCUSS_REMINDER_MODE" not in os.environ
+            assert os.environ["DISCUSS_HOOKS_LOG_LEVEL"] == "DEBUG"
+
+        assert os.environ["DISCUSS_REMINDER_MODE"] == "problems"
+        assert "DISCUSS_HOOKS_LOG_LEVEL" not in os.environ
+
+    def test_rereads_process_settings(self, monkeypatch):
+        """Test settings cached per process follow the request's environment."""
+        from common.logging_utils import DEBUG, get_log_level
+
+        monkeypatch.delenv("DISCUSS_HOOKS_LOG_LEVEL", raising=False)
+        default = get_log_level()
+
+        with request_environment({"DISCUSS_HOOKS_LOG_LEVEL": "DEBUG"}):
+            assert get_log_level() == DEBUG
+
+        assert get_log_level() == default
+
+
+class TestSnapshotCache:
+    """Tests for SnapshotCache revalidation."""
+
+    def test_reloads_after_external_write(self, tmp_path):
+        """Test a snapshot written by another process is picked up."""
+        discuss_root = tmp_path / ".discuss"
+        discuss_root.mkdir()
+        cache = SnapshotCache()
+
+        snapshot = cache.load(discuss_root)
+        snapshot["config"]["stale_threshold"] = 7
+        cache.save(discuss_root, snapshot)
+
+        (discuss_root / ".snapshot.yaml").write_text(
+            "version: 1\nconfig:\n  stale_threshold: 12\ndiscussions: {}\n"
+        )
+
+        assert cache.load(discuss_root)["config"]["stale_threshold"] == 12
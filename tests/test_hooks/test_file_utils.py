@@ -2,14 +2,17 @@
 Tests for hooks/common/file_utils.py
 """
 
+import hashlib
 import pytest
 from pathlib import Path
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
 
+import common.file_utils as file_utils
 from common.file_utils import (
     ensure_directory,
+    file_digest,
     find_discuss_root,
     get_decision_path,
 )
@@ -179,3 +182,32 @@ class TestGetDecisionPath:
         
         expected = tmp_path / "decisions" / "03-use-meta-yaml-schema.md"
         assert result == expected
+
+
+class TestFileDigest:
+    """Tests for file_digest function."""
+
+    def test_small_file(self, tmp_path):
+        """Test digest of a file read in one go."""
+        path = tmp_path / "note.md"
+        path.write_bytes(b"# Note")
+
+        assert file_digest(path) == hashlib.blake2b(b"# Note", digest_size=16).hexdigest()
+
+    def test_mmap_matches_read(self, tmp_path, monkeypatch):
+        """Test mapped files hash the same as read files."""
+        path = tmp_path / "note.md"
+        path.write_bytes(b"x" * 4096)
+        expected = file_digest(path)
+
+        monkeypatch.setattr(file_utils, "MMAP_THRESHOLD", 1024)
+
+        assert file_digest(path) == expected
+
+    def test_empty_and_missing(self, tmp_path):
+        """Test empty files hash and missing files give None."""
+        path = tmp_path / "empty.md"
+        path.write_bytes(b"")
+
+        assert file_digest(path) == hashlib.blake2b(b"", digest_size=16).hexdigest()
+        assert file_digest(tmp_path / "missing.md") is None
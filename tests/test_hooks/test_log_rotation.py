@@ -0,0 +1,197 @@
+"""
+Tests for hook log rotation (hooks/common/log_rotation.py)
+"""
+
+import gzip
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+HOOKS_DIR = Path(__file__).parent.parent.parent / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
+
+from common import log_rotation
+from common.log_rotation import append, cleanup, list_archives, maintain
+
+ACTIVE = "discuss-hooks.jsonl"
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    return log_dir
+
+
+def write(path: Path, text: str, age_days: float = 0) -> Path:
+    path.write_text(text)
+    mtime = time.time() - age_days * 86400
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def wait_for_cleanup(log_dir: Path, timeout: float = 30) -> None:
+    """Wait until the detached cleanup processes compressed every rotated log."""
+    deadline = time.monotonic() + timeout
+    while list(log_dir.glob("discuss-hooks.*.jsonl")) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def read_all(log_dir: Path) -> str:
+    """Content of the active log and all archives, oldest first."""
+    parts = [
+        gzip.decompress(path.read_bytes()).decode()
+        for path in reversed(list_archives(log_dir, "discuss-hooks"))
+    ]
+    active = log_dir / ACTIVE
+    if active.exists():
+        parts.append(active.read_text())
+    return "".join(parts)
+
+
+class TestAppend:
+    """Tests for append."""
+
+    def test_creates_directory_and_reports_size(self, tmp_path):
+        """Test the first write creates the file; later ones report its size."""
+        path = tmp_path / "logs" / ACTIVE
+
+        assert append(lambda: path, b"one\n") == (path, 4, True)
+        assert append(lambda: path, b"two\n") == (path, 8, False)
+        assert path.read_text() == "one\ntwo\n"
+
+
+class TestMaintain:
+    """Tests for maintain and cleanup."""
+
+    @pytest.fixture
+    def cleanups(self, monkeypatch):
+        """Cleanups started by maintain, recorded instead of run."""
+        started = []
+        monkeypatch.setattr(log_rotation, "start_cleanup", lambda *args: started.append(args))
+        return started
+
+    def test_rotates_oversized_file(self, log_dir, cleanups):
+        """Test an active file over the cap is renamed, and compressed by the cleanup."""
+        active = write(log_dir / ACTIVE, "x" * 200 + "\n")
+
+        assert maintain(active, "discuss-hooks", {ACTIVE}, 100, 5, 0)
+
+        [rotated] = log_dir.glob("discuss-hooks.*.jsonl")
+        assert not active.exists()
+        assert rotated.read_text() == "x" * 200 + "\n"
+        assert cleanups == [(log_dir, "discuss-hooks", {ACTIVE}, 5, 0)]
+
+        cleanup(*cleanups[0])
+
+        archives = list_archives(log_dir, "discuss-hooks")
+        assert not active.exists()
+        assert len(archives) == 1
+        assert archives[0].name.startswith("discuss-hooks.") and archives[0].name.endswith(
+            ".jsonl.gz"
+        )
+        assert gzip.decompress(archives[0].read_bytes()) == b"x" * 200 + b"\n"
+
+    def test_keeps_small_file(self, log_dir, cleanups):
+        """Test a file under the cap is left alone, with no cleanup to start."""
+        active = write(log_dir / ACTIVE, "x\n")
+
+        maintain(active, "discuss-hooks", {ACTIVE}, 100, 5, 0)
+
+        assert active.read_text() == "x\n"
+        assert list_archives(log_dir, "discuss-hooks") == []
+        assert cleanups == []
+
+    def test_compresses_inactive_logs(self, log_dir):
+        """Test previous days' logs are compressed, active ones and others are not."""
+        today = write(log_dir / "discuss-hooks-2026-10-18.log", "today\n")
+        write(log_dir / "discuss-hooks-2026-10-17.log", "yesterday\n", age_days=1)
+        write(log_dir / "other.log", "unrelated\n")
+
+        cleanup(log_dir, "discuss-hooks", {today.name, ACTIVE}, 5, 0)
+
+        assert sorted(path.name for path in log_dir.iterdir() if not path.name.startswith(".")) == [
+            "discuss-hooks-2026-10-17.log.gz",
+            "discuss-hooks-2026-10-18.log",
+            "other.log",
+        ]
+        archive = log_dir / "discuss-hooks-2026-10-17.log.gz"
+        assert gzip.decompress(archive.read_bytes()) == b"yesterday\n"
+        assert archive.stat().st_mtime == pytest.approx(time.time() - 86400, abs=5)
+
+    def test_retention(self, log_dir):
+        """Test archives beyond the count or age limit are deleted."""
+        for age in (1, 2, 3, 40):
+            write(log_dir / f"discuss-hooks.{age}.jsonl.gz", "", age_days=age)
+        write(log_dir / ACTIVE, "")
+
+        cleanup(log_dir, "discuss-hooks", {ACTIVE}, 2, 30)
+
+        assert [path.name for path in list_archives(log_dir, "discuss-hooks")] == [
+            "discuss-hooks.1.jsonl.gz",
+            "discuss-hooks.2.jsonl.gz",
+        ]
+
+    @pytest.mark.skipif(log_rotation.fcntl is None, reason="needs fcntl")
+    def test_skips_when_locked(self, log_dir):
+        """Test a process does not wait for another one's maintenance."""
+        import fcntl
+
+        active = write(log_dir / ACTIVE, "x" * 200)
+        with open(log_dir / log_rotation.MAINTENANCE_LOCK_NAME, "w") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+
+            assert not maintain(active, "discuss-hooks", {ACTIVE}, 100, 5, 0)
+
+        assert active.exists()
+
+    def test_cleanup_process(self, log_dir):
+        """Test the detached cleanup process compresses a rotated log."""
+        write(log_dir / "discuss-hooks.20261018T101500-1.jsonl", "rotated\n")
+
+        log_rotation.start_cleanup(log_dir, "discuss-hooks", [ACTIVE], 5, 0)
+        wait_for_cleanup(log_dir)
+
+        [archive] = list_archives(log_dir, "discuss-hooks")
+        assert gzip.decompress(archive.read_bytes()) == b"rotated\n"
+
+
+@pytest.mark.skipif(log_rotation.fcntl is None, reason="needs fcntl")
+def test_concurrent_writers_lose_no_lines(tmp_path):
+    """Test rotating under concurrent hook processes keeps every line whole."""
+    script = (
+        "import sys; from pathlib import Path\n"
+        f"sys.path.insert(0, {str(HOOKS_DIR)!r})\n"
+        f"Path.home = lambda: Path({str(tmp_path)!r})\n"
+        "from common.logging_utils import log_hook_start, log_hook_end, log_info\n"
+        "for run in range(40):\n"
+        "    log_hook_start(sys.argv[1], {'session_id': sys.argv[1]})\n"
+        "    for i in range(10):\n"
+        "        log_info('line %d ' + 'x' * 200, i)\n"
+        "    log_hook_end(sys.argv[1])\n"
+    )
+    env = dict(
+        os.environ,
+        DISCUSS_HOOKS_LOG_FORMAT="json",
+        DISCUSS_HOOKS_LOG_MAX_BYTES="20000",
+        DISCUSS_HOOKS_LOG_KEEP="1000",
+    )
+    env.pop("DISCUSS_HOOKS_LOG_LEVEL", None)
+    processes = [
+        subprocess.Popen([sys.executable, "-c", script, f"hook{n}"], env=env) for n in range(4)
+    ]
+    assert all(process.wait(timeout=120) == 0 for process in processes)
+
+    log_dir = tmp_path / ".discuss-for-specs" / "logs"
+    wait_for_cleanup(log_dir)
+    records = [json.loads(line) for line in read_all(log_dir).splitlines()]
+    assert len(records) == 4 * 40 * 13
+    assert len(list_archives(log_dir, "discuss-hooks")) > 1
+    assert not list(log_dir.glob("discuss-hooks.*.jsonl"))  # every archive compressed
+    ends = [record for record in records if record["phase"] == "end"]
+    assert len(ends) == 160 and all(record["verdict"] == "allow" for record in ends)
@@ -0,0 +1,299 @@
+"""
+Tests for hook log statistics (hooks/common/log_stats.py, stop/discuss_hooks.py)
+"""
+
+import gzip
+import json
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+HOOKS_DIR = Path(__file__).parent.parent.parent / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
+
+import common.log_stats as log_stats
+import common.logging_utils as logging_utils
+from common.log_stats import LatencyHistogram, collect_stats, format_stats, iter_log_files
+
+
+def json_end(day, platform, session, duration, verdict, hook="check_precipitation"):
+    """An END record as logging_utils writes it."""
+    return (
+        json.dumps(
+            {
+                "ts": f"{day}T10:00:00.000",
+                "level": "INFO",
+                "hook": hook,
+                "exec_id": "a3f2",
+                "platform": platform,
+                "session": session,
+                "phase": "end",
+                "duration_ms": duration,
+                "verdict": verdict,
+                "msg": "END [OK]",
+            },
+            ensure_ascii=False,
+        )
+        + "\n"
+    )
+
+
+def json_other(day):
+    return (
+        json.dumps(
+            {
+                "ts": f"{day}T10:00:00.000",
+                "level": "INFO",
+                "hook": "check_precipitation",
+                "exec_id": "a3f2",
+                "platform": "cursor",
+                "session": "s",
+                "phase": "run",
+                "duration_ms": None,
+                "verdict": None,
+                "msg": "> Stale reminders: 0",
+            }
+        )
+        + "\n"
+    )
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    return log_dir
+
+
+def stats_for(log_dir, **kwargs):
+    return collect_stats(list(iter_log_files(log_dir, "discuss-hooks")), **kwargs)
+
+
+class TestLatencyHistogram:
+    """Tests for LatencyHistogram."""
+
+    def test_percentiles_within_resolution(self):
+        """Test percentiles are within the bucket resolution of the exact value."""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(3, 1) for _ in range(5000)]
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.add(value)
+
+        values.sort()
+        for q in (0.5, 0.95, 0.99):
+            exact = values[int(q * len(values)) - 1]
+            assert histogram.percentile(q) == pytest.approx(exact, rel=0.03)
+        assert histogram.percentile(1.0) == max(values)
+        assert len(histogram.buckets) < 600
+
+    def test_empty_and_zero(self):
+        """Test an empty histogram and zero latencies."""
+        histogram = LatencyHistogram()
+        assert histogram.percentile(0.5) is None
+
+        histogram.add(0.0)
+        assert histogram.percentile(0.5) == 0.0
+
+
+class TestCollectStats:
+    """Tests for collect_stats over both formats."""
+
+    def test_json_and_archives(self, log_dir):
+        """Test END records of the active log and .gz archives are counted."""
+        archive = "".join(
+            json_other("2026-10-01") + json_end("2026-10-01", "cursor", "s1", 10.0, "allow")
+            for _ in range(3)
+        )
+        (log_dir / "discuss-hooks.20261001T100000-1.jsonl.gz").write_bytes(
+            gzip.compress(archive.encode())
+        )
+        (log_dir / "discuss-hooks.jsonl").write_text(
+            json_end("2026-10-02", "cursor", "s1", 30.0, "block")
+            + json_end("2026-10-02", "claude_code", "s2", 5.0, "error")
+            + json_other("2026-10-02")
+        )
+
+        groups = stats_for(log_dir, by=["platform"])
+
+        assert groups[("cursor",)].runs == 4
+        assert groups[("cursor",)].verdicts == {"allow": 3, "block": 1}
+        assert groups[("cursor",)].latency.max == 30.0
+        assert groups[("claude_code",)].error_rate == 1.0
+
+    def test_filters_and_grouping(self, log_dir):
+        """Test --since/--hook/--platform filters and multi-field groups."""
+        (log_dir / "discuss-hooks.jsonl").write_text(
+            json_end("2026-10-01", "cursor", "s1", 10.0, "allow")
+            + json_end("2026-10-02", "cursor", "s1", 10.0, "skip")
+            + json_end("2026-10-02", "cursor", None, 10.0, "allow", hook="other")
+            + json_end("2026-10-02", "claude_code", "s2", 10.0, "allow")
+        )
+
+        groups = stats_for(
+            log_dir,
+            by=["day", "session"],
+            since="2026-10-02",
+            hook="check_precipitation",
+            platform="cursor",
+        )
+
+        assert list(groups) == [("2026-10-02", "s1")]
+        assert groups[("2026-10-02", "s1")].verdicts == {"skip": 1}
+
+    def test_text_log_joins_by_tag(self, log_dir, tmp_path, monkeypatch):
+        """Test text logs written by logging_utils, interleaved with another run."""
+        monkeypatch.setattr(Path, "home", lambda: tmp_path)
+        monkeypatch.setattr(logging_utils, "get_log_dir", lambda: log_dir)
+        logging_utils.set_log_format(logging_utils.LOG_FORMAT_TEXT)
+        logging_utils.set_log_level(logging_utils.INFO)
+        try:
+            logging_utils.log_hook_start(
+                "check_precipitation", {"hook_event_name": "Stop", "session_id": "s1"}
+            )
+            logging_utils.log_skip("No .discuss directory found")
+            logging_utils.log_hook_end("check_precipitation", {})
+            logging_utils.log_hook_start("check_precipitation", {"hook_event_name": "Stop"})
+            logging_utils.log_hook_end("check_precipitation", {"action": "suggest"})
+        finally:
+            logging_utils.set_log_format(None)
+            logging_utils.set_log_level(None)
+
+        groups = stats_for(log_dir, by=["platform", "session"])
+
+        assert groups[("claude_code", "s1")].verdicts == {"skip": 1}
+        assert groups[("claude_code", "-")].verdicts == {"suggest": 1}
+        assert groups[("claude_code", "s1")].latency.count == 1
+
+    def test_legacy_text_log(self, log_dir):
+        """Test END lines without duration/verdict and runs without END."""
+        prefix = "2026-01-30 22:31:40 | INFO     | [check_precipitation:{}] "
+        lines = [
+            "START cwd=/p",
+            "platform=cursor session=N/A",
+            ">> Blocking: 1 stale reminder(s) [FORCE]",
+            "END [OK]",
+        ]
+        text = "".join(prefix.format("a3f2") + line + "\n" for line in lines)
+        text += prefix.format("b4c1") + "START cwd=/p\n"  # crashed run
+        text += prefix.format("c5d6") + "START cwd=/p\n" + prefix.format("c5d6") + "END [FAIL]\n"
+        (log_dir / "discuss-hooks-2026-01-30.log").write_text(text)
+
+        groups = stats_for(log_dir, by=["day"])
+
+        assert groups[("2026-01-30",)].verdicts == {"block": 1, "error": 1}
+        assert groups[("2026-01-30",)].latency.count == 0
+
+    def test_pending_runs_bounded(self, log_dir, monkeypatch):
+        """Test runs without END do not accumulate."""
+        monkeypatch.setattr(log_stats, "MAX_PENDING", 10)
+        prefix = "2026-01-30 22:31:40 | INFO     | [check_precipitation:{:04x}] "
+        text = "".join(prefix.format(i) + "START cwd=/p\n" for i in range(100))
+        text += prefix.format(99) + "END [OK] duration_ms=1.5 verdict=allow\n"
+        text += prefix.format(0) + "END [OK] duration_ms=1.5 verdict=allow\n"
+        (log_dir / "discuss-hooks-2026-01-30.log").write_text(text)
+
+        assert stats_for(log_dir, by=["hook"])[("check_precipitation",)].runs == 1
+
+    def test_line_split_across_chunks(self, log_dir, monkeypatch):
+        """Test records spanning read blocks are decoded whole."""
+        monkeypatch.setattr(log_stats, "CHUNK_SIZE", 7)
+        (log_dir / "discuss-hooks.jsonl").write_text(
+            "".join(json_end("2026-10-02", "cursor", "s1", 10.0, "allow") for _ in range(5))
+        )
+
+        assert stats_for(log_dir)[("cursor",)].runs == 5
+
+    @pytest.mark.parametrize("log_format", ["text", "json"])
+    def test_cheap_exits_counted(self, tmp_path, log_format):
+        """Test runs that end at a cheap exit are logged as skipped runs."""
+        env = dict(
+            os.environ,
+            HOME=str(tmp_path),
+            PWD=str(tmp_path),
+            DISCUSS_HOOKS_LOG_FORMAT=log_format,
+            DISCUSS_HOOKS_LOG_LEVEL="INFO",
+        )
+        for input_data in [{"hook_event_name": "Stop", "session_id": "s1"}, {"status": "x"}]:
+            subprocess.run(
+                [sys.executable, str(HOOKS_DIR / "stop" / "check_precipitation.py")],
+                input=json.dumps(input_data),
+                capture_output=True,
+                text=True,
+                cwd=str(tmp_path),
+                env=env,
+                check=True,
+            )
+
+        groups = stats_for(tmp_path / ".discuss-for-specs" / "logs", by=["platform", "session"])
+
+        assert groups[("claude_code", "s1")].verdicts == {"skip": 1}
+        assert groups[("cursor", "-")].verdicts == {"skip": 1}
+        assert groups[("cursor", "-")].latency.count == 1
+
+
+def test_format_stats():
+    """Test the table lists groups with percentiles and verdicts."""
+    groups = {("cursor",): log_stats.GroupStats()}
+    groups[("cursor",)].add(log_stats.RunRecord("2026-10-02", "h", "cursor", None, 12.0, "block"))
+
+    table = format_stats(groups, ["platform"]).splitlines()
+
+    assert table[0].split() == [
+        "platform",
+        "runs",
+        "p50",
+        "ms",
+        "p95",
+        "ms",
+        "p99",
+        "ms",
+        "allow",
+        "skip",
+        "suggest",
+        "block",
+        "error",
+        "error",
+        "%",
+    ]
+    assert table[1].split()[:3] == ["cursor", "1", "12.0"]
+    assert format_stats({}, ["platform"]) == "No hook runs found"
+
+
+def test_stats_command(log_dir):
+    """Test the stats command end to end."""
+    (log_dir / "discuss-hooks.jsonl").write_text(
+        json_end("2026-10-02", "cursor", "s1", 10.0, "allow")
+    )
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(HOOKS_DIR / "stop" / "discuss_hooks.py"),
+            "stats",
+            "--by",
+            "platform,day",
+            "--json",
+            "--log-dir",
+            str(log_dir),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    [group] = json.loads(result.stdout)
+    assert group["platform"] == "cursor" and group["day"] == "2026-10-02"
+    assert group["runs"] == 1 and group["verdicts"]["allow"] == 1
+    assert group["p95_ms"] == pytest.approx(10.0, rel=0.02)
+
+    bad = subprocess.run(
+        [sys.executable, str(HOOKS_DIR / "stop" / "discuss_hooks.py"), "stats", "--by", "color"],
+        capture_output=True,
+        text=True,
+    )
+    assert bad.returncode == 2
@@ -3,14 +3,18 @@ Tests for hooks/common/logging_utils.py
 """
 
 import pytest
+import json
 import logging
 from pathlib import Path
+import subprocess
 import sys
 import os
 from unittest.mock import patch, MagicMock
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+HOOKS_DIR = Path(__file__).parent.parent.parent / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
 
+import common.logging_utils as logging_utils
 from common.logging_utils import (
     get_base_dir,
     get_config_dir,
@@ -28,9 +32,28 @@ from common.logging_utils import (
     log_warning,
     log_info,
     log_debug,
+    get_log_file,
+    log_skip,
+    set_log_format,
+    set_log_level,
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_pipeline(monkeypatch):
+    """Start every test outside a run, with the level read from the environment."""
+    monkeypatch.delenv("DISCUSS_HOOKS_LOG_LEVEL", raising=False)
+    monkeypatch.delenv("DISCUSS_HOOKS_LOG_FORMAT", raising=False)
+    set_log_level(None)
+    set_log_format(None)
+    monkeypatch.setattr(logging_utils, "_in_run", False)
+    logging_utils._buffer.clear()
+    yield
+    set_log_level(None)
+    set_log_format(None)
+    logging_utils._buffer.clear()
+
+
 class TestDirectoryPaths:
     """Tests for directory path functions."""
     
@@ -217,3 +240,196 @@ class TestLogFileCreation:
         
         # Check log directory exists
         assert log_dir.exists()
+
+
+class TestPipeline:
+    """Tests for level gating and buffered writes."""
+
+    @pytest.fixture
+    def home(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(Path, "home", lambda: tmp_path)
+        return tmp_path
+
+    def read_log(self):
+        log_file = get_log_file()
+        return log_file.read_text(encoding="utf-8") if log_file.exists() else ""
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (None, logging.INFO),
+            ("debug", logging.DEBUG),
+            ("ERROR", logging.ERROR),
+            ("OFF", 100),
+            ("bogus", logging.INFO),
+        ],
+    )
+    def test_level_from_environment(self, monkeypatch, value, expected):
+        """Test DISCUSS_HOOKS_LOG_LEVEL with INFO as default."""
+        if value is not None:
+            monkeypatch.setenv("DISCUSS_HOOKS_LOG_LEVEL", value)
+
+        assert logging_utils.get_log_level() == expected
+
+    def test_suppressed_records_not_formatted(self, home):
+        """Test arguments of suppressed records are never formatted."""
+
+        class Unformattable:
+            def __str__(self):
+                raise AssertionError("formatted")
+
+        log_debug("value=%s", Unformattable())
+
+        assert self.read_log() == ""
+
+    def test_input_not_serialized_below_debug(self, home, monkeypatch):
+        """Test the stdin payload is only serialized at DEBUG."""
+        monkeypatch.setattr(logging_utils, "_truncate", None)
+        log_hook_start("test_hook", {"session_id": "s1", "payload": "x" * 10000})
+        log_hook_end("test_hook", {"decision": "block"})
+
+        assert "platform=cursor session=s1" in self.read_log()
+        assert "input=" not in self.read_log()
+
+    def test_debug_level(self, home):
+        """Test DEBUG writes the truncated payloads and lazy messages."""
+        set_log_level(logging.DEBUG)
+        log_hook_start("test_hook", {"payload": "x" * 10000})
+        log_debug("Found %s active discussion(s)", 2)
+        log_hook_end("test_hook", {"decision": "block"})
+
+        text = self.read_log()
+        assert "...(truncated)" in text
+        assert "| DEBUG    | [test_hook:" in text
+        assert ". Found 2 active discussion(s)" in text
+        assert 'output={"decision": "block"}' in text
+
+    def test_one_write_per_run(self, home, monkeypatch):
+        """Test a run's lines are written together at log_hook_end."""
+        writes = []
+        write = logging_utils._write
+        monkeypatch.setattr(
+            logging_utils, "_write", lambda data: writes.append(data) or write(data)
+        )
+
+        log_hook_start("test_hook", {"session_id": "s1"})
+        for i in range(20):
+            log_info("step %d", i)
+        assert self.read_log() == ""
+        log_hook_end("test_hook", {}, success=True)
+
+        assert len(writes) == 1
+        assert self.read_log().count("\n") == 23
+        assert "END [OK] duration_ms=" in self.read_log().splitlines()[-1]
+
+    def test_outside_run_written_immediately(self, home):
+        """Test records outside a run (daemon, watcher) are not held back."""
+        log_info("Daemon listening on %s", "/tmp/sock")
+
+        assert "> Daemon listening on /tmp/sock" in self.read_log()
+
+    def test_concurrent_runs_do_not_interleave(self, tmp_path):
+        """Test lines of concurrent hook processes stay grouped per run."""
+        script = (
+            "import sys; from pathlib import Path\n"
+            f"sys.path.insert(0, {str(HOOKS_DIR)!r})\n"
+            f"Path.home = lambda: Path({str(tmp_path)!r})\n"
+            "from common.logging_utils import log_hook_start, log_hook_end, log_info\n"
+            "for run in range(5):\n"
+            "    log_hook_start(sys.argv[1])\n"
+            "    for i in range(100):\n"
+            "        log_info('%s line %d ' + 'x' * 100, sys.argv[1], i)\n"
+            "    log_hook_end(sys.argv[1])\n"
+        )
+        processes = [subprocess.Popen([sys.executable, "-c", script, f"hook{n}"]) for n in range(4)]
+        assert all(process.wait(timeout=60) == 0 for process in processes)
+
+        log_file = next((tmp_path / ".discuss-for-specs" / "logs").glob("discuss-hooks-*.log"))
+        lines = log_file.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 4 * 5 * 102
+        # Every run is one block: START, 100 lines, END from the same exec id
+        for start in range(0, len(lines), 102):
+            block = lines[start : start + 102]
+            assert len({line.split(" | ", 2)[2].split("] ", 1)[0] for line in block}) == 1
+            assert block[0].endswith(f"START cwd={os.getcwd()}")
+            assert block[-1].endswith(" verdict=allow")
+
+
+class TestJsonFormat:
+    """Tests for the JSON-lines format."""
+
+    FIELDS = [
+        "ts",
+        "level",
+        "hook",
+        "exec_id",
+        "platform",
+        "session",
+        "phase",
+        "duration_ms",
+        "verdict",
+        "msg",
+    ]
+
+    @pytest.fixture
+    def records(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(Path, "home", lambda: tmp_path)
+        monkeypatch.setenv("DISCUSS_HOOKS_LOG_FORMAT", "json")
+
+        def read():
+            log_file = tmp_path / ".discuss-for-specs" / "logs" / "discuss-hooks.jsonl"
+            return [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+
+        return read
+
+    def test_fixed_fields(self, records):
+        """Test every record has the same fields; the end record has duration and verdict."""
+        log_hook_start("check_precipitation", {"hook_event_name": "Stop", "session_id": "s1"})
+        log_info("Stale reminders: %s", 1)
+        log_hook_end("check_precipitation", {"action": "block", "force": True})
+
+        found = records()
+        assert all(list(record) == self.FIELDS for record in found)
+        assert [record["phase"] for record in found] == ["start", "start", "run", "end"]
+        assert {(record["platform"], record["session"], record["exec_id"]) for record in found} == {
+            ("claude_code", "s1", found[0]["exec_id"]),
+        }
+        assert found[-1]["msg"] == "END [OK]"
+        assert found[-1]["verdict"] == "block"
+        assert found[-1]["duration_ms"] >= 0
+        assert found[0]["verdict"] is None and found[0]["duration_ms"] is None
+
+    @pytest.mark.parametrize(
+        "output, skip, success, verdict",
+        [
+            ({}, False, True, "allow"),
+            ({}, True, True, "skip"),
+            ({"action": "suggest"}, False, True, "suggest"),
+            ({}, False, False, "error"),
+        ],
+    )
+    def test_verdicts(self, records, output, skip, success, verdict):
+        """Test the verdict of the end record."""
+        log_hook_start("check_precipitation", {"hook_event_name": "Stop"})
+        if skip:
+            log_skip("No .discuss directory found")
+        log_hook_end("check_precipitation", output, success=success)
+
+        assert records()[-1]["verdict"] == verdict
+
+    def test_context_set_below_info(self, records):
+        """Test records of a run logged at WARNING still carry its platform and session."""
+        set_log_level(logging_utils.WARNING)
+        log_hook_start("check_precipitation", {"hook_event_name": "Stop", "session_id": "s1"})
+        log_error("Snapshot unreadable")
+        log_hook_end("check_precipitation", {})
+
+        [record] = records()
+        assert record["level"] == "ERROR"
+        assert (record["platform"], record["session"]) == ("claude_code", "s1")
+
+    def test_outside_run(self, records):
+        """Test records outside a run have no phase."""
+        log_info("Daemon stopped")
+
+        assert records()[-1]["phase"] is None
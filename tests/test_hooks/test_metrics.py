@@ -0,0 +1,200 @@
+"""
+Tests for hooks/common/metrics.py
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+import common.metrics as metrics
+from common.metrics import (
+    TIMING_JSON,
+    TIMING_LOG,
+    TIMING_OFF,
+    count,
+    format_counters,
+    format_phases,
+    get_counters,
+    get_phases,
+    incr,
+    phase,
+    record_phase,
+    reset_counters,
+    set_timing,
+)
+
+
+class TestCounters:
+    """Tests for per-run counters."""
+
+    def setup_method(self):
+        reset_counters()
+
+    def test_incr(self):
+        """Test counters start at zero and accumulate."""
+        incr("snapshot_writes")
+        incr("snapshot_writes")
+        incr("snapshot_writes_skipped", 3)
+
+        assert get_counters() == {"snapshot_writes": 2, "snapshot_writes_skipped": 3}
+
+    def test_reset(self):
+        """Test reset clears all counters."""
+        incr("snapshot_writes")
+        reset_counters()
+
+        assert get_counters() == {}
+
+    def test_get_counters_returns_copy(self):
+        """Test callers cannot change counters through the returned dict."""
+        get_counters()["snapshot_writes"] = 5
+
+        assert get_counters() == {}
+
+    def test_format_counters(self):
+        """Test counters are formatted sorted by name."""
+        assert format_counters({"b": 2, "a": 1}) == "a=1 b=2"
+
+
+@pytest.fixture
+def timing(monkeypatch):
+    """Enable phase timings for one test."""
+    monkeypatch.delenv("DISCUSS_HOOKS_TIMING", raising=False)
+    reset_counters()
+    set_timing(TIMING_LOG)
+    yield
+    set_timing(None)
+    reset_counters()
+
+
+class TestPhases:
+    """Tests for phase timings."""
+
+    def test_disabled_is_noop(self, monkeypatch):
+        """Test phase() and count() record nothing when timing is off."""
+        monkeypatch.delenv("DISCUSS_HOOKS_TIMING", raising=False)
+        set_timing(None)
+        reset_counters()
+
+        with phase("load_snapshot") as timer:
+            count("bytes_read", 10)
+
+        assert timer is None
+        assert phase("a") is phase("b")
+        assert get_phases() == {}
+
+    @pytest.mark.parametrize(
+        "value, mode",
+        [
+            ("", TIMING_OFF),
+            ("0", TIMING_OFF),
+            ("1", TIMING_LOG),
+            ("JSON", TIMING_JSON),
+        ],
+    )
+    def test_timing_env(self, monkeypatch, value, mode):
+        """Test DISCUSS_HOOKS_TIMING selects the mode."""
+        monkeypatch.setenv("DISCUSS_HOOKS_TIMING", value)
+        set_timing(None)
+        try:
+            assert metrics.get_timing() == mode
+        finally:
+            monkeypatch.delenv("DISCUSS_HOOKS_TIMING")
+            set_timing(None)
+
+    def test_durations_and_counts(self, timing):
+        """Test phases accumulate time, runs and the counts made inside them."""
+        record_phase("read_stdin", 0.002)
+        for _ in range(2):
+            with phase("scan_compare"):
+                time.sleep(0.001)
+                count("bytes_read", 100)
+                count("discussions_scanned")
+
+        phases = get_phases()
+
+        assert list(phases) == ["read_stdin", "scan_compare"]
+        assert phases["read_stdin"] == {"ms": 2.0, "calls": 1}
+        assert phases["scan_compare"]["calls"] == 2
+        assert phases["scan_compare"]["ms"] >= 2.0
+        assert phases["scan_compare"]["bytes_read"] == 200
+        assert phases["scan_compare"]["discussions_scanned"] == 2
+
+    def test_worker_thread_counts(self, timing):
+        """Test counts made on a worker thread go to the phase that started it."""
+        with phase("find_active_discussions"):
+            worker = threading.Thread(target=count, args=("stat_calls", 4))
+            worker.start()
+            worker.join()
+
+        assert get_phases()["find_active_discussions"]["stat_calls"] == 4
+
+    def test_reset(self, timing):
+        """Test reset_counters also clears phases."""
+        with phase("cleanup"):
+            pass
+        reset_counters()
+
+        assert get_phases() == {}
+
+    def test_format_phases(self):
+        """Test phases are formatted in run order with their counts."""
+        phases = {
+            "load_snapshot": {"ms": 0.412, "calls": 1, "bytes_read": 1830},
+            "scan_compare": {"ms": 1.2, "calls": 2},
+        }
+
+        assert (
+            format_phases(phases)
+            == "load_snapshot=0.41ms(bytes_read=1830) scan_compare=1.20ms(calls=2)"
+        )
+
+
+def test_run_check_timings(tmp_path, monkeypatch):
+    """Test a timed run logs its phases and appends them to the JSON sidecar."""
+    import common.logging_utils as logging_utils
+    from common.precipitation import run_check
+
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    monkeypatch.setenv("DISCUSS_HOOKS_TIMING", "json")
+    monkeypatch.setenv("DISCUSS_HOOKS_LOG_FORMAT", "text")
+    monkeypatch.delenv("DISCUSS_HOOKS_LOG_LEVEL", raising=False)
+    set_timing(None)
+    logging_utils.set_log_format(None)
+    logging_utils.set_log_level(None)
+    workspace = tmp_path / "project"
+    topic = workspace / ".discuss" / "2026-01-30" / "storage"
+    topic.mkdir(parents=True)
+    (topic / "outline.md").write_text("# Outline\n")
+    try:
+        run_check({"status": "completed"}, workspace, read_seconds=0.001)
+    finally:
+        set_timing(None)
+        logging_utils.set_log_format(None)
+
+    log_dir = tmp_path / ".discuss-for-specs" / "logs"
+    [log_file] = log_dir.glob("discuss-hooks-*.log")
+    assert " phases: read_stdin=1.00ms load_snapshot=" in log_file.read_text()
+
+    [record] = [
+        json.loads(line) for line in (log_dir / "hook-timings.jsonl").read_text().splitlines()
+    ]
+    assert record["hook"] == "check_precipitation" and record["verdict"] == "allow"
+    assert list(record["phases"]) == [
+        "read_stdin",
+        "load_snapshot",
+        "find_active_discussions",
+        "scan_compare",
+        "cleanup",
+        "save_snapshot",
+    ]
+    assert record["phases"]["find_active_discussions"]["stat_calls"] > 0
+    assert record["phases"]["scan_compare"]["discussions_scanned"] == 1
+    assert record["phases"]["scan_compare"]["bytes_read"] >= len("# Outline\n")
+    assert record["phases"]["save_snapshot"]["bytes_written"] > 0
@@ -0,0 +1,246 @@
+"""
+Tests for the outline problem parser (hooks/common/outline_parser.py)
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+import common.outline_parser as outline_parser
+from common.file_utils import file_digest
+from common.outline_parser import (
+    is_recorded,
+    iter_problems,
+    parse_outline,
+    parse_section,
+    problem_id,
+    split_sections,
+    update_problem_index,
+)
+from common.precipitation import run_check
+from common.snapshot_manager import get_reminder_mode, load_snapshot, save_snapshot
+
+OUTLINE = """# Discussion: Storage
+
+> Status: In Progress | Round: R2
+
+## 🔵 Current Focus
+
+- **Cache layout**
+
+## ⚪ Pending
+
+- [ ] Retention policy
+- [ ] Compression
+
+## ✅ Confirmed
+
+| Decision | Description | Document |
+|----------|-------------|----------|
+| Snapshot format | JSON by default | [D01](./decisions/D01-snapshot-format.md) |
+
+## ❌ Rejected
+
+*(None yet)*
+
+## Notes
+
+- Not a problem
+"""
+
+
+def move(text: str, title: str, to_heading: str) -> str:
+    """Move a pending list item to the end of another section."""
+    text = text.replace(f"- [ ] {title}\n", "")
+    return text.replace(f"{to_heading}\n\n", f"{to_heading}\n\n- {title}\n", 1)
+
+
+def problems(text: str) -> dict:
+    sections, _ = parse_outline(text)
+    return {problem["id"]: problem for problem in iter_problems(sections)}
+
+
+class TestParse:
+    """Tests for parse_outline and friends."""
+
+    def test_problem_states(self):
+        """Test list items and table rows get their section's status."""
+        found = problems(OUTLINE)
+
+        assert {key: problem["status"] for key, problem in found.items()} == {
+            "cache-layout": "discussing",
+            "retention-policy": "pending",
+            "compression": "pending",
+            "snapshot-format": "resolved",
+        }
+        assert found["snapshot-format"]["refs"] == ["D01-snapshot-format.md", "D1"]
+        assert found["cache-layout"]["title"] == "Cache layout"
+
+    def test_split_ignores_code_fences(self):
+        """Test headings inside code fences do not start a section."""
+        text = "## ⚪ Pending\n\n```\n## ✅ Not a heading\n- not an item\n```\n- Real item\n"
+
+        assert len(split_sections(text)) == 2
+        assert [p["id"] for p in parse_section(split_sections(text)[1])["problems"]] == [
+            "real-item"
+        ]
+
+    def test_decision_id_cells_and_pointers(self):
+        """Test ID cells and "→ D01" pointers are not part of titles."""
+        text = (
+            "## ✅ Final Decisions\n\n| ID | Decision |\n|----|----------|\n"
+            "| D03 | Two-level architecture |\n\n- D4: Snapshot window → D04-window.md\n"
+        )
+
+        found = problems(text)
+
+        assert found["two-level-architecture"]["refs"] == ["D3"]
+        assert found["snapshot-window"]["refs"] == ["D4"]
+
+    def test_non_ascii_titles(self):
+        """Test titles without ASCII letters get a stable digest id."""
+        assert problem_id("缓存布局") == problem_id("缓存布局")
+        assert problem_id("缓存布局").startswith("p-")
+
+    def test_only_changed_sections_reparsed(self):
+        """Test unchanged sections come from the cache."""
+        sections, reparsed = parse_outline(OUTLINE)
+        assert reparsed == len(sections) == 6
+
+        edited = OUTLINE.replace("- [ ] Compression", "- [ ] Compression level")
+        sections, reparsed = parse_outline(edited, sections)
+
+        assert reparsed == 1
+        assert "compression-level" in {p["id"] for p in iter_problems(sections)}
+
+    @pytest.mark.parametrize(
+        "decision",
+        [
+            "D02-anything.md",
+            "02-other.md",
+            "D07-retention-policy.md",
+            "retention-policy.md",
+        ],
+    )
+    def test_is_recorded(self, decision):
+        """Test decision files match by ID or slug."""
+        problem = {"id": "retention-policy", "refs": ["D2"]}
+
+        assert is_recorded(problem, [decision])
+        assert not is_recorded(problem, ["D03-compression.md"])
+
+
+class TestUpdateProblemIndex:
+    """Tests for update_problem_index."""
+
+    @pytest.fixture
+    def discuss_dir(self, tmp_path):
+        discuss_dir = tmp_path / "2026-01-30" / "storage"
+        (discuss_dir / "decisions").mkdir(parents=True)
+        return discuss_dir
+
+    def run(self, discuss_dir, old_state, text, decisions=()):
+        (discuss_dir / "outline.md").write_text(text)
+        new_state = {
+            "outline": {"digest": file_digest(discuss_dir / "outline.md"), "change_count": 0},
+            "decisions": [{"name": name} for name in decisions],
+            "notes": [],
+        }
+        return new_state, update_problem_index(old_state, new_state, discuss_dir)
+
+    def test_first_parse_is_baseline(self, discuss_dir):
+        """Test problems decided before tracking started are not reported."""
+        state, unrecorded = self.run(
+            discuss_dir, {}, move(OUTLINE, "Compression", "## ❌ Rejected")
+        )
+
+        assert unrecorded == []
+        assert "title" not in json.dumps(state)
+
+    def test_newly_resolved_until_recorded(self, discuss_dir):
+        """Test a problem turning resolved is reported until a decision exists."""
+        state, _ = self.run(discuss_dir, {}, OUTLINE)
+        resolved = move(OUTLINE, "Retention policy", "## ✅ Confirmed")
+
+        state, unrecorded = self.run(discuss_dir, state, resolved)
+        assert unrecorded == ["retention-policy"]
+
+        # Still reported on later runs, then cleared by a decision document
+        state, unrecorded = self.run(discuss_dir, state, resolved)
+        assert unrecorded == ["retention-policy"]
+        state, unrecorded = self.run(discuss_dir, state, resolved, ["D02-retention-policy.md"])
+        assert unrecorded == []
+
+    def test_unchanged_outline_not_read(self, discuss_dir, monkeypatch):
+        """Test the cached parse is used while the outline digest matches."""
+        state, _ = self.run(discuss_dir, {}, OUTLINE)
+        monkeypatch.setattr(outline_parser, "parse_outline", None)
+
+        _, unrecorded = self.run(discuss_dir, state, OUTLINE)
+
+        assert unrecorded == []
+
+    def test_outline_without_status_sections(self, discuss_dir):
+        """Test free-form outlines are not tracked."""
+        _, unrecorded = self.run(discuss_dir, {}, "# Notes\n\n- an idea\n")
+
+        assert unrecorded is None
+
+
+def test_run_check_problems_mode(tmp_path, monkeypatch):
+    """Test the hook reminds about decided problems instead of edit counts."""
+    monkeypatch.setenv("DISCUSS_SNAPSHOT_FORMAT", "json")
+    monkeypatch.setenv("DISCUSS_REMINDER_MODE", "problems")
+    topic = tmp_path / ".discuss" / "2026-01-30" / "storage"
+    topic.mkdir(parents=True)
+    outline = topic / "outline.md"
+
+    # Many edits without a decided problem: no reminder
+    for i in range(8):
+        outline.write_text(OUTLINE + f"\nRound {i}\n")
+        os.utime(outline, (time.time() + i, time.time() + i))
+        output = run_check({"status": "completed"}, tmp_path)
+        assert output == {}
+
+    outline.write_text(move(OUTLINE, "Retention policy", "## ✅ Confirmed"))
+    os.utime(outline, (time.time() + 10, time.time() + 10))
+    output = run_check({"status": "completed"}, tmp_path)
+
+    assert "Problem: Retention policy" in json.dumps(output, ensure_ascii=False)
+    assert "Compression" not in json.dumps(output)
+
+
+def test_yaml_snapshot_stays_in_subset(tmp_path, monkeypatch):
+    """Test the cached parse round-trips through the stdlib YAML writer."""
+    import common.snapshot_yaml as snapshot_yaml
+
+    monkeypatch.setenv("DISCUSS_SNAPSHOT_FORMAT", "yaml")
+    discuss_dir = tmp_path / ".discuss" / "2026-01-30" / "storage"
+    discuss_dir.mkdir(parents=True)
+    (discuss_dir / "outline.md").write_text(OUTLINE)
+    state = {"outline": {"digest": file_digest(discuss_dir / "outline.md")}, "decisions": []}
+    update_problem_index({}, state, discuss_dir)
+    snapshot = load_snapshot(tmp_path / ".discuss")
+    snapshot["discussions"]["2026-01-30/storage"] = state
+    snapshot.dirty = True
+
+    save_snapshot(tmp_path / ".discuss", snapshot)
+
+    text = (tmp_path / ".discuss" / ".snapshot.yaml").read_text()
+    assert snapshot_yaml.loads(text)["discussions"]["2026-01-30/storage"] == state
+
+
+def test_reminder_mode(monkeypatch):
+    """Test environment > config > default."""
+    monkeypatch.delenv("DISCUSS_REMINDER_MODE", raising=False)
+    assert get_reminder_mode({}) == "edits"
+    assert get_reminder_mode({"reminder_mode": "problems"}) == "problems"
+    assert get_reminder_mode({"reminder_mode": "bogus"}) == "edits"
+    monkeypatch.setenv("DISCUSS_REMINDER_MODE", "edits")
+    assert get_reminder_mode({"reminder_mode": "problems"}) == "edits"
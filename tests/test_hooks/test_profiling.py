@@ -0,0 +1,164 @@
+"""
+Tests for hook profiling (hooks/common/profiling.py, stop/discuss_hooks.py profiles)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+HOOKS_DIR = Path(__file__).parent.parent.parent / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
+
+from common import metrics
+from common.profiling import (
+    PROFILE_CPU,
+    PROFILE_MEMORY,
+    format_profile_report,
+    list_profiles,
+    merge_profiles,
+    profile_call,
+    prune_profiles,
+)
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    """Profiles under a temporary home; timing restored afterwards."""
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    monkeypatch.delenv("DISCUSS_HOOKS_TIMING", raising=False)
+    monkeypatch.delenv("DISCUSS_HOOKS_PROFILE", raising=False)
+    metrics.set_timing(None)
+    metrics.reset_counters()
+    yield tmp_path / ".discuss-for-specs" / "profiles"
+    metrics.set_timing(None)
+    metrics.reset_counters()
+
+
+def hook_run():
+    """A run with two phases that allocates memory, then exits like a hook."""
+    with metrics.phase("load_snapshot"):
+        metrics.count("bytes_read", 100)
+    with metrics.phase("scan_compare"):
+        data = [str(i) * 10 for i in range(20000)]
+        metrics.count("discussions_scanned", len(data) // 10000)
+    sys.exit(0)
+
+
+def profile(mode=None):
+    with pytest.raises(SystemExit):
+        profile_call("check_precipitation", hook_run, mode)
+
+
+class TestProfileCall:
+    """Tests for profile_call."""
+
+    def test_cpu_and_memory(self, profile_dir):
+        """Test the cProfile stats and the per-phase memory report are written."""
+        profile()
+
+        [report_path] = list_profiles(profile_dir)
+        report = json.loads(report_path.read_text())
+        assert report_path.with_suffix(".prof").exists()
+        assert report["hook"] == "check_precipitation" and report["exit_code"] == 0
+        assert list(report["phases"]) == ["load_snapshot", "scan_compare"]
+        scan = report["phases"]["scan_compare"]
+        assert scan["discussions_scanned"] == 2
+        assert scan["peak_kib"] > 1000
+        assert scan["top"][0]["where"].endswith(
+            f"test_profiling.py:{hook_run.__code__.co_firstlineno + 5}"
+        )
+        assert report["peak_kib"] >= scan["peak_kib"]
+
+    @pytest.mark.parametrize(
+        "mode, prof, memory", [(PROFILE_CPU, True, False), (PROFILE_MEMORY, False, True)]
+    )
+    def test_modes(self, profile_dir, mode, prof, memory):
+        """Test cpu mode skips tracemalloc and memory mode skips cProfile."""
+        profile(mode)
+
+        [report_path] = list_profiles(profile_dir)
+        report = json.loads(report_path.read_text())
+        assert report_path.with_suffix(".prof").exists() == prof
+        assert ("peak_kib" in report) == memory
+        assert ("peak_kib" in report["phases"]["scan_compare"]) == memory
+
+    def test_prune(self, profile_dir):
+        """Test only the newest invocations are kept, with their .prof files."""
+        profile_dir.mkdir(parents=True)
+        for i in range(5):
+            for suffix in (".json", ".prof"):
+                path = profile_dir / f"check_precipitation-2026101{i}T100000-1{suffix}"
+                path.write_text("{}")
+                os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+
+        prune_profiles(profile_dir, 2)
+
+        assert sorted(path.name for path in profile_dir.iterdir()) == [
+            "check_precipitation-20261013T100000-1.json",
+            "check_precipitation-20261013T100000-1.prof",
+            "check_precipitation-20261014T100000-1.json",
+            "check_precipitation-20261014T100000-1.prof",
+        ]
+
+
+def test_merge_profiles(profile_dir):
+    """Test invocations are merged into one ranked report."""
+    profile()
+    profile()
+
+    merged = merge_profiles(list_profiles(profile_dir))
+
+    assert merged["invocations"] == 2
+    assert merged["phases"]["scan_compare"]["runs"] == 2
+    assert merged["phases"]["scan_compare"]["discussions_scanned"] == 4
+    assert merged["allocations"][0]["runs"] == 2
+    report = format_profile_report(merged, "cumulative", 10)
+    assert report.startswith("Invocations: 2")
+    assert "Functions (by cumulative, 2 profile(s) merged):" in report
+    assert "hook_run" in report
+    assert format_profile_report(merge_profiles([])) == "No profiles found"
+
+
+def test_profiled_hook(tmp_path):
+    """Test the installed hook layout profiles a run and the profiles command reports it."""
+    workspace = tmp_path / "project"
+    (workspace / ".discuss" / "2026-01-30" / "storage").mkdir(parents=True)
+    (workspace / ".discuss" / "2026-01-30" / "storage" / "outline.md").write_text("# Outline\n")
+    env = dict(os.environ, HOME=str(tmp_path), DISCUSS_HOOKS_PROFILE="cpu", PWD=str(workspace))
+    env.pop("WORKSPACE_ROOT", None)
+    env.pop("PROJECT_ROOT", None)
+
+    result = subprocess.run(
+        [sys.executable, str(HOOKS_DIR / "stop" / "check_precipitation.py")],
+        input='{"status": "completed"}',
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=str(workspace),
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == {}
+
+    report = subprocess.run(
+        [
+            sys.executable,
+            str(HOOKS_DIR / "stop" / "discuss_hooks.py"),
+            "profiles",
+            "--hook",
+            "check_precipitation",
+            "--limit",
+            "200",
+            "--profile-dir",
+            str(tmp_path / ".discuss-for-specs" / "profiles"),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert report.startswith("Invocations: 1")
+    assert "load_snapshot" in report and "run_check" in report
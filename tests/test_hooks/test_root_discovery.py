@@ -0,0 +1,226 @@
+"""
+Tests for hooks/common/root_discovery.py and multi-root checks
+"""
+
+import json
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+import common.precipitation as precipitation
+from common.logging_utils import get_log_file, log_info, set_log_format
+from common.metrics import incr
+from common.precipitation import format_stale_reminder, run_check
+from common.root_discovery import (
+    find_discuss_roots,
+    find_workspace_top,
+    get_cache_path,
+    get_discuss_roots,
+    get_root_label,
+    is_multi_root_enabled,
+)
+from common.snapshot_manager import load_snapshot
+
+from .conftest import make_topic
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path, monkeypatch):
+    """Keep the root cache out of the real home directory."""
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.delenv("DISCUSS_HOOKS_ROOTS_TTL", raising=False)
+    return home
+
+
+@pytest.fixture
+def monorepo(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / ".git").mkdir(parents=True)
+    make_topic(repo / ".discuss", "2026-01-30/top-topic")
+    make_topic(repo / "packages" / "api" / ".discuss", "2026-01-30/api-topic")
+    make_topic(repo / "packages" / "web" / ".discuss", "2026-01-30/web-topic")
+    make_topic(repo / "node_modules" / "dep" / ".discuss", "2026-01-30/ignored")
+    make_topic(repo / ".cache" / ".discuss", "2026-01-30/ignored")
+    return repo
+
+
+class TestFindRoots:
+    """Tests for workspace top and .discuss root discovery."""
+
+    def test_workspace_top_is_git_ancestor(self, monorepo):
+        """Test the nearest ancestor containing .git is the top."""
+        assert find_workspace_top(monorepo / "packages" / "api") == monorepo
+
+    def test_workspace_top_without_git(self, tmp_path):
+        """Test the workspace root is the top outside a repository."""
+        assert find_workspace_top(tmp_path) == tmp_path
+
+    def test_finds_nested_roots(self, monorepo):
+        """Test every .discuss root is found, skipping vendored and hidden trees."""
+        assert find_discuss_roots(monorepo) == [
+            monorepo / ".discuss",
+            monorepo / "packages" / "api" / ".discuss",
+            monorepo / "packages" / "web" / ".discuss",
+        ]
+
+    def test_max_depth(self, monorepo):
+        """Test roots below max_depth are not found."""
+        assert find_discuss_roots(monorepo, max_depth=1) == [monorepo / ".discuss"]
+
+    def test_root_labels(self, monorepo):
+        """Test labels are relative to the workspace top."""
+        assert get_root_label(monorepo / ".discuss", monorepo) == "."
+        assert (
+            get_root_label(monorepo / "packages" / "api" / ".discuss", monorepo) == "packages/api"
+        )
+
+
+class TestRootCache:
+    """Tests for the cached root list."""
+
+    def test_uses_cache(self, monorepo):
+        """Test a fresh cached list is reused without walking the tree."""
+        roots = get_discuss_roots(monorepo)
+        assert get_cache_path(monorepo).exists()
+        make_topic(monorepo / "packages" / "cli" / ".discuss", "2026-01-30/cli-topic")
+
+        assert get_discuss_roots(monorepo) == roots
+
+    def test_stale_cache(self, monorepo, monkeypatch):
+        """Test an expired cached list is rebuilt."""
+        get_discuss_roots(monorepo)
+        make_topic(monorepo / "packages" / "cli" / ".discuss", "2026-01-30/cli-topic")
+        cache_path = get_cache_path(monorepo)
+        cached = json.loads(cache_path.read_text())
+        cached["created"] = time.time() - 3600
+        cache_path.write_text(json.dumps(cached))
+
+        assert monorepo / "packages" / "cli" / ".discuss" in get_discuss_roots(monorepo)
+
+    def test_cache_disabled(self, monorepo, monkeypatch):
+        """Test DISCUSS_HOOKS_ROOTS_TTL=0 walks the tree every time."""
+        monkeypatch.setenv("DISCUSS_HOOKS_ROOTS_TTL", "0")
+        get_discuss_roots(monorepo)
+
+        assert not get_cache_path(monorepo).exists()
+
+    def test_deleted_root(self, monorepo):
+        """Test a cached root that no longer exists is dropped."""
+        get_discuss_roots(monorepo)
+        shutil.rmtree(monorepo / "packages" / "web" / ".discuss")
+
+        assert monorepo / "packages" / "web" / ".discuss" not in get_discuss_roots(monorepo)
+
+
+class TestMultiRootCheck:
+    """Tests for run_check across several .discuss roots."""
+
+    def edit_outlines(self, monorepo, roots, times):
+        workspace = monorepo / "packages" / "api"
+        output = {}
+        for i in range(times):
+            for root in roots:
+                outline = next((monorepo / root / ".discuss").glob("*/*/outline.md"))
+                outline.write_text(f"# Edited {i}")
+            output = run_check({"status": "completed"}, workspace, multi_root=True)
+        return output
+
+    def test_checks_every_root(self, monorepo):
+        """Test each root gets its own snapshot."""
+        run_check({"status": "completed"}, monorepo / "packages" / "api", multi_root=True)
+
+        for root in [".", "packages/api", "packages/web"]:
+            discussions = load_snapshot(monorepo / root / ".discuss")["discussions"]
+            assert len(discussions) == 1
+
+    def test_combined_reminders(self, monorepo):
+        """Test stale discussions of several roots are reported together, labelled."""
+        output = self.edit_outlines(monorepo, [".", "packages/web"], times=4)
+        message = output["followup_message"]
+
+        assert "top-topic" in message and "web-topic" in message
+        assert "`packages/web/.discuss/2026-01-30/web-topic`" in message
+        assert "`.discuss/2026-01-30/top-topic`" in message
+        assert message.count("\n\n---\n\n") == 1
+
+    def test_roots_log_and_count_apart(self, monorepo, monkeypatch):
+        """Test concurrent roots write their log lines in root order and add up their counts."""
+        # Every root waits for the others, so all three run at once
+        barrier = threading.Barrier(3)
+
+        def record(discuss_root, *args, **kwargs):
+            name = discuss_root.parent.name
+            log_info("checking %s", name)
+            barrier.wait(timeout=5)
+            incr("roots_checked")
+            log_info("checked %s", name)
+            return []
+
+        monkeypatch.setattr(precipitation, "check_discuss_root", record)
+        monkeypatch.setenv("DISCUSS_HOOKS_LOG_FORMAT", "json")
+        set_log_format(None)
+        try:
+            run_check({"status": "completed"}, monorepo / "packages" / "api", multi_root=True)
+        finally:
+            set_log_format(None)
+
+        records = [json.loads(line) for line in get_log_file().read_text().splitlines()]
+        messages = [r["msg"] for r in records if r["msg"].startswith("> check")]
+        assert messages == [
+            "> checking repo",
+            "> checked repo",
+            "> checking api",
+            "> checked api",
+            "> checking web",
+            "> checked web",
+        ]
+        assert any("roots_checked=3" in r["msg"] for r in records)
+
+    def test_single_root_mode(self, monorepo):
+        """Test without multi-root mode only the workspace's own .discuss is checked."""
+        run_check({"status": "completed"}, monorepo / "packages" / "api", multi_root=False)
+
+        assert load_snapshot(monorepo / "packages" / "api" / ".discuss")["discussions"]
+        assert not load_snapshot(monorepo / ".discuss")["discussions"]
+
+    def test_no_roots(self, tmp_path):
+        """Test a workspace without any .discuss root is allowed."""
+        assert run_check({"status": "completed"}, tmp_path, multi_root=True) == {}
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, False),
+        ("", False),
+        ("0", False),
+        ("off", False),
+        ("1", True),
+        ("true", True),
+        (" Yes ", True),
+    ],
+)
+def test_is_multi_root_enabled(monkeypatch, value, expected):
+    """Test DISCUSS_HOOKS_MULTI_ROOT is parsed like the hook's other opt-in flags."""
+    monkeypatch.delenv("DISCUSS_HOOKS_MULTI_ROOT", raising=False)
+    if value is not None:
+        monkeypatch.setenv("DISCUSS_HOOKS_MULTI_ROOT", value)
+
+    assert is_multi_root_enabled() is expected
+
+
+def test_reminder_root_label():
+    """Test the reminder names the root outside the workspace top."""
+    reminder = format_stale_reminder("2026-01-30/topic", 3, 3, root_label="packages/api")
+
+    assert "- Root: `packages/api`" in reminder
+    assert "`packages/api/.discuss/2026-01-30/topic`" in reminder
+    assert "Root:" not in format_stale_reminder("2026-01-30/topic", 3, 3, root_label=".")
@@ -0,0 +1,460 @@
+"""
+Syscall-count and parallel-mode tests for the discussion scanners in
+snapshot_manager.py
+
+scan_active_discussions walks each topic once with os.scandir and reuses
+DirEntry stat results. These tests count stat/scandir/listdir calls against
+a copy of the previous rglob-based implementation (find_active_discussions +
+scan_discussion) and check the scanner does at most half the work while
+returning the same result. The parallel mode (workers > 1) must produce
+exactly the serial output.
+"""
+
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+from common.precipitation import run_check
+from common.snapshot_manager import (
+    cleanup_deleted_discussions,
+    find_active_discussions,
+    get_index_keys,
+    get_scan_deadline,
+    get_scan_workers,
+    load_snapshot,
+    scan_active_discussions,
+    scan_discussion,
+    scan_discussions_indexed,
+    scan_discussions_journaled,
+)
+
+from .conftest import make_topic
+
+# Reference implementation (before the single-pass scanner)
+
+
+def legacy_find_active_discussions(discuss_root: Path, hours: int = 24) -> list:
+    if not discuss_root.exists():
+        return []
+
+    active_discussions = []
+    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+    for date_dir in discuss_root.iterdir():
+        if not date_dir.is_dir():
+            continue
+        if not re.match(r"\d{4}-\d{2}-\d{2}$", date_dir.name):
+            continue
+        for topic_dir in date_dir.iterdir():
+            if not topic_dir.is_dir():
+                continue
+            if legacy_is_recently_modified(topic_dir, cutoff_time):
+                active_discussions.append(topic_dir)
+    return active_discussions
+
+
+def legacy_is_recently_modified(directory: Path, cutoff_time: datetime) -> bool:
+    try:
+        dir_mtime = datetime.fromtimestamp(directory.stat().st_mtime, tz=timezone.utc)
+        if dir_mtime > cutoff_time:
+            return True
+    except (OSError, ValueError):
+        pass
+    try:
+        for item in directory.rglob("*"):
+            if item.is_file():
+                try:
+                    file_mtime = datetime.fromtimestamp(item.stat().st_mtime, tz=timezone.utc)
+                    if file_mtime > cutoff_time:
+                        return True
+                except (OSError, ValueError):
+                    continue
+    except (OSError, ValueError):
+        pass
+    return False
+
+
+def legacy_scan_discussion(discuss_dir: Path) -> dict:
+    state = {"outline": {"mtime": 0.0, "change_count": 0}, "decisions": [], "notes": []}
+    outline_path = discuss_dir / "outline.md"
+    if outline_path.exists():
+        state["outline"]["mtime"] = outline_path.stat().st_mtime
+        state["outline"]["size"] = outline_path.stat().st_size
+    for sub in ("decisions", "notes"):
+        sub_dir = discuss_dir / sub
+        if sub_dir.exists() and sub_dir.is_dir():
+            for path in sub_dir.glob("*.md"):
+                state[sub].append(
+                    {"name": path.name, "mtime": path.stat().st_mtime, "size": path.stat().st_size}
+                )
+    return state
+
+
+def legacy_scan(discuss_root: Path) -> list:
+    return [
+        (discuss_dir, legacy_scan_discussion(discuss_dir))
+        for discuss_dir in legacy_find_active_discussions(discuss_root)
+    ]
+
+
+# Syscall counting
+
+
+class CountingEntry:
+    """DirEntry proxy counting stat() calls that reach the filesystem."""
+
+    def __init__(self, entry, counts):
+        self._entry = entry
+        self._counts = counts
+        self._stat_cached = False
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def __fspath__(self):
+        return self._entry.__fspath__()
+
+    def stat(self, *, follow_symlinks=True):
+        # DirEntry caches stat results; only the first call is a syscall
+        if not self._stat_cached:
+            self._counts["stat"] += 1
+            self._stat_cached = True
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+class CountingScandir:
+    """os.scandir replacement wrapping entries in CountingEntry."""
+
+    def __init__(self, path, counts, real_scandir):
+        self._counts = counts
+        self._iterator = real_scandir(path)
+        counts["scandir"] += 1
+
+    def __iter__(self):
+        for entry in self._iterator:
+            yield CountingEntry(entry, self._counts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._iterator.close()
+
+
+@pytest.fixture
+def count_syscalls(monkeypatch):
+    """Count os.stat/os.lstat/os.scandir/os.listdir and DirEntry.stat calls."""
+    counts = {"stat": 0, "scandir": 0}
+    real_stat, real_lstat = os.stat, os.lstat
+    real_scandir, real_listdir = os.scandir, os.listdir
+
+    def counting_stat(*args, **kwargs):
+        counts["stat"] += 1
+        return real_stat(*args, **kwargs)
+
+    def counting_lstat(*args, **kwargs):
+        counts["stat"] += 1
+        return real_lstat(*args, **kwargs)
+
+    def counting_scandir(path="."):
+        return CountingScandir(path, counts, real_scandir)
+
+    def counting_listdir(path="."):
+        counts["scandir"] += 1
+        return real_listdir(path)
+
+    monkeypatch.setattr(os, "stat", counting_stat)
+    monkeypatch.setattr(os, "lstat", counting_lstat)
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    monkeypatch.setattr(os, "listdir", counting_listdir)
+
+    def measure(func, *args):
+        counts["stat"] = counts["scandir"] = 0
+        result = func(*args)
+        return result, dict(counts)
+
+    return measure
+
+
+def make_full_topic(discuss_root: Path, key: str, age_hours: float = 0) -> Path:
+    """Create a discussion with outline, decisions, notes and an attachment subtree."""
+    return make_topic(discuss_root, key, age_hours, decisions=3, notes=2, attachments=True)
+
+
+@pytest.fixture
+def discuss_root(discuss_root):
+    """Tree with mostly old discussions and a few active ones."""
+    for day in range(10):
+        for topic in range(4):
+            make_full_topic(
+                discuss_root, f"2025-10-{day + 10:02d}/old-topic-{topic}", age_hours=24 * 30
+            )
+    make_full_topic(discuss_root, "2026-01-30/active-topic", age_hours=1)
+    make_full_topic(discuss_root, "2026-01-30/edited-topic", age_hours=24 * 30)
+    (discuss_root / "2026-01-30" / "edited-topic" / "outline.md").write_text("# Edited")
+    (discuss_root / "not-a-date").mkdir()
+    return discuss_root
+
+
+def normalize(result):
+    return sorted((str(path), state) for path, state in result)
+
+
+class TestScanSyscalls:
+    """Tests for the single-pass scanner."""
+
+    def test_same_result_as_legacy(self, discuss_root):
+        """Test the scanner finds the same discussions and state as before."""
+        result = scan_active_discussions(discuss_root)
+
+        assert normalize(result) == normalize(legacy_scan(discuss_root))
+        assert {path.name for path, _ in result} == {"active-topic", "edited-topic"}
+
+    def test_halves_syscalls(self, discuss_root, count_syscalls):
+        """Test the scanner needs at most half the stat/readdir calls of the legacy walk."""
+        legacy_result, legacy_counts = count_syscalls(legacy_scan, discuss_root)
+        result, counts = count_syscalls(scan_active_discussions, discuss_root)
+
+        assert normalize(result) == normalize(legacy_result)
+        assert counts["stat"] * 2 <= legacy_counts["stat"], (counts, legacy_counts)
+        assert sum(counts.values()) * 2 <= sum(legacy_counts.values()), (counts, legacy_counts)
+
+    def test_stats_each_file_once(self, discuss_root, count_syscalls):
+        """Test every file and topic directory is stat'ed at most once."""
+        files = sum(1 for p in discuss_root.rglob("*") if p.is_file())
+        topics = sum(1 for p in discuss_root.glob("*/*") if p.is_dir())
+
+        _, counts = count_syscalls(scan_active_discussions, discuss_root)
+
+        assert counts["stat"] <= files + topics
+
+    def test_active_wrappers_agree(self, discuss_root):
+        """Test find_active_discussions and scan_discussion match the single pass."""
+        result = scan_active_discussions(discuss_root)
+
+        assert sorted(find_active_discussions(discuss_root)) == sorted(p for p, _ in result)
+        for path, state in result:
+            assert scan_discussion(path) == state
+
+
+def old_topic_count(discuss_root: Path) -> int:
+    return sum(1 for p in discuss_root.glob("2025-*/*") if p.is_dir())
+
+
+class TestIndexedScan:
+    """Tests for the directory-index scanner."""
+
+    def test_same_result_as_full_scan(self, discuss_root):
+        """Test indexed scans find the same discussions, with and without an index."""
+        expected = normalize(scan_active_discussions(discuss_root))
+
+        result, index = scan_discussions_indexed(discuss_root, None)
+        assert normalize(result) == expected
+
+        result, new_index = scan_discussions_indexed(discuss_root, index)
+        assert normalize(result) == expected
+        assert new_index == index
+
+    def test_index_lists_all_discussions(self, discuss_root):
+        """Test the index covers every discussion, active or not."""
+        _, index = scan_discussions_indexed(discuss_root, None)
+
+        assert len(get_index_keys(index)) == old_topic_count(discuss_root) + 2
+        assert "2026-01-30/active-topic" in get_index_keys(index)
+
+    def test_cold_topics_are_not_walked(self, discuss_root, count_syscalls):
+        """Test untouched history costs four stats per topic and no directory reads."""
+        _, index = scan_discussions_indexed(discuss_root, None)
+
+        _, counts = count_syscalls(scan_discussions_indexed, discuss_root, index)
+
+        date_dirs = sum(1 for p in discuss_root.iterdir() if p.is_dir())
+        topics = old_topic_count(discuss_root) + 2
+        # Root listing plus the 5 directories of each of the 2 active topics
+        assert counts["scandir"] <= 1 + 2 * 5, counts
+        # One stat per date directory, four per topic, plus the 7 files of each active topic
+        assert counts["stat"] <= date_dirs + 4 * topics + 2 * 7, counts
+
+    def test_detects_outline_edit_in_cold_topic(self, discuss_root):
+        """Test an in-place outline.md edit in an old discussion is seen."""
+        _, index = scan_discussions_indexed(discuss_root, None)
+        outline = discuss_root / "2025-10-12" / "old-topic-1" / "outline.md"
+        outline.write_text("# Edited in place")
+
+        result, _ = scan_discussions_indexed(discuss_root, index)
+
+        assert outline.parent in {path for path, _ in result}
+
+    def test_detects_new_decision_in_cold_topic(self, discuss_root):
+        """Test a decision added to an old discussion is seen."""
+        _, index = scan_discussions_indexed(discuss_root, None)
+        decision = discuss_root / "2025-10-12" / "old-topic-1" / "decisions" / "D09-new.md"
+        decision.write_text("# New decision")
+
+        result, _ = scan_discussions_indexed(discuss_root, index)
+
+        states = {path.name: state for path, state in result}
+        assert "D09-new.md" in {d["name"] for d in states["old-topic-1"]["decisions"]}
+
+    def test_detects_new_and_deleted_topics(self, discuss_root):
+        """Test topics added to or removed from an indexed date directory."""
+        import shutil
+
+        _, index = scan_discussions_indexed(discuss_root, None)
+        make_full_topic(discuss_root, "2025-10-12/brand-new")
+        os.utime(discuss_root / "2025-10-12", None)
+        shutil.rmtree(discuss_root / "2025-10-13" / "old-topic-0")
+
+        result, new_index = scan_discussions_indexed(discuss_root, index)
+
+        assert "brand-new" in {path.name for path, _ in result}
+        assert "2025-10-12/brand-new" in get_index_keys(new_index)
+        assert "2025-10-13/old-topic-0" not in get_index_keys(new_index)
+
+
+class TestScanDeadline:
+    """Tests for indexed scans with a deadline."""
+
+    def test_generous_deadline_is_a_full_scan(self, discuss_root):
+        """Test a deadline that is not reached changes nothing."""
+        result, index = scan_discussions_indexed(discuss_root, None, deadline=time.monotonic() + 60)
+
+        assert (result, index) == scan_discussions_indexed(discuss_root, None)
+        assert "cursor" not in index
+
+    def test_unreached_topics_stay_listed(self, discuss_root):
+        """Test topics not checked in time keep an index entry and are pending."""
+        result, index = scan_discussions_indexed(discuss_root, None, deadline=time.monotonic() - 1)
+
+        assert get_index_keys(index) == get_index_keys(
+            scan_discussions_indexed(discuss_root, None)[1]
+        )
+        assert len(result) <= 1
+        assert len(index["cursor"]["pending"]) == old_topic_count(discuss_root) + 1
+
+    def test_recent_topics_first(self, discuss_root):
+        """Test the most recent topic is checked first, then the one left over."""
+        _, index = scan_discussions_indexed(discuss_root, None)
+
+        result, index = scan_discussions_indexed(discuss_root, index, deadline=time.monotonic() - 1)
+        assert [path.name for path, _ in result] == ["edited-topic"]
+        assert index["cursor"]["pending"] == ["2026-01-30/active-topic"]
+
+        result, index = scan_discussions_indexed(discuss_root, index, deadline=time.monotonic() - 1)
+        assert [path.name for path, _ in result] == ["active-topic"]
+
+    def test_sweep_reaches_idle_history(self, discuss_root):
+        """Test an edit in an idle topic is found within one sweep, resuming at the cursor."""
+        _, index = scan_discussions_indexed(discuss_root, None)
+        outline = discuss_root / "2025-10-12" / "old-topic-1" / "outline.md"
+        outline.write_text("# Edited in place")
+
+        _, index = scan_discussions_indexed(discuss_root, index, deadline=time.monotonic() - 1)
+        assert index["cursor"]["next"] == "2025-10-19/old-topic-2"
+
+        for _ in range(old_topic_count(discuss_root)):
+            result, index = scan_discussions_indexed(
+                discuss_root, index, deadline=time.monotonic() - 1
+            )
+            if outline.parent in {path for path, _ in result}:
+                break
+        else:
+            pytest.fail("edited idle topic never checked")
+
+    def test_run_check_resumes(self, discuss_root, monkeypatch):
+        """Test an out-of-time check allows, stores the cursor, and a full check clears it."""
+        monkeypatch.setenv("DISCUSS_SNAPSHOT_FORMAT", "json")
+        monkeypatch.setenv("DISCUSS_SCAN_DEADLINE_MS", "0.001")
+
+        assert run_check({"status": "completed"}, discuss_root.parent) == {}
+        index = load_snapshot(discuss_root)["index"]
+        assert index["cursor"]["pending"]
+        assert len(get_index_keys(index)) == old_topic_count(discuss_root) + 2
+
+        monkeypatch.setenv("DISCUSS_SCAN_DEADLINE_MS", "0")
+        run_check({"status": "completed"}, discuss_root.parent)
+        assert "cursor" not in load_snapshot(discuss_root)["index"]
+
+    @pytest.mark.parametrize(
+        "env, config, expected",
+        [
+            (None, None, 5.0),
+            (None, {"scan_deadline_ms": 250}, 0.25),
+            ("100", {"scan_deadline_ms": 250}, 0.1),
+            ("bogus", {}, 5.0),
+            ("0", {"scan_deadline_ms": 250}, None),
+        ],
+    )
+    def test_get_scan_deadline(self, monkeypatch, env, config, expected):
+        """Test DISCUSS_SCAN_DEADLINE_MS overrides config.scan_deadline_ms, 0 disables."""
+        monkeypatch.delenv("DISCUSS_SCAN_DEADLINE_MS", raising=False)
+        if env is not None:
+            monkeypatch.setenv("DISCUSS_SCAN_DEADLINE_MS", env)
+
+        assert get_scan_deadline(config) == expected
+
+
+class TestParallelScan:
+    """Tests for the thread-pool scan mode."""
+
+    @pytest.mark.parametrize("workers", [2, 8])
+    def test_same_output_as_serial(self, discuss_root, workers):
+        """Test every scanner returns the serial result, in the same order."""
+        serial = scan_active_discussions(discuss_root)
+        assert scan_active_discussions(discuss_root, workers=workers) == serial
+        assert find_active_discussions(discuss_root, workers=workers) == [p for p, _ in serial]
+
+        serial_indexed = scan_discussions_indexed(discuss_root, None)
+        assert scan_discussions_indexed(discuss_root, None, workers=workers) == serial_indexed
+
+        index = serial_indexed[1]
+        discussions = {f"{p.parent.name}/{p.name}": state for p, state in serial}
+        changed = {"2025-10-12/old-topic-1/outline.md", "2025-10-13", "2026-01-30/active-topic"}
+        assert scan_discussions_journaled(
+            discuss_root, index, discussions, changed, workers=workers
+        ) == scan_discussions_journaled(discuss_root, index, discussions, changed)
+
+    def test_results_sorted(self, discuss_root):
+        """Test results are ordered by discussion key."""
+        result = scan_active_discussions(discuss_root, workers=4)
+
+        keys = [f"{p.parent.name}/{p.name}" for p, _ in result]
+        assert keys == sorted(keys)
+
+    def test_parallel_cleanup(self, discuss_root):
+        """Test parallel cleanup removes the same entries as serial cleanup."""
+        discussions = {"2025-10-12/old-topic-1": {}, "2025-10-12/gone": {}, "1999-01-01/x": {}}
+        serial = {"discussions": dict(discussions)}
+        parallel = {"discussions": dict(discussions)}
+
+        assert cleanup_deleted_discussions(serial, discuss_root) == 2
+        assert cleanup_deleted_discussions(parallel, discuss_root, workers=4) == 2
+        assert parallel == serial
+
+    @pytest.mark.parametrize(
+        "env, config, expected",
+        [
+            (None, None, 1),
+            (None, {"scan_workers": 8}, 8),
+            ("4", {"scan_workers": 8}, 4),
+            ("bogus", {}, 1),
+            ("0", {}, 1),
+            ("1000", {}, 32),
+        ],
+    )
+    def test_get_scan_workers(self, monkeypatch, env, config, expected):
+        """Test DISCUSS_SCAN_WORKERS overrides config.scan_workers, serial by default."""
+        monkeypatch.delenv("DISCUSS_SCAN_WORKERS", raising=False)
+        if env is not None:
+            monkeypatch.setenv("DISCUSS_SCAN_WORKERS", env)
+
+        assert get_scan_workers(config) == expected
@@ -0,0 +1,168 @@
+"""
+Tests for the cold archive of idle discussion states (snapshot_manager)
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+import common.snapshot_manager as snapshot_manager
+from common.precipitation import run_check
+from common.snapshot_manager import (
+    archive_idle_discussions,
+    convert_snapshot_layout,
+    get_archive_days,
+    get_archive_path,
+    load_archive,
+    load_snapshot,
+    restore_archived_discussions,
+    save_snapshot,
+)
+
+from .conftest import make_topic
+
+DAY = 24 * 3600
+
+
+def set_age(topic: Path, age_days: float) -> None:
+    mtime = time.time() - age_days * DAY
+    os.utime(topic / "outline.md", (mtime, mtime))
+    os.utime(topic, (mtime, mtime))
+
+
+def state(change_count: int) -> dict:
+    return {"outline": {"mtime": 1.0, "change_count": change_count}, "decisions": [], "notes": []}
+
+
+def index_with(newest_by_key: dict) -> dict:
+    dates = {}
+    for key, newest in newest_by_key.items():
+        date_name, topic_name = key.split("/")
+        dates.setdefault(date_name, {"mtime": 0.0, "topics": {}})["topics"][topic_name] = {
+            "newest": newest
+        }
+    return {"dates": dates}
+
+
+class TestArchive:
+    """Tests for archive_idle_discussions / restore_archived_discussions."""
+
+    @pytest.fixture
+    def snapshot(self, discuss_root):
+        snapshot = load_snapshot(discuss_root)
+        snapshot["discussions"] = {"2025-01-01/idle": state(2), "2026-01-30/recent": state(1)}
+        return snapshot
+
+    def test_archives_idle_discussions(self, discuss_root, snapshot):
+        """Test idle states move to the archive file on save."""
+        index = index_with(
+            {"2025-01-01/idle": time.time() - 60 * DAY, "2026-01-30/recent": time.time()}
+        )
+
+        assert archive_idle_discussions(snapshot, index, 30) == 1
+        save_snapshot(discuss_root, snapshot)
+
+        reloaded = load_snapshot(discuss_root)
+        assert list(reloaded["discussions"]) == ["2026-01-30/recent"]
+        assert reloaded["archived"] == ["2025-01-01/idle"]
+        assert load_archive(discuss_root) == {"2025-01-01/idle": state(2)}
+
+    def test_keep_keys_and_disabled(self, snapshot):
+        """Test active keys and max_age_days=0 are never archived."""
+        index = index_with({"2025-01-01/idle": time.time() - 60 * DAY})
+
+        assert archive_idle_discussions(snapshot, index, 30, keep_keys={"2025-01-01/idle"}) == 0
+        assert archive_idle_discussions(snapshot, index, 0) == 0
+        assert "archived" not in snapshot
+
+    def test_restore(self, discuss_root, snapshot):
+        """Test a restored discussion keeps its history and leaves the archive."""
+        archive_idle_discussions(snapshot, index_with({"2025-01-01/idle": 0.0}), 30)
+        save_snapshot(discuss_root, snapshot)
+        snapshot = load_snapshot(discuss_root)
+
+        assert restore_archived_discussions(snapshot, discuss_root, ["2025-01-01/idle"]) == 1
+        save_snapshot(discuss_root, snapshot)
+
+        reloaded = load_snapshot(discuss_root)
+        assert reloaded["discussions"]["2025-01-01/idle"] == state(2)
+        assert "archived" not in reloaded
+        assert not get_archive_path(discuss_root).exists()
+
+    def test_archive_not_read_without_archived_keys(self, discuss_root, snapshot, monkeypatch):
+        """Test the archive file is left alone when no active key is archived."""
+
+        def fail(_):
+            raise AssertionError("archive was read")
+
+        monkeypatch.setattr(snapshot_manager, "load_archive", fail)
+
+        assert restore_archived_discussions(snapshot, discuss_root, ["2026-01-30/recent"]) == 0
+
+    def test_drops_deleted_archived_keys(self, discuss_root, snapshot):
+        """Test archived discussions that were deleted leave the archive."""
+        archive_idle_discussions(snapshot, index_with({"2025-01-01/idle": 0.0}), 30)
+        save_snapshot(discuss_root, snapshot)
+        snapshot = load_snapshot(discuss_root)
+
+        archive_idle_discussions(snapshot, {"dates": {}}, 30, existing_keys={"2026-01-30/recent"})
+        save_snapshot(discuss_root, snapshot)
+
+        assert "archived" not in load_snapshot(discuss_root)
+        assert load_archive(discuss_root) == {}
+
+    def test_archive_days(self, monkeypatch):
+        """Test environment > config > default (disabled)."""
+        assert get_archive_days({}) == 0
+        assert get_archive_days({"archive_after_days": 7}) == 7
+        monkeypatch.setenv("DISCUSS_SNAPSHOT_ARCHIVE_DAYS", "0")
+        assert get_archive_days({"archive_after_days": 7}) == 0
+
+    def test_yaml_snapshot(self, discuss_root, snapshot, monkeypatch):
+        """Test the archived key list round-trips through the YAML codec."""
+        monkeypatch.setenv("DISCUSS_SNAPSHOT_FORMAT", "yaml")
+        archive_idle_discussions(snapshot, index_with({"2025-01-01/idle": 0.0}), 30)
+        save_snapshot(discuss_root, snapshot)
+
+        assert load_snapshot(discuss_root)["archived"] == ["2025-01-01/idle"]
+
+
+@pytest.mark.parametrize("layout", ["single", "sharded"])
+def test_run_check_archives_and_restores(discuss_root, layout, monkeypatch):
+    """Test a discussion going idle is archived and comes back with its count."""
+    monkeypatch.setenv("DISCUSS_SNAPSHOT_ARCHIVE_DAYS", "30")
+    workspace = discuss_root.parent
+    topic = make_topic(discuss_root, "2025-01-01/topic")
+    for i in range(3):
+        mtime = time.time() + i
+        (topic / "outline.md").write_text(f"# Outline {i}")
+        os.utime(topic / "outline.md", (mtime, mtime))
+        run_check({"status": "completed"}, workspace)
+    convert_snapshot_layout(discuss_root, layout)
+    assert (
+        load_snapshot(discuss_root)["discussions"]["2025-01-01/topic"]["outline"]["change_count"]
+        == 3
+    )
+
+    # Idle for two months
+    set_age(topic, 60)
+    (discuss_root / "2025-01-01").touch()
+    run_check({"status": "completed"}, workspace)
+    snapshot = load_snapshot(discuss_root)
+    assert "2025-01-01/topic" not in snapshot["discussions"]
+    assert snapshot["archived"] == ["2025-01-01/topic"]
+
+    # Active again: history is restored and the edit counts
+    (topic / "outline.md").write_text("# Edited")
+    os.utime(topic / "outline.md", (time.time() + 10, time.time() + 10))
+    output = run_check({"status": "completed"}, workspace)
+    snapshot = load_snapshot(discuss_root)
+    assert snapshot["discussions"]["2025-01-01/topic"]["outline"]["change_count"] == 4
+    assert "archived" not in snapshot
+    assert "topic" in json.dumps(output)
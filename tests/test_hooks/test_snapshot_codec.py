@@ -0,0 +1,101 @@
+"""
+Tests for hooks/common/snapshot_codec.py
+"""
+
+import pytest
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+from common.snapshot_codec import (
+    CODECS,
+    DEFAULT_CODEC,
+    all_codecs,
+    get_codec,
+    select_codec,
+)
+
+SAMPLE_SNAPSHOT = {
+    "version": 1,
+    "config": {"stale_threshold": 3},
+    "discussions": {
+        "2026-01-30/topic": {
+            "outline": {"mtime": 1706621400.25, "change_count": 2},
+            "decisions": [{"name": "D01-xxx.md", "mtime": 1706620000.0}],
+            "notes": [],
+        }
+    },
+}
+
+
+class TestCodecRoundTrip:
+    """Tests for codec loads/dumps."""
+
+    @pytest.mark.parametrize("name", sorted(CODECS))
+    def test_round_trip(self, name):
+        """Test every codec round-trips the snapshot."""
+        codec = CODECS[name]
+
+        assert codec.loads(codec.dumps(SAMPLE_SNAPSHOT)) == SAMPLE_SNAPSHOT
+
+    @pytest.mark.parametrize("name", sorted(CODECS))
+    def test_unicode_keys(self, name):
+        """Test non-ASCII discussion keys survive."""
+        codec = CODECS[name]
+        snapshot = {"version": 1, "config": {}, "discussions": {"2026-01-30/讨论": {}}}
+
+        assert codec.loads(codec.dumps(snapshot)) == snapshot
+
+    def test_yaml_output_matches_safe_dump(self):
+        """Test YAML codec writes the same text as yaml.safe_dump."""
+        import yaml
+
+        expected = yaml.safe_dump(
+            SAMPLE_SNAPSHOT, sort_keys=False, allow_unicode=True, default_flow_style=False
+        )
+
+        assert CODECS["yaml"].dumps(SAMPLE_SNAPSHOT).decode("utf-8") == expected
+
+    def test_marshal_rejects_foreign_data(self):
+        """Test marshal codec refuses files without its magic prefix."""
+        with pytest.raises(ValueError):
+            CODECS["marshal"].loads(b"version: 1\n")
+
+    def test_json_is_compact(self):
+        """Test JSON codec writes a single line."""
+        assert b"\n" not in CODECS["json"].dumps(SAMPLE_SNAPSHOT)
+
+
+class TestSelectCodec:
+    """Tests for codec selection."""
+
+    def test_default(self, monkeypatch):
+        """Test default codec is YAML."""
+        monkeypatch.delenv("DISCUSS_SNAPSHOT_FORMAT", raising=False)
+
+        assert select_codec().name == DEFAULT_CODEC == "yaml"
+
+    def test_config(self, monkeypatch):
+        """Test config.snapshot_format selects the codec."""
+        monkeypatch.delenv("DISCUSS_SNAPSHOT_FORMAT", raising=False)
+
+        assert select_codec({"snapshot_format": "json"}).name == "json"
+
+    def test_env_overrides_config(self, monkeypatch):
+        """Test DISCUSS_SNAPSHOT_FORMAT wins over config."""
+        monkeypatch.setenv("DISCUSS_SNAPSHOT_FORMAT", "marshal")
+
+        assert select_codec({"snapshot_format": "json"}).name == "marshal"
+
+    def test_unknown_name_falls_back(self):
+        """Test unknown codec names fall back to the default."""
+        assert get_codec("toml").name == DEFAULT_CODEC
+
+    def test_all_codecs_default_first(self):
+        """Test default codec is tried first."""
+        codecs = all_codecs()
+
+        assert codecs[0].name == DEFAULT_CODEC
+        assert {c.name for c in codecs} == set(CODECS)
@@ -0,0 +1,209 @@
+"""
+Tests for hooks/common/snapshot_lock.py (concurrent snapshot updates)
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+from common.metrics import get_counters, reset_counters
+from common.precipitation import run_check
+import common.snapshot_lock as snapshot_lock_module
+from common.snapshot_lock import commit_snapshot, fcntl, snapshot_lock
+from common.snapshot_manager import (
+    compare_and_update,
+    convert_snapshot_layout,
+    get_snapshot_signature,
+    load_snapshot,
+    save_snapshot,
+    set_discussion_state,
+)
+
+from .conftest import make_topic
+
+requires_flock = pytest.mark.skipif(
+    fcntl is None or "fork" not in multiprocessing.get_all_start_methods(),
+    reason="fcntl locks and fork required",
+)
+
+# Edits per process in the stress test
+STRESS_EDITS = 5
+
+
+def touch_outline(topic: Path, mtime: float) -> None:
+    # Replace atomically, as editors do, so no hook reads a half-written outline
+    temp = topic / ".outline.md.tmp"
+    temp.write_text(f"# Outline {mtime}")
+    os.utime(temp, (mtime, mtime))
+    os.replace(temp, topic / "outline.md")
+
+
+def outline_state(mtime: float) -> dict:
+    return {"outline": {"mtime": mtime, "change_count": 0}, "decisions": [], "notes": []}
+
+
+def edit_and_check(workspace: Path, topic: Path, edits: int) -> None:
+    """Stress worker: edit one topic's outline and run the hook check after each edit."""
+    base = time.time()
+    for i in range(edits):
+        touch_outline(topic, base + i + 1)
+        run_check({"status": "completed"}, workspace)
+
+
+@requires_flock
+class TestSnapshotLock:
+    """Tests for the bounded-wait lock."""
+
+    def test_excludes_second_holder(self, discuss_root):
+        """Test a held lock times out for other holders."""
+        with snapshot_lock(discuss_root) as first:
+            assert first
+            started = time.monotonic()
+            with snapshot_lock(discuss_root, timeout=0.05) as second:
+                assert not second
+            assert time.monotonic() - started < 1
+
+        with snapshot_lock(discuss_root, timeout=0) as again:
+            assert again
+
+
+class TestCommitSnapshot:
+    """Tests for the compare-and-swap commit."""
+
+    def record(self, key, mtime):
+        def apply(snapshot):
+            state = outline_state(mtime)
+            count = compare_and_update(snapshot["discussions"].get(key, {}), state)
+            set_discussion_state(snapshot, key, state)
+            return count
+
+        return apply
+
+    def test_saves_when_unchanged(self, discuss_root):
+        """Test a snapshot nobody else saved is written as is."""
+        snapshot = load_snapshot(discuss_root)
+
+        assert commit_snapshot(discuss_root, snapshot, self.record("2026-01-30/a", 1.0)) == 1
+        assert load_snapshot(discuss_root)["discussions"]["2026-01-30/a"]["outline"]["mtime"] == 1.0
+
+    def test_merges_concurrent_save(self, discuss_root):
+        """Test a concurrent save is merged instead of overwritten."""
+        commit_snapshot(discuss_root, load_snapshot(discuss_root), self.record("2026-01-30/a", 1.0))
+        first = load_snapshot(discuss_root)
+        second = load_snapshot(discuss_root)
+
+        commit_snapshot(discuss_root, first, self.record("2026-01-30/b", 1.0))
+        count = commit_snapshot(discuss_root, second, self.record("2026-01-30/a", 2.0))
+
+        discussions = load_snapshot(discuss_root)["discussions"]
+        assert set(discussions) == {"2026-01-30/a", "2026-01-30/b"}
+        assert count == 2
+        assert discussions["2026-01-30/a"]["outline"]["change_count"] == 2
+
+    def test_same_change_counted_once(self, discuss_root):
+        """Test two sessions observing the same edit increment once."""
+        commit_snapshot(discuss_root, load_snapshot(discuss_root), self.record("2026-01-30/a", 1.0))
+        first = load_snapshot(discuss_root)
+        second = load_snapshot(discuss_root)
+
+        commit_snapshot(discuss_root, first, self.record("2026-01-30/a", 2.0))
+        count = commit_snapshot(discuss_root, second, self.record("2026-01-30/a", 2.0))
+
+        assert count == 2
+        assert (
+            load_snapshot(discuss_root)["discussions"]["2026-01-30/a"]["outline"]["change_count"]
+            == 2
+        )
+
+    def settled_snapshot(self, discuss_root, layout):
+        """Save a snapshot and age its file past SIGNATURE_SETTLE."""
+        commit_snapshot(discuss_root, load_snapshot(discuss_root), self.record("2026-01-30/a", 1.0))
+        convert_snapshot_layout(discuss_root, layout)
+        path = get_snapshot_signature(discuss_root)[0]
+        mtime = time.time() - 60
+        os.utime(path, (mtime, mtime))
+
+    @pytest.mark.parametrize("layout", ["single", "sharded"])
+    def test_unchanged_signature_skips_digest(self, discuss_root, monkeypatch, layout):
+        """Test a settled snapshot file that nobody rewrote is not hashed again."""
+        self.settled_snapshot(discuss_root, layout)
+        snapshot = load_snapshot(discuss_root)
+        assert snapshot.signature == get_snapshot_signature(discuss_root)
+
+        def no_digest(root):
+            raise AssertionError("snapshot file hashed")
+
+        monkeypatch.setattr(snapshot_lock_module, "get_snapshot_digest", no_digest)
+
+        assert commit_snapshot(discuss_root, snapshot, self.record("2026-01-30/b", 1.0)) == 1
+        assert set(load_snapshot(discuss_root)["discussions"]) == {"2026-01-30/a", "2026-01-30/b"}
+
+    @pytest.mark.parametrize("layout", ["single", "sharded"])
+    def test_changed_signature_merges(self, discuss_root, layout):
+        """Test a save after a settled load is still merged."""
+        self.settled_snapshot(discuss_root, layout)
+        first = load_snapshot(discuss_root)
+        second = load_snapshot(discuss_root)
+
+        commit_snapshot(discuss_root, first, self.record("2026-01-30/b", 1.0))
+        commit_snapshot(discuss_root, second, self.record("2026-01-30/c", 1.0))
+
+        discussions = load_snapshot(discuss_root)["discussions"]
+        assert set(discussions) == {"2026-01-30/a", "2026-01-30/b", "2026-01-30/c"}
+
+    def test_recent_file_has_no_signature(self, discuss_root):
+        """Test a snapshot file written just now is compared by digest."""
+        save_snapshot(discuss_root, load_snapshot(discuss_root), force=True)
+
+        assert load_snapshot(discuss_root).signature is None
+
+    @requires_flock
+    def test_lock_timeout_skips_write(self, discuss_root):
+        """Test nothing is written when the lock is not released in time."""
+        save_snapshot(discuss_root, load_snapshot(discuss_root), force=True)
+        reset_counters()
+
+        with snapshot_lock(discuss_root):
+            commit_snapshot(
+                discuss_root,
+                load_snapshot(discuss_root),
+                self.record("2026-01-30/a", 1.0),
+                timeout=0.01,
+            )
+
+        assert load_snapshot(discuss_root)["discussions"] == {}
+        assert get_counters()["snapshot_lock_timeouts"] == 1
+
+
+@requires_flock
+@pytest.mark.parametrize("layout", ["single", "sharded"])
+@pytest.mark.parametrize("processes", [1, 4, 16])
+def test_no_lost_updates(discuss_root, monkeypatch, processes, layout):
+    """Test concurrent hooks editing different discussions lose no increment."""
+    monkeypatch.setenv("DISCUSS_SNAPSHOT_LOCK_TIMEOUT", "30")
+    workspace = discuss_root.parent
+    topics = [make_topic(discuss_root, f"2026-01-30/topic-{i:02d}") for i in range(processes)]
+    run_check({"status": "completed"}, workspace)
+    convert_snapshot_layout(discuss_root, layout)
+
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=edit_and_check, args=(workspace, topic, STRESS_EDITS))
+        for topic in topics
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+
+    assert all(worker.exitcode == 0 for worker in workers)
+    discussions = load_snapshot(discuss_root)["discussions"]
+    counts = {key: discussions[key]["outline"]["change_count"] for key in discussions}
+    # The first run counts each new outline once, then every edit counts once
+    assert counts == {f"2026-01-30/topic-{i:02d}": STRESS_EDITS + 1 for i in range(processes)}
@@ -2,6 +2,8 @@
 Tests for hooks/common/snapshot_manager.py
 """
 
+import os
+import stat
 import pytest
 from pathlib import Path
 import time
@@ -17,8 +19,12 @@ from common.snapshot_manager import (
     find_active_discussions,
     scan_discussion,
     compare_and_update,
+    hash_changed_files,
     cleanup_deleted_discussions,
+    set_discussion_state,
+    convert_snapshot_layout,
 )
+from common.metrics import get_counters, reset_counters
 
 
 class TestCreateDefaultSnapshot:
@@ -92,6 +98,199 @@ class TestLoadSaveSnapshot:
         assert (discuss_root / ".snapshot.yaml").exists()
 
 
+class TestSnapshotFormats:
+    """Tests for snapshot codec selection and migration."""
+
+    def test_save_with_configured_format(self, tmp_path, monkeypatch):
+        """Test config.snapshot_format selects the snapshot file."""
+        monkeypatch.delenv("DISCUSS_SNAPSHOT_FORMAT", raising=False)
+        discuss_root = tmp_path / ".discuss"
+        discuss_root.mkdir()
+        snapshot = create_default_snapshot()
+        snapshot["config"]["snapshot_format"] = "json"
+
+        save_snapshot(discuss_root, snapshot)
+
+        assert (discuss_root / ".snapshot.json").exists()
+        assert not (discuss_root / ".snapshot.yaml").exists()
+        assert load_snapshot(discuss_root)["config"]["snapshot_format"] == "json"
+
+    def test_migrates_yaml_once(self, tmp_path, monkeypatch):
+        """Test an existing .snapshot.yaml is read and replaced by the new format."""
+        monkeypatch.delenv("DISCUSS_SNAPSHOT_FORMAT", raising=False)
+        discuss_root = tmp_path / ".discuss"
+        discuss_root.mkdir()
+        (discuss_root / ".snapshot.yaml").write_text(
+            "version: 1\n"
+            "config:\n"
+            "  stale_threshold: 4\n"
+            "discussions:\n"
+            "  2026-01-30/topic:\n"
+            "    outline:\n"
+            "      mtime: 100.0\n"
+            "      change_count: 2\n"
+        )
+
+        monkeypatch.setenv("DISCUSS_SNAPSHOT_FORMAT", "marshal")
+        snapshot = load_snapshot(discuss_root)
+        save_snapshot(discuss_root, snapshot)
+
+        assert not (discuss_root / ".snapshot.yaml").exists()
+        assert (discuss_root / ".snapshot.marshal").exists()
+        loaded = load_snapshot(discuss_root)
+        assert loaded["config"]["stale_threshold"] == 4
+        assert loaded["discussions"]["2026-01-30/topic"]["outline"]["change_count"] == 2
+
+    def test_loads_newest_file(self, tmp_path):
+        """Test the newest snapshot file wins when several formats exist."""
+        import os
+
+        discuss_root = tmp_path / ".discuss"
+        discuss_root.mkdir()
+        (discuss_root / ".snapshot.yaml").write_text("version: 1\nconfig:\n  stale_threshold: 4\n")
+        (discuss_root / ".snapshot.json").write_text(
+            '{"version": 1, "config": {"stale_threshold": 8}}'
+        )
+        os.utime(discuss_root / ".snapshot.yaml", (100, 100))
+
+        assert load_snapshot(discuss_root)["config"]["stale_threshold"] == 8
+
+
+class TestSnapshotWrites:
+    """Tests for dirty tracking and atomic snapshot writes."""
+
+    @pytest.fixture
+    def discuss_root(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("DISCUSS_SNAPSHOT_FORMAT", raising=False)
+        monkeypatch.delenv("DISCUSS_SNAPSHOT_FSYNC", raising=False)
+        reset_counters()
+        root = tmp_path / ".discuss"
+        root.mkdir()
+        return root
+
+    def test_loaded_snapshot_is_clean(self, discuss_root):
+        """Test a freshly saved and reloaded snapshot is not dirty."""
+        assert create_default_snapshot().dirty
+        save_snapshot(discuss_root, create_default_snapshot())
+
+        assert not load_snapshot(discuss_root).dirty
+
+    def test_unchanged_snapshot_skips_write(self, discuss_root):
+        """Test saving a clean snapshot leaves the file untouched."""
+        save_snapshot(discuss_root, create_default_snapshot())
+        snapshot_path = discuss_root / ".snapshot.yaml"
+        before = snapshot_path.stat()
+
+        reset_counters()
+
+        assert save_snapshot(discuss_root, load_snapshot(discuss_root))
+        after = snapshot_path.stat()
+        assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+        assert get_counters() == {"snapshot_writes_skipped": 1}
+
+    def test_set_discussion_state_marks_dirty(self, discuss_root):
+        """Test only real state changes mark the snapshot dirty."""
+        state = {"outline": {"mtime": 100.0, "change_count": 1}, "decisions": [], "notes": []}
+        snapshot = create_default_snapshot()
+        snapshot["discussions"]["2026-01-30/topic"] = state
+        save_snapshot(discuss_root, snapshot)
+
+        snapshot = load_snapshot(discuss_root)
+        assert not set_discussion_state(snapshot, "2026-01-30/topic", dict(state))
+        assert not snapshot.dirty
+
+        changed = dict(state, outline={"mtime": 200.0, "change_count": 2})
+        assert set_discussion_state(snapshot, "2026-01-30/topic", changed)
+        assert snapshot.dirty
+
+    def test_cleanup_marks_dirty(self, discuss_root):
+        """Test removing deleted discussions marks the snapshot dirty."""
+        snapshot = create_default_snapshot()
+        snapshot["discussions"]["2026-01-30/gone"] = {}
+        save_snapshot(discuss_root, snapshot)
+
+        snapshot = load_snapshot(discuss_root)
+        cleanup_deleted_discussions(snapshot, discuss_root)
+
+        assert snapshot.dirty
+
+    def test_force_writes_clean_snapshot(self, discuss_root):
+        """Test force=True writes even when nothing changed."""
+        save_snapshot(discuss_root, create_default_snapshot())
+        reset_counters()
+
+        save_snapshot(discuss_root, load_snapshot(discuss_root), force=True)
+
+        assert get_counters() == {"snapshot_writes": 1}
+
+    def test_write_is_atomic(self, discuss_root, monkeypatch):
+        """Test a failed write keeps the previous snapshot and leaves no temp file."""
+        snapshot = create_default_snapshot()
+        snapshot["config"]["stale_threshold"] = 5
+        save_snapshot(discuss_root, snapshot)
+
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("common.snapshot_manager.os.replace", fail_replace)
+        snapshot["config"]["stale_threshold"] = 9
+
+        assert not save_snapshot(discuss_root, snapshot, force=True)
+        monkeypatch.undo()
+        assert load_snapshot(discuss_root)["config"]["stale_threshold"] == 5
+        assert sorted(p.name for p in discuss_root.iterdir()) == [".snapshot.yaml"]
+
+    def test_new_files_follow_umask(self, discuss_root, monkeypatch):
+        """Test written files get 0666 minus the umask, not mkstemp's 0600."""
+        monkeypatch.setattr("common.snapshot_manager._UMASK", 0o022)
+        save_snapshot(discuss_root, create_default_snapshot())
+        convert_snapshot_layout(discuss_root, "sharded")
+
+        written = [path for path in discuss_root.rglob("*") if path.is_file()]
+        assert written
+        assert {stat.S_IMODE(path.stat().st_mode) for path in written} == {0o644}
+
+    def test_rewrite_keeps_mode(self, discuss_root):
+        """Test rewriting a snapshot keeps its permissions."""
+        save_snapshot(discuss_root, create_default_snapshot())
+        snapshot_path = discuss_root / ".snapshot.yaml"
+        os.chmod(snapshot_path, 0o640)
+
+        save_snapshot(discuss_root, load_snapshot(discuss_root), force=True)
+
+        assert stat.S_IMODE(snapshot_path.stat().st_mode) == 0o640
+
+    @pytest.mark.parametrize(
+        "env, config, expected",
+        [
+            (None, {}, 0),
+            (None, {"fsync": True}, 1),
+            ("1", {}, 1),
+            ("0", {"fsync": True}, 0),
+        ],
+    )
+    def test_fsync_setting(self, discuss_root, monkeypatch, env, config, expected):
+        """Test fsync follows DISCUSS_SNAPSHOT_FSYNC, then config.fsync."""
+        if env is not None:
+            monkeypatch.setenv("DISCUSS_SNAPSHOT_FSYNC", env)
+        snapshot = create_default_snapshot()
+        snapshot["config"].update(config)
+
+        save_snapshot(discuss_root, snapshot)
+
+        assert get_counters().get("snapshot_fsyncs", 0) == expected
+
+    def test_corrupt_snapshot_is_preserved(self, discuss_root):
+        """Test an unreadable snapshot is kept as .corrupt instead of dropped."""
+        (discuss_root / ".snapshot.json").write_text('{"version": 1, "discuss')
+
+        snapshot = load_snapshot(discuss_root)
+
+        assert snapshot["discussions"] == {}
+        assert snapshot.dirty
+        assert (discuss_root / ".snapshot.json.corrupt").read_text() == '{"version": 1, "discuss'
+
+
 class TestGetDiscussKey:
     """Tests for get_discuss_key function."""
     
@@ -273,6 +472,81 @@ class TestCompareAndUpdate:
         assert new_state["outline"]["change_count"] == 2
 
 
+class TestContentDigests:
+    """Tests for hash_changed_files and digest-based comparison."""
+
+    @pytest.fixture
+    def discuss_dir(self, tmp_path):
+        discuss_dir = tmp_path / ".discuss" / "2026-01-30" / "topic"
+        (discuss_dir / "notes").mkdir(parents=True)
+        (discuss_dir / "outline.md").write_text("# Outline")
+        (discuss_dir / "notes" / "note.md").write_text("# Note")
+        return discuss_dir
+
+    def scan(self, discuss_dir, old_state):
+        new_state = scan_discussion(discuss_dir)
+        hashed = hash_changed_files(old_state, new_state, discuss_dir)
+        return new_state, hashed
+
+    def test_unchanged_files_not_hashed(self, discuss_dir):
+        """Test digests are reused while mtime and size match."""
+        first, hashed = self.scan(discuss_dir, {})
+        assert hashed == 2
+        assert first["outline"]["digest"] and first["notes"][0]["digest"]
+
+        second, hashed = self.scan(discuss_dir, first)
+
+        assert hashed == 0
+        assert second == first
+
+    def test_rewrite_with_same_content(self, discuss_dir):
+        """Test a new mtime with the same content neither counts nor resets."""
+        old_state, _ = self.scan(discuss_dir, {})
+        old_state["outline"]["change_count"] = 2
+        later = time.time() + 10
+        for path in (discuss_dir / "outline.md", discuss_dir / "notes" / "note.md"):
+            path.write_text(path.read_text())
+            os.utime(path, (later, later))
+
+        new_state, hashed = self.scan(discuss_dir, old_state)
+
+        assert hashed == 2
+        assert compare_and_update(old_state, new_state) == 2
+
+    def test_content_change_counts(self, discuss_dir):
+        """Test a content change counts even if the mtime went back."""
+        old_state, _ = self.scan(discuss_dir, {})
+        old_state["outline"]["change_count"] = 2
+        (discuss_dir / "outline.md").write_text("# Outline v2")
+        earlier = time.time() - 3600
+        os.utime(discuss_dir / "outline.md", (earlier, earlier))
+
+        new_state, _ = self.scan(discuss_dir, old_state)
+
+        assert compare_and_update(old_state, new_state) == 3
+
+    def test_note_content_change_resets(self, discuss_dir):
+        """Test a changed note resets change_count."""
+        old_state, _ = self.scan(discuss_dir, {})
+        old_state["outline"]["change_count"] = 2
+        (discuss_dir / "notes" / "note.md").write_text("# Note, longer")
+
+        new_state, _ = self.scan(discuss_dir, old_state)
+
+        assert compare_and_update(old_state, new_state) == 0
+
+    def test_state_without_digests(self, discuss_dir):
+        """Test states saved before digests existed fall back to mtimes."""
+        new_state, _ = self.scan(discuss_dir, {})
+        old_state = {
+            "outline": {"mtime": new_state["outline"]["mtime"], "change_count": 2},
+            "decisions": [],
+            "notes": [{"name": "note.md", "mtime": new_state["notes"][0]["mtime"]}],
+        }
+
+        assert compare_and_update(old_state, new_state) == 2
+
+
 class TestCleanupDeletedDiscussions:
     """Tests for cleanup_deleted_discussions function."""
     
@@ -316,3 +590,19 @@ class TestCleanupDeletedDiscussions:
         
         assert cleaned == 0
         assert "2026-01-30/existing-topic" in snapshot["discussions"]
+
+    def test_uses_existing_keys(self, tmp_path):
+        """Test existing_keys decides without looking at the filesystem."""
+        snapshot = {
+            "version": 1,
+            "config": {},
+            "discussions": {
+                "2026-01-30/kept": {},
+                "2026-01-30/dropped": {},
+            },
+        }
+
+        cleaned = cleanup_deleted_discussions(snapshot, tmp_path, existing_keys={"2026-01-30/kept"})
+
+        assert cleaned == 1
+        assert list(snapshot["discussions"]) == ["2026-01-30/kept"]
@@ -0,0 +1,193 @@
+"""
+Tests for the sharded snapshot layout (hooks/common/snapshot_shards.py)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+from common.metrics import get_counters, reset_counters
+from common.precipitation import run_check
+from common.snapshot_manager import (
+    convert_snapshot_layout,
+    get_snapshot_digest,
+    load_snapshot,
+    save_snapshot,
+    set_discussion_state,
+)
+from common.snapshot_shards import (
+    ShardedDiscussions,
+    get_manifest_path,
+    get_state_dir,
+    is_sharded,
+)
+
+from .conftest import make_topic
+
+HOOKS_DIR = Path(__file__).parent.parent.parent / "hooks"
+
+
+def state(mtime: float, change_count: int = 0) -> dict:
+    return {"outline": {"mtime": mtime, "change_count": change_count}, "decisions": [], "notes": []}
+
+
+@pytest.fixture
+def discuss_root(discuss_root):
+    snapshot = load_snapshot(discuss_root)
+    for i in range(5):
+        set_discussion_state(snapshot, f"2025-10-0{i + 1}/topic-{i}", state(1000.0 + i, i))
+    save_snapshot(discuss_root, snapshot)
+    return discuss_root
+
+
+class TestConversion:
+    """Tests for convert_snapshot_layout."""
+
+    def test_round_trip(self, discuss_root):
+        """Test converting to shards and back keeps every discussion."""
+        original = dict(load_snapshot(discuss_root))
+
+        assert convert_snapshot_layout(discuss_root, "sharded")
+        assert is_sharded(discuss_root)
+        assert not (discuss_root / ".snapshot.json").exists()
+        assert (get_state_dir(discuss_root) / "2025-10-03" / "topic-2.json").is_file()
+        sharded = load_snapshot(discuss_root)
+        assert {key: sharded["discussions"][key] for key in sharded["discussions"]} == original[
+            "discussions"
+        ]
+
+        assert convert_snapshot_layout(discuss_root, "single")
+        assert not get_state_dir(discuss_root).exists()
+        assert dict(load_snapshot(discuss_root)) == original
+
+    def test_already_converted(self, discuss_root):
+        """Test converting to the current layout does nothing."""
+        assert not convert_snapshot_layout(discuss_root, "single")
+        convert_snapshot_layout(discuss_root, "sharded")
+        assert not convert_snapshot_layout(discuss_root, "sharded")
+
+    def test_unknown_layout(self, discuss_root):
+        """Test an unknown layout is rejected."""
+        with pytest.raises(ValueError):
+            convert_snapshot_layout(discuss_root, "zip")
+
+    def test_cli(self, discuss_root):
+        """Test the convert_snapshot.py command."""
+        result = subprocess.run(
+            [
+                sys.executable,
+                str(HOOKS_DIR / "stop" / "convert_snapshot.py"),
+                "--layout",
+                "sharded",
+                "--workspace",
+                str(discuss_root.parent),
+            ],
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert is_sharded(discuss_root)
+
+
+class TestShardedSnapshot:
+    """Tests for loading and saving the sharded layout."""
+
+    @pytest.fixture(autouse=True)
+    def sharded(self, discuss_root):
+        convert_snapshot_layout(discuss_root, "sharded")
+
+    def test_loads_shards_on_demand(self, discuss_root):
+        """Test only looked-up discussions are read."""
+        discussions = load_snapshot(discuss_root)["discussions"]
+
+        assert isinstance(discussions, ShardedDiscussions)
+        assert len(discussions) == 5 and "2025-10-02/topic-1" in discussions
+        assert discussions["2025-10-02/topic-1"]["outline"]["change_count"] == 1
+        assert discussions.get("2025-10-09/missing") is None
+        assert len(discussions._states) == 1
+
+    def test_writes_only_changed_shards(self, discuss_root):
+        """Test a save rewrites the changed shard and the manifest only."""
+        state_dir = get_state_dir(discuss_root)
+        untouched = state_dir / "2025-10-01" / "topic-0.json"
+        old_mtime = untouched.stat().st_mtime_ns
+        snapshot = load_snapshot(discuss_root)
+        snapshot["discussions"].get("2025-10-01/topic-0")
+        set_discussion_state(snapshot, "2025-10-02/topic-1", state(2000.0, 2))
+        reset_counters()
+
+        assert save_snapshot(discuss_root, snapshot)
+
+        assert get_counters()["snapshot_shard_writes"] == 1
+        assert untouched.stat().st_mtime_ns == old_mtime
+        reloaded = load_snapshot(discuss_root)["discussions"]
+        assert reloaded["2025-10-02/topic-1"]["outline"]["change_count"] == 2
+
+    def test_deletes_shards(self, discuss_root):
+        """Test removed discussions lose their shard and manifest entry."""
+        snapshot = load_snapshot(discuss_root)
+        del snapshot["discussions"]["2025-10-01/topic-0"]
+        snapshot.dirty = True
+        save_snapshot(discuss_root, snapshot)
+
+        assert not (get_state_dir(discuss_root) / "2025-10-01" / "topic-0.json").exists()
+        assert "2025-10-01/topic-0" not in load_snapshot(discuss_root)["discussions"]
+
+    def test_manifest_revision_changes_digest(self, discuss_root):
+        """Test every save changes the manifest digest (for concurrent writers)."""
+        digest = get_snapshot_digest(discuss_root)
+        snapshot = load_snapshot(discuss_root)
+        assert snapshot.digest == digest
+
+        save_snapshot(discuss_root, snapshot, force=True)
+
+        assert get_snapshot_digest(discuss_root) not in (None, digest)
+        assert snapshot.digest == get_snapshot_digest(discuss_root)
+
+    def test_corrupt_manifest_keeps_history(self, discuss_root):
+        """Test keys are recovered from the shards when the manifest is corrupt."""
+        get_manifest_path(discuss_root).write_text("{not json")
+
+        snapshot = load_snapshot(discuss_root)
+
+        assert len(snapshot["discussions"]) == 5
+        assert snapshot["discussions"]["2025-10-05/topic-4"]["outline"]["change_count"] == 4
+        assert save_snapshot(discuss_root, snapshot)
+        assert json.loads(get_manifest_path(discuss_root).read_text())["layout"] == "sharded"
+
+
+def test_run_check_matches_single_layout(tmp_path, monkeypatch):
+    """Test the hook gives the same verdicts and states in both layouts."""
+    monkeypatch.setenv("DISCUSS_SNAPSHOT_FORMAT", "json")
+    results = {}
+    for layout in ["single", "sharded"]:
+        workspace = tmp_path / layout
+        discuss_root = workspace / ".discuss"
+        make_topic(discuss_root, "2025-10-01/old-topic", age_hours=24 * 30)
+        active = make_topic(discuss_root, "2026-01-30/active-topic")
+        run_check({"status": "completed"}, workspace)
+        convert_snapshot_layout(discuss_root, layout)
+
+        outputs = []
+        for i in range(4):
+            mtime = time.time() + i + 1
+            (active / "outline.md").write_text(f"# Outline {i}")
+            os.utime(active / "outline.md", (mtime, mtime))
+            outputs.append(run_check({"status": "completed"}, workspace))
+
+        snapshot = load_snapshot(discuss_root)
+        discussions = snapshot["discussions"]
+        counts = {key: discussions[key]["outline"]["change_count"] for key in discussions}
+        results[layout] = (outputs, counts)
+        assert isinstance(discussions, ShardedDiscussions) == (layout == "sharded")
+
+    assert results["sharded"] == results["single"]
+    assert results["sharded"][1]["2026-01-30/active-topic"] == 5
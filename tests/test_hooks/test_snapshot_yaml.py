@@ -0,0 +1,188 @@
+"""
+Tests for hooks/common/snapshot_yaml.py
+"""
+
+import random
+
+import pytest
+import yaml
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+from common.snapshot_yaml import UnsupportedYamlError, dumps, loads
+
+
+def safe_dump(data) -> str:
+    """Serialize exactly like the hooks did with PyYAML."""
+    return yaml.safe_dump(data, sort_keys=False, allow_unicode=True, default_flow_style=False)
+
+
+def make_snapshot(rng: random.Random, discussions: int) -> dict:
+    """Build a random snapshot using the real schema."""
+    entries = {}
+    for i in range(discussions):
+        key = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}/topic-{i}"
+        entries[key] = {
+            "outline": {
+                "mtime": rng.uniform(1e9, 2e9),
+                "change_count": rng.randint(0, 9),
+            },
+            "decisions": [
+                {"name": f"D{d:02d}-choice_{rng.randint(0, 99)}.md", "mtime": rng.uniform(1e9, 2e9)}
+                for d in range(rng.randint(0, 3))
+            ],
+            "notes": [
+                {"name": f"note.{n}.md", "mtime": float(rng.randint(0, 10**9))}
+                for n in range(rng.randint(0, 2))
+            ],
+        }
+    return {
+        "version": 1,
+        "config": {"stale_threshold": rng.randint(1, 9), "snapshot_format": "yaml"},
+        "discussions": entries,
+    }
+
+
+class TestDumps:
+    """Tests for the YAML writer."""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_safe_dump(self, seed):
+        """Test output is byte-identical to yaml.safe_dump."""
+        snapshot = make_snapshot(random.Random(seed), discussions=seed)
+
+        assert dumps(snapshot) == safe_dump(snapshot)
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "2026-01-30",
+            "123",
+            "007",
+            "1_000",
+            "1.5",
+            "true",
+            "no",
+            "null",
+            "On",
+            "0x1F",
+            "plain-text",
+            "a.b/c",
+            "topic_1",
+        ],
+    )
+    def test_string_quoting_matches_safe_dump(self, value):
+        """Test strings PyYAML would resolve to other types are quoted like PyYAML."""
+        data = {value: value, "items": [value, {value: [value]}]}
+
+        assert dumps(data) == safe_dump(data)
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            0,
+            -5,
+            10**20,
+            0.0,
+            -0.0,
+            1e16,
+            1.5e-7,
+            3.14,
+            float("inf"),
+            float("-inf"),
+            True,
+            False,
+            None,
+        ],
+    )
+    def test_scalars_match_safe_dump(self, value):
+        """Test non-string scalars are formatted like PyYAML."""
+        data = {"value": value, "items": [value]}
+
+        assert dumps(data) == safe_dump(data)
+
+    def test_empty_collections(self):
+        """Test empty mappings and sequences use flow style like PyYAML."""
+        data = {"a": {}, "b": [], "c": [{}], "d": {"e": []}}
+
+        assert dumps(data) == safe_dump(data)
+        assert dumps({}) == safe_dump({})
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"key": "with space"},
+            {"key": "讨论"},
+            {"key": ""},
+            {"key": "it's"},
+            {"key": [[1, 2]]},
+            {1: "int key"},
+            {"k" * 200: 1},
+            {"key": (1, 2)},
+        ],
+    )
+    def test_unsupported_raises(self, data):
+        """Test values outside the subset are refused instead of guessed."""
+        with pytest.raises(UnsupportedYamlError):
+            dumps(data)
+
+
+class TestLoads:
+    """Tests for the YAML reader."""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_safe_load(self, seed):
+        """Test reader agrees with yaml.safe_load on safe_dump output."""
+        text = safe_dump(make_snapshot(random.Random(seed), discussions=seed))
+
+        assert loads(text) == yaml.safe_load(text)
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_round_trip_byte_stable(self, seed):
+        """Test safe_dump output survives loads -> dumps unchanged."""
+        text = safe_dump(make_snapshot(random.Random(seed), discussions=seed))
+
+        assert dumps(loads(text)) == text
+
+    def test_quoted_date_stays_string(self):
+        """Test a quoted date key is read as a string."""
+        assert loads("'2026-01-30':\n  a: 1\n") == {"2026-01-30": {"a": 1}}
+
+    def test_special_floats(self):
+        """Test .inf/.nan are read as floats."""
+        result = loads("a: .inf\nb: -.inf\nc: .nan\n")
+
+        assert result["a"] == float("inf")
+        assert result["b"] == float("-inf")
+        assert result["c"] != result["c"]
+
+    def test_empty_value_is_null(self):
+        """Test "key:" with nothing nested is None."""
+        assert loads("a:\nb: 1\n") == {"a": None, "b": 1}
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "# comment\nversion: 1\n",
+            "version: 1  # comment\n",
+            "---\nversion: 1\n",
+            "discussions: {a: 1}\n",
+            'key: "double"\n',
+            "key: with space\n",
+            "key: 2026-01-30\n",
+            "key: yes\n",
+            "key: 0x10\n",
+            "a:\n  - 1\n",
+            "a:\n\tb: 1\n",
+            "a: 1\na: 2\n",
+            "- 1\n",
+            "",
+        ],
+    )
+    def test_unsupported_raises(self, text):
+        """Test inputs outside the subset are refused (PyYAML fallback handles them)."""
+        with pytest.raises(UnsupportedYamlError):
+            loads(text)
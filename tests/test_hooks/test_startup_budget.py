@@ -0,0 +1,155 @@
+"""
+Startup-cost tests for hooks/stop/check_precipitation.py
+
+The cheap exits ("stop_hook_active", "no .discuss directory") run on most
+Stop events, so they must finish with only json/sys/os loaded. These tests
+run the hook under `python -X importtime` and check both which modules were
+imported and how long the imports took.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+HOOKS_DIR = Path(__file__).parent.parent.parent / "hooks"
+CHECK_PRECIPITATION = HOOKS_DIR / "stop" / "check_precipitation.py"
+
+# Budget for imports beyond bare interpreter startup on the fast path (microseconds).
+# json (with re/enum) is the only expected import and costs a few ms cold.
+FAST_PATH_IMPORT_BUDGET_US = 30_000
+
+# Runs per budget measurement (the fastest one is checked)
+BUDGET_RUNS = 3
+
+# Modules that must only be imported once a scan is really needed
+HEAVY_MODULES = {"yaml", "logging", "uuid", "datetime", "pathlib", "typing", "socket"}
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        Mapping of module name to self import time (microseconds)
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def run_importtime(args: list, input_text: str = "", cwd: Path = None) -> Dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        input=input_text,
+        capture_output=True,
+        text=True,
+        cwd=str(cwd) if cwd else None,
+    )
+    assert result.returncode == 0, result.stderr
+    return parse_importtime(result.stderr)
+
+
+@pytest.fixture(scope="module")
+def baseline_modules():
+    """Modules imported by bare interpreter startup."""
+    return set(run_importtime(["-c", "pass"]))
+
+
+def fast_path_imports(input_data: dict, cwd: Path, baseline: set) -> Dict[str, int]:
+    modules = run_importtime(
+        [str(CHECK_PRECIPITATION)],
+        input_text=json.dumps(input_data),
+        cwd=cwd,
+    )
+    return {name: us for name, us in modules.items() if name not in baseline}
+
+
+class TestFastPathImports:
+    """Tests for import cost of the cheap exits."""
+
+    @pytest.mark.parametrize(
+        "input_data",
+        [
+            {"hook_event_name": "Stop", "stop_hook_active": True},
+            {"status": "completed"},
+        ],
+    )
+    def test_no_heavy_imports(self, input_data, tmp_path, monkeypatch, baseline_modules):
+        """Test cheap exits don't import heavy or common.* modules."""
+        monkeypatch.setenv("PWD", str(tmp_path))
+
+        extra = fast_path_imports(input_data, tmp_path, baseline_modules)
+
+        top_level = {name.split(".")[0] for name in extra}
+        assert not top_level & HEAVY_MODULES
+        assert "common" not in top_level
+
+    def test_within_budget(self, tmp_path, monkeypatch, baseline_modules):
+        """Test fast path import time stays within FAST_PATH_IMPORT_BUDGET_US."""
+        monkeypatch.setenv("PWD", str(tmp_path))
+
+        # Best of a few runs: the budget is about code, not a busy machine
+        runs = [
+            fast_path_imports({"status": "completed"}, tmp_path, baseline_modules)
+            for _ in range(BUDGET_RUNS)
+        ]
+        extra = min(runs, key=lambda modules: sum(modules.values()))
+
+        total_us = sum(extra.values())
+        assert (
+            total_us <= FAST_PATH_IMPORT_BUDGET_US
+        ), f"fast path imports took {total_us}us: " + ", ".join(
+            f"{name}={us}" for name, us in sorted(extra.items())
+        )
+
+    def test_scan_path_loads_common(self, tmp_path, monkeypatch, baseline_modules):
+        """Test the parser sees heavy imports once a scan is needed."""
+        (tmp_path / ".discuss").mkdir()
+        monkeypatch.setenv("PWD", str(tmp_path))
+        monkeypatch.setenv("DISCUSS_HOOKS_NO_DAEMON", "1")
+
+        extra = fast_path_imports({"status": "completed"}, tmp_path, baseline_modules)
+
+        assert "common.precipitation" in extra
+
+    def test_scan_path_without_pyyaml(self, tmp_path, monkeypatch, baseline_modules):
+        """Test a scan reads and writes the YAML snapshot without importing PyYAML."""
+        discuss_dir = tmp_path / ".discuss" / "2026-01-30" / "topic"
+        discuss_dir.mkdir(parents=True)
+        (discuss_dir / "outline.md").write_text("# Outline")
+        monkeypatch.setenv("PWD", str(tmp_path))
+        monkeypatch.setenv("DISCUSS_HOOKS_NO_DAEMON", "1")
+        monkeypatch.setenv("DISCUSS_HOOKS_NO_CACHE", "1")
+        monkeypatch.delenv("DISCUSS_SNAPSHOT_FORMAT", raising=False)
+
+        # First run writes the snapshot, second run reads it back
+        for _ in range(2):
+            extra = fast_path_imports({"status": "completed"}, tmp_path, baseline_modules)
+            assert "yaml" not in extra
+        assert (tmp_path / ".discuss" / ".snapshot.yaml").exists()
+
+    def test_cache_hit_skips_heavy_imports(self, tmp_path, monkeypatch, baseline_modules):
+        """Test a verdict cache hit answers without the check's imports."""
+        discuss_dir = tmp_path / ".discuss" / "2026-01-30" / "topic"
+        discuss_dir.mkdir(parents=True)
+        (discuss_dir / "outline.md").write_text("# Outline")
+        monkeypatch.setenv("PWD", str(tmp_path))
+        monkeypatch.setenv("DISCUSS_HOOKS_NO_DAEMON", "1")
+        monkeypatch.delenv("DISCUSS_HOOKS_NO_CACHE", raising=False)
+
+        # First run checks and caches the verdict, second run is a hit
+        fast_path_imports({"status": "completed"}, tmp_path, baseline_modules)
+        extra = fast_path_imports({"status": "completed"}, tmp_path, baseline_modules)
+
+        top_level = {name.split(".")[0] for name in extra}
+        assert not top_level & HEAVY_MODULES
+        assert "common.verdict_cache" in extra
+        assert "common.precipitation" not in extra
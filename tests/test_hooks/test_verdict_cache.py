@@ -0,0 +1,301 @@
+"""
+Tests for hooks/common/verdict_cache.py and its use by the Stop-hook check
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "hooks"))
+
+import common.verdict_cache as verdict_cache
+from common.change_journal import JournalWriter
+from common.precipitation import run_check
+from common.snapshot_manager import load_snapshot, save_snapshot
+from common.verdict_cache import cached_verdict, get_cache_path
+
+from .conftest import make_topic
+
+ACTIVE = "2026-01-30/active-topic"
+IDLE = "2025-10-01/idle-topic-0"
+
+
+def touch(path: Path, seconds: float = 10) -> None:
+    """Move a path's mtime forward, so the change shows on any filesystem."""
+    mtime = time.time() + seconds
+    os.utime(path, (mtime, mtime))
+
+
+def dir_mtimes(path: Path) -> list:
+    """mtimes of a path and its parents up to the .discuss directory."""
+    mtimes = []
+    while path.name != ".discuss":
+        mtimes.append(path.stat().st_mtime)
+        path = path.parent
+    return mtimes
+
+
+def check(discuss_root: Path) -> dict:
+    return run_check({"status": "completed"}, discuss_root.parent)
+
+
+@pytest.fixture
+def discuss_root(discuss_root):
+    for i in range(3):
+        make_topic(discuss_root, f"2025-10-01/idle-topic-{i}", age_hours=24 * 30, decisions=1)
+    make_topic(discuss_root, ACTIVE, decisions=1)
+    return discuss_root
+
+
+@pytest.fixture
+def cached(discuss_root):
+    """A .discuss root whose last check allowed the stop and was cached."""
+    assert check(discuss_root) == {}
+    assert cached_verdict(discuss_root) == {}
+    return discuss_root
+
+
+class TestCacheHit:
+    """Tests for hits after a check that allowed the stop."""
+
+    def test_hit_after_unchanged_check(self, cached):
+        """Test a second check of an unchanged tree is served from the cache."""
+        assert os.path.isfile(get_cache_path(cached))
+        assert cached_verdict(cached) == {}
+
+    def test_hit_does_not_walk_the_tree(self, cached, monkeypatch):
+        """Test a hit lists no directory but .discuss."""
+
+        def no_scandir(path):
+            raise AssertionError(f"scandir({path})")
+
+        monkeypatch.setattr(os, "scandir", no_scandir)
+
+        assert cached_verdict(cached) == {}
+
+    def test_hit_after_unchanged_rerun(self, cached):
+        """Test the check itself keeps the cache valid when nothing changed."""
+        assert check(cached) == {}
+
+        assert cached_verdict(cached) == {}
+
+    def test_disabled(self, discuss_root, monkeypatch):
+        """Test DISCUSS_HOOKS_NO_CACHE=1 writes no cache."""
+        monkeypatch.setenv("DISCUSS_HOOKS_NO_CACHE", "1")
+
+        check(discuss_root)
+
+        assert not os.path.exists(get_cache_path(discuss_root))
+
+
+class TestCacheMiss:
+    """Tests for changes that must invalidate the cached verdict."""
+
+    def test_in_place_outline_edit_in_active_topic(self, cached):
+        """Test an outline rewritten in place (no directory mtime change) is a miss."""
+        outline = cached / ACTIVE / "outline.md"
+        before = dir_mtimes(outline.parent)
+
+        outline.write_text("# Outline, rewritten")
+        touch(outline)
+
+        assert dir_mtimes(outline.parent) == before
+        assert cached_verdict(cached) is None
+
+    def test_in_place_decision_edit_in_active_topic(self, cached):
+        """Test a decision rewritten in place is a miss."""
+        decision = cached / ACTIVE / "decisions" / "D01-decision.md"
+        before = dir_mtimes(decision.parent)
+
+        decision.write_text("# Decision, revised")
+        touch(decision)
+
+        assert dir_mtimes(decision.parent) == before
+        assert cached_verdict(cached) is None
+
+    def test_in_place_outline_edit_in_idle_topic(self, cached):
+        """Test an outline edit in a discussion idle for weeks is a miss."""
+        outline = cached / IDLE / "outline.md"
+        before = dir_mtimes(outline.parent)
+
+        outline.write_text("# Outline, reopened")
+        touch(outline)
+
+        assert dir_mtimes(outline.parent) == before
+        assert cached_verdict(cached) is None
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda root: make_topic(root, "2026-01-30/new-topic"),
+            lambda root: make_topic(root, "2026-02-01/new-date"),
+            lambda root: shutil.rmtree(root / IDLE),
+            lambda root: (root / "notes.txt").write_text("not a date"),
+        ],
+        ids=["new-topic", "new-date", "deleted-topic", "new-root-entry"],
+    )
+    def test_tree_changes(self, cached, change):
+        """Test topics and dates added or removed are a miss."""
+        change(cached)
+
+        assert cached_verdict(cached) is None
+
+    def test_snapshot_saved_by_another_session(self, cached):
+        """Test a snapshot written after the check is a miss."""
+        save_snapshot(cached, load_snapshot(cached), force=True)
+
+        assert cached_verdict(cached) is None
+
+    def test_environment_change(self, cached, monkeypatch):
+        """Test a different reminder mode is a miss."""
+        monkeypatch.setenv("DISCUSS_REMINDER_MODE", "problems")
+
+        assert cached_verdict(cached) is None
+
+    def test_expired(self, cached, monkeypatch):
+        """Test a verdict older than CACHE_MAX_AGE is a miss."""
+        monkeypatch.setattr(verdict_cache, "CACHE_MAX_AGE", 0.0)
+
+        assert cached_verdict(cached) is None
+
+    def test_corrupt_cache(self, cached):
+        """Test an unreadable cache is a miss."""
+        Path(get_cache_path(cached)).write_text('{"version": 1, "created"')
+
+        assert cached_verdict(cached) is None
+
+
+class TestCacheWrite:
+    """Tests for which checks are cached."""
+
+    def test_reminder_removes_cache(self, cached):
+        """Test a check that reminds leaves no cached verdict behind."""
+        outline = cached / ACTIVE / "outline.md"
+        output = {}
+        for i in range(3):
+            outline.write_text(
+                f"# Outline\n\nRound {i}: " + " ".join(f"point-{i}-{n}" for n in range(50))
+            )
+            touch(outline, i + 1)
+            output = check(cached)
+
+        assert output != {}
+        assert not os.path.exists(get_cache_path(cached))
+
+    def test_deadline_removes_cache(self, cached, monkeypatch):
+        """Test a check that ran out of time (resume cursor stored) is not cached."""
+        monkeypatch.setenv("DISCUSS_SCAN_DEADLINE_MS", "0.001")
+        touch(cached / IDLE)
+
+        assert check(cached) == {}
+        assert load_snapshot(cached)["index"].get("cursor")
+        assert not os.path.exists(get_cache_path(cached))
+
+    def test_fingerprint_from_before_the_scan(self, discuss_root, monkeypatch):
+        """Test a topic created while the check runs is a miss afterwards."""
+        scan = verdict_cache.get_root_names
+
+        def names_then_create(root):
+            names = scan(root)
+            make_topic(discuss_root, "2026-02-01/created-during-check")
+            return names
+
+        monkeypatch.setattr("common.precipitation.get_root_names", names_then_create)
+
+        assert check(discuss_root) == {}
+        assert cached_verdict(discuss_root) is None
+
+
+class TestCacheWithJournal:
+    """Tests for the journal fast path (a live change watcher)."""
+
+    @pytest.fixture
+    def writer(self, discuss_root):
+        writer = JournalWriter(discuss_root)
+        writer.start()
+        yield writer
+        writer.close(remove=True)
+
+    def settle(self, discuss_root):
+        """Age the journal past JOURNAL_SETTLE, as if the watcher had been quiet."""
+        touch(discuss_root / ".journal", -2 * verdict_cache.JOURNAL_SETTLE)
+
+    def test_live_journal_skips_topic_stats(self, discuss_root, writer, monkeypatch):
+        """Test an unchanged, settled journal of a live watcher vouches for the tree."""
+        assert check(discuss_root) == {}
+        record = json.loads(Path(get_cache_path(discuss_root)).read_text())
+        assert record["journal"]["pid"] == os.getpid()
+        self.settle(discuss_root)
+
+        def no_stat(path, mtime):
+            raise AssertionError(f"stat({path})")
+
+        monkeypatch.setattr(verdict_cache, "_same_mtime", no_stat)
+
+        assert cached_verdict(discuss_root) == {}
+
+    def test_recent_journal_falls_back_to_stats(self, discuss_root, writer, monkeypatch):
+        """Test a journal written within JOURNAL_SETTLE does not vouch for the tree."""
+        assert check(discuss_root) == {}
+        touch(discuss_root / ".journal", 0)
+
+        stats = []
+        same_mtime = verdict_cache._same_mtime
+        monkeypatch.setattr(
+            verdict_cache,
+            "_same_mtime",
+            lambda path, mtime: stats.append(path) or same_mtime(path, mtime),
+        )
+
+        assert cached_verdict(discuss_root) == {}
+        assert stats
+
+    @pytest.mark.parametrize("relative", ["outline.md", "decisions/D01-decision.md"])
+    def test_edit_before_journal_append_is_a_miss(self, discuss_root, writer, relative):
+        """Test an active file edited before the watcher journals it is a miss."""
+        assert check(discuss_root) == {}
+        self.settle(discuss_root)
+        assert cached_verdict(discuss_root) == {}
+
+        path = discuss_root / ACTIVE / relative
+        path.write_text("# Rewritten before the watcher caught up")
+        touch(path)
+
+        assert cached_verdict(discuss_root) is None
+
+    def test_journaled_change_is_a_miss(self, discuss_root, writer, monkeypatch):
+        """Test a journal grown since the check falls back to the per-topic stats."""
+        assert check(discuss_root) == {}
+        outline = discuss_root / IDLE / "outline.md"
+        outline.write_text("# Outline, reopened")
+        touch(outline)
+        writer.append([f"{IDLE}/outline.md"])
+
+        stats = []
+        same_mtime = verdict_cache._same_mtime
+        monkeypatch.setattr(
+            verdict_cache,
+            "_same_mtime",
+            lambda path, mtime: stats.append(path) or same_mtime(path, mtime),
+        )
+
+        assert cached_verdict(discuss_root) is None
+        assert stats
+
+    def test_replaced_journal_falls_back_to_stats(self, discuss_root, writer):
+        """Test a journal from another watcher falls back to the per-topic stats."""
+        assert check(discuss_root) == {}
+        writer.close(remove=True)
+        JournalWriter(discuss_root).start()
+
+        assert cached_verdict(discuss_root) == {}
+
+        outline = discuss_root / IDLE / "outline.md"
+        outline.write_text("# Outline, reopened")
+        touch(outline)
+        assert cached_verdict(discuss_root) is None